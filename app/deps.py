@@ -6,8 +6,33 @@ Phase 4 Migration: Node auth -> App-to-app auth
 - Context headers (X-Context-Household-Id, X-Context-Node-Id) provide request origin
 """
 
+import functools
+
 from jarvis_auth_client.fastapi import require_app_auth as _require_app_auth
 
+from app.services.auth_cache import AuthCache
+from app.services.tracing import span
+
+
+def _traced(dependency):
+    """Wrap an async dependency in an "auth.validate" span.
+
+    functools.wraps keeps the original signature (via __wrapped__), so
+    FastAPI still sees the Header() parameters.
+    """
+
+    @functools.wraps(dependency)
+    async def wrapper(*args, **kwargs):
+        with span("auth.validate"):
+            return await dependency(*args, **kwargs)
+
+    return wrapper
+
+
+# Validated credentials are cached locally (see app/services/auth_cache.py)
+auth_cache = AuthCache()
+
 # The dependency returned by require_app_auth() already uses Header() annotations,
-# so FastAPI extracts headers correctly. Do NOT wrap it in a plain-param function.
-verify_app_auth = _require_app_auth()
+# so FastAPI extracts headers correctly. Do NOT wrap it in a plain-param function
+# (the wrappers above preserve its signature).
+verify_app_auth = _traced(auth_cache.wrap(_require_app_auth()))
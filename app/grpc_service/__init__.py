@@ -0,0 +1 @@
+"""gRPC service for jarvis-tts (optional, requires grpcio)."""
@@ -0,0 +1,177 @@
+"""gRPC front end for jarvis-tts.
+
+Serves unary ``Synthesize`` and server-streaming ``SynthesizeStream``
+RPCs carrying raw PCM. Requests go through the same SpeechPipeline as
+/speak (voice, scheduler, coalescing, phrase bank, disk store and audio
+cache, both read and written, and the fallback voice under load;
+AudioMetadata.voice names the voice used), and
+app credentials are read from call metadata and validated with the same
+dependency as the HTTP endpoints.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+import grpc
+from fastapi import HTTPException
+
+from app.deps import verify_app_auth
+from app.grpc_service import tts_pb2, tts_pb2_grpc
+from app.services.cost_model import overload_retry_after
+from app.services.metrics import get_metrics
+from app.services.scheduler import Tenant, get_scheduler
+from app.services.speech import SpeechPipeline, SpeechPlan, TextTooLong
+from app.services.synthesis import AudioFormat, UnknownSpeaker
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys mirror the HTTP auth headers
+_AUTH_METADATA = {
+    "x_jarvis_app_id": "x-jarvis-app-id",
+    "x_jarvis_app_key": "x-jarvis-app-key",
+    "x_context_household_id": "x-context-household-id",
+    "x_context_node_id": "x-context-node-id",
+    "x_context_user_id": "x-context-user-id",
+    "x_context_household_member_ids": "x-context-household-member-ids",
+}
+
+
+def _metadata(plan: SpeechPlan, fmt: AudioFormat) -> tts_pb2.AudioMetadata:
+    return tts_pb2.AudioMetadata(
+        sample_rate=fmt.sample_rate,
+        channels=fmt.channels,
+        sample_width=fmt.sample_width,
+        voice=plan.voice_key,
+        etag=plan.etag,
+    )
+
+
+class TextToSpeechServicer(tts_pb2_grpc.TextToSpeechServicer):
+    """Implements the TextToSpeech service on top of a SpeechPipeline."""
+
+    def __init__(
+        self,
+        speech: SpeechPipeline,
+        authenticate: Callable[..., Awaitable[Any]] = verify_app_auth,
+    ):
+        self._speech = speech
+        self._authenticate_fn = authenticate
+
+    async def _authenticate(self, context: grpc.aio.ServicerContext) -> Any:
+        metadata = {key.lower(): value for key, value in context.invocation_metadata() or ()}
+        kwargs: dict[str, Any] = {name: metadata.get(key) for name, key in _AUTH_METADATA.items()}
+        if kwargs["x_context_user_id"] is not None:
+            try:
+                kwargs["x_context_user_id"] = int(kwargs["x_context_user_id"])
+            except ValueError:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid x-context-user-id")
+        try:
+            return await self._authenticate_fn(**kwargs)
+        except HTTPException as e:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, str(e.detail))
+
+    async def _plan(self, request: tts_pb2.SynthesizeRequest, context: grpc.aio.ServicerContext) -> SpeechPlan:
+        if not request.text:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "No text provided")
+        postprocess = request.postprocess if request.HasField("postprocess") else None
+        fast_start = request.fast_start if request.HasField("fast_start") else None
+        try:
+            return self._speech.plan(request.text, postprocess, fast_start, request.speaker or None)
+        except (TextTooLong, UnknownSpeaker) as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    async def _cached(self, plan: SpeechPlan) -> tuple[AudioFormat, bytes] | None:
+        return await asyncio.to_thread(self._speech.cached_pcm, plan)
+
+    async def _admit(self, context: grpc.aio.ServicerContext) -> None:
+        """Abort with RESOURCE_EXHAUSTED and retry-after metadata when overloaded."""
+        retry_after = overload_retry_after(get_scheduler().workers)
+        if retry_after is None:
+            return
+        get_metrics().increment("synthesis_rejected_total", route="grpc")
+        context.set_trailing_metadata((("retry-after", str(retry_after)),))
+        await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Synthesis queue is full")
+
+    async def Synthesize(self, request, context):
+        auth = await self._authenticate(context)
+        logger.debug("gRPC Synthesize from %s", auth.app.app_id)
+        plan = await self._plan(request, context)
+
+        cached = await self._cached(plan)
+        if cached is None:
+            plan = self._speech.degrade(plan)
+            cached = await self._cached(plan) if plan.degraded else None
+        if cached is not None:
+            fmt, pcm = cached
+            return tts_pb2.SynthesizeResponse(metadata=_metadata(plan, fmt), pcm=pcm)
+
+        await self._admit(context)
+        fmt: AudioFormat | None = None
+        parts: list[bytes] = []
+        tenant = Tenant.from_auth(auth)
+        chunks = self._speech.open_pcm(plan)
+        # Chunks another identical request already synthesized are taken without a worker
+        steps = get_scheduler().iterate(chunks, tenant=tenant, cost=plan.predicted_seconds, turn=chunks)
+        async for chunk_fmt, pcm in steps:
+            fmt = fmt or chunk_fmt
+            parts.append(pcm)
+        if fmt is None:
+            await context.abort(grpc.StatusCode.INTERNAL, "No audio produced")
+        pcm = b"".join(parts)
+        # Disk and shared-cache writes block; keep them off the event loop
+        await asyncio.to_thread(self._speech.store_pcm, plan, fmt, pcm)
+        return tts_pb2.SynthesizeResponse(metadata=_metadata(plan, fmt), pcm=pcm)
+
+    async def SynthesizeStream(self, request, context) -> AsyncIterator[tts_pb2.SynthesizeChunk]:
+        auth = await self._authenticate(context)
+        logger.debug("gRPC SynthesizeStream from %s", auth.app.app_id)
+        plan = await self._plan(request, context)
+
+        cached = await self._cached(plan)
+        if cached is None:
+            plan = self._speech.degrade(plan)
+            cached = await self._cached(plan) if plan.degraded else None
+        if cached is not None:
+            fmt, pcm = cached
+            yield tts_pb2.SynthesizeChunk(metadata=_metadata(plan, fmt), pcm=pcm)
+            return
+
+        await self._admit(context)
+        first = True
+        tenant = Tenant.from_auth(auth)
+        # Saved as it streams; the writes run with the pulls, on a scheduler
+        # worker only for chunks this request synthesizes
+        subscription = self._speech.open_pcm(plan)
+        chunks = self._speech.tee_pcm(plan, subscription)
+        steps = get_scheduler().iterate(chunks, tenant=tenant, cost=plan.predicted_seconds, turn=subscription)
+        try:
+            async for fmt, pcm in steps:
+                if first:
+                    first = False
+                    yield tts_pb2.SynthesizeChunk(metadata=_metadata(plan, fmt), pcm=pcm)
+                else:
+                    yield tts_pb2.SynthesizeChunk(pcm=pcm)
+        finally:
+            # A cancelled RPC is interrupted at a yield above, outside steps;
+            # closing steps closes chunks, which releases the (possibly
+            # coalesced) synthesis and discards the partial stored clip
+            await steps.aclose()
+        if first:
+            await context.abort(grpc.StatusCode.INTERNAL, "No audio produced")
+
+
+async def start_grpc_server(
+    speech: SpeechPipeline,
+    port: int,
+    authenticate: Callable[..., Awaitable[Any]] = verify_app_auth,
+) -> grpc.aio.Server:
+    """Start the gRPC server on port (0 picks a free port) and return it."""
+    server = grpc.aio.server()
+    tts_pb2_grpc.add_TextToSpeechServicer_to_server(TextToSpeechServicer(speech, authenticate), server)
+    bound = server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    server.bound_port = bound  # type: ignore[attr-defined]
+    logger.info("gRPC server listening on port %d", bound)
+    return server
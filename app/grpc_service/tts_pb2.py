@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: app/grpc_service/tts.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'app/grpc_service/tts.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1a\x61pp/grpc_service/tts.proto\x12\rjarvis.tts.v1\"\x84\x01\n\x11SynthesizeRequest\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x18\n\x0bpostprocess\x18\x02 \x01(\x08H\x00\x88\x01\x01\x12\x17\n\nfast_start\x18\x03 \x01(\x08H\x01\x88\x01\x01\x12\x0f\n\x07speaker\x18\x04 \x01(\tB\x0e\n\x0c_postprocessB\r\n\x0b_fast_start\"i\n\rAudioMetadata\x12\x13\n\x0bsample_rate\x18\x01 \x01(\r\x12\x10\n\x08\x63hannels\x18\x02 \x01(\r\x12\x14\n\x0csample_width\x18\x03 \x01(\r\x12\r\n\x05voice\x18\x04 \x01(\t\x12\x0c\n\x04\x65tag\x18\x05 \x01(\t\"Q\n\x12SynthesizeResponse\x12.\n\x08metadata\x18\x01 \x01(\x0b\x32\x1c.jarvis.tts.v1.AudioMetadata\x12\x0b\n\x03pcm\x18\x02 \x01(\x0c\"N\n\x0fSynthesizeChunk\x12.\n\x08metadata\x18\x01 \x01(\x0b\x32\x1c.jarvis.tts.v1.AudioMetadata\x12\x0b\n\x03pcm\x18\x02 \x01(\x0c\x32\xb9\x01\n\x0cTextToSpeech\x12Q\n\nSynthesize\x12 .jarvis.tts.v1.SynthesizeRequest\x1a!.jarvis.tts.v1.SynthesizeResponse\x12V\n\x10SynthesizeStream\x12 .jarvis.tts.v1.SynthesizeRequest\x1a\x1e.jarvis.tts.v1.SynthesizeChunk0\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'app.grpc_service.tts_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_SYNTHESIZEREQUEST']._serialized_start=46
+  _globals['_SYNTHESIZEREQUEST']._serialized_end=178
+  _globals['_AUDIOMETADATA']._serialized_start=180
+  _globals['_AUDIOMETADATA']._serialized_end=285
+  _globals['_SYNTHESIZERESPONSE']._serialized_start=287
+  _globals['_SYNTHESIZERESPONSE']._serialized_end=368
+  _globals['_SYNTHESIZECHUNK']._serialized_start=370
+  _globals['_SYNTHESIZECHUNK']._serialized_end=448
+  _globals['_TEXTTOSPEECH']._serialized_start=451
+  _globals['_TEXTTOSPEECH']._serialized_end=636
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,140 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from app.grpc_service import tts_pb2 as app_dot_grpc__service_dot_tts__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in app/grpc_service/tts_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class TextToSpeechStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Synthesize = channel.unary_unary(
+                '/jarvis.tts.v1.TextToSpeech/Synthesize',
+                request_serializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.SerializeToString,
+                response_deserializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeResponse.FromString,
+                _registered_method=True)
+        self.SynthesizeStream = channel.unary_stream(
+                '/jarvis.tts.v1.TextToSpeech/SynthesizeStream',
+                request_serializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.SerializeToString,
+                response_deserializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeChunk.FromString,
+                _registered_method=True)
+
+
+class TextToSpeechServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def Synthesize(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SynthesizeStream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_TextToSpeechServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Synthesize': grpc.unary_unary_rpc_method_handler(
+                    servicer.Synthesize,
+                    request_deserializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.FromString,
+                    response_serializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeResponse.SerializeToString,
+            ),
+            'SynthesizeStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.SynthesizeStream,
+                    request_deserializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.FromString,
+                    response_serializer=app_dot_grpc__service_dot_tts__pb2.SynthesizeChunk.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'jarvis.tts.v1.TextToSpeech', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('jarvis.tts.v1.TextToSpeech', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class TextToSpeech:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Synthesize(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/jarvis.tts.v1.TextToSpeech/Synthesize',
+            app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.SerializeToString,
+            app_dot_grpc__service_dot_tts__pb2.SynthesizeResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SynthesizeStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/jarvis.tts.v1.TextToSpeech/SynthesizeStream',
+            app_dot_grpc__service_dot_tts__pb2.SynthesizeRequest.SerializeToString,
+            app_dot_grpc__service_dot_tts__pb2.SynthesizeChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,29 +1,69 @@
-import json
+# First, so the startup report times every import below
+from app.startup_report import get_startup_report  # isort: skip
+
+import asyncio
 import logging
 import os
-import wave
-from io import BytesIO
+import threading
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import httpx
-import onnxruntime as ort
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, Request, Response
-from piper import PiperVoice
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTasks
 
 from app import service_config
 from app.deps import verify_app_auth
-from app.services.settings_service import get_settings_service
+from app.services.audio_cache import create_audio_cache
+from app.services.audio_store import StoredClip, StoredClipResponse, create_audio_store, if_none_match
+from app.services.cost_model import cost_units, get_cost_model, overload_retry_after
+from app.services.deadline import DeadlineExceeded, DeadlineGuard, parse_deadline, record_deadline_exceeded
+from app.services.degradation import DEGRADED_HEADER, get_degradation_policy, get_load_governor
+from app.services.jobs import JobManager, create_job_manager, get_job_limits
+from app.services.log_shipping import BatchingLogHandler
+from app.services.memory import MemorySamplingMiddleware, get_voice_memory, mib, peak_rss_bytes, rss_bytes
+from app.services.metrics import get_metrics
+from app.services.ort_session import get_session_memory_options, load_voice
+from app.services.phrase_bank import PhraseBankStore, get_phrase_bank_path
+from app.services.scheduler import Tenant, get_scheduler
+from app.services.settings_service import deferred_settings_service, get_settings_service
+from app.services.speech import SpeechPipeline, SpeechPlan, TextTooLong
+from app.services.synthesis import UnknownSpeaker, instrument_voice, stream_wav, text_chunks, voice_speakers
+from app.services.timing import RequestTimingMiddleware, current_timer, get_timing_stats, mark
+from app.services.tracing import (
+    FirstTokenTimer,
+    TracingMiddleware,
+    current_span,
+    inject_trace_headers,
+    setup_tracing,
+    shutdown_tracing,
+    span,
+)
+from app.services.voice_swap import VoiceHotSwap, warm_up_workers
+from app.services.wake_response import (
+    CutoffReason,
+    WakeTextCollector,
+    collect_wake_text,
+    feed_lines,
+    get_wake_cutoff,
+)
+from app.services.wav_buffer import assemble_wav, get_buffer_pool
 from jarvis_auth_client.models import AppAuthResult
 from jarvis_settings_client import create_combined_auth, create_settings_router, create_superuser_auth
 
+if TYPE_CHECKING:
+    from piper import PiperVoice
+
 try:
     from jarvis_log_client import JarvisLogHandler, init as init_log_client
     _jarvis_log_available = True
 except ImportError:
     _jarvis_log_available = False
 
-ort.set_default_logger_severity(3)  # 3=ERROR, suppresses warnings
 load_dotenv()
 
 # Set up logging
@@ -37,6 +77,22 @@ logger = logging.getLogger("uvicorn")
 # Remote logging handler (initialized in startup event)
 _jarvis_handler = None
 
+# gRPC server (started in startup event when server.grpc_port is set)
+_grpc_server = None
+
+# Background task switching voices when tts.default_voice changes
+_voice_watch_task: asyncio.Task | None = None
+
+# Long-form synthesis jobs (created on first use)
+_job_manager: JobManager | None = None
+
+
+def _get_job_manager() -> JobManager:
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = create_job_manager(get_scheduler())
+    return _job_manager
+
 
 def _setup_remote_logging() -> None:
     """Set up remote logging to jarvis-logs server."""
@@ -54,10 +110,15 @@ def _setup_remote_logging() -> None:
 
     init_log_client(app_id=app_id, app_key=app_key)
 
-    remote_level = os.getenv("JARVIS_LOG_REMOTE_LEVEL", "DEBUG")
-    _jarvis_handler = JarvisLogHandler(
-        service="jarvis-tts",
-        level=getattr(logging, remote_level.upper(), logging.DEBUG),
+    remote_level = getattr(logging, os.getenv("JARVIS_LOG_REMOTE_LEVEL", "DEBUG").upper(), logging.DEBUG)
+    remote_handler = JarvisLogHandler(service="jarvis-tts", level=remote_level)
+    # Ship from a background thread so jarvis-logs never blocks a request
+    _jarvis_handler = BatchingLogHandler(
+        remote_handler,
+        level=remote_level,
+        max_queue=int(os.getenv("JARVIS_LOG_QUEUE_SIZE", "1000")),
+        batch_size=int(os.getenv("JARVIS_LOG_BATCH_SIZE", "100")),
+        flush_interval=float(os.getenv("JARVIS_LOG_FLUSH_INTERVAL", "1.0")),
     )
 
     for logger_name in ["uvicorn", "uvicorn.error", "uvicorn.access"]:
@@ -66,12 +127,30 @@ def _setup_remote_logging() -> None:
     logger.info("Remote logging enabled to jarvis-logs")
 
 
+def _shutdown_remote_logging() -> None:
+    """Detach the remote handler and ship whatever is still queued."""
+    global _jarvis_handler
+    if _jarvis_handler is None:
+        return
+    for logger_name in ["uvicorn", "uvicorn.error", "uvicorn.access"]:
+        logging.getLogger(logger_name).removeHandler(_jarvis_handler)
+    _jarvis_handler.close()
+    _jarvis_handler = None
+
+
 app = FastAPI(title="Jarvis TTS", version="1.0.0")
+app.add_middleware(MemorySamplingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+app.add_middleware(TracingMiddleware)
 
+_superuser_auth = create_superuser_auth(service_config.get_auth_url())
+
+# The settings service (and its DB engine) is created on first use, in
+# the startup hook at the latest, not at import
 _settings_router = create_settings_router(
-    service=get_settings_service(),
+    service=deferred_settings_service(),
     auth_dependency=create_combined_auth(service_config.get_auth_url()),
-    write_auth_dependency=create_superuser_auth(service_config.get_auth_url()),
+    write_auth_dependency=_superuser_auth,
 )
 app.include_router(_settings_router, prefix="/settings", tags=["settings"])
 
@@ -79,15 +158,157 @@ app.include_router(_settings_router, prefix="/settings", tags=["settings"])
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on app startup."""
-    service_config.init()
-    _setup_remote_logging()
+    report = get_startup_report()
+    with report.phase("config"):
+        service_config.init()
+    with report.phase("logging"):
+        _setup_remote_logging()
+    with report.phase("tracing"):
+        setup_tracing()
+    with report.phase("voice"):
+        _active_voice()
+        _load_fallback_voice()
+        await _warm_worker_sessions()
+    with report.phase("caches"):
+        _speech.phrase_bank = PhraseBankStore(get_phrase_bank_path())
+        _speech.audio_store = create_audio_store()
+        _speech.audio_cache = create_audio_cache()
+    with report.phase("grpc"):
+        await _start_grpc()
+    _start_voice_watch()
     logger.info("Jarvis TTS service started")
+    report.finish()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the gRPC server, letting in-flight calls finish, and flush traces and logs."""
+    global _grpc_server, _voice_watch_task
+    if _voice_watch_task is not None:
+        _voice_watch_task.cancel()
+        _voice_watch_task = None
+    if _grpc_server is not None:
+        await _grpc_server.stop(grace=5)
+        _grpc_server = None
+    if _speech.audio_cache is not None:
+        _speech.audio_cache.close()
+    shutdown_tracing()
+    _shutdown_remote_logging()
+
+
+async def _warm_worker_sessions() -> None:
+    """With pinned workers, build and warm each worker's sessions now, not on its first request.
+
+    Every worker holds its own copy of each voice's model, next to the
+    voice's original session; the startup report lists the copies and the
+    memory they take.
+    """
+    scheduler = get_scheduler()
+    if not scheduler.pinned:
+        return
+    await warm_up_workers(scheduler, _active_voice())
+    if _speech.fallback_voice is not None:
+        await warm_up_workers(scheduler, _speech.fallback_voice[1])
+    for entry in get_voice_memory().snapshot():
+        get_startup_report().note(
+            f"Voice {entry['voice']}: {entry['sessions']} ORT sessions "
+            f"({entry['sessions'] - 1} per-worker model copies), {mib(entry['resident_bytes']):.1f} MiB resident"
+        )
+
+
+async def _start_grpc() -> None:
+    """Start the optional gRPC server alongside the HTTP app."""
+    global _grpc_server
+    port = get_settings_service().get_int("server.grpc_port", 0)
+    if port <= 0:
+        return
+    try:
+        from app.grpc_service.server import start_grpc_server
+    except ImportError:
+        logger.warning("server.grpc_port is set but grpcio is not installed, gRPC disabled")
+        return
+    _grpc_server = await start_grpc_server(_speech, port)
+
+
+def _start_voice_watch() -> None:
+    """Watch tts.default_voice and hot-swap the voice when it changes."""
+    global _voice_watch_task
+    interval = get_settings_service().get_float("tts.voice_watch_interval_seconds", 10.0)
+    if interval <= 0 or _voice_watch_task is not None:
+        return
+    _voice_watch_task = asyncio.get_running_loop().create_task(_voice_swap.watch(interval))
+
 
 VOICE_DIR = Path("app/models")
-MODEL_PATH = VOICE_DIR / "en_GB-alan-low.onnx"
-CONFIG_PATH = VOICE_DIR / "en_GB-alan-low.onnx.json"
+DEFAULT_VOICE = "en_GB-alan-low"
+
+
+def _load_voice(name: str) -> "PiperVoice":
+    # Imported here (piper too, in load_voice): the heaviest imports, and
+    # only needed once a voice is loaded
+    import onnxruntime as ort
+
+    ort.set_default_logger_severity(3)  # 3=ERROR, suppresses warnings
+    model_path = VOICE_DIR / f"{name}.onnx"
+    rss_before = rss_bytes()
+    loaded = load_voice(
+        name,
+        model_path,
+        VOICE_DIR / f"{name}.onnx.json",
+        get_session_memory_options(),
+        per_worker=get_settings_service().get_bool("tts.worker_pinning", False),
+    )
+    get_voice_memory().track(name, loaded, rss_bytes() - rss_before, model_path)
+    # Phonemization and inference show up as their own request stages
+    return instrument_voice(loaded)
+
+
+def _load_fallback_voice() -> None:
+    """Load tts.degraded_voice, the lighter voice used under load, if set."""
+    name = get_degradation_policy().voice
+    if not name:
+        return
+    try:
+        _speech.fallback_voice = (name, _load_voice(name))
+    except Exception as e:
+        logger.error("Failed to load degraded voice %s, load-adaptive degradation disabled: %s", name, e)
+        return
+    _speech.governor = get_load_governor()
+    logger.info("Degraded voice %s loaded", name)
+
+
+# Start on the env fallback of tts.default_voice; the watcher reconciles
+# with the settings service once it is running
+VOICE_NAME = os.getenv("TTS_DEFAULT_VOICE") or DEFAULT_VOICE
+
+# Loaded by the startup hook, or on first use when startup is skipped
+voice: "PiperVoice | None" = None
+_voice_load_lock = threading.Lock()
+
+
+def _active_voice() -> "PiperVoice":
+    """The active voice, loading VOICE_NAME if no voice is loaded yet."""
+    global voice
+    if voice is None:
+        with _voice_load_lock:
+            if voice is None:
+                voice = _load_voice(VOICE_NAME)
+    return voice
+
+
+def _set_voice(name: str, new_voice: "PiperVoice") -> None:
+    # Runs on the event loop, like the provider below, so requests see
+    # the name and voice change together
+    global VOICE_NAME, voice
+    VOICE_NAME, voice = name, new_voice
+
+
+# Voice, coalescing and caches shared by /speak and the gRPC service.
+# The provider reads the module-level voice at call time.
+_speech = SpeechPipeline(lambda: (VOICE_NAME, _active_voice()))
+
+_voice_swap = VoiceHotSwap(_load_voice, lambda: (VOICE_NAME, _active_voice()), _set_voice, get_scheduler=get_scheduler)
 
-voice = PiperVoice.load(model_path=MODEL_PATH, config_path=CONFIG_PATH)
 
 @app.get("/ping")
 def pong():
@@ -98,51 +319,308 @@ def pong():
 def health():
     return {"status": "healthy"}
 
+
+@app.get("/metrics")
+def metrics():
+    return get_metrics().snapshot()
+
+
+@app.get("/voices")
+def voices(auth: AppAuthResult = Depends(verify_app_auth)):
+    """The loaded voice and, for multi-speaker voices, its speakers."""
+    return {"voice": VOICE_NAME, "speakers": voice_speakers(_active_voice())}
+
+
+@app.get("/admin/timings", dependencies=[Depends(_superuser_auth)])
+def admin_timings():
+    """Per-route, per-stage latency percentiles over the recent window."""
+    stats = get_timing_stats()
+    return {"window": stats.window, "routes": stats.percentiles()}
+
+
+@app.get("/admin/memory", dependencies=[Depends(_superuser_auth)])
+def admin_memory():
+    """Process RSS and approximate resident memory per loaded voice."""
+    return {
+        "rss_bytes": rss_bytes(),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "active_voice": VOICE_NAME,
+        "voices": get_voice_memory().snapshot(),
+    }
+
+
+def _record_time_to_first_audio(started: float, voice_name: str, mode: str) -> None:
+    """Time from request arrival until audio is ready to send, per voice and mode."""
+    timer = current_timer()
+    elapsed = timer.elapsed() if timer is not None else time.perf_counter() - started
+    get_metrics().observe("speak_time_to_first_audio_seconds", elapsed, voice=voice_name, mode=mode)
+
+
+def _record_speak_deadline(plan: SpeechPlan, chunks: DeadlineGuard | None) -> None:
+    """Count a /speak abandoned at its deadline and the text chunks it skipped."""
+    produced = started = 0
+    if chunks is not None:
+        produced = chunks.produced
+        # Once audio came out, the text chunk it belongs to has started
+        started = SpeechPipeline.chunks_done(chunks) + (1 if produced else 0)
+        # Releases the (possibly coalesced) synthesis right away
+        chunks.close()
+    skipped = list(text_chunks(plan.text, plan.limits))[started:]
+    model = get_cost_model()
+    seconds = sum(model.predict(plan.voice_name, cost_units(chunk)) for chunk in skipped)
+    record_deadline_exceeded("speak", "running" if produced else "queued", len(skipped), seconds)
+
+
+def _deadline_exceeded(plan: SpeechPlan, chunks: DeadlineGuard | None) -> JSONResponse:
+    _record_speak_deadline(plan, chunks)
+    return JSONResponse(status_code=504, content={"error": "Deadline exceeded"})
+
+
+def _overloaded(route: str, retry_after: int) -> JSONResponse:
+    """503 with Retry-After set to the predicted queue drain time."""
+    get_metrics().increment("synthesis_rejected_total", route=route)
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Synthesis queue is full"},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def _until_deadline(body, on_exceeded):
+    """End a streamed body quietly when its deadline passes mid-stream."""
+    try:
+        async for part in body:
+            yield part
+    except DeadlineExceeded:
+        on_exceeded()
+
+
+def _cache_lookup(plan: SpeechPlan) -> bytes | memoryview | StoredClip | None:
+    # Pre-rendered phrases are slices of the mapped bank; stored clips are
+    # sent from their open file (Range capable)
+    with span("tts.cache_lookup", voice=plan.voice_name) as lookup_span:
+        cached = _speech.cached_wav(plan)
+        if lookup_span is not None:
+            lookup_span.set_attribute("tts.cache_hit", cached is not None)
+    return cached
+
+
 @app.post("/speak")
 async def speak(request: Request, auth: AppAuthResult = Depends(verify_app_auth)):
+    # Everything before the handler runs (routing, auth) counts as "auth"
+    mark("auth")
+    started = time.perf_counter()
+    deadline = parse_deadline(request.headers)
     logger.debug(
-        f"TTS request from {auth.app.app_id} "
-        f"for household {auth.context.household_id}, node {auth.context.node_id}"
+        "TTS request from %s for household %s, node %s",
+        auth.app.app_id, auth.context.household_id, auth.context.node_id,
     )
     data = await request.json()
     text = data.get("text", "")
+    mark("parse")
     if not text:
         return {"error": "No text provided"}
 
-    # Get the generator from Piper
-    audio_chunks = voice.synthesize(text)
-
-    # Grab first chunk to read audio properties
-    first_chunk = next(audio_chunks)
-    sample_rate = first_chunk.sample_rate
-    channels = first_chunk.sample_channels
-    sample_width = first_chunk.sample_width  # in bytes (should be 2 for 16-bit PCM)
-
-    # Prepare in-memory WAV buffer
-    buf = BytesIO()
-    with wave.open(buf, 'wb') as wav_file:
-        wav_file.setnchannels(channels)
-        wav_file.setsampwidth(sample_width)
-        wav_file.setframerate(sample_rate)
-
-        # Write first chunk
-        wav_file.writeframes(first_chunk.audio_int16_bytes)
-
-        # Write remaining chunks
-        for chunk in audio_chunks:
-            wav_file.writeframes(chunk.audio_int16_bytes)
+    try:
+        with span("tts.plan", text_length=len(text)):
+            plan = _speech.plan(text, data.get("postprocess"), data.get("fast_start"), data.get("speaker"))
+    except TextTooLong as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except UnknownSpeaker as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    mark("plan")
+
+    # The weak ETag names the request's inputs: a match means the client
+    # already has an equivalent rendering
+    if_none = request.headers.get("if-none-match")
+    if if_none_match(if_none, plan.etag):
+        return Response(status_code=304, headers={"ETag": plan.etag})
+
+    # The shared cache is a blocking Redis client: look up off the loop
+    cached = await run_in_threadpool(_cache_lookup, plan)
+    if cached is None:
+        # Under load, new synthesis uses the lighter fallback voice (whose
+        # clip may be cached too); cached clips of the configured voice
+        # are still served as they are
+        degraded = _speech.degrade(plan)
+        if degraded is not plan:
+            plan = degraded
+            cached = await run_in_threadpool(_cache_lookup, plan)
+    mark("cache")
+    headers = {"ETag": plan.etag, DEGRADED_HEADER: "1" if plan.degraded else "0"}
+    if cached is not None:
+        _record_time_to_first_audio(started, plan.voice_name, "cached")
+    if isinstance(cached, StoredClip):
+        # Stored clips carry a strong ETag of their bytes, which makes
+        # Range (and If-Range) safe
+        headers["ETag"] = cached.etag
+        if if_none_match(if_none, cached.etag):
+            cached.close()
+            return Response(status_code=304, headers={"ETag": cached.etag})
+        return StoredClipResponse(cached, media_type="audio/wav", headers=headers)
+    if cached is not None:
+        return Response(content=cached, media_type="audio/wav", headers=headers)
+
+    # Nobody is waiting for audio past the deadline: don't start it, and
+    # stop a started synthesis at the next chunk boundary
+    scheduler = get_scheduler()
+    if deadline is not None and deadline.expired():
+        return _deadline_exceeded(plan, None)
+    retry_after = overload_retry_after(scheduler.workers)
+    if retry_after is not None:
+        return _overloaded("speak", retry_after)
+    # Identical requests in flight share one synthesis; only the pulls
+    # that produce a chunk take a scheduler worker (the subscription is
+    # the turn)
+    subscription = _speech.open_pcm(plan)
+    pcm_chunks = DeadlineGuard(subscription, deadline)
+
+    # Grab first chunk on the synthesis scheduler to read audio properties;
+    # every step is charged to the caller's app and household, and short
+    # requests go first
+    tenant = Tenant.from_auth(auth)
+    cost = plan.predicted_seconds
+    try:
+        with span("tts.synthesis.first_chunk", voice=plan.voice_name):
+            first_chunk = await scheduler.pull(
+                pcm_chunks, None, tenant=tenant, deadline=deadline, cost=cost, turn=subscription
+            )
+    except DeadlineExceeded:
+        return _deadline_exceeded(plan, pcm_chunks)
+    mark("synth_first")
+    if first_chunk is None:
+        return {"error": "No audio produced"}
+
+    # Long text is streamed so only a few chunks are held in memory at a time;
+    # fast-start requests are streamed so the leading clause goes out at once
+    audio_store = _speech.audio_store
+    audio_cache = _speech.audio_cache
+    if data.get("stream") or plan.limits.fast_start or len(text) > plan.limits.long_text_threshold_chars:
+        _record_time_to_first_audio(started, plan.voice_name, "fast_start" if plan.limits.fast_start else "stream")
+        body = stream_wav(first_chunk, pcm_chunks)
+        if audio_store is not None:
+            body = audio_store.tee(plan.key, body)
+        if audio_cache is not None:
+            body = audio_cache.tee(plan.key, body)
+        # pcm_chunks stops before the next chunk once the deadline passes;
+        # chunks already synthesized are still sent
+        body = _until_deadline(
+            scheduler.iterate(body, tenant=tenant, cost=cost, turn=subscription),
+            lambda: _record_speak_deadline(plan, pcm_chunks),
+        )
+        return StreamingResponse(body, media_type="audio/wav", headers=headers)
+
+    # Synthesizes the remaining chunks one step each, then copies them into
+    # a pooled buffer; the response sends a view of it and returns the
+    # buffer to the pool afterwards
+    try:
+        with span("tts.synthesis.render", voice=plan.voice_name):
+            rest = [
+                chunk
+                async for chunk in scheduler.iterate(
+                    pcm_chunks, tenant=tenant, deadline=deadline, cost=cost, turn=subscription
+                )
+            ]
+            buffer, content = assemble_wav(first_chunk, iter(rest), get_buffer_pool())
+    except DeadlineExceeded:
+        return _deadline_exceeded(plan, pcm_chunks)
+    mark("render")
+    _record_time_to_first_audio(started, plan.voice_name, "buffered")
+    try:
+        if audio_store is not None:
+            with span("tts.audio_store.put"):
+                etag = await run_in_threadpool(audio_store.put, plan.key, content)
+            if etag is not None:
+                headers["ETag"] = etag
+            mark("store")
+    except BaseException:
+        buffer.release()
+        raise
+    # After the response is sent: publish to the audio cache (a network
+    # write for the shared tier), then recycle the buffer
+    after = BackgroundTasks()
+    if audio_cache is not None:
+        after.add_task(audio_cache.put, plan.key, content)
+    after.add_task(buffer.release)
+    return Response(content=content, media_type="audio/wav", headers=headers, background=after)
+
+
+@app.post("/speak/jobs", status_code=202)
+async def create_speak_job(request: Request, auth: AppAuthResult = Depends(verify_app_auth)):
+    data = await request.json()
+    text = data.get("text", "")
+    if not text:
+        return JSONResponse(status_code=400, content={"error": "No text provided"})
+
+    try:
+        plan = _speech.plan(text, data.get("postprocess"), speaker=data.get("speaker"), limits=get_job_limits())
+    except TextTooLong as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except UnknownSpeaker as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    # A new job waits behind interactive work and the other jobs
+    retry_after = overload_retry_after(get_scheduler().workers, background=True)
+    if retry_after is not None:
+        return _overloaded("jobs", retry_after)
+
+    tenant = Tenant.from_auth(auth)
+    try:
+        job = _get_job_manager().create(
+            owner=tenant,
+            text=text,
+            voice=plan.voice,
+            limits=plan.limits,
+            postprocess=plan.postprocess,
+            speaker_id=plan.speaker_id,
+            tenant=tenant,
+            voice_name=plan.voice_name,
+        )
+    except RuntimeError:
+        # Synthesis scheduler shut down (service stopping)
+        return JSONResponse(status_code=503, content={"error": "Synthesis is shutting down"})
+    logger.debug("Created synthesis job %s for %s", job.id, auth.app.app_id)
+    return job.to_dict()
+
+
+@app.get("/speak/jobs/{job_id}")
+def get_speak_job(job_id: str, auth: AppAuthResult = Depends(verify_app_auth)):
+    job = _get_job_manager().get(job_id, owner=Tenant.from_auth(auth))
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job.to_dict()
+
+
+@app.get("/speak/jobs/{job_id}/audio")
+def get_speak_job_audio(job_id: str, auth: AppAuthResult = Depends(verify_app_auth)):
+    job = _get_job_manager().get(job_id, owner=Tenant.from_auth(auth))
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    wav = job.iter_wav()
+    if wav is None:
+        return JSONResponse(status_code=409, content={"error": "No audio available yet", **job.to_dict()})
+    size, pieces = wav
+    # Partial audio is returned while the job is still running
+    return StreamingResponse(
+        pieces,
+        media_type="audio/wav",
+        headers={"Content-Length": str(size), "X-Job-Status": job.status.value},
+    )
 
-    return Response(content=buf.getvalue(), media_type="audio/wav")
 
 @app.post("/generate-wake-response")
-async def generate_wake_response(auth: AppAuthResult = Depends(verify_app_auth)):
+async def generate_wake_response(request: Request, auth: AppAuthResult = Depends(verify_app_auth)):
+    mark("auth")
+    deadline = parse_deadline(request.headers)
+    if deadline is not None and deadline.expired():
+        record_deadline_exceeded("wake", "queued")
+        return JSONResponse(status_code=504, content={"error": "Deadline exceeded"})
     logger.debug(
-        f"Wake response request from {auth.app.app_id} "
-        f"for household {auth.context.household_id}, node {auth.context.node_id}"
+        "Wake response request from %s for household %s, node %s",
+        auth.app.app_id, auth.context.household_id, auth.context.node_id,
     )
     llm_proxy_version = os.getenv("JARVIS_LLM_PROXY_API_VERSION", "1")
     llm_proxy_url = f"{service_config.get_llm_proxy_url()}/api/v{llm_proxy_version}/lightweight/chat"
-    logger.debug(f"Calling LLM proxy at {llm_proxy_url}")
+    logger.debug("Calling LLM proxy at %s", llm_proxy_url)
     
     system_prompt = (
         "You are Jarvis, a voice assistant butler. The user has just called you for help. "
@@ -160,18 +638,34 @@ async def generate_wake_response(auth: AppAuthResult = Depends(verify_app_auth))
         "stream": True
     }
 
-    async with httpx.AsyncClient() as client:
-        async with client.stream("POST", llm_proxy_url, headers=headers, json=body, timeout=20.0) as response:
-            response.raise_for_status()
-            full_text = ""
-            async for line in response.aiter_lines():
-                if not line.strip():
-                    continue
-                try:
-                    chunk = httpx.Response(200, content=line).json()
-                    full_text += chunk.get("response", "")
-                except json.JSONDecodeError as e:
-                    logger.debug(f"Failed to parse LLM response chunk: {e}")
-                    continue
-
-    return {"text": full_text.strip() or "Yes?"}
+    cutoff = get_wake_cutoff()
+    with span("llm.stream", **{"url.full": llm_proxy_url}) as llm_span:
+        first_token = FirstTokenTimer(current_span())
+
+        def on_token() -> None:
+            if first_token.ttft is None:
+                first_token.token()
+                mark("llm_first_token")
+
+        async def read(collector: WakeTextCollector) -> None:
+            # Returning early (or being cancelled at the deadline) closes the stream
+            async with httpx.AsyncClient() as client:
+                async with client.stream("POST", llm_proxy_url, headers=headers, json=body, timeout=20.0) as response:
+                    response.raise_for_status()
+                    await feed_lines(response.aiter_lines(), collector, on_token)
+
+        # W3C trace context so the LLM proxy's spans join this trace
+        inject_trace_headers(headers)
+        budget = deadline.remaining() if deadline is not None else None
+        text, reason = await collect_wake_text(read, cutoff, budget)
+        if reason is CutoffReason.DEADLINE and deadline is not None and deadline.expired():
+            record_deadline_exceeded("wake", "running")
+        if llm_span is not None:
+            llm_span.set_attribute("llm.cutoff_reason", reason.value)
+    mark("llm")
+
+    return {"text": text}
+
+
+# Everything above ran at import time
+get_startup_report().imported()
@@ -0,0 +1,417 @@
+"""Two-tier audio cache shared between jarvis-tts replicas.
+
+Behind a load balancer each replica used to re-synthesize clips another
+replica had already made. TwoTierAudioCache looks a clip up by its
+synthesis key in two backends:
+
+- local: an in-process LRU of complete WAVs (LocalAudioCache), bounded
+  by total size, with a per-entry TTL
+- shared: a Redis-protocol server (RedisCacheBackend) every replica
+  talks to, with its own TTL and a per-clip size limit
+
+A shared hit is copied into the local tier. Payloads in the shared tier
+are compressed (zlib over byte-shuffled 16-bit samples, which compresses
+PCM noticeably better than the raw interleaved bytes), so fewer bytes
+cross the network. An unreachable shared server only costs misses: after
+an error the backend is skipped for a short back-off period.
+
+Both backends implement CacheBackend (get/set), so another store can be
+plugged in without touching the speech pipeline.
+"""
+
+import logging
+import socket
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Protocol
+from urllib.parse import unquote, urlsplit
+
+from app.services.metrics import get_metrics
+from app.services.synthesis import WAV_HEADER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Payload format tags (first byte of a shared-tier value)
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+_ZLIB_SHUFFLE16 = b"\x02"
+
+
+class CacheBackend(Protocol):
+    """A key/value store for complete WAV clips."""
+
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        ...
+
+
+def encode_payload(data: bytes, level: int) -> bytes:
+    """Compress a clip for the shared tier; stored raw if that is smaller."""
+    if level <= 0:
+        return _RAW + data
+    if len(data) % 2 == 0:
+        # Low bytes of 16-bit samples are noisy, high bytes repetitive;
+        # grouping them lets zlib find far more matches
+        tag, packed = _ZLIB_SHUFFLE16, zlib.compress(data[0::2] + data[1::2], level)
+    else:
+        tag, packed = _ZLIB, zlib.compress(data, level)
+    if len(packed) >= len(data):
+        return _RAW + data
+    return tag + packed
+
+
+def decode_payload(payload: bytes) -> bytes:
+    """Inverse of encode_payload(). Raises ValueError on a malformed payload."""
+    tag, body = payload[:1], payload[1:]
+    try:
+        if tag == _RAW:
+            return body
+        if tag == _ZLIB:
+            return zlib.decompress(body)
+        if tag == _ZLIB_SHUFFLE16:
+            shuffled = zlib.decompress(body)
+            half = len(shuffled) // 2
+            data = bytearray(len(shuffled))
+            data[0::2] = shuffled[:half]
+            data[1::2] = shuffled[half:]
+            return bytes(data)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt cache payload: {e}") from e
+    raise ValueError(f"Unknown cache payload format {tag!r}")
+
+
+class LocalAudioCache:
+    """In-process LRU of clips, bounded by total bytes, with per-entry TTLs."""
+
+    def __init__(self, max_bytes: int, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._total = 0
+        metrics = get_metrics()
+        metrics.register_gauge("audio_cache_local_bytes", lambda: self._total)
+        metrics.register_gauge("audio_cache_local_entries", lambda: len(self._entries))
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self._total -= len(value)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > self.max_bytes or ttl_seconds <= 0:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total -= len(previous[0])
+            self._entries[key] = (value, self._clock() + ttl_seconds)
+            self._total += len(value)
+            while self._total > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._total -= len(evicted)
+                get_metrics().increment("audio_cache_local_evictions_total")
+
+
+class RedisError(Exception):
+    """An error reply from the Redis server."""
+
+
+class _Connection:
+    """One RESP connection; not thread-safe, pooled by RedisCacheBackend."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    def execute(self, *args: bytes | str | int) -> object:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode()
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n" % len(arg))
+            parts.append(arg)
+            parts.append(b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> object:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by Redis server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by Redis server")
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected Redis reply {line[:20]!r}")
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisCacheBackend:
+    """CacheBackend on a Redis-protocol server (GET / SET ... PX).
+
+    Speaks RESP directly over a small pool of sockets. Connection errors
+    and timeouts are logged, counted in audio_cache_shared_errors_total
+    and treated as misses; the server is then skipped for retry_seconds.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key_prefix: str = "jarvis-tts:audio:",
+        timeout: float = 0.2,
+        retry_seconds: float = 5.0,
+        max_idle: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme {parts.scheme!r} (expected redis://)")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.db = int(parts.path.lstrip("/") or 0)
+        self._username = unquote(parts.username) if parts.username else None
+        self._password = unquote(parts.password) if parts.password else None
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self.max_idle = max_idle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle: list[_Connection] = []
+        self._down_until = 0.0
+
+    def _connect(self) -> _Connection:
+        conn = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self._password is not None:
+                if self._username:
+                    conn.execute("AUTH", self._username, self._password)
+                else:
+                    conn.execute("AUTH", self._password)
+            if self.db:
+                conn.execute("SELECT", self.db)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _execute(self, *args: bytes | str | int) -> object:
+        with self._lock:
+            if self._clock() < self._down_until:
+                get_metrics().increment("audio_cache_shared_skipped_total")
+                return None
+            conn = self._idle.pop() if self._idle else None
+        try:
+            if conn is None:
+                conn = self._connect()
+            reply = conn.execute(*args)
+        except (OSError, RedisError, ValueError) as e:
+            if conn is not None:
+                conn.close()
+            with self._lock:
+                self._down_until = self._clock() + self.retry_seconds
+            get_metrics().increment("audio_cache_shared_errors_total")
+            logger.warning("Shared audio cache %s:%d unavailable: %s", self.host, self.port, e)
+            return None
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+        return reply
+
+    def get(self, key: str) -> bytes | None:
+        reply = self._execute("GET", self.key_prefix + key)
+        return reply if isinstance(reply, bytes) else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if ttl_seconds > 0:
+            self._execute("SET", self.key_prefix + key, value, "PX", max(1, int(ttl_seconds * 1000)))
+        else:
+            self._execute("SET", self.key_prefix + key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class TwoTierAudioCache:
+    """Local LRU in front of a shared backend, keyed by synthesis key."""
+
+    def __init__(
+        self,
+        local: CacheBackend | None,
+        shared: CacheBackend | None,
+        local_ttl_seconds: float = 3600,
+        shared_ttl_seconds: float = 86400,
+        max_item_bytes: int = 4 * 1024 * 1024,
+        compression_level: int = 6,
+    ):
+        self.local = local
+        self.shared = shared
+        self.local_ttl_seconds = local_ttl_seconds
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.max_item_bytes = max_item_bytes
+        self.compression_level = compression_level
+
+    def get_local(self, key: str) -> bytes | None:
+        """Look up the in-process tier only."""
+        if self.local is None:
+            return None
+        value = self.local.get(key)
+        if value is not None:
+            get_metrics().increment("audio_cache_hits_total", tier="local")
+        return value
+
+    def get_shared(self, key: str) -> bytes | None:
+        """Look up the shared tier, copying a hit into the local tier."""
+        metrics = get_metrics()
+        if self.shared is None:
+            metrics.increment("audio_cache_misses_total")
+            return None
+        payload = self.shared.get(key)
+        if payload is None:
+            metrics.increment("audio_cache_misses_total")
+            return None
+        try:
+            value = decode_payload(payload)
+        except ValueError as e:
+            logger.warning("Dropping shared cache entry %s: %s", key, e)
+            metrics.increment("audio_cache_corrupt_total")
+            return None
+        metrics.increment("audio_cache_hits_total", tier="shared")
+        metrics.increment("audio_cache_shared_bytes_received_total", len(payload))
+        if self.local is not None:
+            self.local.set(key, value, self.local_ttl_seconds)
+        return value
+
+    def get(self, key: str) -> bytes | None:
+        """Local tier, then shared tier."""
+        value = self.get_local(key)
+        return value if value is not None else self.get_shared(key)
+
+    def put(self, key: str, data: bytes | memoryview) -> None:
+        """Store a complete WAV in both tiers (skipped above max_item_bytes)."""
+        if len(data) > self.max_item_bytes:
+            get_metrics().increment("audio_cache_oversize_total")
+            return
+        # Own copy: data may be a view of a pooled buffer
+        data = bytes(data)
+        if self.local is not None:
+            self.local.set(key, data, self.local_ttl_seconds)
+        if self.shared is not None:
+            payload = encode_payload(data, self.compression_level)
+            self.shared.set(key, payload, self.shared_ttl_seconds)
+            metrics = get_metrics()
+            metrics.increment("audio_cache_shared_bytes_raw_total", len(data))
+            metrics.increment("audio_cache_shared_bytes_sent_total", len(payload))
+
+    def tee(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass a streamed WAV through, storing it once complete.
+
+        Clips that grow past max_item_bytes stop being collected. The
+        streamed header has placeholder sizes, patched before storing.
+        """
+        collected: bytearray | None = bytearray()
+        for chunk in chunks:
+            if collected is not None:
+                if len(collected) + len(chunk) > self.max_item_bytes:
+                    collected = None
+                    get_metrics().increment("audio_cache_oversize_total")
+                else:
+                    collected += chunk
+            yield chunk
+        if collected is None or len(collected) < WAV_HEADER_SIZE:
+            return
+        struct.pack_into("<I", collected, 4, len(collected) - 8)
+        struct.pack_into("<I", collected, 40, len(collected) - WAV_HEADER_SIZE)
+        self.put(key, collected)
+
+    def close(self) -> None:
+        """Close connections held by the shared backend."""
+        close = getattr(self.shared, "close", None)
+        if close is not None:
+            close()
+
+
+def create_audio_cache() -> TwoTierAudioCache | None:
+    """Create the audio cache from runtime settings, or None if disabled.
+
+    tts.audio_cache_backend is "none", "local" (in-process LRU only) or
+    "redis" (in-process LRU in front of tts.audio_cache_redis_url).
+    """
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    backend = (settings.get_str("tts.audio_cache_backend", "none") or "none").lower()
+    if backend == "none":
+        return None
+    if backend not in ("local", "redis"):
+        logger.warning("Unknown tts.audio_cache_backend %r, audio cache disabled", backend)
+        return None
+
+    local_mb = settings.get_int("tts.audio_cache_local_max_mb", 64)
+    local = LocalAudioCache(local_mb * 1024 * 1024) if local_mb > 0 else None
+    shared = None
+    if backend == "redis":
+        shared = RedisCacheBackend(
+            settings.get_str("tts.audio_cache_redis_url", "redis://127.0.0.1:6379/0"),
+            key_prefix=settings.get_str("tts.audio_cache_key_prefix", "jarvis-tts:audio:"),
+            timeout=settings.get_int("tts.audio_cache_timeout_ms", 200) / 1000,
+        )
+    return TwoTierAudioCache(
+        local,
+        shared,
+        local_ttl_seconds=settings.get_int("tts.audio_cache_local_ttl_seconds", 3600),
+        shared_ttl_seconds=settings.get_int("tts.audio_cache_shared_ttl_seconds", 86400),
+        max_item_bytes=settings.get_int("tts.audio_cache_max_item_kb", 4096) * 1024,
+        compression_level=settings.get_int("tts.audio_cache_compression_level", 6),
+    )
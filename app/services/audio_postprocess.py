@@ -0,0 +1,236 @@
+"""Audio post-processing for synthesized PCM.
+
+Optional stage between the voice and the WAV writer that trims leading
+and trailing silence, normalizes loudness towards a target RMS level
+and applies a soft limiter. All processing is vectorized NumPy on the
+int16 samples of each chunk, so it works incrementally on streamed
+output and keeps only a bounded amount of held-back silence in memory.
+Chunks are read in place and processed in working arrays that are reused
+from chunk to chunk.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.synthesis import AudioFormat
+
+_INT16_FULL_SCALE = 32768.0
+
+
+def db_to_amplitude(db: float) -> float:
+    """Convert dBFS to a linear amplitude ratio."""
+    return float(10.0 ** (db / 20.0))
+
+
+@dataclass(frozen=True)
+class PostProcessConfig:
+    """Tuning for the post-processing stage."""
+
+    enabled: bool = False
+    trim_silence: bool = True
+    silence_threshold_db: float = -50.0
+    target_loudness_dbfs: float = -20.0
+    max_gain_db: float = 12.0
+    limiter_threshold_db: float = -1.0
+    silence_pad_ms: int = 30
+    max_pause_ms: int = 2000
+
+
+def get_postprocess_config() -> PostProcessConfig:
+    """Read post-processing settings from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    defaults = PostProcessConfig()
+    return PostProcessConfig(
+        enabled=settings.get_bool("tts.postprocess_enabled", defaults.enabled),
+        trim_silence=settings.get_bool("tts.postprocess_trim_silence", defaults.trim_silence),
+        silence_threshold_db=settings.get_float(
+            "tts.postprocess_silence_threshold_db", defaults.silence_threshold_db
+        ),
+        target_loudness_dbfs=settings.get_float(
+            "tts.postprocess_target_dbfs", defaults.target_loudness_dbfs
+        ),
+        max_gain_db=settings.get_float("tts.postprocess_max_gain_db", defaults.max_gain_db),
+        limiter_threshold_db=settings.get_float(
+            "tts.postprocess_limiter_threshold_db", defaults.limiter_threshold_db
+        ),
+    )
+
+
+class AudioPostProcessor:
+    """Stateful, chunk-by-chunk post-processor for one int16 mono/stereo stream.
+
+    Leading silence is dropped until the first sample above the silence
+    threshold. Silence at the end of each chunk is held back and only
+    emitted if more audio follows, so flush() can drop the trailing part.
+    Loudness gain is derived from the running RMS of all non-silent
+    samples seen so far, which keeps the level stable across chunks.
+    """
+
+    def __init__(self, fmt: AudioFormat, config: PostProcessConfig):
+        if fmt.sample_width != 2:
+            raise ValueError("Post-processing requires 16-bit PCM")
+        self._config = config
+        self._frame_samples = fmt.channels
+        self._threshold = db_to_amplitude(config.silence_threshold_db) * _INT16_FULL_SCALE
+        self._target_rms = db_to_amplitude(config.target_loudness_dbfs) * _INT16_FULL_SCALE
+        self._max_gain = db_to_amplitude(config.max_gain_db)
+        self._limit = db_to_amplitude(config.limiter_threshold_db)
+        self._pad = int(fmt.sample_rate * config.silence_pad_ms / 1000) * fmt.channels
+        self._max_pause = int(fmt.sample_rate * config.max_pause_ms / 1000) * fmt.channels
+        self._started = not config.trim_silence
+        self._sum_sq = 0.0
+        self._count = 0
+        # Working arrays, grown as needed and reused for every chunk. _work
+        # starts with the held-back silence (_pending samples), followed by
+        # the chunk being emitted; the rest are for gain and limiting.
+        self._work = np.empty(0, dtype=np.int16)
+        self._pending = 0
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._magnitude = np.empty(0, dtype=np.float32)
+        self._loud = np.empty(0, dtype=np.bool_)
+        self._over = np.empty(0, dtype=np.bool_)
+
+    def _align(self, index: int) -> int:
+        """Round a sample index down to a frame boundary."""
+        return index - index % self._frame_samples
+
+    def _reserve(self, size: int) -> None:
+        """Grow the working arrays to hold size samples, keeping held-back silence."""
+        if self._work.size >= size:
+            return
+        work = np.empty(size, dtype=np.int16)
+        work[: self._pending] = self._work[: self._pending]
+        self._work = work
+        self._scratch = np.empty(size, dtype=np.float32)
+        self._magnitude = np.empty(size, dtype=np.float32)
+        self._loud = np.empty(size, dtype=np.bool_)
+        self._over = np.empty(size, dtype=np.bool_)
+
+    def _loud_mask(self, samples: np.ndarray) -> np.ndarray:
+        """Samples above the silence threshold, in the reused mask array."""
+        loud = self._loud[: samples.size]
+        over = self._over[: samples.size]
+        np.greater(samples, self._threshold, out=loud)
+        np.less(samples, -self._threshold, out=over)
+        np.logical_or(loud, over, out=loud)
+        return loud
+
+    def _update_loudness(self, samples: np.ndarray, loud: np.ndarray) -> None:
+        count = int(np.count_nonzero(loud))
+        if count:
+            # Silent samples zeroed, so they add nothing to the sum
+            voiced = self._scratch[: samples.size]
+            np.multiply(samples, loud, out=voiced, casting="unsafe")
+            self._sum_sq += float(np.dot(voiced, voiced))
+            self._count += count
+
+    def _gain(self) -> float:
+        if not self._count:
+            return 1.0
+        rms = (self._sum_sq / self._count) ** 0.5
+        if rms <= 0:
+            return 1.0
+        return min(self._target_rms / rms, self._max_gain)
+
+    def _apply_gain_and_limit(self, samples: np.ndarray) -> None:
+        """Scale samples in place and soft-limit peaks above the threshold."""
+        if not samples.size:
+            return
+        x = self._scratch[: samples.size]
+        np.multiply(samples, self._gain() / _INT16_FULL_SCALE, out=x, casting="unsafe")
+
+        t = self._limit
+        if t < 1.0:
+            mag = self._magnitude[: samples.size]
+            over = self._over[: samples.size]
+            np.abs(x, out=mag)
+            np.greater(mag, t, out=over)
+            if over.any():
+                knee = 1.0 - t
+                x[over] = np.sign(x[over]) * (t + knee * np.tanh((mag[over] - t) / knee))
+
+        np.multiply(x, _INT16_FULL_SCALE - 1, out=x)
+        np.rint(x, out=x)
+        np.clip(x, -_INT16_FULL_SCALE, _INT16_FULL_SCALE - 1, out=x)
+        samples[...] = x
+
+    def _emit(self, size: int) -> bytes:
+        """Process and return the first size samples of the work array."""
+        out = self._work[:size]
+        self._apply_gain_and_limit(out)
+        return out.tobytes()
+
+    def process(self, pcm: bytes) -> bytes:
+        """Process one chunk of PCM and return the audio ready to emit.
+
+        The chunk is read in place and worked on in the reused arrays; the
+        returned bytes are the only allocation proportional to its size.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        pending = self._pending
+        self._reserve(pending + samples.size)
+        loud = self._loud_mask(samples)
+        self._update_loudness(samples, loud)
+
+        if not self._config.trim_silence:
+            self._work[: samples.size] = samples
+            return self._emit(samples.size)
+
+        if not loud.any():
+            if self._started:
+                # Whole chunk is silence: hold it back in case audio follows,
+                # bounded so long pauses cannot grow memory without limit.
+                kept = max(min(samples.size, self._align(self._max_pause) - pending), 0)
+                self._work[pending : pending + kept] = samples[:kept]
+                self._pending = pending + kept
+            return b""
+
+        start = 0
+        if not self._started:
+            start = self._align(max(int(np.argmax(loud)) - self._pad, 0))
+            self._started = True
+        last = samples.size - 1 - int(np.argmax(loud[::-1]))
+        end = self._align(last + self._frame_samples)
+
+        size = pending + end - start
+        self._work[pending:size] = samples[start:end]
+        out = self._emit(size)
+        rest = samples[end:]
+        self._work[: rest.size] = rest
+        self._pending = rest.size
+        return out
+
+    def flush(self) -> bytes:
+        """Emit a short pad of trailing silence and drop the rest."""
+        size = min(self._pending, self._align(self._pad))
+        self._pending = 0
+        return self._emit(size)
+
+
+def postprocess_pcm(
+    chunks: Iterator[tuple[AudioFormat, bytes]],
+    config: PostProcessConfig,
+) -> Iterator[tuple[AudioFormat, bytes]]:
+    """Wrap a PCM chunk iterator with the post-processing stage.
+
+    The first chunk is always yielded (possibly empty) so callers can
+    read the audio format from it; later empty chunks are skipped.
+    """
+    processor: AudioPostProcessor | None = None
+    fmt: AudioFormat | None = None
+    for fmt, pcm in chunks:
+        if processor is None:
+            processor = AudioPostProcessor(fmt, config)
+            yield fmt, processor.process(pcm)
+            continue
+        out = processor.process(pcm)
+        if out:
+            yield fmt, out
+    if processor is not None and fmt is not None:
+        tail = processor.flush()
+        if tail:
+            yield fmt, tail
@@ -0,0 +1,350 @@
+"""Content-addressed on-disk audio store.
+
+Finished WAV clips are stored under the synthesis key (a hash of text,
+voice, params and format), so they survive redeploys and can be served
+straight from disk with ETag and Range support.
+
+The synthesis key names the inputs, not the bytes: Piper's noise makes
+every render slightly different, so responses identified only by their
+key carry a weak ETag. A stored clip gets a strong ETag hashed from its
+bytes, kept in the index (hashed again on first use after a restart).
+Clips are never overwritten in place, so a strong ETag always matches
+the file served under it and Range requests cannot splice two renders.
+
+Writes go to a
+temporary file that is fsync'ed and moved into place with os.replace(),
+so a crash never leaves a partial clip under a real key. The store is
+bounded by total size and evicts least-recently-used clips first;
+access order is persisted through file access times across restarts
+(the modification time, sent as Last-Modified, never changes).
+
+get() opens the clip under the store lock and returns it open, so a
+concurrent eviction that unlinks the file cannot turn a hit into an
+error: the open file stays readable until it is closed.
+StoredClipResponse serves it with Range support.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import anyio
+from starlette.responses import FileResponse
+
+from app.services.metrics import get_metrics
+from app.services.synthesis import WAV_HEADER_SIZE
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".wav"
+_TMP_PREFIX = ".tmp-"
+_READ_SIZE = 1 << 20
+
+
+def _digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _file_etag(path: str | Path) -> str:
+    """Strong ETag of a file's bytes."""
+    with open(path, "rb") as f:
+        return _stream_etag(f)
+
+
+def _stream_etag(f: BinaryIO) -> str:
+    digest = _digest()
+    f.seek(0)
+    while block := f.read(_READ_SIZE):
+        digest.update(block)
+    f.seek(0)
+    return f'"{digest.hexdigest()}"'
+
+
+class StoredClip:
+    """A stored clip, open for reading, with its strong ETag."""
+
+    def __init__(self, path: Path, file: BinaryIO, etag: str, stat: os.stat_result):
+        self.path = path
+        self.file = file
+        self.etag = etag
+        self.stat = stat
+
+    def read_bytes(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "StoredClip":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class StoredClipResponse(FileResponse):
+    """FileResponse that sends a StoredClip's open file and then closes it.
+
+    The file is never reopened by path (pathsend is not offered to the
+    server), so the clip can be evicted while it is being sent.
+    """
+
+    def __init__(self, clip: StoredClip, **kwargs: Any):
+        super().__init__(clip.path, stat_result=clip.stat, **kwargs)
+        self.clip = clip
+
+    @asynccontextmanager
+    async def _open_file(self) -> AsyncIterator[Any]:
+        self.clip.file.seek(0)
+        yield anyio.wrap_file(self.clip.file)
+
+    async def __call__(self, scope, receive, send) -> None:
+        extensions = {k: v for k, v in scope.get("extensions", {}).items() if k != "http.response.pathsend"}
+        try:
+            await super().__call__({**scope, "extensions": extensions}, receive, send)
+        finally:
+            self.clip.close()
+
+
+class AudioStoreWriter:
+    """Incremental writer for one clip; commit() publishes it atomically."""
+
+    def __init__(self, store: "AudioStore", key: str, f: BinaryIO, tmp_path: str):
+        self._store = store
+        self._key = key
+        self._file = f
+        self._tmp_path = tmp_path
+        self._size = 0
+        self._digest = _digest()
+        self._closed = False
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._digest.update(data)
+        self._size += len(data)
+
+    def commit(self, fix_wav_sizes: bool = False) -> str | None:
+        """Publish the clip, optionally patching streamed WAV header sizes.
+
+        Returns the clip's strong ETag, or None if it was not stored
+        (too large, already stored, or a write error).
+        """
+        if self._closed:
+            return None
+        self._closed = True
+        try:
+            patched = fix_wav_sizes and self._size >= WAV_HEADER_SIZE
+            if patched:
+                self._file.seek(4)
+                self._file.write(struct.pack("<I", self._size - 8))
+                self._file.seek(40)
+                self._file.write(struct.pack("<I", self._size - WAV_HEADER_SIZE))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            # The patched header is not what was hashed while streaming
+            etag = _file_etag(self._tmp_path) if patched else f'"{self._digest.hexdigest()}"'
+            return self._store._publish(self._key, self._tmp_path, self._size, etag)
+        except OSError as e:
+            logger.warning("Failed to store clip %s: %s", self._key, e)
+            self._discard()
+            return None
+
+    def abort(self) -> None:
+        """Discard the partially written clip."""
+        if self._closed:
+            return
+        self._closed = True
+        self._discard()
+
+    def _discard(self) -> None:
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class AudioStore:
+    """Size-bounded LRU store of WAV clips keyed by content hash."""
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._etags: dict[str, str] = {}
+        self._total = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._scan()
+        metrics = get_metrics()
+        metrics.register_gauge("audio_store_bytes", lambda: self._total)
+        metrics.register_gauge("audio_store_entries", lambda: len(self._entries))
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{_SUFFIX}"
+
+    def _scan(self) -> None:
+        """Rebuild the LRU index from disk, least recently accessed first."""
+        found: list[tuple[float, str, int]] = []
+        for path in self.root.glob(f"*/*{_SUFFIX}"):
+            st = path.stat()
+            found.append((st.st_atime, path.stem, st.st_size))
+        for path in self.root.glob(f"{_TMP_PREFIX}*"):
+            # Left over from a crash mid-write
+            path.unlink(missing_ok=True)
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def get(self, key: str) -> StoredClip | None:
+        """Open a stored clip and mark it recently used; the caller closes it."""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                get_metrics().increment("audio_store_misses_total")
+                return None
+            # Opened under the lock: eviction can unlink it, not pull it away
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                self._total -= self._entries.pop(key)
+                self._etags.pop(key, None)
+                get_metrics().increment("audio_store_misses_total")
+                return None
+            self._entries.move_to_end(key)
+            etag = self._etags.get(key)
+        stat = os.fstat(f.fileno())
+        try:
+            # Persist the LRU order in the access time; mtime stays put
+            os.utime(f.fileno(), ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+        if etag is None:
+            # Stored before a restart: hash it once
+            etag = _stream_etag(f)
+            with self._lock:
+                if key in self._entries:
+                    etag = self._etags.setdefault(key, etag)
+        get_metrics().increment("audio_store_hits_total")
+        return StoredClip(path, f, etag, stat)
+
+    def etag(self, key: str) -> str | None:
+        """Strong ETag of a stored clip's bytes, or None if not stored."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            etag = self._etags.get(key)
+        if etag is not None:
+            return etag
+        # Stored before a restart: hash it once
+        try:
+            etag = _file_etag(self._path(key))
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            return self._etags.setdefault(key, etag)
+
+    def open_writer(self, key: str) -> AudioStoreWriter:
+        """Start writing a clip to a temporary file in the store."""
+        fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=self.root)
+        return AudioStoreWriter(self, key, os.fdopen(fd, "wb"), tmp_path)
+
+    def put(self, key: str, data: bytes) -> str | None:
+        """Store a complete clip; returns its strong ETag if stored."""
+        if len(data) > self.max_bytes:
+            return None
+        writer = self.open_writer(key)
+        writer.write(data)
+        return writer.commit()
+
+    def tee(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass a streamed WAV through while writing it to the store."""
+        writer = self.open_writer(key)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit(fix_wav_sizes=True)
+
+    def _publish(self, key: str, tmp_path: str, size: int, etag: str) -> str | None:
+        if size > self.max_bytes:
+            os.unlink(tmp_path)
+            return None
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        with self._lock:
+            if key in self._entries:
+                # First render wins: the stored bytes keep matching their ETag
+                os.unlink(tmp_path)
+                return None
+            os.replace(tmp_path, path)
+            self._entries[key] = size
+            self._etags[key] = etag
+            self._total += size
+            self._evict()
+        return etag
+
+    def _evict(self) -> None:
+        """Drop least-recently-used clips until under max_bytes. Lock held."""
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._etags.pop(key, None)
+            self._total -= size
+            self._path(key).unlink(missing_ok=True)
+            get_metrics().increment("audio_store_evictions_total")
+
+
+def etag_for_key(key: str) -> str:
+    """Weak ETag for a synthesis key: equivalent audio, not identical bytes."""
+    return f'W/"{key}"'
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    """True if an If-None-Match header matches etag (weak comparison).
+
+    "*" matches any current representation.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def create_audio_store() -> AudioStore | None:
+    """Create the audio store from runtime settings, or None if disabled."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    root = settings.get_str("tts.audio_store_dir", "")
+    if not root:
+        return None
+    max_mb = settings.get_int("tts.audio_store_max_mb", 512)
+    return AudioStore(root, max_mb * 1024 * 1024)
@@ -0,0 +1,190 @@
+"""In-process cache for app-to-app auth validation.
+
+Every request is validated against jarvis-auth. AuthCache keeps the
+outcome per (app id, hashed app key, context headers) so repeat callers
+skip the network round trip:
+
+- successful validations are kept for auth.cache_ttl_seconds
+- rejections (401/403) are kept for auth.cache_failure_ttl_seconds
+- other errors (e.g. auth service unreachable) are never cached
+
+Both TTLs are read from settings on every lookup, so changes apply
+without a restart (0 disables that side of the cache). Positive entries
+that are still being used when they near expiry are revalidated in the
+background, so hot callers never wait on jarvis-auth.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Revalidate positive entries used in the last (1 - fraction) of their TTL
+REFRESH_AHEAD_FRACTION = 0.8
+
+_KEY_PARAM = "x_jarvis_app_key"
+_NEGATIVE_STATUS = (401, 403)
+
+
+@dataclass
+class _Entry:
+    result: Any
+    error: HTTPException | None
+    stored_at: float
+
+
+class AuthCache:
+    """LRU cache of auth validation results with positive and negative TTLs."""
+
+    def __init__(self, max_entries: int = 4096, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._refreshing: dict[tuple, asyncio.Task] = {}
+        metrics = get_metrics()
+        metrics.register_gauge("auth_cache_entries", lambda: len(self._entries))
+        metrics.register_gauge("auth_cache_hit_ratio", self.hit_ratio)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+    @staticmethod
+    def hit_ratio() -> float:
+        metrics = get_metrics()
+        hits = metrics.get_counter("auth_cache_hits_total", result="success") + metrics.get_counter(
+            "auth_cache_hits_total", result="failure"
+        )
+        total = hits + metrics.get_counter("auth_cache_misses_total")
+        return hits / total if total else 0.0
+
+    @staticmethod
+    def cache_key(arguments: dict[str, Any]) -> tuple:
+        """Key on every header value, with the app key replaced by its hash."""
+        items = []
+        for name, value in sorted(arguments.items()):
+            if name == _KEY_PARAM and value is not None:
+                value = hashlib.sha256(str(value).encode()).hexdigest()
+            items.append((name, value))
+        return tuple(items)
+
+    async def validate(self, validator: Callable[..., Awaitable[Any]], arguments: dict[str, Any]) -> Any:
+        """Return a cached outcome for arguments, or call validator(**arguments)."""
+        success_ttl, failure_ttl = _ttls()
+        if not arguments.get("x_jarvis_app_id") or not arguments.get(_KEY_PARAM):
+            # Rejected locally without a network call; nothing to cache
+            return await validator(**arguments)
+
+        key = self.cache_key(arguments)
+        metrics = get_metrics()
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None:
+            ttl = failure_ttl if entry.error is not None else success_ttl
+            age = now - entry.stored_at
+            if age < ttl:
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    metrics.increment("auth_cache_hits_total", result="failure")
+                    raise entry.error
+                metrics.increment("auth_cache_hits_total", result="success")
+                if age >= ttl * REFRESH_AHEAD_FRACTION:
+                    self._schedule_refresh(key, validator, arguments)
+                return entry.result
+            del self._entries[key]
+
+        metrics.increment("auth_cache_misses_total")
+        return await self._fetch(key, validator, arguments, success_ttl, failure_ttl)
+
+    async def _fetch(
+        self,
+        key: tuple,
+        validator: Callable[..., Awaitable[Any]],
+        arguments: dict[str, Any],
+        success_ttl: float,
+        failure_ttl: float,
+    ) -> Any:
+        try:
+            result = await validator(**arguments)
+        except HTTPException as e:
+            if failure_ttl > 0 and e.status_code in _NEGATIVE_STATUS:
+                self._store(key, _Entry(None, e, self._clock()))
+            raise
+        if success_ttl > 0:
+            self._store(key, _Entry(result, None, self._clock()))
+        return result
+
+    def _store(self, key: tuple, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_refresh(
+        self,
+        key: tuple,
+        validator: Callable[..., Awaitable[Any]],
+        arguments: dict[str, Any],
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                success_ttl, failure_ttl = _ttls()
+                await self._fetch(key, validator, arguments, success_ttl, failure_ttl)
+                get_metrics().increment("auth_cache_refreshes_total")
+            except HTTPException:
+                get_metrics().increment("auth_cache_refreshes_total", result="rejected")
+            except Exception as e:
+                # Keep serving the current entry until it expires
+                logger.warning("Background auth refresh failed: %s", e)
+                get_metrics().increment("auth_cache_refresh_errors_total")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+    def wrap(self, dependency: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Return a cached version of an async auth dependency.
+
+        The wrapper keeps the dependency's signature (via __wrapped__), so
+        FastAPI still sees its Header() parameters.
+        """
+        signature = inspect.signature(dependency)
+
+        @functools.wraps(dependency)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await self.validate(dependency, dict(bound.arguments))
+
+        return wrapper
+
+
+def _ttls() -> tuple[float, float]:
+    """(success, failure) TTLs in seconds, read live from settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return (
+        settings.get_int("auth.cache_ttl_seconds", 60),
+        settings.get_int("auth.cache_failure_ttl_seconds", 60),
+    )
@@ -0,0 +1,295 @@
+"""Single-flight coalescing of identical concurrent syntheses.
+
+While a synthesis for a given key is in flight, later requests for the
+same key attach to it and replay the same PCM chunks instead of running
+inference again. The flight is pull-driven: whichever subscriber needs
+a chunk that has not been produced yet advances the shared source, so
+no extra thread is needed and production pauses if every subscriber
+stalls. A flight leaves the registry once its source is exhausted, so
+this only deduplicates overlapping requests; it is not a cache.
+
+Late joiners replay from the first chunk, so a flight keeps its first
+REPLAY_CHUNKS chunks. Past that it only keeps chunks some subscriber
+has not read yet and stops accepting joiners (the next identical request
+starts its own flight). A long streamed clip with a single subscriber
+therefore holds a bounded number of chunks, not the whole clip.
+
+Async callers that advance subscriptions on the synthesis scheduler
+first await wait_turn(): it returns once the subscriber's next chunk is
+already there (take it without a worker) or once the subscriber holds
+the flight's claim to produce it (submit the step). Only the claim
+holder's step goes through the scheduler, so subscribers waiting on a
+chunk another one is producing do not hold workers or tenant slots.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from typing import Generic, TypeVar
+
+from app.services.metrics import get_metrics
+
+T = TypeVar("T")
+
+# Marker returned by the wait loop when the caller should produce the next item
+_PRODUCE = object()
+
+# Chunks kept from the start of a flight for late joiners to replay
+REPLAY_CHUNKS = 4
+
+
+class Flight(Generic[T]):
+    """One in-flight synthesis shared by all subscribers for its key."""
+
+    def __init__(self, key: str, source: Iterator[T], replay_chunks: int = REPLAY_CHUNKS):
+        self.key = key
+        self._source = source
+        self.replay_chunks = replay_chunks
+        self._items: deque[T] = deque()
+        # Position in the flight of _items[0]; above 0 once chunks were dropped
+        self._first = 0
+        self._produced = 0
+        # Chunks read so far, per subscriber
+        self._cursors: dict[int, int] = {}
+        self._next_cursor = 0
+        self._cond = threading.Condition()
+        self._producing = False
+        self._done = False
+        self._error: BaseException | None = None
+        # Cursor whose submitted step will produce the next item, if any
+        self._claim: int | None = None
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+        self.subscribers = 0
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def source(self) -> Iterator[T]:
+        return self._source
+
+    def retained(self) -> int:
+        """Chunks currently held for subscribers."""
+        with self._cond:
+            return len(self._items)
+
+    def join(self) -> int | None:
+        """Register a subscriber and return its cursor, or None if too late to replay."""
+        with self._cond:
+            if self._done or self._first > 0:
+                return None
+            cursor = self._next_cursor
+            self._next_cursor += 1
+            self._cursors[cursor] = 0
+            return cursor
+
+    def leave(self, cursor: int) -> None:
+        with self._cond:
+            self._cursors.pop(cursor, None)
+            self._trim()
+            if self._claim == cursor:
+                self._claim = None
+                self._notify()
+
+    def _notify(self) -> None:
+        """Wake blocking and async waiters. Lock held."""
+        self._cond.notify_all()
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # Loop already closed; nobody is awaiting there any more
+                pass
+
+    def _turn(self, cursor: int) -> bool | None:
+        """True: next item ready, False: claimed to produce it, None: wait. Lock held."""
+        if self._done or cursor not in self._cursors or self._cursors[cursor] < self._produced:
+            return True
+        if not self._producing and self._claim in (None, cursor):
+            self._claim = cursor
+            return False
+        return None
+
+    async def wait_turn(self, cursor: int) -> bool:
+        """Wait until cursor's next item is ready (True) or it holds the claim to produce it (False).
+
+        A False return must be followed by pulling the next item, which
+        uses the claim, or by end_turn().
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                ready = self._turn(cursor)
+                if ready is not None:
+                    return ready
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            await waiter
+
+    def end_turn(self, cursor: int) -> None:
+        """Release cursor's claim if its pull did not use it."""
+        with self._cond:
+            if self._claim == cursor:
+                self._claim = None
+                self._notify()
+
+    def _trim(self) -> None:
+        """Drop chunks every subscriber has read, beyond the replay window. Lock held."""
+        read = min(self._cursors.values(), default=self._produced)
+        while self._items and self._first < read and (self._first > 0 or len(self._items) > self.replay_chunks):
+            self._items.popleft()
+            self._first += 1
+
+    def _produce_next(self) -> None:
+        """Advance the shared source by one item. Called without the lock held."""
+        try:
+            item = next(self._source)
+        except StopIteration:
+            with self._cond:
+                self._done = True
+                self._producing = False
+                self._notify()
+            return
+        except BaseException as e:
+            with self._cond:
+                self._error = e
+                self._done = True
+                self._producing = False
+                self._notify()
+            raise
+        with self._cond:
+            self._items.append(item)
+            self._produced += 1
+            self._producing = False
+            self._notify()
+
+    def iterate(self, cursor: int) -> Iterator[T]:
+        """Yield every item of the flight from the start for a joined cursor."""
+        index = 0
+        while True:
+            with self._cond:
+                while True:
+                    if index < self._produced:
+                        item = self._items[index - self._first]
+                        self._cursors[cursor] = index + 1
+                        self._trim()
+                        break
+                    if self._done:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    if not self._producing and self._claim in (None, cursor):
+                        self._producing = True
+                        self._claim = None
+                        item = _PRODUCE
+                        break
+                    self._cond.wait()
+            if item is _PRODUCE:
+                self._produce_next()
+                continue
+            index += 1
+            yield item
+
+    def close(self) -> None:
+        """Abandon the flight and release its source."""
+        with self._cond:
+            self._done = True
+            self._notify()
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                # Generator is currently executing in another thread; it
+                # will stop on its own once that pull completes.
+                pass
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class SingleFlight(Generic[T]):
+    """Registry of in-flight syntheses keyed by request identity."""
+
+    def __init__(self, replay_chunks: int = REPLAY_CHUNKS) -> None:
+        self.replay_chunks = replay_chunks
+        self._lock = threading.Lock()
+        self._flights: dict[str, Flight[T]] = {}
+        get_metrics().register_gauge("speak_inflight_flights", lambda: len(self._flights))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def subscribe(self, key: str, factory: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """Attach to the flight for key, starting one with factory() if needed."""
+        with self._lock:
+            flight = self._flights.get(key)
+            cursor = flight.join() if flight is not None else None
+            if cursor is None:
+                # No flight, or it is finished or past its replay window
+                flight = Flight(key, factory(), self.replay_chunks)
+                cursor = flight.join()
+                self._flights[key] = flight
+                get_metrics().increment("speak_flights_started_total")
+            else:
+                get_metrics().increment("speak_coalesced_total")
+            flight.subscribers += 1
+        return _Subscription(self, flight, cursor)
+
+    def _release(self, flight: Flight[T]) -> None:
+        with self._lock:
+            flight.subscribers -= 1
+            abandoned = flight.subscribers == 0 and not flight.done
+            if (flight.done or abandoned) and self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if abandoned:
+            flight.close()
+
+
+class _Subscription(Generic[T]):
+    """Iterator handed to one subscriber; releases the flight when closed."""
+
+    def __init__(self, registry: SingleFlight[T], flight: Flight[T], cursor: int):
+        self._registry = registry
+        self._flight = flight
+        self._cursor = cursor
+        self._items = flight.iterate(cursor)
+        self._closed = False
+
+    @property
+    def source(self) -> Iterator[T]:
+        """The flight's iterator, shared with the other subscribers."""
+        return self._flight.source
+
+    async def wait_turn(self) -> bool:
+        """See Flight.wait_turn()."""
+        return await self._flight.wait_turn(self._cursor)
+
+    def end_turn(self) -> None:
+        self._flight.end_turn(self._cursor)
+
+    def __iter__(self) -> "_Subscription[T]":
+        return self
+
+    def __next__(self) -> T:
+        try:
+            return next(self._items)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._flight.leave(self._cursor)
+        self._registry._release(self._flight)
+
+    def __del__(self) -> None:
+        self.close()
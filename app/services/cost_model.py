@@ -0,0 +1,270 @@
+"""Online synthesis cost model and predicted backlog.
+
+Synthesis time grows with the amount of speech in the text and differs
+per voice. CostModel fits, per voice, a line
+
+    seconds = intercept + slope * units
+
+to the measured compute time of every synthesized text chunk, where
+units is a phoneme-count proxy (letters and digits; phonemizing just to
+predict would cost an extra espeak pass per request). The fit is an
+exponentially weighted least-squares regression, so it keeps tracking
+the voice as the host's load or CPU changes. Until a voice has a few
+samples its cost is a flat per-unit prior. A voice's length_scale is
+part of its config, so the per-voice fit covers it.
+
+Every chunk's prediction error, |predicted - measured| / measured, is
+recorded as cost_model_error_ratio{voice} once the voice is fitted.
+
+SynthesisBacklog sums the predicted seconds of syntheses that have
+started (queued or running) minus the time already spent on them.
+Divided by the worker count, that is the predicted queue drain time:
+new synthesis is rejected while it exceeds tts.max_queue_seconds, with
+a Retry-After of the drain time. Background jobs are in the backlog too,
+but interactive requests run ahead of them, so only new jobs count them
+when deciding whether to reject.
+"""
+
+import math
+import threading
+from collections.abc import Iterator
+from typing import Any, TypeVar
+
+from app.services.metrics import get_metrics
+from app.services.synthesis import SynthesisLimits, text_chunks
+
+T = TypeVar("T")
+
+# Seconds per unit before a voice has samples (roughly a low-quality
+# voice on one core)
+_PRIOR_SECONDS_PER_UNIT = 0.002
+# Weight kept by older samples at each new one (~50-sample memory)
+_DECAY = 0.98
+_MIN_SAMPLES = 5
+
+
+def cost_units(text: str) -> int:
+    """Phoneme-count proxy for text: its letters and digits."""
+    return sum(1 for c in text if c.isalnum())
+
+
+class _Fit:
+    """Exponentially weighted sums for a least-squares line."""
+
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy", "samples")
+
+    def __init__(self) -> None:
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.samples = 0
+
+    def add(self, x: float, y: float, decay: float) -> None:
+        self.n = decay * self.n + 1
+        self.sx = decay * self.sx + x
+        self.sy = decay * self.sy + y
+        self.sxx = decay * self.sxx + x * x
+        self.sxy = decay * self.sxy + x * y
+        self.samples += 1
+
+    def predict(self, x: float) -> float:
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if denominator > 1e-9 * self.n * self.sxx:
+            slope = (self.n * self.sxy - self.sx * self.sy) / denominator
+            intercept = (self.sy - slope * self.sx) / self.n
+            if slope >= 0 and intercept >= 0:
+                return intercept + slope * x
+        # Too little spread in chunk sizes, or a noisy fit: cost per unit
+        if self.sx > 0:
+            return self.sy / self.sx * x
+        return self.sy / self.n
+
+
+class CostModel:
+    """Per-voice online model of synthesis seconds for a piece of text."""
+
+    def __init__(
+        self,
+        decay: float = _DECAY,
+        min_samples: int = _MIN_SAMPLES,
+        prior_seconds_per_unit: float = _PRIOR_SECONDS_PER_UNIT,
+    ):
+        self.decay = decay
+        self.min_samples = min_samples
+        self.prior_seconds_per_unit = prior_seconds_per_unit
+        self._fits: dict[str, _Fit] = {}
+        self._lock = threading.Lock()
+
+    def fitted(self, voice: str) -> bool:
+        with self._lock:
+            fit = self._fits.get(voice)
+            return fit is not None and fit.samples >= self.min_samples
+
+    def predict(self, voice: str, units: int) -> float:
+        """Predicted seconds to synthesize one text chunk of units."""
+        with self._lock:
+            fit = self._fits.get(voice)
+            if fit is None or fit.samples < self.min_samples:
+                return units * self.prior_seconds_per_unit
+            return max(0.0, fit.predict(units))
+
+    def predict_text(self, voice: str, text: str, limits: SynthesisLimits) -> float:
+        """Predicted seconds to synthesize text, chunked as synthesis will."""
+        return sum(self.predict(voice, cost_units(chunk)) for chunk in text_chunks(text, limits))
+
+    def observe(self, voice: str, units: int, seconds: float) -> None:
+        """Record the measured compute time of one text chunk."""
+        if units <= 0 or seconds <= 0:
+            return
+        metrics = get_metrics()
+        if self.fitted(voice):
+            error = abs(self.predict(voice, units) - seconds) / seconds
+            metrics.observe("cost_model_error_ratio", error, voice=voice)
+        with self._lock:
+            fit = self._fits.get(voice)
+            if fit is None:
+                fit = self._fits[voice] = _Fit()
+            fit.add(units, seconds, self.decay)
+        metrics.increment("cost_model_samples_total", voice=voice)
+
+
+class BacklogEntry(Iterator[T]):
+    """One started synthesis in the backlog, wrapping its chunk iterator.
+
+    Leaves the backlog when the iterator is exhausted, fails, is closed
+    (e.g. an abandoned coalesced flight) or is garbage collected.
+    """
+
+    def __init__(self, backlog: "SynthesisBacklog", seconds: float, background: bool = False):
+        self._backlog = backlog
+        self.remaining = seconds
+        # Text chunks completed so far (one progress() call each)
+        self.chunks_done = 0
+        self.background = background
+        self._source: Iterator[T] | None = None
+        self._released = False
+
+    def attach(self, source: Iterator[T]) -> "BacklogEntry[T]":
+        self._source = source
+        return self
+
+    def progress(self, seconds: float) -> None:
+        """Take a completed text chunk's seconds off the remaining estimate."""
+        self.chunks_done += 1
+        self._backlog._progress(self, seconds)
+
+    def __iter__(self) -> "BacklogEntry[T]":
+        return self
+
+    def __next__(self) -> T:
+        try:
+            return next(self._source)
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._backlog._release(self)
+
+    def close(self) -> None:
+        self.release()
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+
+    def __del__(self) -> None:
+        self.release()
+
+
+class SynthesisBacklog:
+    """Predicted synthesis seconds still to run across started syntheses."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Indexed by BacklogEntry.background
+        self._seconds = [0.0, 0.0]
+        self._entries = [0, 0]
+        get_metrics().register_gauge("synthesis_backlog_seconds", self.total)
+
+    def start(self, seconds: float, background: bool = False) -> BacklogEntry[Any]:
+        """Add a synthesis predicted to take seconds; attach() its iterator.
+
+        background marks a job's synthesis, which interactive requests
+        run ahead of; release() it when the job ends.
+        """
+        entry: BacklogEntry[Any] = BacklogEntry(self, seconds, background)
+        with self._lock:
+            self._seconds[background] += seconds
+            self._entries[background] += 1
+        return entry
+
+    def total(self, background: bool = True) -> float:
+        """Predicted seconds left, including background jobs if background."""
+        with self._lock:
+            # Float drift once everything has been released
+            classes = (False, True) if background else (False,)
+            return sum(self._seconds[c] for c in classes if self._entries[c])
+
+    def drain_seconds(self, workers: int, background: bool = True) -> float:
+        """Predicted time for the workers to finish the started syntheses."""
+        return self.total(background) / max(1, workers)
+
+    def _progress(self, entry: BacklogEntry[Any], seconds: float) -> None:
+        with self._lock:
+            if entry._released:
+                return
+            taken = min(entry.remaining, seconds)
+            entry.remaining -= taken
+            self._seconds[entry.background] -= taken
+
+    def _release(self, entry: BacklogEntry[Any]) -> None:
+        with self._lock:
+            self._seconds[entry.background] -= entry.remaining
+            self._entries[entry.background] -= 1
+            entry.remaining = 0.0
+
+
+def overload_retry_after(workers: int, background: bool = False) -> int | None:
+    """Retry-After seconds if new synthesis should be rejected, else None.
+
+    Rejects while the predicted drain time exceeds tts.max_queue_seconds
+    (0 disables); the client is asked to come back once it has drained.
+    Pass background=True for a new job, which waits behind other jobs.
+    """
+    from app.services.settings_service import get_settings_service
+
+    limit = get_settings_service().get_float("tts.max_queue_seconds", 0.0)
+    if limit <= 0:
+        return None
+    drain = get_backlog().drain_seconds(workers, background)
+    if drain <= limit:
+        return None
+    return max(1, math.ceil(drain))
+
+
+# Global singletons
+_cost_model: CostModel | None = None
+_backlog: SynthesisBacklog | None = None
+
+
+def get_cost_model() -> CostModel:
+    """Get the global CostModel."""
+    global _cost_model
+    if _cost_model is None:
+        _cost_model = CostModel()
+    return _cost_model
+
+
+def get_backlog() -> SynthesisBacklog:
+    """Get the global SynthesisBacklog."""
+    global _backlog
+    if _backlog is None:
+        _backlog = SynthesisBacklog()
+    return _backlog
+
+
+def reset_cost_model() -> None:
+    """Reset the cost model and backlog singletons (for testing)."""
+    global _cost_model, _backlog
+    _cost_model = None
+    _backlog = None
@@ -0,0 +1,150 @@
+"""Client-supplied deadlines for synthesis requests.
+
+Nodes stop waiting for a reply after a couple of seconds, so audio
+finished after that is wasted work. A request can carry its deadline
+in either header:
+
+- X-Request-Timeout-Ms: budget in milliseconds from arrival
+- X-Request-Deadline: absolute Unix time in seconds (fractions allowed)
+
+If both are sent, the earlier one wins. Absolute deadlines are converted
+to the monotonic clock on arrival, so they assume the node's clock is
+roughly in sync with ours. Malformed values are ignored and counted.
+
+Queued scheduler steps whose deadline has passed are dropped before
+they run (see SynthesisScheduler), and DeadlineGuard stops a running
+synthesis at the next chunk boundary. Each abandoned request is counted
+in deadline_exceeded_total{route,stage}, and the text chunks it never
+started in deadline_saved_steps_total{route}. Their predicted worker
+time goes in deadline_saved_seconds_total{route}.
+"""
+
+import logging
+import math
+import time
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from typing import TypeVar
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = "x-request-timeout-ms"
+DEADLINE_HEADER = "x-request-deadline"
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is abandoned because its deadline has passed."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """A point on the monotonic clock by which a reply is needed."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Seconds left (negative once passed)."""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+def parse_deadline(headers: Mapping[str, str]) -> Deadline | None:
+    """Deadline from the request headers, or None if none was given.
+
+    Returns None as well when tts.deadlines_enabled is off.
+    """
+    from app.services.settings_service import get_settings_service
+
+    if not get_settings_service().get_bool("tts.deadlines_enabled", True):
+        return None
+    candidates: list[float] = []
+    timeout = headers.get(TIMEOUT_HEADER)
+    if timeout:
+        value = _parse_float(TIMEOUT_HEADER, timeout)
+        if value is not None:
+            candidates.append(value / 1000)
+    absolute = headers.get(DEADLINE_HEADER)
+    if absolute:
+        value = _parse_float(DEADLINE_HEADER, absolute)
+        if value is not None:
+            candidates.append(value - time.time())
+    if not candidates:
+        return None
+    return Deadline.after(min(candidates))
+
+
+def _parse_float(header: str, value: str) -> float | None:
+    """Finite float value of a header ("nan" and "inf" are malformed too)."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = math.nan
+    if not math.isfinite(number):
+        _invalid(header, value)
+        return None
+    return number
+
+
+def _invalid(header: str, value: str) -> None:
+    logger.debug("Ignoring malformed %s header %r", header, value)
+    get_metrics().increment("deadline_header_invalid_total")
+
+
+class DeadlineGuard(Iterator[T]):
+    """Iterator wrapper that stops at the next item once the deadline passes.
+
+    Checked before each item is pulled, so a chunk already being
+    synthesized completes, but the next one is never started, and the
+    wrapped iterator is closed. Counts the items produced so far in
+    produced.
+    """
+
+    def __init__(self, iterator: Iterator[T], deadline: Deadline | None):
+        self._iterator = iterator
+        self._deadline = deadline
+        self.produced = 0
+
+    @property
+    def source(self) -> Iterator[T]:
+        return self._iterator
+
+    def __iter__(self) -> "DeadlineGuard[T]":
+        return self
+
+    def __next__(self) -> T:
+        if self._deadline is not None and self._deadline.expired():
+            self.close()
+            raise DeadlineExceeded("Deadline exceeded")
+        item = next(self._iterator)
+        self.produced += 1
+        return item
+
+    def close(self) -> None:
+        """Close the wrapped iterator (e.g. release a coalesced flight)."""
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def record_deadline_exceeded(route: str, stage: str, saved_steps: int = 0, saved_seconds: float = 0.0) -> None:
+    """Count an abandoned request and the synthesis it no longer needs.
+
+    stage is "queued" when no audio had been synthesized yet, otherwise
+    "running". saved_steps counts the text chunks never started and
+    saved_seconds their predicted worker time.
+    """
+    metrics = get_metrics()
+    metrics.increment("deadline_exceeded_total", route=route, stage=stage)
+    if saved_steps > 0:
+        metrics.increment("deadline_saved_steps_total", saved_steps, route=route)
+        metrics.increment("deadline_saved_seconds_total", saved_seconds, route=route)
@@ -0,0 +1,179 @@
+"""Load-adaptive quality degradation.
+
+Under load it is better to answer quickly with a lighter voice than late
+with the configured one. LoadGovernor watches two signals:
+
+- queued synthesis steps per scheduler worker
+- the real-time factor (RTF: synthesis time / audio duration) of recent
+  chunks, as a moving average
+
+and switches new requests to the fallback voice (tts.degraded_voice,
+e.g. an x_low variant or a quantized export of the same voice) when
+either crosses its enter threshold. It switches back only once both are
+below their (lower) exit thresholds and degradation has lasted at least
+tts.degradation_min_hold_seconds, so the service does not flap between
+voices at the edge of overload.
+
+Requests already synthesizing keep their voice. Clips already cached for
+the configured voice are still served from cache while degraded.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from app.services.metrics import get_metrics
+from app.services.synthesis import AudioFormat
+
+logger = logging.getLogger(__name__)
+
+# Response header on /speak: "1" when the lighter voice was used, else "0"
+DEGRADED_HEADER = "X-TTS-Degraded"
+
+_RTF_SMOOTHING = 0.2
+
+
+@dataclass(frozen=True)
+class DegradationPolicy:
+    """Fallback voice and the thresholds for switching to it and back."""
+
+    voice: str = ""
+    enter_queue_depth: float = 4.0
+    exit_queue_depth: float = 1.0
+    enter_rtf: float = 0.8
+    exit_rtf: float = 0.4
+    min_hold_seconds: float = 10.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.voice)
+
+
+def get_degradation_policy() -> DegradationPolicy:
+    """Read the degradation policy from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return DegradationPolicy(
+        voice=settings.get_str("tts.degraded_voice", "").strip(),
+        enter_queue_depth=settings.get_float("tts.degradation_enter_queue_depth", 4.0),
+        exit_queue_depth=settings.get_float("tts.degradation_exit_queue_depth", 1.0),
+        enter_rtf=settings.get_float("tts.degradation_enter_rtf", 0.8),
+        exit_rtf=settings.get_float("tts.degradation_exit_rtf", 0.4),
+        min_hold_seconds=settings.get_float("tts.degradation_min_hold_seconds", 10.0),
+    )
+
+
+class LoadGovernor:
+    """Decides, with hysteresis, whether new requests get the fallback voice.
+
+    queue_depth returns the current queued steps per worker. An
+    enter_rtf of 0 leaves RTF out of the decision.
+    """
+
+    def __init__(
+        self,
+        policy: DegradationPolicy,
+        queue_depth: Callable[[], float],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.policy = policy
+        self._queue_depth = queue_depth
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rtf: float | None = None
+        self._degraded = False
+        self._since = clock()
+        metrics = get_metrics()
+        metrics.register_gauge("degradation_active", lambda: float(self._degraded))
+        metrics.register_gauge("synthesis_rtf", lambda: self._rtf or 0.0)
+
+    @property
+    def rtf(self) -> float | None:
+        """Moving average RTF of recent chunks (None before the first)."""
+        return self._rtf
+
+    @property
+    def degraded(self) -> bool:
+        return self._degraded
+
+    def observe(self, synth_seconds: float, audio_seconds: float) -> None:
+        """Record one synthesized chunk."""
+        if audio_seconds <= 0:
+            return
+        rtf = synth_seconds / audio_seconds
+        with self._lock:
+            self._rtf = rtf if self._rtf is None else (1 - _RTF_SMOOTHING) * self._rtf + _RTF_SMOOTHING * rtf
+
+    def update(self) -> bool:
+        """Re-evaluate the signals and return whether to degrade now."""
+        policy = self.policy
+        depth = self._queue_depth()
+        now = self._clock()
+        with self._lock:
+            rtf = self._rtf or 0.0
+            use_rtf = policy.enter_rtf > 0
+            if not self._degraded:
+                if depth >= policy.enter_queue_depth or (use_rtf and rtf >= policy.enter_rtf):
+                    self._switch(True, now, depth, rtf)
+            elif (
+                now - self._since >= policy.min_hold_seconds
+                and depth <= policy.exit_queue_depth
+                and (not use_rtf or rtf <= policy.exit_rtf)
+            ):
+                self._switch(False, now, depth, rtf)
+            return self._degraded
+
+    def _switch(self, degraded: bool, now: float, depth: float, rtf: float) -> None:
+        """Lock held."""
+        self._degraded = degraded
+        self._since = now
+        state = "degraded" if degraded else "normal"
+        get_metrics().increment("degradation_transitions_total", state=state)
+        logger.info(
+            "Load %s: %.1f queued steps per worker, RTF %.2f; new requests use %s",
+            "high" if degraded else "back to normal", depth, rtf,
+            self.policy.voice if degraded else "the configured voice",
+        )
+
+    def measure(self, chunks: Iterator[tuple[AudioFormat, bytes]]) -> Iterator[tuple[AudioFormat, bytes]]:
+        """Pass PCM chunks through, observing how long each took to produce."""
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    fmt, pcm = next(chunks)
+                except StopIteration:
+                    return
+                self.observe(time.perf_counter() - started, len(pcm) / fmt.bytes_per_second)
+                yield fmt, pcm
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+
+# Global singleton
+_governor: LoadGovernor | None = None
+
+
+def get_load_governor() -> LoadGovernor | None:
+    """The global LoadGovernor, or None when no fallback voice is configured."""
+    global _governor
+    if _governor is None:
+        policy = get_degradation_policy()
+        if not policy.enabled:
+            return None
+        from app.services.scheduler import get_scheduler
+
+        scheduler = get_scheduler()
+        _governor = LoadGovernor(policy, lambda: scheduler.queue_depth() / scheduler.workers)
+    return _governor
+
+
+def reset_load_governor() -> None:
+    """Reset the governor singleton (for testing)."""
+    global _governor
+    _governor = None
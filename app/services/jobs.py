@@ -0,0 +1,334 @@
+"""Asynchronous synthesis jobs for long-form content.
+
+A job renders its text one chunk (sentence) at a time on the synthesis
+scheduler at background priority, so interactive /speak requests are
+served between its steps. Progress and partial audio can be read while
+it runs. Finished jobs expire after a TTL, and all job audio together
+is bounded by a byte budget: the oldest finished jobs are evicted to
+make room, and a running job that cannot get room fails.
+
+Jobs have their own input and duration caps (tts.job_max_input_chars,
+tts.job_max_audio_seconds) rather than the interactive /speak ones. Each
+step feeds the synthesis cost model, and a job's predicted remaining
+time is part of the synthesis backlog until it finishes.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass, field, replace
+from enum import Enum
+from functools import partial
+from typing import Any
+
+from app.services.audio_postprocess import AudioPostProcessor, PostProcessConfig
+from app.services.cost_model import BacklogEntry, cost_units, get_backlog, get_cost_model
+from app.services.metrics import get_metrics
+from app.services.scheduler import Priority, SynthesisScheduler, Tenant
+from app.services.synthesis import AudioFormat, SynthesisLimits, get_synthesis_limits, synthesize_pcm, wav_header
+from app.services.text_chunker import split_text
+
+logger = logging.getLogger(__name__)
+
+# Job audio is served in pieces of this size rather than copied whole
+WAV_PIECE_BYTES = 64 * 1024
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobBudgetExceeded(Exception):
+    """Raised when job audio would exceed the total byte budget."""
+
+
+@dataclass
+class SynthesisJob:
+    """State of one long-form synthesis job."""
+
+    id: str
+    # Only this tenant (app and household) can read the job
+    owner: Tenant
+    text_chunks: list[str]
+    voice: Any
+    limits: SynthesisLimits
+    postprocess: PostProcessConfig | None
+    speaker_id: int | None = None
+    tenant: Tenant | None = None
+    # Voice name for the cost model
+    voice_name: str = ""
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    sentences_done: int = 0
+    error: str | None = None
+    fmt: AudioFormat | None = None
+    pcm: bytearray = field(default_factory=bytearray)
+    processor: AudioPostProcessor | None = None
+    backlog: BacklogEntry[Any] | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    @property
+    def audio_seconds(self) -> float:
+        if self.fmt is None:
+            return 0.0
+        return len(self.pcm) / self.fmt.bytes_per_second
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "sentences_done": self.sentences_done,
+            "sentences_total": len(self.text_chunks),
+            "audio_seconds": round(self.audio_seconds, 3),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def iter_wav(self) -> tuple[int, Iterator[bytes]] | None:
+        """WAV of the audio produced so far as (size, pieces), or None if there is none yet.
+
+        The PCM is copied WAV_PIECE_BYTES at a time as the pieces are
+        consumed, never as a whole. Audio appended after the call is not
+        included.
+        """
+        if self.fmt is None:
+            return None
+        pcm = self.pcm
+        size = len(pcm)
+        header = wav_header(self.fmt, size)
+
+        def pieces() -> Iterator[bytes]:
+            yield header
+            # No memoryview: an exported buffer would stop the running
+            # step from growing the bytearray
+            for start in range(0, size, WAV_PIECE_BYTES):
+                yield bytes(pcm[start : min(start + WAV_PIECE_BYTES, size)])
+
+        return len(header) + size, pieces()
+
+
+class JobManager:
+    """Creates, runs and expires synthesis jobs."""
+
+    def __init__(self, scheduler: SynthesisScheduler, ttl_seconds: float, max_total_bytes: int):
+        self._scheduler = scheduler
+        self._ttl = ttl_seconds
+        self._max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        self._jobs: dict[str, SynthesisJob] = {}
+        self._total_bytes = 0
+        metrics = get_metrics()
+        metrics.register_gauge("jobs_active", lambda: sum(not j.finished for j in list(self._jobs.values())))
+        metrics.register_gauge("jobs_audio_bytes", lambda: self._total_bytes)
+
+    def create(
+        self,
+        owner: Tenant,
+        text: str,
+        voice: Any,
+        limits: SynthesisLimits,
+        postprocess: PostProcessConfig | None = None,
+        speaker_id: int | None = None,
+        tenant: Tenant | None = None,
+        voice_name: str = "",
+    ) -> SynthesisJob:
+        """Register a job and queue its first step; steps are charged to tenant."""
+        self._expire()
+        job = SynthesisJob(
+            id=uuid.uuid4().hex,
+            owner=owner,
+            text_chunks=list(split_text(text, limits.chunk_max_chars)),
+            voice=voice,
+            limits=limits,
+            postprocess=postprocess,
+            speaker_id=speaker_id,
+            tenant=tenant,
+            voice_name=voice_name,
+        )
+        model = get_cost_model()
+        predicted = sum(model.predict(voice_name, cost_units(chunk)) for chunk in job.text_chunks)
+        job.backlog = get_backlog().start(predicted, background=True)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._schedule_step(job)
+        except RuntimeError:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            job.backlog.release()
+            raise
+        get_metrics().increment("jobs_created_total")
+        return job
+
+    def get(self, job_id: str, owner: Tenant) -> SynthesisJob | None:
+        """Return a job if it exists, has not expired and belongs to owner."""
+        self._expire()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def _schedule_step(self, job: SynthesisJob) -> None:
+        cost = None
+        if job.sentences_done < len(job.text_chunks):
+            text_chunk = job.text_chunks[job.sentences_done]
+            cost = get_cost_model().predict(job.voice_name, cost_units(text_chunk))
+        # In a fresh context: steps outlive the request that created the
+        # job and must not record into its timer
+        future = contextvars.Context().run(
+            self._scheduler.submit, self._step, job, priority=Priority.BACKGROUND, tenant=job.tenant, cost=cost
+        )
+        future.add_done_callback(lambda f: self._after_step(job, f))
+
+    def _observe(self, job: SynthesisJob, text_chunk: str, seconds: float) -> None:
+        get_cost_model().observe(job.voice_name, cost_units(text_chunk), seconds)
+        if job.backlog is not None:
+            job.backlog.progress(seconds)
+
+    def _step(self, job: SynthesisJob) -> bool:
+        """Synthesize the next text chunk. Returns True when the job is done."""
+        job.status = JobStatus.RUNNING
+        if job.sentences_done >= len(job.text_chunks):
+            self._finish_postprocess(job)
+            return True
+
+        text_chunk = job.text_chunks[job.sentences_done]
+        unlimited = SynthesisLimits(chunk_max_chars=job.limits.chunk_max_chars, max_audio_seconds=0)
+        observe = partial(self._observe, job)
+        for fmt, pcm in synthesize_pcm(job.voice, text_chunk, unlimited, job.speaker_id, observe):
+            if job.fmt is None:
+                job.fmt = fmt
+                if job.postprocess is not None:
+                    job.processor = AudioPostProcessor(fmt, job.postprocess)
+            if job.processor is not None:
+                pcm = job.processor.process(pcm)
+            if self._append(job, pcm):
+                self._finish_postprocess(job)
+                return True
+        job.sentences_done += 1
+        if job.sentences_done >= len(job.text_chunks):
+            self._finish_postprocess(job)
+            return True
+        return False
+
+    def _finish_postprocess(self, job: SynthesisJob) -> None:
+        if job.processor is not None:
+            self._append(job, job.processor.flush())
+            job.processor = None
+
+    def _append(self, job: SynthesisJob, pcm: bytes) -> bool:
+        """Append audio within the duration cap and byte budget.
+
+        Returns True if the duration cap was reached.
+        """
+        capped = False
+        if job.limits.max_audio_seconds > 0 and job.fmt is not None:
+            max_bytes = int(job.limits.max_audio_seconds * job.fmt.sample_rate) * job.fmt.frame_size
+            remaining = max_bytes - len(job.pcm)
+            if len(pcm) >= remaining:
+                pcm = pcm[:max(remaining, 0)]
+                capped = True
+        self._reserve(len(pcm))
+        job.pcm += pcm
+        return capped
+
+    def _reserve(self, size: int) -> None:
+        """Account for size new bytes, evicting old finished jobs if needed."""
+        with self._lock:
+            if self._total_bytes + size > self._max_total_bytes:
+                finished = sorted(
+                    (j for j in self._jobs.values() if j.finished),
+                    key=lambda j: j.finished_at or 0,
+                )
+                for old in finished:
+                    if self._total_bytes + size <= self._max_total_bytes:
+                        break
+                    self._drop(old)
+                    get_metrics().increment("jobs_evicted_total")
+            if self._total_bytes + size > self._max_total_bytes:
+                raise JobBudgetExceeded("Job audio byte budget exceeded")
+            self._total_bytes += size
+
+    def _drop(self, job: SynthesisJob) -> None:
+        """Remove a job and release its audio. Lock held."""
+        self._jobs.pop(job.id, None)
+        self._total_bytes -= len(job.pcm)
+        job.pcm = bytearray()
+
+    def _after_step(self, job: SynthesisJob, future) -> None:
+        error = future.exception()
+        if error is not None:
+            self._fail(job, error)
+            return
+        if future.result():
+            job.status = JobStatus.COMPLETED
+            job.finished_at = time.time()
+            self._release_backlog(job)
+            get_metrics().increment("jobs_completed_total")
+            return
+        try:
+            self._schedule_step(job)
+        except RuntimeError as e:
+            # Scheduler shut down between steps; errors raised in a done
+            # callback are swallowed, so the job would stay running
+            self._fail(job, e)
+
+    def _fail(self, job: SynthesisJob, error: BaseException) -> None:
+        logger.warning("Synthesis job %s failed: %s", job.id, error)
+        job.status = JobStatus.FAILED
+        job.error = str(error)
+        job.finished_at = time.time()
+        self._release_backlog(job)
+        get_metrics().increment("jobs_failed_total")
+
+    @staticmethod
+    def _release_backlog(job: SynthesisJob) -> None:
+        if job.backlog is not None:
+            job.backlog.release()
+            job.backlog = None
+
+    def _expire(self) -> None:
+        """Drop finished jobs older than the TTL."""
+        cutoff = time.time() - self._ttl
+        with self._lock:
+            for job in list(self._jobs.values()):
+                if job.finished and (job.finished_at or 0) < cutoff:
+                    self._drop(job)
+                    get_metrics().increment("jobs_expired_total")
+
+
+def get_job_limits() -> SynthesisLimits:
+    """Synthesis limits for jobs: the /speak ones with the job input and duration caps."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return replace(
+        get_synthesis_limits(),
+        max_input_chars=settings.get_int("tts.job_max_input_chars", 50000),
+        max_audio_seconds=settings.get_float("tts.job_max_audio_seconds", 3600.0),
+        fast_start=False,
+    )
+
+
+def create_job_manager(scheduler: SynthesisScheduler) -> JobManager:
+    """Create a JobManager configured from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return JobManager(
+        scheduler,
+        ttl_seconds=settings.get_int("tts.jobs_ttl_seconds", 3600),
+        max_total_bytes=settings.get_int("tts.jobs_max_total_mb", 256) * 1024 * 1024,
+    )
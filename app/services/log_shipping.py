@@ -0,0 +1,121 @@
+"""Non-blocking remote log shipping.
+
+BatchingLogHandler sits in front of a slow handler (the jarvis-logs
+JarvisLogHandler). Logging calls only put the record on a bounded
+in-memory queue; a daemon thread drains it in batches and hands them to
+the target handler, so jarvis-logs latency or outages never block a
+request. When the queue is full new records are dropped and counted
+rather than waited on.
+
+A target with an emit_batch(records) method receives each batch in one
+call, so it can send it as one payload. Other targets get the batch's
+records one handle() call at a time; then batching only saves shipper
+wakeups, not round trips.
+"""
+
+import copy
+import logging
+import queue
+import threading
+
+from app.services.metrics import get_metrics
+
+_STOP = object()
+
+
+class BatchingLogHandler(logging.Handler):
+    """Queue records and forward them to target from a background thread."""
+
+    def __init__(
+        self,
+        target: logging.Handler,
+        level: int | None = None,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        super().__init__(level=target.level if level is None else level)
+        self.target = target
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+        get_metrics().register_gauge("log_queue_depth", self._queue.qsize)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return a copy with args merged into the message.
+
+        Like logging.handlers.QueueHandler.prepare(), this runs only for
+        records that passed the level check, and leaves the caller's
+        record (seen by the other handlers) untouched.
+        """
+        message = record.getMessage()
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = message
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+            get_metrics().increment("log_records_dropped_total")
+        except Exception:
+            self.handleError(record)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._ship(batch)
+            if stop:
+                return
+
+    def _ship(self, batch: list[logging.LogRecord]) -> None:
+        metrics = get_metrics()
+        emit_batch = getattr(self.target, "emit_batch", None)
+        try:
+            if emit_batch is None:
+                for record in batch:
+                    self.target.handle(record)
+            else:
+                records = [r for r in batch if r.levelno >= self.target.level and self.target.filter(r)]
+                if records:
+                    emit_batch(records)
+        except Exception:
+            metrics.increment("log_ship_errors_total")
+            return
+        metrics.increment("log_batches_shipped_total")
+        metrics.increment("log_records_shipped_total", len(batch))
+
+    def close(self) -> None:
+        """Ship what is queued (best effort, bounded wait) and close target."""
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=self.flush_interval)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        self.target.close()
+        super().close()
@@ -0,0 +1,187 @@
+"""Process memory helpers for jarvis-tts.
+
+- rss_bytes() / peak_rss_bytes(): resident memory of the process
+- VoiceMemoryTracker: approximate resident memory per loaded voice,
+  measured as RSS deltas while its sessions are created
+- MemorySamplingMiddleware: for a sampled fraction of requests, records
+  the Python allocation peak (tracemalloc) and the RSS delta, which also
+  covers native allocations such as ORT's arena
+"""
+
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.services.metrics import get_metrics
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process in bytes.
+
+    Reads /proc/self/statm on Linux; elsewhere falls back to the peak RSS
+    reported by getrusage().
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def mib(n_bytes: float) -> float:
+    return n_bytes / (1024 * 1024)
+
+
+@dataclass
+class _VoiceEntry:
+    name: str
+    model_bytes: int
+    load_rss_bytes: int
+    loaded_at: float
+    sessions: int = 1
+    session_rss_bytes: int = 0
+
+
+class VoiceMemoryTracker:
+    """Resident memory attributed to each loaded voice.
+
+    Entries disappear when the voice object is garbage collected, so after
+    a hot swap both voices are listed until the old one is released. RSS
+    deltas are approximate: other threads allocate at the same time.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, _VoiceEntry] = {}
+        self._lock = threading.Lock()
+
+    def track(self, name: str, voice: Any, load_rss_bytes: int, model_path: Path | str | None = None) -> None:
+        try:
+            model_bytes = os.path.getsize(model_path) if model_path is not None else 0
+        except OSError:
+            model_bytes = 0
+        entry = _VoiceEntry(name, model_bytes, max(0, load_rss_bytes), time.time())
+        key = id(voice)
+        with self._lock:
+            self._entries[key] = entry
+        try:
+            weakref.finalize(voice, self._forget, key, entry)
+        except TypeError:
+            pass
+
+    def _forget(self, key: int, entry: _VoiceEntry) -> None:
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def add_session(self, name: str, rss_delta: int) -> None:
+        """Attribute an extra session (e.g. for a pinned worker) to the newest voice called name."""
+        with self._lock:
+            entries = [e for e in self._entries.values() if e.name == name]
+            if not entries:
+                return
+            entry = max(entries, key=lambda e: e.loaded_at)
+            entry.sessions += 1
+            entry.session_rss_bytes += max(0, rss_delta)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            {
+                "voice": e.name,
+                "model_bytes": e.model_bytes,
+                "sessions": e.sessions,
+                "load_rss_bytes": e.load_rss_bytes,
+                "worker_sessions_rss_bytes": e.session_rss_bytes,
+                "resident_bytes": e.load_rss_bytes + e.session_rss_bytes,
+                "loaded_at": e.loaded_at,
+            }
+            for e in sorted(entries, key=lambda e: e.loaded_at)
+        ]
+
+
+class MemorySamplingMiddleware:
+    """ASGI middleware recording per-request memory for a sample of requests.
+
+    Sampled requests run one at a time (others are skipped rather than
+    queued) because tracemalloc's peak is process-wide. The measurement
+    lasts until the response body is sent, so streamed synthesis counts.
+    Results go to the request_python_peak_bytes and
+    request_rss_delta_bytes summaries, labelled by route.
+    """
+
+    def __init__(self, app: Any, sample_ratio: float | None = None, rng: random.Random | None = None):
+        self.app = app
+        self._sample_ratio = sample_ratio
+        self._rng = rng or random.Random()
+        self._active = threading.Lock()
+
+    @property
+    def sample_ratio(self) -> float:
+        if self._sample_ratio is not None:
+            return self._sample_ratio
+        from app.services.settings_service import get_settings_service
+
+        return get_settings_service().get_float("server.memory_sample_ratio", 0.0)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        ratio = self.sample_ratio
+        if ratio <= 0 or self._rng.random() >= ratio or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+            rss_before = rss_bytes()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                python_peak = max(0, tracemalloc.get_traced_memory()[1] - traced_before)
+                rss_delta = rss_bytes() - rss_before
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                metrics = get_metrics()
+                metrics.observe("request_python_peak_bytes", python_peak, route=route)
+                metrics.observe("request_rss_delta_bytes", rss_delta, route=route)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._active.release()
+
+
+# Global singleton
+_voice_memory: VoiceMemoryTracker | None = None
+
+
+def get_voice_memory() -> VoiceMemoryTracker:
+    global _voice_memory
+    if _voice_memory is None:
+        _voice_memory = VoiceMemoryTracker()
+    return _voice_memory
+
+
+def reset_voice_memory() -> None:
+    """Reset the tracker singleton (for testing)."""
+    global _voice_memory
+    _voice_memory = None
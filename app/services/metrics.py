@@ -0,0 +1,123 @@
+"""In-process metrics for jarvis-tts.
+
+A small thread-safe registry of counters, callback gauges and latency
+summaries, exposed as a JSON snapshot by the /metrics endpoint. Labels
+are folded into the metric name Prometheus-style, e.g.
+``speak_coalesced_total{voice="x"}``.
+"""
+
+import threading
+from collections import deque
+from collections.abc import Callable
+
+# Observations kept per summary for percentiles
+SUMMARY_WINDOW = 1000
+
+
+def _metric_name(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class _Summary:
+    """All-time count/sum plus a recent window for percentiles."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.window: deque[float] = deque(maxlen=SUMMARY_WINDOW)
+
+    def to_dict(self) -> dict[str, float]:
+        ordered = sorted(self.window)
+
+        def pct(p: float) -> float:
+            return ordered[max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))]
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": pct(50),
+            "p95": pct(95),
+            "p99": pct(99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe counters and gauges."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._summaries: dict[str, _Summary] = {}
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add value to a counter."""
+        key = _metric_name(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(_metric_name(name, labels), 0)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record one observation (e.g. a latency in seconds) in a summary."""
+        key = _metric_name(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.count += 1
+            summary.sum += value
+            summary.window.append(value)
+
+    def get_summary(self, name: str, **labels: str) -> dict[str, float] | None:
+        """Return count, sum and p50/p95/p99 of a summary (None if never observed)."""
+        with self._lock:
+            summary = self._summaries.get(_metric_name(name, labels))
+            return summary.to_dict() if summary is not None else None
+
+    def register_gauge(self, name: str, fn: Callable[[], float], **labels: str) -> None:
+        """Register a callback evaluated whenever a snapshot is taken."""
+        with self._lock:
+            self._gauges[_metric_name(name, labels)] = fn
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return a point-in-time copy of all metrics."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {name: s.to_dict() for name, s in self._summaries.items()}
+        return {
+            "counters": counters,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+            "summaries": summaries,
+        }
+
+    def reset(self) -> None:
+        """Clear all counters and summaries (gauges stay registered)."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# Global singleton
+_metrics: MetricsRegistry | None = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global MetricsRegistry instance."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
+
+
+def reset_metrics() -> None:
+    """Reset the metrics singleton (for testing)."""
+    global _metrics
+    _metrics = None
@@ -0,0 +1,147 @@
+"""ONNX Runtime session settings for voice models.
+
+ORT's CPU arena keeps its high-water mark, so RSS stays up after a burst
+of long requests. The tts.ort_* settings control, per voice session:
+
+- tts.ort_cpu_mem_arena: use the CPU memory arena at all
+- tts.ort_mem_pattern: pre-plan allocations from the first run's shapes
+  (saves time for fixed shapes, but Piper inputs vary per sentence)
+- tts.ort_arena_shrinkage: return unused arena chunks to the system
+  after every run (RunOptions memory.enable_memory_arena_shrinkage)
+
+load_voice() applies them where voices are loaded. PiperVoice.load()
+builds a default session, so when the settings differ from ORT's
+defaults the voice is constructed around our own session instead; the
+model is never loaded twice.
+"""
+
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.services.memory import get_voice_memory, rss_bytes
+from app.services.worker_topology import use_worker_sessions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SessionMemoryOptions:
+    """Memory settings applied to each voice session."""
+
+    cpu_mem_arena: bool = True
+    mem_pattern: bool = True
+    arena_shrinkage: bool = False
+
+    @property
+    def is_default(self) -> bool:
+        return self == SessionMemoryOptions()
+
+
+def get_session_memory_options() -> SessionMemoryOptions:
+    """Build SessionMemoryOptions from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return SessionMemoryOptions(
+        cpu_mem_arena=settings.get_bool("tts.ort_cpu_mem_arena", True),
+        mem_pattern=settings.get_bool("tts.ort_mem_pattern", True),
+        arena_shrinkage=settings.get_bool("tts.ort_arena_shrinkage", False),
+    )
+
+
+class ManagedSession:
+    """InferenceSession wrapper that applies default RunOptions to run()."""
+
+    def __init__(self, session: Any, run_options: Any = None):
+        self.session = session
+        self.run_options = run_options
+
+    def run(self, output_names: Any, input_feed: Any, run_options: Any = None) -> Any:
+        return self.session.run(output_names, input_feed, run_options or self.run_options)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+def create_session(
+    model_path: Path | str,
+    memory: SessionMemoryOptions,
+    threads: int = 0,
+) -> ManagedSession:
+    """CPU session with the given memory options.
+
+    threads > 0 fixes the intra-op pool size and disables the inter-op
+    pool (used for pinned workers); 0 keeps ORT's defaults.
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.enable_cpu_mem_arena = memory.cpu_mem_arena
+    options.enable_mem_pattern = memory.mem_pattern
+    if threads > 0:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+
+    run_options = None
+    if memory.arena_shrinkage and memory.cpu_mem_arena:
+        run_options = ort.RunOptions()
+        run_options.add_run_config_entry("memory.enable_memory_arena_shrinkage", "cpu:0")
+    return ManagedSession(session, run_options)
+
+
+def load_voice(
+    name: str,
+    model_path: Path | str,
+    config_path: Path | str,
+    memory: SessionMemoryOptions,
+    per_worker: bool = False,
+    create: Callable[..., Any] = create_session,
+) -> Any:
+    """Load a PiperVoice whose session is built once with memory's options."""
+    from piper import PiperVoice
+
+    if memory.is_default:
+        voice = PiperVoice.load(model_path=model_path, config_path=config_path)
+    else:
+        from piper.config import PiperConfig
+
+        with open(config_path, encoding="utf-8") as f:
+            config = PiperConfig.from_dict(json.load(f))
+        voice = PiperVoice(session=create(model_path, memory), config=config)
+        logger.info("Voice %s session: %s", name, memory)
+    return configure_voice_session(voice, name, model_path, memory, per_worker=per_worker, create=create)
+
+
+def configure_voice_session(
+    voice: Any,
+    name: str,
+    model_path: Path | str,
+    memory: SessionMemoryOptions,
+    per_worker: bool = False,
+    create: Callable[..., Any] = create_session,
+) -> Any:
+    """Give a loaded voice per-worker sessions when workers are pinned.
+
+    Extra sessions created later for pinned workers use the same memory
+    options and are added to the voice's entry in the memory tracker.
+    Returns voice.
+    """
+    if getattr(voice, "session", None) is None:
+        return voice
+    if per_worker:
+        tracker = get_voice_memory()
+
+        def create_for_worker(threads: int) -> Any:
+            before = rss_bytes()
+            session = create(model_path, memory, threads)
+            tracker.add_session(name, rss_bytes() - before)
+            return session
+
+        use_worker_sessions(voice, create_for_worker)
+    return voice
@@ -0,0 +1,266 @@
+"""Persistent phrase bank of pre-rendered clips.
+
+A phrase bank is a single packed file holding complete WAV clips for a
+fixed set of (voice, text) pairs, followed by a sorted fixed-width index
+of 16-byte phrase digests. The service memory-maps the file and answers
+exact-match lookups with a binary search over the mapped index, returning
+zero-copy slices of the mapping. Nothing is parsed up front, so opening a
+bank costs the same regardless of how many phrases it holds.
+
+File layout (little-endian)::
+
+    header   magic(8) entry_count(u32) reserved(u32) index_offset(u64)
+    data     concatenated WAV clips
+    index    entry_count x [digest(16) offset(u64) length(u64)], sorted by digest
+
+Build a bank with::
+
+    python -m app.services.phrase_bank --phrases phrases.txt \\
+        --voice en_GB-alan-low --output app/models/phrases.bank
+"""
+
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"JTTSPB01"
+_HEADER = struct.Struct("<8sIIQ")
+_ENTRY = struct.Struct("<16sQQ")
+_DIGEST_SIZE = 16
+
+
+class PhraseBankError(Exception):
+    """Raised when a phrase bank file is missing or malformed."""
+
+
+def phrase_digest(voice_name: str, text: str) -> bytes:
+    """Digest identifying a phrase for a voice."""
+    return hashlib.blake2b(
+        f"{voice_name}\0{text}".encode("utf-8"), digest_size=_DIGEST_SIZE
+    ).digest()
+
+
+def _file_signature(path: Path) -> tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class PhraseBank:
+    """Read-only memory-mapped view of one phrase bank file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, "rb") as f:
+                self.signature = _file_signature(self.path)
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise PhraseBankError(f"Cannot open phrase bank {self.path}: {e}") from e
+
+        if len(self._mm) < _HEADER.size:
+            raise PhraseBankError(f"Phrase bank {self.path} is truncated")
+        magic, count, _, index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise PhraseBankError(f"Phrase bank {self.path} has bad magic {magic!r}")
+        if index_offset + count * _ENTRY.size > len(self._mm):
+            raise PhraseBankError(f"Phrase bank {self.path} index is truncated")
+        self._count = count
+        self._index_offset = index_offset
+        self._view = memoryview(self._mm)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _digest_at(self, i: int) -> bytes:
+        start = self._index_offset + i * _ENTRY.size
+        return self._mm[start:start + _DIGEST_SIZE]
+
+    def lookup(self, voice_name: str, text: str) -> memoryview | None:
+        """Return the WAV clip for (voice, text) as a slice of the mapping."""
+        digest = phrase_digest(voice_name, text)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._digest_at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count or self._digest_at(lo) != digest:
+            return None
+        _, offset, length = _ENTRY.unpack_from(self._mm, self._index_offset + lo * _ENTRY.size)
+        return self._view[offset:offset + length]
+
+
+def write_phrase_bank(path: str | Path, clips: Iterable[tuple[str, str, bytes]]) -> int:
+    """Write (voice, text, wav_bytes) clips to a bank file atomically.
+
+    Clips are streamed to a temporary file next to the target and the
+    result is moved into place with os.replace(), so readers only ever
+    see a complete bank. Returns the number of entries written.
+    """
+    path = Path(path)
+    entries: dict[bytes, tuple[int, int]] = {}
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, 0, 0, 0))
+            offset = _HEADER.size
+            for voice_name, text, wav in clips:
+                digest = phrase_digest(voice_name, text)
+                if digest in entries:
+                    continue
+                f.write(wav)
+                entries[digest] = (offset, len(wav))
+                offset += len(wav)
+            for digest in sorted(entries):
+                f.write(_ENTRY.pack(digest, *entries[digest]))
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, len(entries), 0, offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    return len(entries)
+
+
+class PhraseBankStore:
+    """Holds the current phrase bank and swaps it when the file is replaced.
+
+    The file is re-checked with os.stat() at most every check_interval
+    seconds. A replaced file is mapped in full before it is published, so
+    readers switch atomically; slices handed out from the previous mapping
+    stay valid until the last of them is released.
+    """
+
+    def __init__(self, path: str | Path, check_interval: float = 2.0):
+        self.path = Path(path)
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._bank: PhraseBank | None = None
+        self._next_check = 0.0
+        self._maybe_reload(force=True)
+
+    def __len__(self) -> int:
+        bank = self._bank
+        return len(bank) if bank is not None else 0
+
+    def _maybe_reload(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            if not force and now < self._next_check:
+                return
+            self._next_check = now + self._check_interval
+            try:
+                signature = _file_signature(self.path)
+            except FileNotFoundError:
+                if self._bank is not None:
+                    logger.info("Phrase bank %s removed", self.path)
+                self._bank = None
+                return
+            if self._bank is not None and self._bank.signature == signature:
+                return
+            try:
+                bank = PhraseBank(self.path)
+            except PhraseBankError as e:
+                logger.error("Failed to load phrase bank: %s", e)
+                return
+            self._bank = bank
+            logger.info("Loaded phrase bank %s (%d phrases)", self.path, len(bank))
+
+    def get(self, voice_name: str, text: str) -> memoryview | None:
+        """Return the pre-rendered WAV for an exact (voice, text) match."""
+        self._maybe_reload()
+        bank = self._bank
+        if bank is None:
+            return None
+        clip = bank.lookup(voice_name, text)
+        get_metrics().increment("phrase_bank_hits_total" if clip is not None else "phrase_bank_misses_total")
+        return clip
+
+
+def get_phrase_bank_path() -> str:
+    """Read the phrase bank location from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    return get_settings_service().get_str("tts.phrase_bank_path", "app/models/phrases.bank")
+
+
+def _read_phrases(path: Path) -> list[str]:
+    phrases = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            phrases.append(line)
+    return phrases
+
+
+def _render_clips(voice_names: list[str], phrases: list[str], voice_dir: Path):
+    from piper import PiperVoice
+
+    from app.services.synthesis import (
+        SynthesisLimits,
+        render_wav,
+        resolve_speaker,
+        speaker_voice_key,
+        synthesize_pcm,
+    )
+
+    limits = SynthesisLimits()
+    for spec in voice_names:
+        # NAME or NAME#SPEAKER for a speaker of a multi-speaker voice
+        voice_name, _, speaker = spec.partition("#")
+        voice = PiperVoice.load(
+            model_path=voice_dir / f"{voice_name}.onnx",
+            config_path=voice_dir / f"{voice_name}.onnx.json",
+        )
+        speaker_id = resolve_speaker(voice, speaker or None)
+        voice_key = speaker_voice_key(voice_name, speaker_id)
+        for text in phrases:
+            chunks = synthesize_pcm(voice, text, limits, speaker_id)
+            first = next(chunks, None)
+            if first is None:
+                logger.warning("No audio produced for %r (%s)", text, voice_key)
+                continue
+            yield voice_key, text, render_wav(first, chunks)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entry point: render a phrase list into a packed bank file."""
+    parser = argparse.ArgumentParser(description="Build a jarvis-tts phrase bank")
+    parser.add_argument("--phrases", required=True, type=Path, help="Text file, one phrase per line")
+    parser.add_argument(
+        "--voice", action="append", required=True,
+        help="Voice name, or NAME#SPEAKER for a multi-speaker voice (repeatable)",
+    )
+    parser.add_argument("--output", required=True, type=Path, help="Output bank file")
+    parser.add_argument("--voice-dir", default=Path("app/models"), type=Path, help="Directory of voice models")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    phrases = _read_phrases(args.phrases)
+    count = write_phrase_bank(args.output, _render_clips(args.voice, phrases, args.voice_dir))
+    logger.info("Wrote %d clips to %s", count, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,556 @@
+"""Synthesis scheduler for jarvis-tts.
+
+All CPU-bound synthesis work runs on a fixed pool of worker threads fed
+from per-tenant queues, so interactive /speak requests are picked ahead
+of background work such as long-form jobs. Work is submitted in small
+steps (typically one chunk), which lets other requests slip in between
+the steps of a long render.
+
+Within a priority class, tenants (calling app and household) share the
+workers by weighted fair queuing on measured worker time: each tenant
+has a virtual time that grows by step duration / weight, and the next
+step comes from the tenant with the lowest virtual time. One household
+streaming an audiobook therefore cannot delay another household's wake
+response by more than about one step. Tenants that go idle are
+forgotten and come back at the current virtual time, so idling does not
+bank credit. An optional per-tenant concurrency cap keeps a single
+tenant from occupying every worker at once.
+
+Within one tenant's queue of a priority class, the step whose request
+has the least predicted synthesis time runs first (shortest job first,
+with predictions from app/services/cost_model.py). To keep long
+requests from starving, each second a step has waited counts as one
+second less predicted work. Steps submitted without a cost count as
+one typical step.
+
+Steps submitted with a Deadline that has passed by the time a worker
+picks them up are failed with DeadlineExceeded instead of run.
+
+Like asyncio.to_thread(), a step runs in a copy of the submitter's
+context, so per-request state such as the request timer is visible on
+the worker; each step's queue wait is recorded there as the "queue"
+stage.
+
+Pulls from a coalesced subscription (app/services/coalescing.py) pass
+it as the turn: a pull whose item another subscriber has already
+produced is taken on the event loop's default executor instead, so
+identical requests waiting on one synthesis occupy a single worker.
+
+Workers can optionally be pinned to disjoint CPU sets (see
+app/services/worker_topology.py).
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, NamedTuple, Protocol, TypeVar
+
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services.metrics import get_metrics
+from app.services.timing import record_stage
+from app.services.worker_topology import (
+    WorkerSlot,
+    cgroup_cpu_quota,
+    default_worker_count,
+    pin_current_thread,
+    plan_workers,
+    usable_cpus,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_DONE = object()
+
+# Initial guess of one step's duration, charged when a step starts and
+# corrected with the measured time when it ends
+_INITIAL_STEP_ESTIMATE = 0.05
+
+
+class Turn(Protocol):
+    """Says whether an iterator's next item is ready or must be produced."""
+
+    async def wait_turn(self) -> bool:
+        """Wait until the next item is ready (True) or is this caller's to produce (False)."""
+        ...
+
+    def end_turn(self) -> None:
+        """Give up the right to produce taken by a False wait_turn()."""
+        ...
+
+
+class Priority(IntEnum):
+    """Scheduling class; lower values run first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """Who a synthesis step is done for: the calling app and household."""
+
+    app_id: str = ""
+    household_id: str = ""
+
+    @classmethod
+    def from_auth(cls, auth: Any) -> "Tenant":
+        """Tenant of an AppAuthResult."""
+        context = getattr(auth, "context", None)
+        return cls(auth.app.app_id or "", getattr(context, "household_id", None) or "")
+
+
+# Work submitted without a tenant (internal callers, tests)
+DEFAULT_TENANT = Tenant()
+
+
+def parse_weights(spec: str) -> dict[str, float]:
+    """Parse "id=weight,id=weight"; malformed or non-positive entries are skipped."""
+    weights: dict[str, float] = {}
+    for entry in spec.split(","):
+        name, sep, value = entry.partition("=")
+        if not entry.strip():
+            continue
+        try:
+            weight = float(value)
+        except ValueError:
+            weight = 0.0
+        if not sep or not name.strip() or weight <= 0:
+            logger.warning("Ignoring invalid tenant weight %r", entry.strip())
+            continue
+        weights[name.strip()] = weight
+    return weights
+
+
+@dataclass
+class TenantPolicy:
+    """Per-tenant weights and concurrency cap.
+
+    A tenant's weight is its app weight times its household weight (both
+    1 unless configured). max_concurrency limits how many of a tenant's
+    steps run at once (0 = no limit).
+    """
+
+    app_weights: dict[str, float] = field(default_factory=dict)
+    household_weights: dict[str, float] = field(default_factory=dict)
+    max_concurrency: int = 0
+
+    def weight(self, tenant: Tenant) -> float:
+        return self.app_weights.get(tenant.app_id, 1.0) * self.household_weights.get(tenant.household_id, 1.0)
+
+
+class _Step(NamedTuple):
+    seq: int
+    queued_at: float
+    future: Future
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    deadline: Deadline | None
+    # Predicted seconds of the request the step belongs to
+    cost: float
+    context: contextvars.Context
+
+
+class _TenantState:
+    """Queues and fair-share accounting for one active tenant."""
+
+    __slots__ = ("weight", "queues", "vtime", "running")
+
+    def __init__(self, weight: float, vtime: float):
+        self.weight = weight
+        self.queues: dict[int, deque[_Step]] = {}
+        self.vtime = vtime
+        self.running = 0
+
+    def idle(self) -> bool:
+        return self.running == 0 and not any(self.queues.values())
+
+
+class SynthesisScheduler:
+    """Priority-ordered, tenant-fair thread pool for synthesis steps."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        slots: list[WorkerSlot] | None = None,
+        policy: TenantPolicy | None = None,
+        shortest_first: bool = True,
+    ):
+        """slots, when given, pins one worker per slot and overrides workers.
+
+        shortest_first=False keeps each tenant's queue first-in first-out.
+        """
+        if slots:
+            workers = len(slots)
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.slots = slots or None
+        self.policy = policy or TenantPolicy()
+        self.shortest_first = shortest_first
+        self._tenants: dict[Tenant, _TenantState] = {}
+        self._pending = 0
+        self._vclock = 0.0
+        self._step_estimate = _INITIAL_STEP_ESTIMATE
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._threads: list[threading.Thread] = []
+        # Calls queued for one particular worker (see on_each_worker)
+        self._worker_calls: list[deque[tuple[Future, Callable[..., Any], tuple]]] = [
+            deque() for _ in range(workers)
+        ]
+        self._shutdown = False
+        self._busy = 0
+        metrics = get_metrics()
+        metrics.register_gauge("scheduler_queue_depth", self.queue_depth)
+        metrics.register_gauge("scheduler_busy_workers", lambda: self._busy)
+        metrics.register_gauge("scheduler_active_tenants", lambda: len(self._tenants))
+
+    def _start_workers(self) -> None:
+        """Start worker threads on first use. Condition lock held."""
+        for i in range(self.workers):
+            slot = self.slots[i] if self.slots else None
+            thread = threading.Thread(target=self._worker, args=(i, slot), name=f"tts-synth-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def queue_depth(self) -> int:
+        """Number of submitted steps not yet picked up by a worker."""
+        with self._cond:
+            return self._pending
+
+    def submit(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        tenant: Tenant | None = None,
+        deadline: Deadline | None = None,
+        cost: float | None = None,
+    ) -> "Future[T]":
+        """Queue fn(*args) for tenant and return a Future for its result.
+
+        If deadline passes before a worker picks the step up, the future
+        fails with DeadlineExceeded and fn is never called. cost is the
+        predicted synthesis seconds of the whole request, used to run
+        short requests first.
+        """
+        future: Future[T] = Future()
+        tenant = tenant or DEFAULT_TENANT
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            if not self._threads:
+                self._start_workers()
+            state = self._tenants.get(tenant)
+            if state is None:
+                state = self._tenants[tenant] = _TenantState(self.policy.weight(tenant), self._vclock)
+            if cost is None:
+                # A fixed guess, so steps without a cost stay in FIFO order
+                cost = _INITIAL_STEP_ESTIMATE
+            step = _Step(
+                next(self._seq), time.perf_counter(), future, fn, args, deadline, cost, contextvars.copy_context()
+            )
+            state.queues.setdefault(int(priority), deque()).append(step)
+            self._pending += 1
+            self._cond.notify()
+        return future
+
+    def on_each_worker(self, fn: Callable[..., T], *args: Any) -> "list[Future[T]]":
+        """Run fn(*args) once on every worker thread; one Future per worker.
+
+        Each worker makes the call before it picks up its next queued
+        step, so a call waits at most for the step its worker is running.
+        Used to build and warm per-worker state (such as a pinned
+        worker's ORT session) ahead of the requests that need it.
+        """
+        futures: list[Future[T]] = []
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            if not self._threads:
+                self._start_workers()
+            for calls in self._worker_calls:
+                future: Future[T] = Future()
+                calls.append((future, fn, args))
+                futures.append(future)
+            self._cond.notify_all()
+        return futures
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        tenant: Tenant | None = None,
+        deadline: Deadline | None = None,
+        cost: float | None = None,
+    ) -> T:
+        """Run fn(*args) on the scheduler and await the result."""
+        return await asyncio.wrap_future(
+            self.submit(fn, *args, priority=priority, tenant=tenant, deadline=deadline, cost=cost)
+        )
+
+    async def _advance(
+        self, iterator: Iterator[T], default: Any, turn: Turn | None, **step: Any
+    ) -> "Future[Any]":
+        """Start next(iterator, default): taken off the workers if turn says the item is ready."""
+        if turn is not None and await turn.wait_turn():
+            return _take(asyncio.get_running_loop(), iterator, default)
+        try:
+            future = self.submit(next, iterator, default, **step)
+        except BaseException:
+            if turn is not None:
+                turn.end_turn()
+            raise
+        if turn is not None:
+            # Releases the turn if the step was dropped or cancelled before producing
+            future.add_done_callback(lambda _: turn.end_turn())
+        return future
+
+    async def pull(
+        self,
+        iterator: Iterator[T],
+        default: Any = None,
+        priority: Priority = Priority.INTERACTIVE,
+        tenant: Tenant | None = None,
+        deadline: Deadline | None = None,
+        cost: float | None = None,
+        turn: Turn | None = None,
+    ) -> Any:
+        """Await next(iterator, default), on the scheduler unless turn says it is ready."""
+        step = await self._advance(
+            iterator, default, turn, priority=priority, tenant=tenant, deadline=deadline, cost=cost
+        )
+        return await asyncio.wrap_future(step)
+
+    async def iterate(
+        self,
+        iterator: Iterator[T],
+        priority: Priority = Priority.INTERACTIVE,
+        tenant: Tenant | None = None,
+        deadline: Deadline | None = None,
+        cost: float | None = None,
+        turn: Turn | None = None,
+    ) -> AsyncIterator[T]:
+        """Advance a blocking iterator one step at a time on the scheduler.
+
+        With a turn, items it reports ready are taken without a worker
+        and only the steps that produce an item are submitted.
+
+        The iterator is closed when this is closed, cancelled or done; if a
+        step is still advancing it, it is closed on the worker once that
+        step returns.
+        """
+        step: Future[Any] | None = None
+        try:
+            while True:
+                step = await self._advance(
+                    iterator, _DONE, turn, priority=priority, tenant=tenant, deadline=deadline, cost=cost
+                )
+                item = await asyncio.wrap_future(step)
+                step = None
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                if step is None or step.cancel():
+                    close()
+                else:
+                    step.add_done_callback(lambda _: close())
+
+    @property
+    def step_estimate(self) -> float:
+        """Moving average of step duration in seconds."""
+        return self._step_estimate
+
+    @property
+    def pinned(self) -> bool:
+        return self.slots is not None
+
+    def _next_index(self, queue: deque[_Step], now: float) -> int:
+        """Position of the step to run next from one tenant queue. Lock held."""
+        if not self.shortest_first or len(queue) == 1:
+            return 0
+        # Aged cost: predicted work minus time already waited
+        return min(range(len(queue)), key=lambda i: (queue[i].cost - (now - queue[i].queued_at), queue[i].seq))
+
+    def _pick(self) -> tuple[Tenant, _TenantState, int, _Step] | None:
+        """Next step: highest priority, then lowest tenant virtual time. Lock held.
+
+        Linear scans; the number of active tenants and their queued steps
+        is small.
+        """
+        cap = self.policy.max_concurrency
+        now = time.perf_counter()
+        best = None
+        best_key = None
+        for tenant, state in self._tenants.items():
+            if cap > 0 and state.running >= cap:
+                continue
+            for priority, queue in state.queues.items():
+                if not queue:
+                    continue
+                index = self._next_index(queue, now)
+                key = (priority, state.vtime, queue[index].seq)
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best = (tenant, state, priority, index)
+        if best is None:
+            return None
+        tenant, state, priority, index = best
+        queue = state.queues[priority]
+        step = queue[index]
+        del queue[index]
+        self._pending -= 1
+        state.running += 1
+        self._vclock = max(self._vclock, state.vtime)
+        # Charge an estimate now so concurrent picks see this step's cost
+        state.vtime += self._step_estimate / state.weight
+        return tenant, state, priority, step
+
+    def _worker(self, index: int, slot: WorkerSlot | None = None) -> None:
+        if slot is not None:
+            pin_current_thread(slot)
+        calls = self._worker_calls[index]
+        metrics = get_metrics()
+        while True:
+            with self._cond:
+                while not calls and (picked := self._pick()) is None:
+                    if self._shutdown and self._pending == 0:
+                        return
+                    self._cond.wait()
+                call = calls.popleft() if calls else None
+                if call is None:
+                    # Only picked (and charged) when no call was queued
+                    tenant, state, priority, step = picked
+                    charged = self._step_estimate
+                    self._busy += 1
+            if call is not None:
+                future, fn, args = call
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+                continue
+            started = time.perf_counter()
+            priority_name = Priority(priority).name.lower()
+            waited = started - step.queued_at
+            metrics.observe("scheduler_queue_wait_seconds", waited, priority=priority_name)
+            step.context.run(record_stage, "queue", waited)
+            ran = False
+            try:
+                if step.deadline is not None and step.deadline.expired():
+                    if step.future.set_running_or_notify_cancel():
+                        step.future.set_exception(DeadlineExceeded("Deadline passed while queued"))
+                    metrics.increment("scheduler_deadline_dropped_total", priority=priority_name)
+                elif step.future.set_running_or_notify_cancel():
+                    ran = True
+                    try:
+                        step.future.set_result(step.context.run(step.fn, *step.args))
+                    except BaseException as e:
+                        step.future.set_exception(e)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._cond:
+                    self._busy -= 1
+                    state.running -= 1
+                    state.vtime += (elapsed - charged) / state.weight
+                    if ran:
+                        self._step_estimate = 0.8 * self._step_estimate + 0.2 * elapsed
+                    if state.idle():
+                        del self._tenants[tenant]
+                    if self._pending or self._shutdown:
+                        # A capped tenant may be eligible again
+                        self._cond.notify_all()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and let workers drain the queue."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+def _take(loop: asyncio.AbstractEventLoop, iterator: Iterator[T], default: Any) -> "Future[Any]":
+    """next(iterator, default) on loop's default executor, as a cancellable Future."""
+    future: Future[Any] = Future()
+    context = contextvars.copy_context()
+
+    def take() -> None:
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(context.run(next, iterator, default))
+            except BaseException as e:
+                future.set_exception(e)
+
+    loop.run_in_executor(None, take)
+    return future
+
+
+def get_tenant_policy() -> TenantPolicy:
+    """Build TenantPolicy from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return TenantPolicy(
+        app_weights=parse_weights(settings.get_str("tts.tenant_app_weights", "")),
+        household_weights=parse_weights(settings.get_str("tts.tenant_household_weights", "")),
+        max_concurrency=settings.get_int("tts.tenant_max_concurrency", 0),
+    )
+
+
+# Global singleton
+_scheduler: SynthesisScheduler | None = None
+
+
+def get_scheduler() -> SynthesisScheduler:
+    """Get the global SynthesisScheduler, sized from runtime settings."""
+    global _scheduler
+    if _scheduler is None:
+        from app.services.settings_service import get_settings_service
+
+        settings = get_settings_service()
+        workers = settings.get_int("tts.synthesis_workers", 0)
+        policy = get_tenant_policy()
+        shortest_first = settings.get_bool("tts.shortest_job_first", True)
+        if settings.get_bool("tts.worker_pinning", False):
+            quota = cgroup_cpu_quota()
+            cpus = usable_cpus(quota=quota)
+            slots = plan_workers(workers, settings.get_int("tts.ort_threads_per_worker", 0), cpus)
+            _scheduler = SynthesisScheduler(slots=slots, policy=policy, shortest_first=shortest_first)
+            logger.info(
+                "Synthesis scheduler started with %d pinned workers on %d CPUs (cgroup quota %s): %s",
+                _scheduler.workers,
+                len(cpus),
+                f"{quota:.2f}" if quota is not None else "none",
+                ", ".join(f"{list(s.cpus)}x{s.threads}" for s in slots),
+            )
+        else:
+            if workers <= 0:
+                workers = default_worker_count(len(usable_cpus(quota=cgroup_cpu_quota())))
+            _scheduler = SynthesisScheduler(workers=workers, policy=policy, shortest_first=shortest_first)
+            logger.info("Synthesis scheduler started with %d workers", _scheduler.workers)
+    return _scheduler
+
+
+def reset_scheduler() -> None:
+    """Reset the scheduler singleton (for testing)."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+    _scheduler = None
@@ -21,8 +21,16 @@ SETTINGS_DEFINITIONS: list[SettingDefinition] = [
         category="tts",
         value_type="string",
         default="en_GB-alan-low",
-        description="Default voice model for TTS",
+        description="Default voice model for TTS (switched live without a restart)",
         env_fallback="TTS_DEFAULT_VOICE",
+    ),
+    SettingDefinition(
+        key="tts.voice_watch_interval_seconds",
+        category="tts",
+        value_type="float",
+        default=10.0,
+        description="How often tts.default_voice is checked for a voice switch (0 disables)",
+        env_fallback="TTS_VOICE_WATCH_INTERVAL_SECONDS",
         requires_reload=True,
     ),
     SettingDefinition(
@@ -38,6 +46,463 @@ SETTINGS_DEFINITIONS: list[SettingDefinition] = [
         description="System prompt for generating wake responses",
         env_fallback="TTS_WAKE_SYSTEM_PROMPT",
     ),
+    SettingDefinition(
+        key="tts.wake_cutoff_enabled",
+        category="tts",
+        value_type="bool",
+        default=False,
+        description=(
+            "Stop reading the LLM stream for wake responses at the first sentence, word cap or deadline "
+            "(off by default: a slow LLM would otherwise always get the fallback text)"
+        ),
+        env_fallback="TTS_WAKE_CUTOFF_ENABLED",
+    ),
+    SettingDefinition(
+        key="tts.wake_deadline_ms",
+        category="tts",
+        value_type="int",
+        default=400,
+        description="Deadline for the wake response LLM call in milliseconds (0 disables)",
+        env_fallback="TTS_WAKE_DEADLINE_MS",
+    ),
+    SettingDefinition(
+        key="tts.wake_max_words",
+        category="tts",
+        value_type="int",
+        default=12,
+        description="Stop reading the wake response after this many words (0 disables)",
+        env_fallback="TTS_WAKE_MAX_WORDS",
+    ),
+    SettingDefinition(
+        key="tts.wake_stop_at_sentence",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Stop reading the wake response after its first complete sentence",
+        env_fallback="TTS_WAKE_STOP_AT_SENTENCE",
+    ),
+    SettingDefinition(
+        key="tts.wake_fallback_text",
+        category="tts",
+        value_type="string",
+        default="Yes?",
+        description="Canned wake response used when no LLM text arrives in time",
+        env_fallback="TTS_WAKE_FALLBACK_TEXT",
+    ),
+    SettingDefinition(
+        key="tts.max_input_chars",
+        category="tts",
+        value_type="int",
+        default=5000,
+        description="Maximum number of characters accepted by /speak",
+        env_fallback="TTS_MAX_INPUT_CHARS",
+    ),
+    SettingDefinition(
+        key="tts.chunk_max_chars",
+        category="tts",
+        value_type="int",
+        default=400,
+        description="Maximum characters per synthesis chunk (sentence, clause, then hard cap)",
+        env_fallback="TTS_CHUNK_MAX_CHARS",
+    ),
+    SettingDefinition(
+        key="tts.max_audio_seconds",
+        category="tts",
+        value_type="float",
+        default=300.0,
+        description="Maximum audio duration per request in seconds (0 disables the cap)",
+        env_fallback="TTS_MAX_AUDIO_SECONDS",
+    ),
+    SettingDefinition(
+        key="tts.long_text_threshold_chars",
+        category="tts",
+        value_type="int",
+        default=500,
+        description="Text longer than this is streamed chunk by chunk instead of buffered",
+        env_fallback="TTS_LONG_TEXT_THRESHOLD_CHARS",
+    ),
+    SettingDefinition(
+        key="tts.fast_start_enabled",
+        category="tts",
+        value_type="bool",
+        default=False,
+        description="Synthesize and stream a short leading clause before the rest of the text",
+        env_fallback="TTS_FAST_START",
+    ),
+    SettingDefinition(
+        key="tts.fast_start_max_words",
+        category="tts",
+        value_type="int",
+        default=6,
+        description="Maximum words in the fast-start leading clause",
+        env_fallback="TTS_FAST_START_MAX_WORDS",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_enabled",
+        category="tts",
+        value_type="bool",
+        default=False,
+        description="Enable silence trimming, loudness normalization and limiting of synthesized audio",
+        env_fallback="TTS_POSTPROCESS_ENABLED",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_trim_silence",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Trim leading and trailing silence when post-processing is enabled",
+        env_fallback="TTS_POSTPROCESS_TRIM_SILENCE",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_silence_threshold_db",
+        category="tts",
+        value_type="float",
+        default=-50.0,
+        description="Level in dBFS below which audio is treated as silence",
+        env_fallback="TTS_POSTPROCESS_SILENCE_THRESHOLD_DB",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_target_dbfs",
+        category="tts",
+        value_type="float",
+        default=-20.0,
+        description="Target RMS loudness in dBFS for normalization",
+        env_fallback="TTS_POSTPROCESS_TARGET_DBFS",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_max_gain_db",
+        category="tts",
+        value_type="float",
+        default=12.0,
+        description="Maximum gain in dB applied by loudness normalization",
+        env_fallback="TTS_POSTPROCESS_MAX_GAIN_DB",
+    ),
+    SettingDefinition(
+        key="tts.postprocess_limiter_threshold_db",
+        category="tts",
+        value_type="float",
+        default=-1.0,
+        description="Soft limiter threshold in dBFS",
+        env_fallback="TTS_POSTPROCESS_LIMITER_THRESHOLD_DB",
+    ),
+    SettingDefinition(
+        key="tts.phrase_bank_path",
+        category="tts",
+        value_type="string",
+        default="app/models/phrases.bank",
+        description="Packed file of pre-rendered phrases served for exact-match /speak requests",
+        env_fallback="TTS_PHRASE_BANK_PATH",
+    ),
+    SettingDefinition(
+        key="tts.audio_store_dir",
+        category="tts",
+        value_type="string",
+        default="",
+        description="Directory for the on-disk audio store (empty disables it)",
+        env_fallback="TTS_AUDIO_STORE_DIR",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_store_max_mb",
+        category="tts",
+        value_type="int",
+        default=512,
+        description="Maximum size of the on-disk audio store in megabytes",
+        env_fallback="TTS_AUDIO_STORE_MAX_MB",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_backend",
+        category="tts",
+        value_type="string",
+        default="none",
+        description="Audio cache: none, local (in-process LRU) or redis (LRU in front of a shared Redis-protocol server)",
+        env_fallback="TTS_AUDIO_CACHE_BACKEND",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_redis_url",
+        category="tts",
+        value_type="string",
+        default="redis://127.0.0.1:6379/0",
+        description="Shared audio cache server, redis://[user:password@]host[:port][/db]",
+        env_fallback="TTS_AUDIO_CACHE_REDIS_URL",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_key_prefix",
+        category="tts",
+        value_type="string",
+        default="jarvis-tts:audio:",
+        description="Key prefix for clips in the shared audio cache",
+        env_fallback="TTS_AUDIO_CACHE_KEY_PREFIX",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_timeout_ms",
+        category="tts",
+        value_type="int",
+        default=200,
+        description="Connect and read timeout for the shared audio cache in milliseconds",
+        env_fallback="TTS_AUDIO_CACHE_TIMEOUT_MS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_local_max_mb",
+        category="tts",
+        value_type="int",
+        default=64,
+        description="Size of the in-process audio cache tier in megabytes (0 disables it)",
+        env_fallback="TTS_AUDIO_CACHE_LOCAL_MAX_MB",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_local_ttl_seconds",
+        category="tts",
+        value_type="int",
+        default=3600,
+        description="How long clips stay in the in-process audio cache tier",
+        env_fallback="TTS_AUDIO_CACHE_LOCAL_TTL_SECONDS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_shared_ttl_seconds",
+        category="tts",
+        value_type="int",
+        default=86400,
+        description="How long clips stay in the shared audio cache (0 keeps them until evicted)",
+        env_fallback="TTS_AUDIO_CACHE_SHARED_TTL_SECONDS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_max_item_kb",
+        category="tts",
+        value_type="int",
+        default=4096,
+        description="Largest clip stored in the audio cache in kilobytes",
+        env_fallback="TTS_AUDIO_CACHE_MAX_ITEM_KB",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.audio_cache_compression_level",
+        category="tts",
+        value_type="int",
+        default=6,
+        description="zlib level for clips in the shared audio cache (0 stores them uncompressed)",
+        env_fallback="TTS_AUDIO_CACHE_COMPRESSION_LEVEL",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.synthesis_workers",
+        category="tts",
+        value_type="int",
+        default=0,
+        description=(
+            "Number of synthesis worker threads (0 = half the usable cores). With worker pinning "
+            "each worker loads its own ORT session, so model memory grows with the worker count"
+        ),
+        env_fallback="TTS_SYNTHESIS_WORKERS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.shortest_job_first",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Within a tenant and priority, run requests with the least predicted synthesis time first",
+        env_fallback="TTS_SHORTEST_JOB_FIRST",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.max_queue_seconds",
+        category="tts",
+        value_type="float",
+        default=0.0,
+        description="Reject new synthesis (503 with Retry-After) while the predicted queue drain time exceeds this (0 disables)",
+        env_fallback="TTS_MAX_QUEUE_SECONDS",
+    ),
+    SettingDefinition(
+        key="tts.worker_pinning",
+        category="tts",
+        value_type="bool",
+        default=False,
+        description="Pin synthesis workers to disjoint CPU sets, each with its own ORT session",
+        env_fallback="TTS_WORKER_PINNING",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.ort_threads_per_worker",
+        category="tts",
+        value_type="int",
+        default=0,
+        description="ONNX Runtime intra-op threads per pinned worker (0 = one per CPU in its set)",
+        env_fallback="TTS_ORT_THREADS_PER_WORKER",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.tenant_app_weights",
+        category="tts",
+        value_type="string",
+        default="",
+        description="Scheduler weights per app id, e.g. jarvis-node=4,audiobooks=0.5 (unlisted apps weigh 1)",
+        env_fallback="TTS_TENANT_APP_WEIGHTS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.tenant_household_weights",
+        category="tts",
+        value_type="string",
+        default="",
+        description="Scheduler weights per household id, multiplied with the app weight",
+        env_fallback="TTS_TENANT_HOUSEHOLD_WEIGHTS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.tenant_max_concurrency",
+        category="tts",
+        value_type="int",
+        default=0,
+        description="Most synthesis steps one app/household may run at once (0 = no limit)",
+        env_fallback="TTS_TENANT_MAX_CONCURRENCY",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.deadlines_enabled",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Honour X-Request-Timeout-Ms / X-Request-Deadline headers: skip or stop synthesis nobody will wait for",
+        env_fallback="TTS_DEADLINES_ENABLED",
+    ),
+    SettingDefinition(
+        key="tts.degraded_voice",
+        category="tts",
+        value_type="string",
+        default="",
+        description="Lighter voice in app/models used for new requests under load, e.g. an x_low or quantized variant (empty disables)",
+        env_fallback="TTS_DEGRADED_VOICE",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.degradation_enter_queue_depth",
+        category="tts",
+        value_type="float",
+        default=4.0,
+        description="Queued synthesis steps per worker at which new requests switch to the degraded voice",
+        env_fallback="TTS_DEGRADATION_ENTER_QUEUE_DEPTH",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.degradation_exit_queue_depth",
+        category="tts",
+        value_type="float",
+        default=1.0,
+        description="Queued synthesis steps per worker at or below which degradation may end",
+        env_fallback="TTS_DEGRADATION_EXIT_QUEUE_DEPTH",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.degradation_enter_rtf",
+        category="tts",
+        value_type="float",
+        default=0.8,
+        description="Recent real-time factor (synthesis time / audio duration) that triggers degradation (0 ignores RTF)",
+        env_fallback="TTS_DEGRADATION_ENTER_RTF",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.degradation_exit_rtf",
+        category="tts",
+        value_type="float",
+        default=0.4,
+        description="Real-time factor at or below which degradation may end",
+        env_fallback="TTS_DEGRADATION_EXIT_RTF",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.degradation_min_hold_seconds",
+        category="tts",
+        value_type="float",
+        default=10.0,
+        description="Shortest time degradation stays on once entered, so the voice does not flap",
+        env_fallback="TTS_DEGRADATION_MIN_HOLD_SECONDS",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.ort_cpu_mem_arena",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Use ONNX Runtime's CPU memory arena for voice sessions (applied when a voice loads)",
+        env_fallback="TTS_ORT_CPU_MEM_ARENA",
+    ),
+    SettingDefinition(
+        key="tts.ort_mem_pattern",
+        category="tts",
+        value_type="bool",
+        default=True,
+        description="Pre-plan ONNX Runtime allocations from input shapes (applied when a voice loads)",
+        env_fallback="TTS_ORT_MEM_PATTERN",
+    ),
+    SettingDefinition(
+        key="tts.ort_arena_shrinkage",
+        category="tts",
+        value_type="bool",
+        default=False,
+        description="Return unused CPU arena memory to the system after every inference",
+        env_fallback="TTS_ORT_ARENA_SHRINKAGE",
+    ),
+    SettingDefinition(
+        key="tts.wav_buffer_pool_size",
+        category="tts",
+        value_type="int",
+        default=8,
+        description="Reusable WAV assembly buffers kept for buffered /speak responses",
+        env_fallback="TTS_WAV_BUFFER_POOL_SIZE",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.wav_buffer_pool_max_mb",
+        category="tts",
+        value_type="int",
+        default=64,
+        description="Maximum total size of pooled WAV assembly buffers in megabytes",
+        env_fallback="TTS_WAV_BUFFER_POOL_MAX_MB",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.jobs_ttl_seconds",
+        category="tts",
+        value_type="int",
+        default=3600,
+        description="How long finished synthesis jobs are kept",
+        env_fallback="TTS_JOBS_TTL_SECONDS",
+    ),
+    SettingDefinition(
+        key="tts.jobs_max_total_mb",
+        category="tts",
+        value_type="int",
+        default=256,
+        description="Total audio budget across all synthesis jobs in megabytes",
+        env_fallback="TTS_JOBS_MAX_TOTAL_MB",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tts.job_max_input_chars",
+        category="tts",
+        value_type="int",
+        default=50000,
+        description="Maximum number of characters accepted by /speak/jobs",
+        env_fallback="TTS_JOB_MAX_INPUT_CHARS",
+    ),
+    SettingDefinition(
+        key="tts.job_max_audio_seconds",
+        category="tts",
+        value_type="float",
+        default=3600.0,
+        description="Maximum audio duration per synthesis job in seconds (0 disables the cap)",
+        env_fallback="TTS_JOB_MAX_AUDIO_SECONDS",
+    ),
 
     # Server configuration
     SettingDefinition(
@@ -49,6 +514,70 @@ SETTINGS_DEFINITIONS: list[SettingDefinition] = [
         env_fallback="TTS_PORT",
         requires_reload=True,
     ),
+    SettingDefinition(
+        key="server.grpc_port",
+        category="server",
+        value_type="int",
+        default=0,
+        description="gRPC server port (0 disables the gRPC service)",
+        env_fallback="TTS_GRPC_PORT",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="server.timing_window_size",
+        category="server",
+        value_type="int",
+        default=1000,
+        description="Requests per route/stage kept for /admin/timings percentiles",
+        env_fallback="TTS_TIMING_WINDOW_SIZE",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="server.memory_sample_ratio",
+        category="server",
+        value_type="float",
+        default=0.0,
+        description="Fraction of requests whose Python allocation peak and RSS delta are recorded",
+        env_fallback="TTS_MEMORY_SAMPLE_RATIO",
+    ),
+
+    # Tracing (optional, requires the "tracing" extra)
+    SettingDefinition(
+        key="tracing.enabled",
+        category="tracing",
+        value_type="bool",
+        default=False,
+        description="Enable OpenTelemetry tracing",
+        env_fallback="TTS_TRACING_ENABLED",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tracing.exporter",
+        category="tracing",
+        value_type="string",
+        default="console",
+        description="Span exporter: console (stdout) or file (JSON lines)",
+        env_fallback="TTS_TRACING_EXPORTER",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tracing.file_path",
+        category="tracing",
+        value_type="string",
+        default="traces.jsonl",
+        description="Output file for the file span exporter",
+        env_fallback="TTS_TRACING_FILE",
+        requires_reload=True,
+    ),
+    SettingDefinition(
+        key="tracing.sample_ratio",
+        category="tracing",
+        value_type="float",
+        default=1.0,
+        description="Fraction of new traces to sample (0-1); sampled parents are always followed",
+        env_fallback="TTS_TRACING_SAMPLE_RATIO",
+        requires_reload=True,
+    ),
     SettingDefinition(
         key="server.log_console_level",
         category="server",
@@ -75,4 +604,12 @@ SETTINGS_DEFINITIONS: list[SettingDefinition] = [
         description="Auth validation cache TTL in seconds",
         env_fallback="NODE_AUTH_CACHE_TTL",
     ),
+    SettingDefinition(
+        key="auth.cache_failure_ttl_seconds",
+        category="auth",
+        value_type="int",
+        default=60,
+        description="How long rejected credentials are cached, in seconds (0 disables)",
+        env_fallback="JARVIS_AUTH_CACHE_FAILURE_TTL",
+    ),
 ]
@@ -28,6 +28,23 @@ def get_settings_service() -> SettingsService:
     return _settings_service
 
 
+class _DeferredSettingsService:
+    """Forwards to get_settings_service() on first attribute access.
+
+    Lets the settings router be built at import without creating the
+    service, and with it the DB engine, until a request or the startup
+    hook needs a setting.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings_service(), name)
+
+
+def deferred_settings_service() -> SettingsService:
+    """A stand-in for the SettingsService that creates it on first use."""
+    return _DeferredSettingsService()  # type: ignore[return-value]
+
+
 def reset_settings_service() -> None:
     """Reset the settings service singleton (for testing)."""
     global _settings_service
@@ -0,0 +1,291 @@
+"""Shared speech pipeline for jarvis-tts.
+
+Everything between "validated text" and "PCM chunks" lives here so that
+the HTTP /speak endpoint and the gRPC service use the same voice,
+scheduler, request coalescing, phrase bank, on-disk audio store,
+two-tier (local / shared) audio cache, load-adaptive fallback voice and
+the synthesis cost model.
+"""
+
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, replace
+from typing import Any
+
+from app.services.audio_cache import TwoTierAudioCache
+from app.services.audio_postprocess import PostProcessConfig, get_postprocess_config, postprocess_pcm
+from app.services.audio_store import AudioStore, StoredClip, etag_for_key
+from app.services.coalescing import SingleFlight
+from app.services.cost_model import BacklogEntry, cost_units, get_backlog, get_cost_model
+from app.services.degradation import LoadGovernor
+from app.services.metrics import get_metrics
+from app.services.phrase_bank import PhraseBankStore
+from app.services.synthesis import (
+    STREAMING_DATA_SIZE,
+    AudioFormat,
+    SynthesisLimits,
+    get_synthesis_limits,
+    parse_wav_header,
+    resolve_speaker,
+    speaker_voice_key,
+    synthesis_key,
+    synthesize_pcm,
+    wav_header,
+)
+
+
+class TextTooLong(Exception):
+    """Raised when input text exceeds tts.max_input_chars (or the job maximum)."""
+
+    def __init__(self, max_chars: int):
+        super().__init__(f"Text exceeds maximum length of {max_chars} characters")
+        self.max_chars = max_chars
+
+
+@dataclass(frozen=True)
+class SpeechPlan:
+    """Everything needed to produce (or look up) the audio for one request."""
+
+    text: str
+    voice_name: str
+    voice: Any
+    limits: SynthesisLimits
+    postprocess: PostProcessConfig | None
+    key: str
+    speaker_id: int | None = None
+    # Re-targeted at the fallback voice because of load
+    degraded: bool = False
+    # Predicted synthesis seconds (see app/services/cost_model.py)
+    predicted_seconds: float = 0.0
+
+    @property
+    def etag(self) -> str:
+        return etag_for_key(self.key)
+
+    @property
+    def voice_key(self) -> str:
+        """Voice name qualified with the speaker, for per-speaker caches."""
+        return speaker_voice_key(self.voice_name, self.speaker_id)
+
+
+class SpeechPipeline:
+    """Voice, caches and coalescing shared by every synthesis front end."""
+
+    def __init__(self, voice_provider: Callable[[], tuple[str, Any]]):
+        self._voice_provider = voice_provider
+        self.coalescer: SingleFlight = SingleFlight()
+        self.phrase_bank: PhraseBankStore | None = None
+        self.audio_store: AudioStore | None = None
+        self.audio_cache: TwoTierAudioCache | None = None
+        # Lighter voice used under load, as decided by governor
+        self.fallback_voice: tuple[str, Any] | None = None
+        self.governor: LoadGovernor | None = None
+
+    def plan(
+        self,
+        text: str,
+        postprocess: bool | None = None,
+        fast_start: bool | None = None,
+        speaker: str | int | None = None,
+        limits: SynthesisLimits | None = None,
+    ) -> SpeechPlan:
+        """Resolve settings and the content key for a request.
+
+        postprocess and fast_start override the configured defaults when
+        not None; speaker picks a speaker (name or id) of a multi-speaker
+        voice; limits replaces the configured synthesis limits (e.g. the
+        job limits). Raises TextTooLong if the text exceeds the maximum
+        and UnknownSpeaker for a speaker the voice lacks.
+        """
+        if limits is None:
+            limits = get_synthesis_limits()
+        if len(text) > limits.max_input_chars:
+            raise TextTooLong(limits.max_input_chars)
+        if fast_start is not None:
+            limits = replace(limits, fast_start=bool(fast_start))
+
+        config = get_postprocess_config()
+        apply_postprocess = config.enabled if postprocess is None else bool(postprocess)
+        voice_name, voice = self._voice_provider()
+        speaker_id = resolve_speaker(voice, speaker)
+        return self._make_plan(text, voice_name, voice, limits, config if apply_postprocess else None, speaker_id)
+
+    def _make_plan(
+        self,
+        text: str,
+        voice_name: str,
+        voice: Any,
+        limits: SynthesisLimits,
+        postprocess: PostProcessConfig | None,
+        speaker_id: int | None,
+        degraded: bool = False,
+    ) -> SpeechPlan:
+        params = {
+            "chunk_max_chars": limits.chunk_max_chars,
+            "max_audio_seconds": limits.max_audio_seconds,
+            "postprocess": postprocess,
+            "format": "wav",
+        }
+        if limits.fast_start:
+            # The split point changes the audio; only keyed when enabled so
+            # existing clips keep their keys
+            params["fast_start_max_words"] = limits.fast_start_max_words
+        if speaker_id is not None:
+            params["speaker_id"] = speaker_id
+        key = synthesis_key(text, voice_name, params)
+        return SpeechPlan(
+            text=text,
+            voice_name=voice_name,
+            voice=voice,
+            limits=limits,
+            postprocess=postprocess,
+            key=key,
+            speaker_id=speaker_id,
+            degraded=degraded,
+            predicted_seconds=get_cost_model().predict_text(voice_name, text, limits),
+        )
+
+    def degrade(self, plan: SpeechPlan) -> SpeechPlan:
+        """The plan re-targeted at the fallback voice if load calls for it.
+
+        Returns plan itself when not degrading. Requests for a specific
+        speaker keep their voice, since the fallback may not have it.
+        """
+        if self.governor is None or self.fallback_voice is None or plan.speaker_id is not None:
+            return plan
+        name, voice = self.fallback_voice
+        if name == plan.voice_name or not self.governor.update():
+            return plan
+        get_metrics().increment("degraded_requests_total", voice=name)
+        return self._make_plan(plan.text, name, voice, plan.limits, plan.postprocess, None, degraded=True)
+
+    def cached_wav(self, plan: SpeechPlan) -> bytes | memoryview | StoredClip | None:
+        """Return a ready-made WAV from the phrase bank, caches or disk store.
+
+        Lookups go from cheapest to dearest: phrase bank, in-process
+        cache, disk store, then the shared cache over the network.
+        """
+        if self.phrase_bank is not None and plan.postprocess is None:
+            clip = self.phrase_bank.get(plan.voice_key, plan.text)
+            if clip is not None:
+                return clip
+        cache = self.audio_cache
+        if cache is not None:
+            clip = cache.get_local(plan.key)
+            if clip is not None:
+                return clip
+        if self.audio_store is not None:
+            clip = self.audio_store.get(plan.key)
+            if clip is not None:
+                return clip
+        if cache is not None:
+            return cache.get_shared(plan.key)
+        return None
+
+    def cached_pcm(self, plan: SpeechPlan) -> tuple[AudioFormat, bytes] | None:
+        """Like cached_wav(), but returns the raw PCM and its format."""
+        cached = self.cached_wav(plan)
+        if cached is None:
+            return None
+        if isinstance(cached, StoredClip):
+            with cached:
+                wav = cached.read_bytes()
+        else:
+            wav = cached
+        parsed = parse_wav_header(wav)
+        if parsed is None:
+            return None
+        fmt, offset = parsed
+        return fmt, bytes(wav[offset:])
+
+    def store_pcm(self, plan: SpeechPlan, fmt: AudioFormat, pcm: bytes) -> None:
+        """Save a finished clip as WAV to the disk store and audio cache."""
+        if self.audio_store is None and self.audio_cache is None:
+            return
+        wav = wav_header(fmt, len(pcm)) + pcm
+        if self.audio_store is not None:
+            self.audio_store.put(plan.key, wav)
+        if self.audio_cache is not None:
+            self.audio_cache.put(plan.key, wav)
+
+    def tee_pcm(
+        self, plan: SpeechPlan, chunks: Iterator[tuple[AudioFormat, bytes]]
+    ) -> Iterator[tuple[AudioFormat, bytes]]:
+        """Pass PCM chunks through, saving the clip like a streamed /speak.
+
+        The clip is written to the disk store as it streams and saved to
+        the audio cache once complete, from whichever thread iterates.
+        """
+        if self.audio_store is None and self.audio_cache is None:
+            return chunks
+        return self._tee_pcm(plan, chunks)
+
+    def _tee_pcm(
+        self, plan: SpeechPlan, chunks: Iterator[tuple[AudioFormat, bytes]]
+    ) -> Iterator[tuple[AudioFormat, bytes]]:
+        fmts: list[AudioFormat] = []
+
+        def wav() -> Iterator[bytes]:
+            try:
+                for fmt, pcm in chunks:
+                    if not fmts:
+                        fmts.append(fmt)
+                        yield wav_header(fmt, STREAMING_DATA_SIZE)
+                    yield pcm
+            finally:
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+
+        body = wav()
+        if self.audio_store is not None:
+            body = self.audio_store.tee(plan.key, body)
+        if self.audio_cache is not None:
+            body = self.audio_cache.tee(plan.key, body)
+        try:
+            header = True
+            for part in body:
+                if header:
+                    header = False
+                    continue
+                yield fmts[0], part
+        finally:
+            # Abandoned: the store discards its partial clip
+            body.close()
+
+    @staticmethod
+    def chunks_done(pcm: Iterator[Any]) -> int:
+        """Text chunks finished by the synthesis behind an open_pcm() iterator.
+
+        pcm may be wrapped (e.g. in a DeadlineGuard); wrappers expose what
+        they wrap as source. A coalesced synthesis counts for every
+        subscriber.
+        """
+        source: Any = pcm
+        while source is not None and not isinstance(source, BacklogEntry):
+            source = getattr(source, "source", None)
+        return source.chunks_done if source is not None else 0
+
+    def open_pcm(self, plan: SpeechPlan) -> Iterator[tuple[AudioFormat, bytes]]:
+        """Start (or join) the synthesis for a plan and iterate its PCM chunks."""
+
+        def _pipeline():
+            # Counted in the predicted backlog until it finishes or is dropped
+            entry = get_backlog().start(plan.predicted_seconds)
+            model = get_cost_model()
+
+            def observe(text_chunk: str, seconds: float) -> None:
+                model.observe(plan.voice_name, cost_units(text_chunk), seconds)
+                entry.progress(seconds)
+
+            # Synthesize bounded text chunks one at a time
+            pcm_chunks = synthesize_pcm(plan.voice, plan.text, plan.limits, plan.speaker_id, observe)
+            if self.governor is not None:
+                # Feeds the governor's real-time factor
+                pcm_chunks = self.governor.measure(pcm_chunks)
+            # Optional trim / loudness / limiter stage, applied chunk by chunk
+            if plan.postprocess is not None:
+                pcm_chunks = postprocess_pcm(pcm_chunks, plan.postprocess)
+            return entry.attach(pcm_chunks)
+
+        # Identical concurrent requests share one synthesis
+        return self.coalescer.subscribe(plan.key, _pipeline)
@@ -0,0 +1,312 @@
+"""Chunked synthesis pipeline for jarvis-tts.
+
+Feeds bounded text chunks to the voice one at a time and yields raw
+16-bit PCM as it is produced, so peak memory stays proportional to a
+single chunk rather than the whole request.
+"""
+
+import functools
+import hashlib
+import json
+import struct
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.services.text_chunker import split_first_clause, split_text
+from app.services.timing import record_stage
+
+# RIFF/data sizes used for streamed WAV output where the final length is
+# not known up front. Most players treat these as "read until EOF".
+STREAMING_DATA_SIZE = 0xFFFFFFFF - 36
+
+WAV_HEADER_SIZE = 44
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """PCM format of a synthesized clip."""
+
+    sample_rate: int
+    channels: int
+    sample_width: int  # bytes per sample (2 for 16-bit PCM)
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * self.frame_size
+
+
+@dataclass(frozen=True)
+class SynthesisLimits:
+    """Per-request bounds for the synthesis pipeline."""
+
+    max_input_chars: int = 5000
+    chunk_max_chars: int = 400
+    max_audio_seconds: float = 300.0
+    long_text_threshold_chars: int = 500
+    # Fast start: synthesize a short leading clause on its own first
+    fast_start: bool = False
+    fast_start_max_words: int = 6
+
+
+def get_synthesis_limits() -> SynthesisLimits:
+    """Read synthesis limits from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    defaults = SynthesisLimits()
+    return SynthesisLimits(
+        max_input_chars=settings.get_int("tts.max_input_chars", defaults.max_input_chars),
+        chunk_max_chars=settings.get_int("tts.chunk_max_chars", defaults.chunk_max_chars),
+        max_audio_seconds=settings.get_float("tts.max_audio_seconds", defaults.max_audio_seconds),
+        long_text_threshold_chars=settings.get_int(
+            "tts.long_text_threshold_chars", defaults.long_text_threshold_chars
+        ),
+        fast_start=settings.get_bool("tts.fast_start_enabled", defaults.fast_start),
+        fast_start_max_words=max(
+            1, settings.get_int("tts.fast_start_max_words", defaults.fast_start_max_words)
+        ),
+    )
+
+
+def synthesis_key(text: str, voice_name: str, params: dict[str, Any]) -> str:
+    """Stable hash identifying the audio produced for (text, voice, params)."""
+    payload = json.dumps(
+        {"text": text, "voice": voice_name, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=lambda o: asdict(o) if hasattr(o, "__dataclass_fields__") else str(o),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class UnknownSpeaker(ValueError):
+    """Raised when a requested speaker is not offered by the voice."""
+
+
+def voice_speakers(voice: Any) -> dict[str, int]:
+    """Speaker names and ids of a multi-speaker voice ({} if single-speaker)."""
+    config = getattr(voice, "config", None)
+    if config is None or getattr(config, "num_speakers", 1) <= 1:
+        return {}
+    speaker_map = dict(getattr(config, "speaker_id_map", None) or {})
+    return speaker_map or {str(i): i for i in range(config.num_speakers)}
+
+
+def resolve_speaker(voice: Any, speaker: str | int | None) -> int | None:
+    """Map a speaker name or id to a speaker id for voice.
+
+    Returns None for the voice's default speaker, so requests that name
+    it explicitly share audio (and cache keys) with requests that don't.
+    Raises UnknownSpeaker if the voice has no such speaker.
+    """
+    if speaker is None or speaker == "":
+        return None
+    config = getattr(voice, "config", None)
+    num_speakers = getattr(config, "num_speakers", 1) if config is not None else 1
+    if num_speakers <= 1:
+        raise UnknownSpeaker("Voice has a single speaker")
+
+    speaker_map = getattr(config, "speaker_id_map", None) or {}
+    if isinstance(speaker, str) and speaker in speaker_map:
+        speaker_id = speaker_map[speaker]
+    else:
+        try:
+            speaker_id = int(speaker)
+        except (TypeError, ValueError):
+            raise UnknownSpeaker(f"Unknown speaker: {speaker}") from None
+        if not 0 <= speaker_id < num_speakers:
+            raise UnknownSpeaker(f"Unknown speaker: {speaker}")
+    if speaker_id == getattr(config, "default_speaker_id", 0):
+        return None
+    return speaker_id
+
+
+def speaker_voice_key(voice_name: str, speaker_id: int | None) -> str:
+    """Name under which a voice/speaker pair is cached (e.g. in the phrase bank)."""
+    return voice_name if speaker_id is None else f"{voice_name}#{speaker_id}"
+
+
+def instrument_voice(voice: Any) -> Any:
+    """Time a Piper voice's phonemizer and ONNX inference as request stages.
+
+    PiperVoice.synthesize() calls self.phonemize() on the text and
+    self.phoneme_ids_to_audio() (the ONNX run) per sentence; wrapped on
+    the instance, they report "phonemize" and "inference" to the current
+    request's timer (see app/services/timing.py). Returns voice.
+    """
+    for attr, stage in (("phonemize", "phonemize"), ("phoneme_ids_to_audio", "inference")):
+        method = getattr(voice, attr, None)
+        if method is None or getattr(method, "timed_stage", None) is not None:
+            continue
+        setattr(voice, attr, _timed(method, stage))
+    return voice
+
+
+def _timed(fn: Callable[..., Any], stage: str) -> Callable[..., Any]:
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record_stage(stage, time.perf_counter() - started)
+
+    timed.timed_stage = stage  # type: ignore[attr-defined]
+    return timed
+
+
+def _voice_synthesize(voice: Any, text: str, speaker_id: int | None):
+    if speaker_id is None:
+        return voice.synthesize(text)
+    from piper import SynthesisConfig
+
+    return voice.synthesize(text, syn_config=SynthesisConfig(speaker_id=speaker_id))
+
+
+def chunk_format(chunk: Any) -> AudioFormat:
+    """Extract the PCM format from a Piper audio chunk."""
+    return AudioFormat(
+        sample_rate=chunk.sample_rate,
+        channels=chunk.sample_channels,
+        sample_width=chunk.sample_width,
+    )
+
+
+def text_chunks(text: str, limits: SynthesisLimits) -> Iterator[str]:
+    """Bounded text chunks in synthesis order.
+
+    With fast_start the first chunk is split again so its leading clause
+    is synthesized (and can be emitted) before the rest.
+    """
+    chunks = split_text(text, limits.chunk_max_chars)
+    if not limits.fast_start:
+        yield from chunks
+        return
+    first = next(chunks, None)
+    if first is None:
+        return
+    head, rest = split_first_clause(first, limits.fast_start_max_words)
+    yield head
+    if rest:
+        yield rest
+    yield from chunks
+
+
+def synthesize_pcm(
+    voice: Any,
+    text: str,
+    limits: SynthesisLimits,
+    speaker_id: int | None = None,
+    observe: Callable[[str, float], None] | None = None,
+) -> Iterator[tuple[AudioFormat, bytes]]:
+    """Synthesize text chunk by chunk, yielding (format, pcm_bytes) pairs.
+
+    speaker_id selects a speaker of a multi-speaker voice (None for the
+    default). Stops once max_audio_seconds of audio has been produced,
+    truncating the final chunk on a frame boundary. A non-positive
+    max_audio_seconds disables the cap. observe, if given, is called
+    with each completed text chunk and the seconds spent synthesizing
+    it (time the consumer holds a yielded chunk is not counted).
+    """
+    max_bytes: int | None = None
+    emitted = 0
+    for text_chunk in text_chunks(text, limits):
+        spent = 0.0
+        started = time.perf_counter()
+        for chunk in _voice_synthesize(voice, text_chunk, speaker_id):
+            spent += time.perf_counter() - started
+            fmt = chunk_format(chunk)
+            pcm = chunk.audio_int16_bytes
+            if limits.max_audio_seconds > 0:
+                if max_bytes is None:
+                    max_bytes = int(limits.max_audio_seconds * fmt.sample_rate) * fmt.frame_size
+                remaining = max_bytes - emitted
+                if len(pcm) >= remaining:
+                    if remaining > 0:
+                        yield fmt, pcm[:remaining]
+                    return
+                emitted += len(pcm)
+            yield fmt, pcm
+            started = time.perf_counter()
+        if observe is not None:
+            observe(text_chunk, spent + time.perf_counter() - started)
+
+
+def wav_header(fmt: AudioFormat, data_size: int) -> bytes:
+    """Build a canonical 44-byte PCM WAV header."""
+    buf = bytearray(WAV_HEADER_SIZE)
+    wav_header_into(buf, fmt, data_size)
+    return bytes(buf)
+
+
+def wav_header_into(buf: bytearray | memoryview, fmt: AudioFormat, data_size: int, offset: int = 0) -> None:
+    """Write the 44-byte WAV header into buf at offset."""
+    _WAV_HEADER.pack_into(
+        buf,
+        offset,
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        fmt.channels,
+        fmt.sample_rate,
+        fmt.bytes_per_second,
+        fmt.frame_size,
+        fmt.sample_width * 8,
+        b"data",
+        data_size,
+    )
+
+
+def parse_wav_header(wav: bytes | memoryview) -> tuple[AudioFormat, int] | None:
+    """Parse a canonical PCM WAV header into (format, data offset).
+
+    Returns None for anything other than the simple 44-byte layout this
+    service writes.
+    """
+    if len(wav) < WAV_HEADER_SIZE:
+        return None
+    (riff, _, wave_id, fmt_id, fmt_size, audio_format, channels, sample_rate,
+     _, _, bits, data_id, _) = _WAV_HEADER.unpack_from(wav, 0)
+    if (riff, wave_id, fmt_id, data_id) != (b"RIFF", b"WAVE", b"fmt ", b"data"):
+        return None
+    if fmt_size != 16 or audio_format != 1:
+        return None
+    return AudioFormat(sample_rate=sample_rate, channels=channels, sample_width=bits // 8), WAV_HEADER_SIZE
+
+
+def stream_wav(first: tuple[AudioFormat, bytes], rest: Iterator[tuple[AudioFormat, bytes]]) -> Iterator[bytes]:
+    """Yield a streamed WAV: header with open-ended length, then PCM chunks."""
+    fmt, pcm = first
+    started = time.perf_counter()
+    header = wav_header(fmt, STREAMING_DATA_SIZE)
+    # PCM chunks are passed through as they are: only the header is encoded
+    record_stage("encode", time.perf_counter() - started)
+    yield header
+    yield pcm
+    for _, pcm in rest:
+        yield pcm
+
+
+def render_wav(first: tuple[AudioFormat, bytes], rest: Iterator[tuple[AudioFormat, bytes]]) -> bytes:
+    """Render a complete in-memory WAV from the first chunk and the remainder.
+
+    Chunks are joined once behind the header. The /speak buffered path
+    uses app.services.wav_buffer.assemble_wav() instead, which reuses
+    pooled buffers.
+    """
+    fmt, pcm = first
+    parts = [b"", pcm]
+    parts.extend(pcm for _, pcm in rest)
+    parts[0] = wav_header(fmt, sum(len(p) for p in parts))
+    return b"".join(parts)
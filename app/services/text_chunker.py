@@ -0,0 +1,104 @@
+"""Text chunking for long-form synthesis.
+
+Splits input text into bounded pieces so that each call to the voice
+only ever sees a short span of text. Splitting is tried at sentence
+boundaries first, then at clause boundaries, and finally at a hard
+length cap (preferring the last space before the cap).
+"""
+
+import re
+from collections.abc import Iterator
+
+_SENTENCE_RE = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"')\]]))\s+")
+_CLAUSE_RE = re.compile(r"(?<=[,;:—–])\s+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_FIRST_BREAK_RE = re.compile(r"[,;:—–.!?…][\"')\]]?(?=\s)")
+
+# Words that sound unfinished at the end of a fast-start head
+_WEAK_ENDINGS = frozenset({
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "at", "for",
+    "with", "from", "by", "is", "are", "was", "your", "my", "our", "their",
+})
+
+
+def _hard_split(text: str, max_chars: int) -> Iterator[str]:
+    """Split text at or before max_chars, preferring word boundaries."""
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        head, text = text[:cut].strip(), text[cut:].strip()
+        if head:
+            yield head
+    if text:
+        yield text
+
+
+def _pack(parts: list[str], max_chars: int) -> Iterator[str]:
+    """Greedily join adjacent parts while they fit within max_chars."""
+    current = ""
+    for part in parts:
+        if len(part) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield from _hard_split(part, max_chars)
+            continue
+        candidate = f"{current} {part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            yield current
+            current = part
+    if current:
+        yield current
+
+
+def split_text(text: str, max_chars: int) -> Iterator[str]:
+    """Yield chunks of text no longer than max_chars.
+
+    Sentences are kept whole when they fit. Longer sentences are split
+    into clauses, and clauses that still exceed the limit are split at
+    the hard cap. Whitespace runs are collapsed to single spaces.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            yield sentence
+            continue
+        clauses = [c.strip() for c in _CLAUSE_RE.split(sentence) if c.strip()]
+        yield from _pack(clauses, max_chars)
+
+
+def split_first_clause(text: str, max_words: int) -> tuple[str, str]:
+    """Split a short leading clause off text for fast-start synthesis.
+
+    The head ends at the first clause or sentence break if it falls
+    within max_words words, so the voice renders it with natural
+    phrase-final prosody. Otherwise the head is cut at the word cap,
+    backing off from trailing articles, prepositions and conjunctions
+    that would sound clipped. Returns (head, rest); rest is empty when
+    the text is already short.
+    """
+    if max_words <= 0:
+        raise ValueError("max_words must be positive")
+
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    words = text.split(" ")
+    if len(words) <= max_words:
+        return text, ""
+
+    match = _FIRST_BREAK_RE.search(text)
+    if match is not None and len(text[:match.end()].split(" ")) <= max_words:
+        return text[:match.end()], text[match.end():].strip()
+
+    head_words = words[:max_words]
+    while len(head_words) > 2 and head_words[-1].lower() in _WEAK_ENDINGS:
+        head_words.pop()
+    return " ".join(head_words), " ".join(words[len(head_words):])
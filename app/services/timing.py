@@ -0,0 +1,208 @@
+"""Per-request stage timing for jarvis-tts.
+
+RequestTimingMiddleware starts a RequestTimer for every HTTP request and
+makes it available to handlers through a context variable. Handlers call
+mark(stage) at stage boundaries; each mark records the time since the
+previous one. Work timed inside a marked span (scheduler queue wait,
+phonemization, ONNX inference, WAV encoding; possibly on a worker
+thread running in the request's context) is added with
+record_stage(stage, seconds) and taken out of the enclosing mark, so
+the stages still add up to the total. The stages recorded before the
+response headers go out are
+reported in a Server-Timing header. When the body is complete the full
+breakdown is logged as one structured debug line and fed into a rolling
+window that the admin endpoint summarizes as percentiles.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar["RequestTimer | None"] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Ordered stage durations (seconds) for one request."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages: dict[str, float] = {}
+        # Recorded since the last mark, to take out of it
+        self._recorded = 0.0
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str) -> None:
+        """Attribute the time since the previous mark, less recorded stages, to stage."""
+        now = time.perf_counter()
+        with self._lock:
+            own = max(0.0, now - self._last - self._recorded)
+            self.stages[stage] = self.stages.get(stage, 0.0) + own
+            self._last = now
+            self._recorded = 0.0
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add seconds measured elsewhere to stage (thread-safe)."""
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+            self._recorded += seconds
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self.stages)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the stages recorded so far."""
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.snapshot().items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+def current_timer() -> RequestTimer | None:
+    """The timer of the request being handled, if any."""
+    return _current.get()
+
+
+def mark(stage: str) -> None:
+    """Mark the end of stage on the current request's timer (no-op outside a request)."""
+    timer = _current.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Add a separately timed stage to the current request (no-op outside a request)."""
+    timer = _current.get()
+    if timer is not None:
+        timer.record(stage, seconds)
+
+
+class TimingStats:
+    """Rolling window of stage durations per route."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: dict[tuple[str, str], deque[float]] = {}
+
+    def record(self, route: str, stages: dict[str, float]) -> None:
+        with self._lock:
+            for stage, seconds in stages.items():
+                samples = self._samples.get((route, stage))
+                if samples is None:
+                    samples = self._samples[(route, stage)] = deque(maxlen=self.window)
+                samples.append(seconds)
+
+    def percentiles(self) -> dict[str, dict[str, dict[str, float]]]:
+        """{route: {stage: {count, p50_ms, p95_ms, p99_ms, max_ms}}}."""
+        with self._lock:
+            snapshot = {key: sorted(samples) for key, samples in self._samples.items()}
+        result: dict[str, dict[str, dict[str, float]]] = {}
+        for (route, stage), ordered in sorted(snapshot.items()):
+            result.setdefault(route, {})[stage] = {
+                "count": len(ordered),
+                "p50_ms": _percentile(ordered, 50) * 1000,
+                "p95_ms": _percentile(ordered, 95) * 1000,
+                "p99_ms": _percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware that times requests and emits Server-Timing."""
+
+    def __init__(self, app: Any, stats: "TimingStats | None" = None):
+        self.app = app
+        self._stats = stats
+
+    @property
+    def stats(self) -> TimingStats:
+        return self._stats or get_timing_stats()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        status = 0
+        headers_sent = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, headers_sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers_sent = True
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if headers_sent:
+                self._finish(scope, timer, status)
+
+    def _finish(self, scope, timer: RequestTimer, status: int) -> None:
+        route = scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        if timer.stages:
+            # Whatever ran after the last mark (streamed body, ...)
+            timer.mark("send")
+        stages = timer.snapshot()
+        stages["total"] = timer.elapsed()
+        self.stats.record(path, stages)
+        get_metrics().increment("http_requests_total", route=path, status=str(status))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("request timing %s", json.dumps({
+                "method": scope.get("method"),
+                "route": path,
+                "status": status,
+                "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()},
+            }))
+
+
+# Global singleton
+_timing_stats: TimingStats | None = None
+
+
+def get_timing_stats() -> TimingStats:
+    """Get the global TimingStats, sized from runtime settings."""
+    global _timing_stats
+    if _timing_stats is None:
+        from app.services.settings_service import get_settings_service
+
+        window = get_settings_service().get_int("server.timing_window_size", 1000)
+        _timing_stats = TimingStats(window=max(1, window))
+    return _timing_stats
+
+
+def reset_timing_stats() -> None:
+    """Reset the TimingStats singleton (for testing)."""
+    global _timing_stats
+    _timing_stats = None
@@ -0,0 +1,170 @@
+"""Optional OpenTelemetry tracing for jarvis-tts.
+
+When tracing.enabled is set and the OpenTelemetry SDK is installed,
+setup_tracing() installs a tracer provider with a parent-based ratio
+sampler and a console or JSON-lines file exporter (no collector needed).
+Incoming W3C trace context is honoured by TracingMiddleware, and
+inject_trace_headers() propagates it on outgoing httpx calls so a wake
+request can be followed through jarvis-auth, the LLM proxy and this
+service. When tracing is off, span() returns a shared no-op context
+manager, so instrumented code pays next to nothing, and the SDK is not
+even imported: setup_tracing() imports it only once tracing is enabled.
+"""
+
+import logging
+import time
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_NOOP = nullcontext()
+
+_tracer: Any = None
+_provider: Any = None
+_export_file: Any = None
+# opentelemetry API modules, bound by setup_tracing()
+trace: Any = None
+propagate: Any = None
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def setup_tracing(exporter: Any = None) -> bool:
+    """Configure tracing from runtime settings. Returns True if enabled.
+
+    exporter overrides the configured span exporter (used by tests).
+    """
+    global _tracer, _provider, trace, propagate
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    if not settings.get_bool("tracing.enabled", False):
+        return False
+    try:
+        # Imported here: the SDK is only needed once tracing is on
+        from opentelemetry import propagate as otel_propagate, trace as otel_trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("tracing.enabled is set but opentelemetry-sdk is not installed, tracing disabled")
+        return False
+    trace, propagate = otel_trace, otel_propagate
+
+    ratio = min(1.0, max(0.0, settings.get_float("tracing.sample_ratio", 1.0)))
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": "jarvis-tts"}),
+        sampler=ParentBased(TraceIdRatioBased(ratio)),
+    )
+    if exporter is None:
+        exporter = _create_exporter(
+            settings.get_str("tracing.exporter", "console"),
+            settings.get_str("tracing.file_path", "traces.jsonl"),
+        )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    _provider = provider
+    _tracer = provider.get_tracer("jarvis-tts")
+    logger.info("OpenTelemetry tracing enabled (sample ratio %.3f)", ratio)
+    return True
+
+
+def _create_exporter(kind: str, file_path: str) -> Any:
+    global _export_file
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if kind == "file":
+        _export_file = open(file_path, "a", encoding="utf-8")
+        return ConsoleSpanExporter(
+            out=_export_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    if kind != "console":
+        logger.warning("Unknown tracing.exporter %r, using console", kind)
+    return ConsoleSpanExporter()
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and disable tracing."""
+    global _tracer, _provider, _export_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _export_file is not None:
+        _export_file.close()
+    _tracer = _provider = _export_file = None
+
+
+def span(name: str, **attributes: Any) -> AbstractContextManager:
+    """Start a child span of the current context (no-op when tracing is off)."""
+    if _tracer is None:
+        return _NOOP
+    return _tracer.start_as_current_span(name, attributes=attributes or None)
+
+
+def current_span() -> Any:
+    """The active span, or None when tracing is off."""
+    if _tracer is None:
+        return None
+    return trace.get_current_span()
+
+
+def inject_trace_headers(headers: dict[str, str]) -> dict[str, str]:
+    """Add W3C traceparent/tracestate for the current span to headers."""
+    if _tracer is not None:
+        propagate.inject(headers)
+    return headers
+
+
+class FirstTokenTimer:
+    """Records time-to-first-token on a streaming-call span."""
+
+    def __init__(self, span_: Any):
+        self._span = span_
+        self._start = time.perf_counter()
+        self.ttft: float | None = None
+
+    def token(self) -> None:
+        if self.ttft is not None:
+            return
+        self.ttft = time.perf_counter() - self._start
+        if self._span is not None:
+            self._span.set_attribute("llm.ttft_ms", round(self.ttft * 1000, 3))
+            self._span.add_event("first_token")
+
+
+class TracingMiddleware:
+    """ASGI middleware that opens a server span per HTTP request."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        parent = propagate.extract(carrier)
+        method = scope.get("method", "")
+        with _tracer.start_as_current_span(
+            method,
+            context=parent,
+            kind=trace.SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope.get("path", "")},
+        ) as server_span:
+
+            async def send_wrapper(message) -> None:
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.response.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    server_span.update_name(f"{method} {route}")
+                    server_span.set_attribute("http.route", route)
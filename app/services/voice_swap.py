@@ -0,0 +1,155 @@
+"""Zero-downtime switching of the default voice.
+
+VoiceHotSwap watches tts.default_voice. When it changes, the new voice is
+loaded and warmed up off the event loop while the old one keeps serving,
+then new requests are switched over in a single step. With pinned
+synthesis workers, each worker builds and warms its own session of the
+new voice before the switch as well (warm_up_workers(), also used at
+startup). Requests already in flight hold their own reference to the
+old voice, so they finish on it; the old session is freed when the last
+of them drops it. Swap time and the memory overlap (both voices
+resident) are logged and recorded in metrics.
+"""
+
+import asyncio
+import gc
+import logging
+import time
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from app.services.memory import mib, rss_bytes
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = "Hello."
+
+
+def warm_up(voice: Any, text: str = WARMUP_TEXT) -> None:
+    """Run one short synthesis so first-request costs are paid up front."""
+    for _ in voice.synthesize(text):
+        pass
+
+
+async def warm_up_workers(scheduler: Any, voice: Any, text: str = WARMUP_TEXT) -> None:
+    """Warm voice on every pinned worker of scheduler.
+
+    A pinned worker's first synthesis creates its own ORT session (see
+    PerWorkerSession), so this builds all of them now instead of on each
+    worker's first request. No-op when workers are not pinned.
+    """
+    if not scheduler.pinned:
+        return
+    await asyncio.gather(*(asyncio.wrap_future(f) for f in scheduler.on_each_worker(warm_up, voice, text)))
+
+
+class VoiceHotSwap:
+    """Loads, warms and atomically activates a new default voice."""
+
+    def __init__(
+        self,
+        load_voice: Callable[[str], Any],
+        get_current: Callable[[], tuple[str, Any]],
+        set_current: Callable[[str, Any], None],
+        warmup_text: str = WARMUP_TEXT,
+        get_scheduler: Callable[[], Any] | None = None,
+    ):
+        """get_scheduler, when given, returns the synthesis scheduler whose
+        pinned workers warm the new voice before it is activated.
+        """
+        self._load_voice = load_voice
+        self._get_current = get_current
+        self._set_current = set_current
+        self._warmup_text = warmup_text
+        self._get_scheduler = get_scheduler
+        self._lock = asyncio.Lock()
+        self._failed: str | None = None
+        self.released: list[str] = []
+
+    def _load_and_warm(self, name: str) -> Any:
+        voice = self._load_voice(name)
+        warm_up(voice, self._warmup_text)
+        return voice
+
+    async def swap(self, name: str) -> bool:
+        """Switch new requests to voice name. Returns True on success.
+
+        Must be called on the event loop: requests read the current voice
+        there too, so they never see a half-applied switch.
+        """
+        async with self._lock:
+            old_name, _ = self._get_current()
+            if name == old_name:
+                return False
+
+            started = time.monotonic()
+            rss_before = rss_bytes()
+            try:
+                new_voice = await asyncio.to_thread(self._load_and_warm, name)
+                if self._get_scheduler is not None:
+                    await warm_up_workers(self._get_scheduler(), new_voice, self._warmup_text)
+            except Exception as e:
+                self._failed = name
+                get_metrics().increment("voice_swap_failures_total")
+                logger.error("Failed to load voice %s, keeping %s: %s", name, old_name, e)
+                return False
+            overlap_rss = rss_bytes()
+
+            _, old_voice = self._get_current()
+            self._set_current(name, new_voice)
+            elapsed = time.monotonic() - started
+            self._failed = None
+
+            self._watch_release(old_voice, old_name, overlap_rss)
+            del old_voice
+
+            metrics = get_metrics()
+            metrics.increment("voice_swaps_total")
+            metrics.observe("voice_swap_seconds", elapsed)
+            logger.info(
+                "Switched default voice %s -> %s in %.2fs (RSS %.1f MiB before, %.1f MiB with both loaded)",
+                old_name, name, elapsed, mib(rss_before), mib(overlap_rss),
+            )
+            return True
+
+    def _watch_release(self, old_voice: Any, old_name: str, overlap_rss: int) -> None:
+        swapped_at = time.monotonic()
+
+        def released() -> None:
+            self.released.append(old_name)
+            rss_after = rss_bytes()
+            logger.info(
+                "Released voice %s %.2fs after switch-over (RSS %.1f MiB, overlap peak %.1f MiB)",
+                old_name, time.monotonic() - swapped_at, mib(rss_after), mib(overlap_rss),
+            )
+
+        try:
+            weakref.finalize(old_voice, released)
+        except TypeError:
+            # Not weak-referenceable; memory is still freed with the last reference
+            logger.debug("Cannot track release of voice %s", old_name)
+
+    async def check(self) -> bool:
+        """Swap if tts.default_voice no longer matches the active voice."""
+        from app.services.settings_service import get_settings_service
+
+        current_name, _ = self._get_current()
+        desired = get_settings_service().get_str("tts.default_voice", current_name)
+        if not desired or desired == current_name or desired == self._failed:
+            return False
+        swapped = await self.swap(desired)
+        if swapped:
+            # Give finalizers of an already idle old voice a chance to run
+            gc.collect()
+        return swapped
+
+    async def watch(self, interval: float) -> None:
+        """Poll the setting every interval seconds until cancelled."""
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning("Voice watch check failed: %s", e)
+            await asyncio.sleep(interval)
@@ -0,0 +1,155 @@
+"""Latency-bounded reading of the LLM stream for wake responses.
+
+The wake greeting only needs a few words, but the LLM proxy may keep
+streaming (or stall) well past that. WakeTextCollector stops reading as
+soon as one of these happens:
+
+- the first sentence is complete (tts.wake_stop_at_sentence)
+- tts.wake_max_words complete words have arrived
+- tts.wake_deadline_ms has passed since the call started
+
+Leaving the stream's context closes the connection, so the proxy stops
+generating for us. Whatever text has arrived is used, otherwise the
+canned tts.wake_fallback_text. Each outcome is counted in
+wake_llm_cutoff_total{reason}.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from enum import Enum
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminator (optionally closing quote/bracket) then space or end
+_SENTENCE_END_RE = re.compile(r"[.!?…][\"')\]]?(?=\s|$)")
+
+
+class CutoffReason(str, Enum):
+    """Why reading the LLM stream stopped."""
+
+    SENTENCE = "sentence"
+    WORD_CAP = "word_cap"
+    DEADLINE = "deadline"
+    COMPLETE = "complete"  # stream ended by itself
+
+
+@dataclass(frozen=True)
+class WakeCutoff:
+    """Limits for reading a wake response from the LLM stream."""
+
+    enabled: bool = False
+    deadline_seconds: float = 0.4
+    max_words: int = 12
+    stop_at_sentence: bool = True
+    fallback_text: str = "Yes?"
+
+
+def get_wake_cutoff() -> WakeCutoff:
+    """Build WakeCutoff from runtime settings."""
+    from app.services.settings_service import get_settings_service
+
+    settings = get_settings_service()
+    return WakeCutoff(
+        enabled=settings.get_bool("tts.wake_cutoff_enabled", False),
+        deadline_seconds=settings.get_int("tts.wake_deadline_ms", 400) / 1000,
+        max_words=settings.get_int("tts.wake_max_words", 12),
+        stop_at_sentence=settings.get_bool("tts.wake_stop_at_sentence", True),
+        fallback_text=settings.get_str("tts.wake_fallback_text", "Yes?") or "Yes?",
+    )
+
+
+class WakeTextCollector:
+    """Accumulates streamed fragments and decides when to stop reading."""
+
+    def __init__(self, cutoff: WakeCutoff):
+        self.cutoff = cutoff
+        self._text = ""
+        self.reason: CutoffReason | None = None
+
+    def feed(self, fragment: str) -> CutoffReason | None:
+        """Add a fragment; returns the cut-off reason once reading should stop."""
+        self._text += fragment
+        if not self.cutoff.enabled or self.reason is not None:
+            return self.reason
+        if self.cutoff.stop_at_sentence and _SENTENCE_END_RE.search(self._text.strip()):
+            self.reason = CutoffReason.SENTENCE
+        elif self.cutoff.max_words > 0 and self._complete_words() >= self.cutoff.max_words:
+            self.reason = CutoffReason.WORD_CAP
+        return self.reason
+
+    def _complete_words(self) -> int:
+        words = len(self._text.split())
+        # The last word may still be growing unless whitespace follows it
+        return words if self._text[-1:].isspace() else max(0, words - 1)
+
+    @property
+    def text(self) -> str:
+        """The text to speak, trimmed to the first sentence or word cap."""
+        text = self._text.strip()
+        if self.reason is CutoffReason.SENTENCE:
+            match = _SENTENCE_END_RE.search(text)
+            text = text[:match.end()]
+        elif self.reason is CutoffReason.WORD_CAP:
+            text = " ".join(text.split()[:self.cutoff.max_words])
+        return text
+
+
+def parse_stream_line(line: str) -> str:
+    """The "response" text of one NDJSON line from the LLM proxy ("" if none)."""
+    if not line.strip():
+        return ""
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError as e:
+        logger.debug("Failed to parse LLM response chunk: %s", e)
+        return ""
+    return chunk.get("response", "") if isinstance(chunk, dict) else ""
+
+
+async def collect_wake_text(
+    read: Callable[[WakeTextCollector], Awaitable[None]],
+    cutoff: WakeCutoff,
+    budget: float | None = None,
+) -> tuple[str, CutoffReason]:
+    """Run read(collector) under the deadline and return (text, reason).
+
+    read opens the LLM stream and feeds fragments to the collector,
+    returning as soon as feed() reports a cut-off. On the deadline (the
+    cut-off deadline or the caller's remaining budget in seconds,
+    whichever is sooner) it is cancelled, which closes the stream.
+    Errors from read propagate.
+    """
+    collector = WakeTextCollector(cutoff)
+    deadline = cutoff.deadline_seconds if cutoff.enabled and cutoff.deadline_seconds > 0 else None
+    if budget is not None:
+        deadline = max(0.0, budget if deadline is None else min(deadline, budget))
+    try:
+        await asyncio.wait_for(read(collector), timeout=deadline)
+        reason = collector.reason or CutoffReason.COMPLETE
+    except TimeoutError:
+        reason = CutoffReason.DEADLINE
+
+    text = collector.text
+    metrics = get_metrics()
+    metrics.increment("wake_llm_cutoff_total", reason=reason.value)
+    if not text:
+        metrics.increment("wake_fallback_total", reason=reason.value)
+        text = cutoff.fallback_text
+    return text, reason
+
+
+async def feed_lines(lines: AsyncIterator[str], collector: WakeTextCollector, on_token: Callable[[], None]) -> None:
+    """Feed NDJSON lines to collector until it reports a cut-off or the stream ends."""
+    async for line in lines:
+        fragment = parse_stream_line(line)
+        if not fragment:
+            continue
+        on_token()
+        if collector.feed(fragment) is not None:
+            return
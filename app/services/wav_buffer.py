@@ -0,0 +1,220 @@
+"""Pooled buffers for assembling complete WAV responses.
+
+The buffered /speak path used to go chunk -> wave.writeframes -> BytesIO
+-> getvalue() -> Response, copying every clip several times. WavBuffer
+instead leaves 44 bytes for the header at the front of a reusable
+bytearray, copies each PCM chunk in once, writes the header in place
+when the length is known, and hands a memoryview of the buffer to the
+response. The buffer goes back to the pool after the response is sent,
+unless something (e.g. a transport's pending-write queue) still holds a
+view into it; then it is left to the garbage collector instead.
+
+New buffers are sized for the largest of the recent clips, so a buffer
+only moves to a bigger allocation (one extra copy) when a clip outgrows
+that. Allocations, reuses, growth and bytes copied are counted
+per buffer and in metrics, so benchmarks can compare assembly paths.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+
+from app.services.metrics import get_metrics
+from app.services.synthesis import WAV_HEADER_SIZE, AudioFormat, wav_header_into
+from app.services.timing import record_stage
+
+# Smallest buffer handed out: ~3 s of 22.05 kHz 16-bit mono audio
+MIN_BUFFER_BYTES = 128 * 1024
+
+# Finished clip sizes remembered for sizing new buffers
+RECENT_SIZES = 32
+
+
+class BufferPool:
+    """Free list of bytearrays, bounded in count and total size."""
+
+    def __init__(self, max_buffers: int = 8, max_total_bytes: int = 64 * 1024 * 1024):
+        self.max_buffers = max_buffers
+        self.max_total_bytes = max_total_bytes
+        self._free: list[bytearray] = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.reuses = 0
+        self._recent_sizes: deque[int] = deque(maxlen=RECENT_SIZES)
+        get_metrics().register_gauge("wav_buffer_pool_free", lambda: len(self._free))
+
+    def acquire(self, min_size: int) -> bytearray:
+        """A buffer of at least min_size bytes (contents undefined)."""
+        with self._lock:
+            # Smallest free buffer that fits
+            best = None
+            for i, buf in enumerate(self._free):
+                if len(buf) >= min_size and (best is None or len(buf) < len(self._free[best])):
+                    best = i
+            if best is not None:
+                self.reuses += 1
+                get_metrics().increment("wav_buffer_reuses_total")
+                return self._free.pop(best)
+            self.allocations += 1
+        get_metrics().increment("wav_buffer_allocations_total")
+        return bytearray(max(min_size, MIN_BUFFER_BYTES))
+
+    def release(self, buf: bytearray) -> None:
+        """Return buf for reuse; dropped if the pool is full or buf is still viewed."""
+        if _has_exports(buf):
+            get_metrics().increment("wav_buffer_pinned_total")
+            return
+        with self._lock:
+            if len(self._free) >= self.max_buffers:
+                # Keep the larger buffers; they fit more clips
+                smallest = min(range(len(self._free)), key=lambda i: len(self._free[i]))
+                if len(self._free[smallest]) >= len(buf):
+                    return
+                self._free.pop(smallest)
+            if sum(map(len, self._free)) + len(buf) > self.max_total_bytes:
+                return
+            self._free.append(buf)
+
+    def record_size(self, size: int) -> None:
+        """Remember a finished clip size for size_hint()."""
+        with self._lock:
+            self._recent_sizes.append(size)
+
+    def size_hint(self) -> int:
+        """Largest recent clip size; new buffers start this big."""
+        with self._lock:
+            return max(self._recent_sizes, default=0)
+
+    def free_buffers(self) -> int:
+        with self._lock:
+            return len(self._free)
+
+
+def _has_exports(buf: bytearray) -> bool:
+    """True while any memoryview still references buf's memory.
+
+    Only an un-exported bytearray can be resized, so probe with a
+    one-byte grow and shrink.
+    """
+    try:
+        buf.append(0)
+    except BufferError:
+        return True
+    del buf[-1]
+    return False
+
+
+class WavBuffer:
+    """One WAV clip assembled in a (pooled) bytearray."""
+
+    def __init__(self, pool: BufferPool | None = None, size_hint: int = 0):
+        self._pool = pool
+        size = WAV_HEADER_SIZE + size_hint
+        if pool is not None:
+            self._buf = pool.acquire(max(size, pool.size_hint()))
+        else:
+            self._buf = bytearray(max(size, MIN_BUFFER_BYTES))
+        self._pos = WAV_HEADER_SIZE
+        self._view: memoryview | None = None
+        self.allocations = 1
+        self.bytes_copied = 0
+
+    def __len__(self) -> int:
+        return self._pos
+
+    def append(self, pcm: bytes | memoryview) -> None:
+        n = len(pcm)
+        end = self._pos + n
+        if end > len(self._buf):
+            self._grow(end)
+        self._buf[self._pos:end] = pcm
+        self._pos = end
+        self.bytes_copied += n
+
+    def _grow(self, needed: int) -> None:
+        new_size = max(needed, len(self._buf) * 2)
+        new = self._pool.acquire(new_size) if self._pool is not None else bytearray(new_size)
+        new[:self._pos] = memoryview(self._buf)[:self._pos]
+        self.bytes_copied += self._pos
+        self.allocations += 1
+        get_metrics().increment("wav_buffer_grows_total")
+        if self._pool is not None:
+            self._pool.release(self._buf)
+        self._buf = new
+
+    def finish(self, fmt: AudioFormat) -> memoryview:
+        """Write the header in place and return a view of the complete WAV."""
+        wav_header_into(self._buf, fmt, self._pos - WAV_HEADER_SIZE)
+        get_metrics().increment("wav_buffer_bytes_copied_total", self.bytes_copied)
+        if self._pool is not None:
+            self._pool.record_size(self._pos)
+        self._view = memoryview(self._buf)[:self._pos]
+        return self._view
+
+    def release(self) -> None:
+        """Hand the buffer back to the pool. Views from finish() become invalid."""
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                # Re-exported by a consumer; the pool check below keeps it out
+                pass
+            self._view = None
+        if self._pool is not None and self._buf is not None:
+            self._pool.release(self._buf)
+        self._buf = None
+
+
+def assemble_wav(
+    first: tuple[AudioFormat, bytes],
+    rest: Iterator[tuple[AudioFormat, bytes]],
+    pool: BufferPool | None = None,
+) -> tuple[WavBuffer, memoryview]:
+    """Copy all PCM chunks into one WavBuffer and finish it.
+
+    The caller owns the returned buffer and must release() it once the
+    view is no longer needed.
+    """
+    fmt, pcm = first
+    started = time.perf_counter()
+    buffer = WavBuffer(pool, size_hint=len(pcm))
+    try:
+        buffer.append(pcm)
+        encode = time.perf_counter() - started
+        for _, pcm in rest:
+            # Pulling from rest synthesizes; only the copy is encoding
+            started = time.perf_counter()
+            buffer.append(pcm)
+            encode += time.perf_counter() - started
+        started = time.perf_counter()
+        view = buffer.finish(fmt)
+        record_stage("encode", encode + time.perf_counter() - started)
+        return buffer, view
+    except BaseException:
+        buffer.release()
+        raise
+
+
+# Global singleton
+_pool: BufferPool | None = None
+
+
+def get_buffer_pool() -> BufferPool:
+    """Get the global BufferPool, sized from runtime settings."""
+    global _pool
+    if _pool is None:
+        from app.services.settings_service import get_settings_service
+
+        settings = get_settings_service()
+        _pool = BufferPool(
+            max_buffers=settings.get_int("tts.wav_buffer_pool_size", 8),
+            max_total_bytes=settings.get_int("tts.wav_buffer_pool_max_mb", 64) * 1024 * 1024,
+        )
+    return _pool
+
+
+def reset_buffer_pool() -> None:
+    """Reset the pool singleton (for testing)."""
+    global _pool
+    _pool = None
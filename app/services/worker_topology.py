@@ -0,0 +1,181 @@
+"""CPU topology for synthesis workers.
+
+With several synthesis workers sharing one ONNX Runtime session, every
+concurrent inference fans out over ORT's default intra-op pool (one
+thread per core), so busy hosts run many more threads than cores and
+tail latency suffers from context switching. In pinned mode each
+scheduler worker is given a disjoint set of CPUs and an ORT session of
+its own whose intra-op pool matches that set:
+
+- plan_workers() splits the usable CPUs into per-worker slots
+- pin_current_thread() applies a slot's CPU set to the calling worker
+- PerWorkerSession stands in for a voice's session and creates one
+  session per worker thread, sized from the worker's slot, on that
+  worker's first synthesis (the service warms every worker at startup,
+  so this happens before the first request)
+
+Usable CPUs take the process affinity mask and any cgroup CPU quota
+(Docker --cpus) into account.
+"""
+
+import logging
+import math
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class WorkerSlot:
+    """CPU set and ORT intra-op thread budget of one synthesis worker."""
+
+    index: int
+    cpus: tuple[int, ...]
+    threads: int
+
+
+def available_cpus() -> list[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> float | None:
+    """CPU quota in cores from cgroup v2 cpu.max or v1 cfs files, or None."""
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for cpu_dir in (root / "cpu", root / "cpu,cpuacct"):
+        try:
+            quota = int((cpu_dir / "cpu.cfs_quota_us").read_text())
+            period = int((cpu_dir / "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        if quota > 0 and period > 0:
+            return quota / period
+        return None
+    return None
+
+
+def usable_cpus(cpus: list[int] | None = None, quota: float | None = None) -> list[int]:
+    """Allowed CPUs, trimmed to the cgroup quota (rounded up)."""
+    cpus = available_cpus() if cpus is None else sorted(cpus)
+    if quota is not None and quota > 0:
+        cpus = cpus[: max(1, math.ceil(quota))]
+    return cpus
+
+
+def default_worker_count(n_cpus: int) -> int:
+    """Half the usable cores (two intra-op threads per worker), at least one."""
+    return max(1, n_cpus // 2)
+
+
+def plan_workers(workers: int, threads_per_worker: int = 0, cpus: list[int] | None = None) -> list[WorkerSlot]:
+    """Split cpus into one contiguous CPU set per worker.
+
+    workers <= 0 picks default_worker_count(). threads_per_worker <= 0
+    gives each worker one ORT thread per CPU in its set. With more
+    workers than CPUs, sets are single CPUs handed out round-robin and
+    are no longer disjoint.
+    """
+    cpus = usable_cpus() if cpus is None else cpus
+    if not cpus:
+        raise ValueError("no CPUs available")
+    if workers <= 0:
+        workers = default_worker_count(len(cpus))
+
+    slots = []
+    per_worker = len(cpus) // workers
+    for i in range(workers):
+        if per_worker:
+            start = i * per_worker
+            # The last worker also takes any leftover CPUs
+            end = len(cpus) if i == workers - 1 else start + per_worker
+            cpu_set = tuple(cpus[start:end])
+        else:
+            cpu_set = (cpus[i % len(cpus)],)
+        threads = threads_per_worker if threads_per_worker > 0 else len(cpu_set)
+        slots.append(WorkerSlot(index=i, cpus=cpu_set, threads=threads))
+    return slots
+
+
+def pin_current_thread(slot: WorkerSlot) -> bool:
+    """Restrict the calling thread to slot.cpus and remember the slot.
+
+    Threads started afterwards (such as ORT's intra-op pool) inherit the
+    CPU set. Returns False where affinity is unsupported or refused.
+    """
+    _local.slot = slot
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(threading.get_native_id(), slot.cpus)
+    except OSError as e:
+        logger.warning("Could not pin synthesis worker %d to CPUs %s: %s", slot.index, slot.cpus, e)
+        return False
+    return True
+
+
+def current_slot() -> WorkerSlot | None:
+    """The WorkerSlot of the calling thread, if it is a pinned worker."""
+    return getattr(_local, "slot", None)
+
+
+class PerWorkerSession:
+    """Session proxy giving each pinned worker thread its own ORT session.
+
+    Installed as voice.session; create(threads) builds the session for a
+    worker's slot. Calls from threads without a slot (warm-up, phrase
+    bank builds) use fallback, the voice's original session.
+    """
+
+    def __init__(self, create: Callable[[int], Any], fallback: Any):
+        self.create = create
+        self.fallback = fallback
+        self._sessions: dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def _session(self) -> Any:
+        slot = current_slot()
+        if slot is None:
+            return self.fallback
+        session = self._sessions.get(slot.index)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(slot.index)
+                if session is None:
+                    # Created on the pinned worker so ORT's threads inherit its CPU set
+                    session = self.create(slot.threads)
+                    self._sessions[slot.index] = session
+        return session
+
+    def run(self, *args: Any, **kwargs: Any) -> Any:
+        return self._session().run(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session(), name)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def use_worker_sessions(voice: Any, create: Callable[[int], Any]) -> Any:
+    """Give voice one session per pinned worker, built by create(threads). Returns voice."""
+    session = getattr(voice, "session", None)
+    if session is not None and not isinstance(session, PerWorkerSession):
+        voice.session = PerWorkerSession(create, session)
+    return voice
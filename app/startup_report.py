@@ -0,0 +1,183 @@
+"""Startup-time report: import cost and wall-clock per init phase.
+
+app.main imports this module first, so STARTED marks the point where the
+service's own imports begin. The startup hook times each init phase with
+phase() and logs one report once the service is ready, e.g.::
+
+    Startup 2.41 s: import 0.62 s, config 0.01 s, voice 1.71 s, grpc 0.04 s, ...
+
+Phases can add notes, listed under that line (e.g. how many ORT sessions
+each voice holds with pinned workers, and their memory).
+
+With TTS_STARTUP_PROFILE_IMPORTS=1 every import after this one is timed
+as well (like python -X importtime, with self and cumulative time per
+module) and the slowest are listed in the report. The profiler adds a
+little overhead, so it is off by default and removed once the report
+is logged.
+
+Phase durations are also exported as startup_phase_seconds{phase}.
+"""
+
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger("uvicorn")
+
+STARTED = time.perf_counter()
+
+PROFILE_ENV = "TTS_STARTUP_PROFILE_IMPORTS"
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """Time spent executing one module, as reported by -X importtime."""
+
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+    depth: int
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Meta path hook timing each module's execution.
+
+    Finds specs through the finders after it on sys.meta_path and wraps
+    the loader's exec_module, so nested imports are charged to their
+    parent's cumulative time but not to its self time. Built-in modules
+    (whose loader is a class shared by all of them) are not timed.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._stack: list[list] = []
+        self.timings: list[ImportTiming] = []
+
+    def install(self) -> "ImportProfiler":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        try:
+            finders = sys.meta_path[sys.meta_path.index(self) + 1:]
+        except ValueError:
+            return None
+        for finder in finders:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+                loader.exec_module = self._timed(fullname, loader.exec_module)
+            return spec
+        return None
+
+    def _timed(self, name: str, exec_module: Callable) -> Callable:
+        def timed_exec_module(module) -> None:
+            # [name, started, seconds spent in nested imports]
+            frame = [name, self._clock(), 0.0]
+            depth = len(self._stack)
+            self._stack.append(frame)
+            try:
+                exec_module(module)
+            finally:
+                self._stack.pop()
+                cumulative = self._clock() - frame[1]
+                self.timings.append(ImportTiming(name, cumulative - frame[2], cumulative, depth))
+                if self._stack:
+                    self._stack[-1][2] += cumulative
+
+        return timed_exec_module
+
+    def slowest(self, count: int) -> list[ImportTiming]:
+        """The costliest imports made directly by unprofiled code (e.g. app.main)."""
+        direct = [t for t in self.timings if t.depth == 0]
+        return sorted(direct, key=lambda t: t.cumulative_seconds, reverse=True)[:count]
+
+
+class StartupReport:
+    """Wall-clock time of each startup phase since the service began importing."""
+
+    def __init__(
+        self,
+        started: float,
+        profiler: ImportProfiler | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.started = started
+        self.profiler = profiler
+        self._clock = clock
+        self.phases: list[tuple[str, float]] = []
+        self.notes: list[str] = []
+        self.finished: float | None = None
+
+    def imported(self) -> None:
+        """Record the import phase: from STARTED until now."""
+        self.phases.append(("import", self._clock() - self.started))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.phases.append((name, self._clock() - started))
+
+    def note(self, text: str) -> None:
+        """Add a line to the report."""
+        self.notes.append(text)
+
+    def total(self) -> float:
+        end = self.finished if self.finished is not None else self._clock()
+        return end - self.started
+
+    def render(self, top: int = 10) -> str:
+        parts = ", ".join(f"{name} {seconds:.2f} s" for name, seconds in self.phases)
+        lines = [f"Startup {self.total():.2f} s: {parts}"]
+        lines.extend(f"  {text}" for text in self.notes)
+        if self.profiler is not None and self.profiler.timings:
+            lines.append("Slowest imports (self / cumulative):")
+            lines.extend(
+                f"  {t.self_seconds * 1000:8.1f} ms {t.cumulative_seconds * 1000:8.1f} ms  {t.module}"
+                for t in self.profiler.slowest(top)
+            )
+        return "\n".join(lines)
+
+    def finish(self) -> str:
+        """Stop profiling, export the phases as metrics and log the report."""
+        from app.services.metrics import get_metrics
+
+        self.finished = self._clock()
+        if self.profiler is not None:
+            self.profiler.uninstall()
+        metrics = get_metrics()
+        for name, seconds in self.phases:
+            metrics.observe("startup_phase_seconds", seconds, phase=name)
+        report = self.render()
+        logger.info(report)
+        return report
+
+
+def _profile_imports() -> bool:
+    return os.getenv(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+_report = StartupReport(STARTED, ImportProfiler().install() if _profile_imports() else None)
+
+
+def get_startup_report() -> StartupReport:
+    """The report for this process's startup."""
+    return _report
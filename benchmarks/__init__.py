@@ -0,0 +1 @@
+"""Benchmarks for jarvis-tts (run against a live service)."""
@@ -0,0 +1,85 @@
+"""Light-tenant latency under a heavy tenant, FIFO vs fair scheduling.
+
+Drives the SynthesisScheduler with simulated synthesis steps (each holds
+a worker for --step-ms, like one Piper chunk): one "audiobook" household
+keeps --heavy-streams long streams going, while another household sends
+short single-step requests (wake responses) every --light-interval-ms.
+The run is repeated with every step charged to one tenant (the previous
+first-come-first-served behaviour) and with per-tenant fair queuing,
+optionally with a per-tenant concurrency cap. Reports p50/p95/p99
+latency of the light requests and heavy-step throughput. No model is
+needed.
+
+Usage::
+
+    python -m benchmarks.bench_fairness --workers 2 --heavy-streams 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.scheduler import SynthesisScheduler, Tenant, TenantPolicy
+from benchmarks._stats import summarize
+
+HEAVY = Tenant("audiobooks", "household-a")
+LIGHT = Tenant("jarvis-node", "household-b")
+
+
+async def _run(mode: str, args: argparse.Namespace) -> dict:
+    cap = args.cap if mode == "fair+cap" else 0
+    scheduler = SynthesisScheduler(workers=args.workers, policy=TenantPolicy(max_concurrency=cap))
+    fair = mode != "fifo"
+    step = args.step_ms / 1000
+    stop = time.perf_counter() + args.duration
+    heavy_steps = 0
+    latencies: list[float] = []
+
+    async def heavy_stream():
+        nonlocal heavy_steps
+        while time.perf_counter() < stop:
+            await scheduler.run(time.sleep, step, tenant=HEAVY if fair else None)
+            heavy_steps += 1
+
+    async def light_requests():
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            await scheduler.run(time.sleep, step, tenant=LIGHT if fair else None)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(args.light_interval_ms / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(heavy_stream() for _ in range(args.heavy_streams)), light_requests())
+    wall = time.perf_counter() - started
+    scheduler.shutdown()
+
+    row = {"mode": mode, **summarize(latencies, 0, wall), "heavy_steps_per_s": heavy_steps / wall}
+    print(
+        f"{mode:<9} light p50 {row['p50_ms']:7.1f} ms  p95 {row['p95_ms']:7.1f} ms  "
+        f"p99 {row['p99_ms']:7.1f} ms  heavy {row['heavy_steps_per_s']:6.1f} steps/s"
+    )
+    return row
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tenant-fair synthesis scheduling")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--heavy-streams", type=int, default=8)
+    parser.add_argument("--step-ms", type=float, default=40.0, help="Worker time per synthesis step")
+    parser.add_argument("--light-interval-ms", type=float, default=100.0)
+    parser.add_argument("--cap", type=int, default=1, help="Per-tenant concurrency cap for fair+cap")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [asyncio.run(_run(mode, args)) for mode in ("fifo", "fair", "fair+cap")]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
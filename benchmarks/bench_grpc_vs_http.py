@@ -0,0 +1,114 @@
+"""Compare the gRPC and HTTP synthesis paths of a running jarvis-tts.
+
+Sends the same text through POST /speak and the gRPC Synthesize /
+SynthesizeStream RPCs at a fixed concurrency and reports latency
+percentiles, time-to-first-chunk for the streaming calls, throughput and
+bytes received per call.
+
+Usage::
+
+    python -m benchmarks.bench_grpc_vs_http --http-url http://localhost:7707 \\
+        --grpc-target localhost:7708 --app-id command-center --app-key KEY
+
+Identical requests are coalesced and cached by the service, so each call
+appends a counter to the text unless --same-text is given.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import grpc
+import httpx
+
+from app.grpc_service import tts_pb2, tts_pb2_grpc
+from benchmarks._stats import summarize
+
+
+async def _run(concurrency: int, requests: int, call) -> tuple[dict, list[float], int]:
+    latencies: list[float] = []
+    first_chunk: list[float] = []
+    errors = 0
+    sizes: list[int] = []
+    counter = iter(range(requests))
+    start = time.perf_counter()
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                size, ttfc = await call(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+            sizes.append(size)
+            if ttfc is not None:
+                first_chunk.append(ttfc - t0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - start)
+    if first_chunk:
+        result["ttfc_p50_ms"] = summarize(first_chunk, 0, 1)["p50_ms"]
+    result["mean_bytes"] = sum(sizes) / len(sizes) if sizes else 0
+    return result, latencies, errors
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    headers = {"X-Jarvis-App-Id": args.app_id, "X-Jarvis-App-Key": args.app_key}
+    metadata = tuple((k.lower(), v) for k, v in headers.items())
+
+    def text_for(i: int) -> str:
+        return args.text if args.same_text else f"{args.text} {i}"
+
+    results: dict[str, dict] = {}
+    async with httpx.AsyncClient(base_url=args.http_url, timeout=60.0) as client:
+        async def http_call(i: int):
+            resp = await client.post("/speak", json={"text": text_for(i)}, headers=headers)
+            resp.raise_for_status()
+            return len(resp.content), None
+
+        results["http_speak"], _, _ = await _run(args.concurrency, args.requests, http_call)
+
+    async with grpc.aio.insecure_channel(args.grpc_target) as channel:
+        stub = tts_pb2_grpc.TextToSpeechStub(channel)
+
+        async def unary_call(i: int):
+            resp = await stub.Synthesize(tts_pb2.SynthesizeRequest(text=text_for(i)), metadata=metadata)
+            return len(resp.pcm), None
+
+        async def stream_call(i: int):
+            size, ttfc = 0, None
+            async for chunk in stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text=text_for(i)), metadata=metadata):
+                if ttfc is None:
+                    ttfc = time.perf_counter()
+                size += len(chunk.pcm)
+            return size, ttfc
+
+        results["grpc_unary"], _, _ = await _run(args.concurrency, args.requests, unary_call)
+        results["grpc_stream"], _, _ = await _run(args.concurrency, args.requests, stream_call)
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark gRPC vs HTTP synthesis")
+    parser.add_argument("--http-url", default="http://localhost:7707")
+    parser.add_argument("--grpc-target", default="localhost:7708")
+    parser.add_argument("--app-id", required=True)
+    parser.add_argument("--app-key", required=True)
+    parser.add_argument("--text", default="Good evening. The living room lights are now off.")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--same-text", action="store_true", help="Reuse identical text (measures cache/coalescing)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(main_async(args))
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""Compare pinned and unpinned synthesis worker topologies.
+
+Loads a Piper voice in-process and drives the SynthesisScheduler at a
+fixed concurrency for a set time, once with the shared default ORT
+session (intra-op pool over all cores, unpinned workers) and once with
+workers pinned to disjoint CPU sets, each with its own sized session.
+Throughput and p50/p95/p99 per-request latency are reported for both.
+
+Usage::
+
+    python -m benchmarks.bench_pinning --model app/models/en_GB-alan-low.onnx \\
+        --workers 4 --concurrency 8 --duration 20
+
+Needs piper-tts and onnxruntime. Run on an otherwise idle host; results
+are only comparable between runs on the same machine and CPU quota.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.services.ort_session import SessionMemoryOptions, configure_voice_session
+from app.services.scheduler import SynthesisScheduler
+from app.services.synthesis import SynthesisLimits, synthesize_pcm
+from app.services.worker_topology import cgroup_cpu_quota, plan_workers, usable_cpus
+from benchmarks._stats import summarize
+
+TEXTS = [
+    "Turning on the kitchen lights.",
+    "It is currently eighteen degrees and cloudy, with rain expected later this evening.",
+    "Your next meeting starts in fifteen minutes.",
+    "The front door is locked and the alarm is set.",
+]
+
+
+def _render(voice, text: str, limits: SynthesisLimits) -> int:
+    return sum(len(pcm) for _, pcm in synthesize_pcm(voice, text, limits))
+
+
+async def _drive(scheduler: SynthesisScheduler, voice, concurrency: int, duration: float, warmup: float) -> dict:
+    limits = SynthesisLimits()
+    latencies: list[float] = []
+    errors = 0
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def worker(offset: int) -> None:
+        nonlocal errors
+        i = offset
+        while loop.time() < stop_at:
+            text = TEXTS[i % len(TEXTS)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                await scheduler.run(_render, voice, text, limits)
+            except Exception:
+                errors += 1
+                continue
+            if loop.time() >= measure_from:
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, duration)
+
+
+def _load(model: Path):
+    from piper import PiperVoice
+
+    return PiperVoice.load(model_path=model, config_path=Path(f"{model}.json"))
+
+
+def run(args: argparse.Namespace) -> dict:
+    quota = cgroup_cpu_quota()
+    cpus = usable_cpus(quota=quota)
+    slots = plan_workers(args.workers, args.threads_per_worker, cpus)
+    results = {
+        "host": {"usable_cpus": cpus, "cgroup_quota": quota},
+        "config": {
+            "workers": len(slots),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "slots": [{"cpus": list(s.cpus), "threads": s.threads} for s in slots],
+        },
+    }
+
+    for mode in ("unpinned", "pinned"):
+        voice = _load(args.model)
+        if mode == "pinned":
+            configure_voice_session(voice, args.model.stem, args.model, SessionMemoryOptions(), per_worker=True)
+            scheduler = SynthesisScheduler(slots=slots)
+        else:
+            scheduler = SynthesisScheduler(workers=len(slots))
+        try:
+            results[mode] = asyncio.run(_drive(scheduler, voice, args.concurrency, args.duration, args.warmup))
+        finally:
+            scheduler.shutdown()
+        r = results[mode]
+        print(
+            f"{mode:<9} {r['throughput_rps']:7.2f} req/s  p50 {r['p50_ms']:8.1f} ms  "
+            f"p95 {r['p95_ms']:8.1f} ms  p99 {r['p99_ms']:8.1f} ms  errors {r['errors']}"
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pinned vs unpinned synthesis workers")
+    parser.add_argument("--model", type=Path, default=Path("app/models/en_GB-alan-low.onnx"))
+    parser.add_argument("--workers", type=int, default=0, help="0 = half the usable cores")
+    parser.add_argument("--threads-per-worker", type=int, default=0, help="0 = one per CPU in the worker's set")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per mode")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds per mode")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
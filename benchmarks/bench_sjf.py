@@ -0,0 +1,86 @@
+"""Short-request latency with a mix of request sizes, FIFO vs shortest-job-first.
+
+Drives the SynthesisScheduler with simulated single-step requests whose
+worker time is drawn from a short/long mix (wake replies and
+announcements): --short-ms for most, --long-ms for a --long-share
+fraction. Requests arrive as a Poisson process at --load times the
+workers' capacity. Each step is submitted with its true duration as the
+predicted cost, blurred by --cost-noise to stand in for the cost model's
+error. Reports p50/p95 latency of short and long requests for FIFO and
+shortest-job-first. No model is needed.
+
+Usage::
+
+    python -m benchmarks.bench_sjf --workers 2 --load 0.9 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.services.scheduler import SynthesisScheduler
+from benchmarks._stats import summarize
+
+
+async def _run(mode: str, args: argparse.Namespace) -> dict:
+    scheduler = SynthesisScheduler(workers=args.workers, shortest_first=mode == "sjf")
+    rng = random.Random(args.seed)
+    mean_step = (1 - args.long_share) * args.short_ms + args.long_share * args.long_ms
+    interval = mean_step / 1000 / args.workers / args.load
+    latencies: dict[str, list[float]] = {"short": [], "long": []}
+
+    async def request(kind: str, seconds: float):
+        cost = seconds * rng.uniform(1 - args.cost_noise, 1 + args.cost_noise)
+        started = time.perf_counter()
+        await scheduler.run(time.sleep, seconds, cost=cost)
+        latencies[kind].append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    stop = started + args.duration
+    while time.perf_counter() < stop:
+        long = rng.random() < args.long_share
+        seconds = (args.long_ms if long else args.short_ms) / 1000
+        tasks.append(asyncio.create_task(request("long" if long else "short", seconds)))
+        await asyncio.sleep(rng.expovariate(1 / interval))
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - started
+    scheduler.shutdown()
+
+    row = {"mode": mode}
+    for kind, samples in latencies.items():
+        stats = summarize(samples, 0, wall)
+        row[f"{kind}_p50_ms"] = stats["p50_ms"]
+        row[f"{kind}_p95_ms"] = stats["p95_ms"]
+    print(
+        f"{mode:<5} short p50 {row['short_p50_ms']:7.1f} ms  p95 {row['short_p95_ms']:7.1f} ms  "
+        f"long p50 {row['long_p50_ms']:7.1f} ms  p95 {row['long_p95_ms']:7.1f} ms"
+    )
+    return row
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark shortest-job-first synthesis scheduling")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--short-ms", type=float, default=20.0, help="Worker time of a short request")
+    parser.add_argument("--long-ms", type=float, default=200.0, help="Worker time of a long request")
+    parser.add_argument("--long-share", type=float, default=0.2, help="Fraction of long requests")
+    parser.add_argument("--load", type=float, default=0.9, help="Offered load as a fraction of capacity")
+    parser.add_argument("--cost-noise", type=float, default=0.3, help="Relative error of predicted costs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [asyncio.run(_run(mode, args)) for mode in ("fifo", "sjf")]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Compare WAV assembly paths for buffered /speak responses.
+
+Assembles the same synthetic PCM chunks (sized like Piper output) into a
+complete WAV with:
+
+- wave_bytesio: the previous wave.writeframes -> BytesIO -> getvalue() path
+- join: synthesis.render_wav() (one b"".join behind the header)
+- pooled: wav_buffer.assemble_wav() into a reused pooled bytearray
+
+and reports per clip the mean time, the tracemalloc peak (bytes held at
+once, as a multiple of the clip size), and for the pooled path the
+buffer allocations, reuses and bytes copied. No model is needed.
+
+Usage::
+
+    python -m benchmarks.bench_wav_assembly --seconds 2,8,30 --iterations 200
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+import wave
+from io import BytesIO
+
+from app.services.synthesis import AudioFormat, render_wav
+from app.services.wav_buffer import BufferPool, assemble_wav
+
+FMT = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+# Piper yields roughly one chunk per sentence; ~1.5 s each here
+CHUNK_FRAMES = 33075
+
+
+def _chunks(seconds: float) -> list[tuple[AudioFormat, bytes]]:
+    total = int(seconds * FMT.sample_rate)
+    chunks = []
+    while total > 0:
+        frames = min(CHUNK_FRAMES, total)
+        chunks.append((FMT, bytes(frames * FMT.frame_size)))
+        total -= frames
+    return chunks
+
+
+def _wave_bytesio(chunks) -> bytes:
+    buf = BytesIO()
+    with wave.open(buf, "wb") as wav_file:
+        wav_file.setnchannels(FMT.channels)
+        wav_file.setsampwidth(FMT.sample_width)
+        wav_file.setframerate(FMT.sample_rate)
+        for _, pcm in chunks:
+            wav_file.writeframes(pcm)
+    return buf.getvalue()
+
+
+def _join(chunks) -> bytes:
+    return render_wav(chunks[0], iter(chunks[1:]))
+
+
+def _measure(name: str, chunks, iterations: int, assemble) -> dict:
+    clip_bytes = 44 + sum(len(pcm) for _, pcm in chunks)
+
+    # Timing without tracemalloc overhead
+    started = time.perf_counter()
+    for _ in range(iterations):
+        assemble(chunks)
+    mean_ms = (time.perf_counter() - started) / iterations * 1000
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    assemble(chunks)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return {
+        "path": name,
+        "clip_bytes": clip_bytes,
+        "mean_ms": round(mean_ms, 4),
+        "peak_bytes": peak,
+        "peak_per_clip": round(peak / clip_bytes, 2),
+    }
+
+
+def run(seconds_list: list[float], iterations: int) -> list[dict]:
+    results = []
+    for seconds in seconds_list:
+        chunks = _chunks(seconds)
+        pool = BufferPool()
+
+        def pooled(chunks, pool=pool):
+            buffer, view = assemble_wav(chunks[0], iter(chunks[1:]), pool)
+            # The response would send view here
+            buffer.release()
+
+        rows = [
+            _measure("wave_bytesio", chunks, iterations, _wave_bytesio),
+            _measure("join", chunks, iterations, _join),
+            _measure("pooled", chunks, iterations, pooled),
+        ]
+        buffer, _ = assemble_wav(chunks[0], iter(chunks[1:]), pool)
+        rows[-1].update(
+            pool_allocations=pool.allocations,
+            pool_reuses=pool.reuses,
+            bytes_copied_per_clip=buffer.bytes_copied,
+            allocations_per_clip=buffer.allocations,
+        )
+        buffer.release()
+
+        print(f"{seconds:g} s clip ({rows[0]['clip_bytes']} bytes):")
+        for row in rows:
+            extra = ""
+            if "pool_allocations" in row:
+                extra = (
+                    f"  allocs {row['pool_allocations']}/{row['pool_allocations'] + row['pool_reuses']} clips"
+                    f"  copied {row['bytes_copied_per_clip']} B/clip"
+                )
+            print(
+                f"    {row['path']:<13} {row['mean_ms']:9.3f} ms  "
+                f"peak {row['peak_bytes']:>10} B ({row['peak_per_clip']:.2f}x clip){extra}"
+            )
+        results.append({"seconds": seconds, "paths": rows})
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark WAV assembly paths")
+    parser.add_argument("--seconds", type=lambda v: [float(x) for x in v.split(",")], default=[2.0, 8.0, 30.0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.seconds, args.iterations)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,277 @@
+"""Local stand-ins for jarvis-auth, the LLM proxy and a Redis server.
+
+Used by the load harness so jarvis-tts can be exercised without the real
+services. The HTTP fakes support fixed latency plus jitter and random
+error injection. FakeRedisServer speaks enough RESP (PING, AUTH, SELECT,
+GET, SET with EX/PX, DEL, DBSIZE, FLUSHALL) to back the shared audio
+cache of several replicas.
+
+Run standalone with::
+
+    python -m benchmarks.fakes --auth-port 7701 --llm-port 7705 [--redis-port 7379]
+
+then start jarvis-tts with JARVIS_AUTH_BASE_URL=http://127.0.0.1:7701 and
+JARVIS_LLM_PROXY_API_URL=http://127.0.0.1:7705 (and, for a shared audio
+cache, TTS_AUDIO_CACHE_BACKEND=redis with
+TTS_AUDIO_CACHE_REDIS_URL=redis://127.0.0.1:7379/0).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socketserver
+import threading
+import time
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WAKE_TOKENS = ["At", " your", " service", ",", " how", " may", " I", " help", "?"]
+
+
+@dataclass
+class FakeBehaviour:
+    """Latency and error injection for one fake service."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    async def delay(self, rng: random.Random, base_ms: float | None = None) -> None:
+        base = self.latency_ms if base_ms is None else base_ms
+        seconds = max(0.0, base + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    def fail(self, rng: random.Random) -> bool:
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+def create_fake_auth_app(behaviour: FakeBehaviour, seed: int | None = None) -> FastAPI:
+    """jarvis-auth stand-in: /internal/app-ping accepts any credentials."""
+    app = FastAPI(title="fake-jarvis-auth")
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.api_route("/internal/app-ping", methods=["GET", "POST"])
+    async def app_ping(request: Request):
+        app.state.requests += 1
+        await behaviour.delay(rng)
+        if behaviour.fail(rng):
+            return JSONResponse(status_code=503, content={"detail": "injected failure"})
+        app_id = request.headers.get("x-jarvis-app-id") or "load-test"
+        return {"app_id": app_id}
+
+    return app
+
+
+def create_fake_llm_app(
+    behaviour: FakeBehaviour,
+    token_ms: float = 20.0,
+    seed: int | None = None,
+) -> FastAPI:
+    """LLM proxy stand-in streaming NDJSON {"response": token} lines.
+
+    behaviour.latency_ms is the time to the first token; token_ms is the
+    gap between later tokens.
+    """
+    app = FastAPI(title="fake-llm-proxy")
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.post("/api/v{version}/lightweight/chat")
+    async def chat(version: str):
+        app.state.requests += 1
+        if behaviour.fail(rng):
+            return JSONResponse(status_code=500, content={"detail": "injected failure"})
+
+        async def tokens():
+            await behaviour.delay(rng)
+            for i, token in enumerate(_WAKE_TOKENS):
+                if i:
+                    await behaviour.delay(rng, token_ms)
+                yield json.dumps({"response": token}) + "\n"
+
+        return StreamingResponse(tokens(), media_type="application/x-ndjson")
+
+    return app
+
+
+class BackgroundServer:
+    """Run an ASGI app with uvicorn on a daemon thread."""
+
+    def __init__(self, app: FastAPI, port: int, host: str = "127.0.0.1"):
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off")
+        self.server = uvicorn.Server(config)
+        self.url = f"http://{host}:{port}"
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> "BackgroundServer":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Fake server on {self.url} did not start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    server: "_RedisTCPServer"
+
+    def handle(self) -> None:
+        while True:
+            try:
+                command = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            self.wfile.write(self.server.fake.execute(command))
+
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            raise ValueError("inline commands are not supported")
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        self.server.fake.bytes_received += len(line) + sum(len(a) + 16 for a in args)
+        return args
+
+
+class _RedisTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fake: "FakeRedisServer"):
+        self.fake = fake
+        super().__init__(address, _RedisHandler)
+
+
+class FakeRedisServer:
+    """In-memory Redis-protocol server on a daemon thread (port 0 picks a free port)."""
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1", password: str | None = None):
+        self.password = password
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.commands: list[bytes] = []
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server = _RedisTCPServer((host, port), self)
+        self.port = self._server.server_address[1]
+        self.url = f"redis://{host}:{self.port}/0"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "FakeRedisServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+
+    def execute(self, args: list[bytes]) -> bytes:
+        name = args[0].upper()
+        with self._lock:
+            self.commands.append(name)
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"AUTH":
+                ok = self.password is None or args[-1].decode() == self.password
+                return b"+OK\r\n" if ok else b"-WRONGPASS invalid password\r\n"
+            if name in (b"SELECT", b"FLUSHALL"):
+                if name == b"FLUSHALL":
+                    self.data.clear()
+                return b"+OK\r\n"
+            if name == b"GET":
+                value = self._get(args[1])
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            if name == b"SET":
+                expires = None
+                if len(args) >= 5 and args[3].upper() in (b"PX", b"EX"):
+                    scale = 1000 if args[3].upper() == b"PX" else 1
+                    expires = time.monotonic() + int(args[4]) / scale
+                self.data[args[1]] = (args[2], expires)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+                return b":%d\r\n" % removed
+            if name == b"DBSIZE":
+                return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and time.monotonic() >= expires:
+            del self.data[key]
+            return None
+        return value
+
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("fake services")
+    group.add_argument("--auth-port", type=int, default=7701)
+    group.add_argument("--auth-latency-ms", type=float, default=5.0)
+    group.add_argument("--auth-error-rate", type=float, default=0.0)
+    group.add_argument("--llm-port", type=int, default=7705)
+    group.add_argument("--llm-ttft-ms", type=float, default=150.0, help="Time to first token")
+    group.add_argument("--llm-token-ms", type=float, default=20.0, help="Gap between tokens")
+    group.add_argument("--llm-error-rate", type=float, default=0.0)
+    group.add_argument("--jitter-ms", type=float, default=0.0)
+    group.add_argument("--seed", type=int, default=None)
+
+
+def start_fakes(args: argparse.Namespace) -> tuple[BackgroundServer, BackgroundServer]:
+    """Start both fakes from parsed add_fake_arguments() options."""
+    auth = create_fake_auth_app(
+        FakeBehaviour(args.auth_latency_ms, args.jitter_ms, args.auth_error_rate), seed=args.seed
+    )
+    llm = create_fake_llm_app(
+        FakeBehaviour(args.llm_ttft_ms, args.jitter_ms, args.llm_error_rate),
+        token_ms=args.llm_token_ms,
+        seed=args.seed,
+    )
+    return BackgroundServer(auth, args.auth_port).start(), BackgroundServer(llm, args.llm_port).start()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run fake jarvis-auth and LLM proxy services")
+    add_fake_arguments(parser)
+    parser.add_argument("--redis-port", type=int, default=0, help="Also run a fake Redis server (0 disables)")
+    args = parser.parse_args(argv)
+    auth, llm = start_fakes(args)
+    redis = FakeRedisServer(args.redis_port).start() if args.redis_port else None
+    print(f"JARVIS_AUTH_BASE_URL={auth.url}")
+    print(f"JARVIS_LLM_PROXY_API_URL={llm.url}")
+    if redis is not None:
+        print(f"TTS_AUDIO_CACHE_BACKEND=redis TTS_AUDIO_CACHE_REDIS_URL={redis.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        auth.stop()
+        llm.stop()
+        if redis is not None:
+            redis.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+"""End-to-end HTTP load harness for jarvis-tts.
+
+Starts local fakes for jarvis-auth and the LLM proxy (see
+benchmarks/fakes.py), optionally launches the service itself pointed at
+them, then replays a weighted mix of short /speak, long (streamed)
+/speak and /generate-wake-response requests in a closed loop at each
+concurrency step. Throughput, p50/p95/p99 latency, time to first byte
+and error rate are reported per step and per request type, and the full
+result can be written as JSON to compare builds.
+
+Usage::
+
+    python -m benchmarks.load_test --spawn-service --steps 1,2,4,8 \\
+        --duration 20 --mix speak_short=6,speak_long=2,wake=2 --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks._stats import summarize
+from benchmarks.fakes import add_fake_arguments, start_fakes
+
+SHORT_PHRASES = [
+    "Okay.",
+    "Turning on the kitchen lights.",
+    "The front door is locked.",
+    "It is currently 18 degrees and cloudy.",
+    "Timer set for ten minutes.",
+    "Sorry, I didn't catch that.",
+]
+
+LONG_TEXT = (
+    "Good morning. Here is your briefing for today. It is currently twelve degrees outside, "
+    "with light rain expected until around eleven, clearing to sunny spells in the afternoon. "
+    "You have three events on your calendar: a team meeting at half past nine, lunch with Sam "
+    "at one, and a dentist appointment at four fifteen. Traffic on your usual route is light, "
+    "and the commute should take about twenty five minutes. Two packages are due to be "
+    "delivered this afternoon, and the dishwasher cycle finished overnight. The living room "
+    "is at nineteen degrees, the heating will switch to eco mode at nine, and all doors are "
+    "locked. Have a wonderful day."
+)
+
+REQUEST_TYPES = ("speak_short", "speak_long", "wake")
+
+
+@dataclass
+class StepResult:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    ttfb: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    status_codes: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in REQUEST_TYPES:
+            raise argparse.ArgumentTypeError(f"Unknown request type {name!r} (choose from {REQUEST_TYPES})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Mix weights must not all be zero")
+    return mix
+
+
+def _request_for(kind: str, i: int, unique: bool) -> tuple[str, dict | None]:
+    suffix = f" Request {i}." if unique else ""
+    if kind == "speak_short":
+        return "/speak", {"text": SHORT_PHRASES[i % len(SHORT_PHRASES)] + suffix}
+    if kind == "speak_long":
+        return "/speak", {"text": LONG_TEXT + suffix}
+    return "/generate-wake-response", None
+
+
+async def _one(client: httpx.AsyncClient, kind: str, i: int, unique: bool, result: StepResult, record: bool) -> None:
+    path, body = _request_for(kind, i, unique)
+    start = time.perf_counter()
+    try:
+        async with client.stream("POST", path, json=body) as resp:
+            first = None
+            async for _ in resp.aiter_raw():
+                if first is None:
+                    first = time.perf_counter()
+            elapsed = time.perf_counter() - start
+            ok = resp.status_code < 400
+            status = str(resp.status_code)
+    except httpx.HTTPError as e:
+        elapsed, first, ok, status = time.perf_counter() - start, None, False, type(e).__name__
+    if not record:
+        return
+    result.status_codes[status] += 1
+    if not ok:
+        result.errors[kind] += 1
+        return
+    result.latencies[kind].append(elapsed)
+    if first is not None:
+        result.ttfb[kind].append(first - start)
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    mix: dict[str, float],
+    unique: bool,
+    rng: random.Random,
+) -> tuple[StepResult, float]:
+    """Closed-loop load at fixed concurrency; returns results and measured seconds."""
+    result = StepResult()
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    counter = iter(range(sys.maxsize))
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        while loop.time() < stop_at:
+            kind = rng.choices(kinds, weights)[0]
+            await _one(client, kind, next(counter), unique, result, record=loop.time() >= measure_from)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result, max(loop.time() - measure_from, 1e-9)
+
+
+def _report(concurrency: int, result: StepResult, seconds: float) -> dict:
+    all_latencies = [v for values in result.latencies.values() for v in values]
+    by_type = {}
+    for kind in sorted(set(result.latencies) | set(result.errors)):
+        summary = summarize(result.latencies[kind], result.errors[kind], seconds)
+        if result.ttfb[kind]:
+            ttfb = summarize(result.ttfb[kind], 0, seconds)
+            summary["ttfb_p50_ms"] = ttfb["p50_ms"]
+            summary["ttfb_p95_ms"] = ttfb["p95_ms"]
+        by_type[kind] = summary
+    return {
+        "concurrency": concurrency,
+        "seconds": round(seconds, 3),
+        "overall": summarize(all_latencies, sum(result.errors.values()), seconds),
+        "by_type": by_type,
+        "status_codes": dict(result.status_codes),
+    }
+
+
+def _print_step(step: dict) -> None:
+    o = step["overall"]
+    print(
+        f"c={step['concurrency']:<4} {o['throughput_rps']:8.1f} req/s  "
+        f"p50 {o['p50_ms']:7.1f} ms  p95 {o['p95_ms']:7.1f} ms  p99 {o['p99_ms']:7.1f} ms  "
+        f"errors {o['error_rate']:.1%}"
+    )
+    for kind, s in step["by_type"].items():
+        print(f"    {kind:<12} n={s['requests']:<6} p50 {s['p50_ms']:7.1f}  p95 {s['p95_ms']:7.1f}  p99 {s['p99_ms']:7.1f}")
+
+
+def _spawn_service(port: int, auth_url: str, llm_url: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "JARVIS_AUTH_BASE_URL": auth_url,
+        "JARVIS_LLM_PROXY_API_URL": llm_url,
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+    )
+
+
+def _wait_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ping", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Service at {url} did not become ready")
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    headers = {
+        "X-Jarvis-App-Id": args.app_id,
+        "X-Jarvis-App-Key": args.app_key,
+        "X-Context-Household-Id": "load-test",
+        "X-Context-Node-Id": "load-test",
+    }
+    limits = httpx.Limits(max_connections=max(args.steps), max_keepalive_connections=max(args.steps))
+    steps = []
+    async with httpx.AsyncClient(base_url=args.target, headers=headers, timeout=args.timeout, limits=limits) as client:
+        for concurrency in args.steps:
+            result, seconds = await run_step(
+                client, concurrency, args.duration, args.warmup, args.mix, args.unique_text, rng
+            )
+            step = _report(concurrency, result, seconds)
+            _print_step(step)
+            steps.append(step)
+    return {
+        "target": args.target,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "config": {
+            "mix": args.mix,
+            "steps": args.steps,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "unique_text": args.unique_text,
+            "auth_latency_ms": args.auth_latency_ms,
+            "auth_error_rate": args.auth_error_rate,
+            "llm_ttft_ms": args.llm_ttft_ms,
+            "llm_token_ms": args.llm_token_ms,
+            "llm_error_rate": args.llm_error_rate,
+        },
+        "steps": steps,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test jarvis-tts with local fakes for its dependencies")
+    parser.add_argument("--target", default="http://127.0.0.1:7707")
+    parser.add_argument("--spawn-service", action="store_true", help="Start jarvis-tts with uvicorn against the fakes")
+    parser.add_argument("--no-fakes", action="store_true", help="Use real auth/LLM services instead of fakes")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("speak_short=6,speak_long=2,wake=2"))
+    parser.add_argument("--steps", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each step")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--unique-text", action="store_true", help="Make every text unique (defeats caches)")
+    parser.add_argument("--app-id", default="load-test")
+    parser.add_argument("--app-key", default="load-test-key")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    fakes = () if args.no_fakes else start_fakes(args)
+    service = None
+    try:
+        if args.spawn_service:
+            if not fakes:
+                parser.error("--spawn-service needs the fakes (drop --no-fakes)")
+            port = httpx.URL(args.target).port or 7707
+            service = _spawn_service(port, fakes[0].url, fakes[1].url)
+            _wait_ready(args.target, timeout=60.0)
+        results = asyncio.run(run_load(args))
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait(timeout=10)
+        for fake in fakes:
+            fake.stop()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
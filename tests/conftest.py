@@ -35,6 +35,13 @@ class FakeAudioChunk:
         return struct.pack(f"<{self.num_frames}h", *([0] * self.num_frames))
 
 
+@dataclass
+class FakeSynthesisConfig:
+    """Mimics piper.SynthesisConfig (only the fields the service sets)."""
+
+    speaker_id: int | None = None
+
+
 class FakePiperVoice:
     """Fake PiperVoice that yields silent audio chunks."""
 
@@ -56,6 +63,7 @@ def _install_mock_modules() -> None:
     # --- piper (force override so model files aren't needed) ---
     piper_mod = types.ModuleType("piper")
     piper_mod.PiperVoice = FakePiperVoice  # type: ignore[attr-defined]
+    piper_mod.SynthesisConfig = FakeSynthesisConfig  # type: ignore[attr-defined]
     sys.modules["piper"] = piper_mod
 
     # --- piper.voice (some installs expose this) ---
@@ -99,6 +107,16 @@ def _make_auth_result(
     )
 
 
+@pytest.fixture(autouse=True)
+def _clear_auth_cache():
+    """Start every test with an empty local auth validation cache."""
+    from app.deps import auth_cache
+
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
 @pytest.fixture
 def client():
     """FastAPI TestClient with auth dependency overridden."""
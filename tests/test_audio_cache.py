@@ -0,0 +1,260 @@
+"""Tests for app/services/audio_cache.py – two-tier audio cache.
+
+Covers:
+- encode_payload() / decode_payload() round trips, raw fallback, corruption
+- LocalAudioCache: LRU eviction by size, TTL expiry
+- RedisCacheBackend against a fake RESP server: get/set, TTL, auth, db,
+  back-off after connection errors
+- TwoTierAudioCache: local then shared lookup, promotion, size limit, tee()
+- create_audio_cache() from settings
+"""
+
+import struct
+import wave
+from io import BytesIO
+
+import pytest
+
+from app.services.audio_cache import (
+    LocalAudioCache,
+    RedisCacheBackend,
+    TwoTierAudioCache,
+    create_audio_cache,
+    decode_payload,
+    encode_payload,
+)
+from app.services.metrics import get_metrics
+from app.services.synthesis import AudioFormat, stream_wav
+from benchmarks.fakes import FakeRedisServer
+
+FMT = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+@pytest.fixture
+def redis():
+    server = FakeRedisServer().start()
+    yield server
+    server.stop()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _wav(frames: int = 2000) -> bytes:
+    buf = BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(22050)
+        wf.writeframes(b"".join(struct.pack("<h", (i % 64) * 100) for i in range(frames)))
+    return buf.getvalue()
+
+
+class TestPayload:
+
+    def test_round_trip_compresses_pcm(self):
+        data = _wav()
+        payload = encode_payload(data, 6)
+        assert len(payload) < len(data) // 2
+        assert decode_payload(payload) == data
+
+    def test_odd_length_round_trip(self):
+        data = b"abc" * 1001
+        assert decode_payload(encode_payload(data, 6)) == data
+
+    def test_incompressible_stored_raw(self):
+        data = bytes(range(7))
+        assert encode_payload(data, 6) == b"\x00" + data
+
+    def test_level_zero_disables(self):
+        data = _wav()
+        assert decode_payload(encode_payload(data, 0)) == data
+        assert len(encode_payload(data, 0)) == len(data) + 1
+
+    def test_corrupt_payload(self):
+        with pytest.raises(ValueError):
+            decode_payload(b"\x02not zlib")
+        with pytest.raises(ValueError):
+            decode_payload(b"\x09data")
+
+
+class TestLocalAudioCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalAudioCache(max_bytes=25)
+        cache.set("a", b"x" * 10, 60)
+        cache.set("b", b"x" * 10, 60)
+        cache.get("a")
+        cache.set("c", b"x" * 10, 60)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.total_bytes == 20
+        assert get_metrics().get_counter("audio_cache_local_evictions_total") == 1
+
+    def test_entries_expire(self):
+        clock = _Clock()
+        cache = LocalAudioCache(max_bytes=100, clock=clock)
+        cache.set("a", b"x", 10)
+        clock.now = 9.9
+        assert cache.get("a") == b"x"
+        clock.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_oversize_value_not_stored(self):
+        cache = LocalAudioCache(max_bytes=4)
+        cache.set("a", b"12345", 60)
+        assert len(cache) == 0
+
+
+class TestRedisCacheBackend:
+
+    def test_get_and_set(self, redis):
+        backend = RedisCacheBackend(redis.url)
+        assert backend.get("k") is None
+        backend.set("k", b"\x00\r\nvalue", 60)
+        assert backend.get("k") == b"\x00\r\nvalue"
+        assert b"jarvis-tts:audio:k" in redis.data
+        backend.close()
+
+    def test_ttl_sent_in_milliseconds(self, redis):
+        backend = RedisCacheBackend(redis.url, key_prefix="")
+        backend.set("k", b"v", 0.001)
+        backend.set("forever", b"v", 0)
+        assert redis.data[b"forever"][1] is None
+        assert redis.data[b"k"][1] is not None
+        backend.close()
+
+    def test_auth_and_db(self):
+        server = FakeRedisServer(password="s3cret").start()
+        try:
+            backend = RedisCacheBackend(f"redis://:s3cret@127.0.0.1:{server.port}/2")
+            backend.set("k", b"v", 60)
+            assert backend.get("k") == b"v"
+            assert server.commands[:2] == [b"AUTH", b"SELECT"]
+            backend.close()
+
+            wrong = RedisCacheBackend(f"redis://:nope@127.0.0.1:{server.port}/0")
+            assert wrong.get("k") is None
+            assert get_metrics().get_counter("audio_cache_shared_errors_total") == 1
+        finally:
+            server.stop()
+
+    def test_connections_are_reused(self, redis):
+        backend = RedisCacheBackend(redis.url)
+        for _ in range(3):
+            backend.get("k")
+        assert len(backend._idle) == 1
+        backend.close()
+
+    def test_backs_off_after_connection_error(self, redis):
+        clock = _Clock()
+        port = redis.port
+        redis.stop()
+        backend = RedisCacheBackend(f"redis://127.0.0.1:{port}/0", retry_seconds=5, clock=clock)
+        assert backend.get("k") is None
+        assert backend.get("k") is None
+        metrics = get_metrics()
+        assert metrics.get_counter("audio_cache_shared_errors_total") == 1
+        assert metrics.get_counter("audio_cache_shared_skipped_total") == 1
+        clock.now = 5
+        backend.get("k")
+        assert metrics.get_counter("audio_cache_shared_errors_total") == 2
+
+    def test_rejects_other_schemes(self):
+        with pytest.raises(ValueError):
+            RedisCacheBackend("http://localhost:6379")
+
+
+class TestTwoTierAudioCache:
+
+    def test_shared_hit_is_promoted_to_local(self, redis):
+        shared = RedisCacheBackend(redis.url)
+        publisher = TwoTierAudioCache(LocalAudioCache(10_000_000), shared)
+        data = _wav()
+        publisher.put("key", memoryview(data))
+
+        # A second replica: empty local tier, same shared server
+        local = LocalAudioCache(10_000_000)
+        reader = TwoTierAudioCache(local, shared)
+        assert reader.get("key") == data
+        assert local.get("key") == data
+        assert reader.get("key") == data
+
+        metrics = get_metrics()
+        assert metrics.get_counter("audio_cache_hits_total", tier="shared") == 1
+        assert metrics.get_counter("audio_cache_hits_total", tier="local") == 1
+        sent = metrics.get_counter("audio_cache_shared_bytes_sent_total")
+        assert 0 < sent < metrics.get_counter("audio_cache_shared_bytes_raw_total")
+        shared.close()
+
+    def test_miss_counted(self):
+        cache = TwoTierAudioCache(LocalAudioCache(1000), None)
+        assert cache.get("nope") is None
+        assert get_metrics().get_counter("audio_cache_misses_total") == 1
+
+    def test_corrupt_shared_entry_is_a_miss(self, redis):
+        shared = RedisCacheBackend(redis.url)
+        shared.set("key", b"\x02garbage", 60)
+        assert TwoTierAudioCache(None, shared).get("key") is None
+        assert get_metrics().get_counter("audio_cache_corrupt_total") == 1
+        shared.close()
+
+    def test_oversize_clip_skipped(self):
+        local = LocalAudioCache(10_000)
+        cache = TwoTierAudioCache(local, None, max_item_bytes=100)
+        cache.put("key", b"x" * 101)
+        assert len(local) == 0
+        assert get_metrics().get_counter("audio_cache_oversize_total") == 1
+
+    def test_tee_stores_streamed_wav_with_fixed_header(self):
+        local = LocalAudioCache(10_000_000)
+        cache = TwoTierAudioCache(local, None)
+        chunks = [(FMT, b"\x01\x00" * 500), (FMT, b"\x02\x00" * 300)]
+        streamed = b"".join(cache.tee("key", stream_wav(chunks[0], iter(chunks[1:]))))
+        stored = local.get("key")
+        assert len(stored) == len(streamed)
+        with wave.open(BytesIO(stored), "rb") as wf:
+            assert wf.getnframes() == 800
+
+    def test_tee_skips_oversize_stream(self):
+        local = LocalAudioCache(10_000_000)
+        cache = TwoTierAudioCache(local, None, max_item_bytes=500)
+        chunks = [(FMT, b"\x00" * 400), (FMT, b"\x00" * 400)]
+        list(cache.tee("key", stream_wav(chunks[0], iter(chunks[1:]))))
+        assert len(local) == 0
+
+
+class TestCreateAudioCache:
+
+    def test_disabled_by_default(self):
+        assert create_audio_cache() is None
+
+    def test_local_backend(self, monkeypatch):
+        monkeypatch.setenv("TTS_AUDIO_CACHE_BACKEND", "local")
+        monkeypatch.setenv("TTS_AUDIO_CACHE_LOCAL_MAX_MB", "8")
+        cache = create_audio_cache()
+        assert cache.shared is None
+        assert cache.local.max_bytes == 8 * 1024 * 1024
+
+    def test_redis_backend(self, monkeypatch):
+        monkeypatch.setenv("TTS_AUDIO_CACHE_BACKEND", "redis")
+        monkeypatch.setenv("TTS_AUDIO_CACHE_REDIS_URL", "redis://cache.local:6380/1")
+        monkeypatch.setenv("TTS_AUDIO_CACHE_COMPRESSION_LEVEL", "1")
+        cache = create_audio_cache()
+        assert (cache.shared.host, cache.shared.port, cache.shared.db) == ("cache.local", 6380, 1)
+        assert cache.compression_level == 1
+
+    def test_unknown_backend_disables(self, monkeypatch):
+        monkeypatch.setenv("TTS_AUDIO_CACHE_BACKEND", "memcached")
+        assert create_audio_cache() is None
@@ -0,0 +1,144 @@
+"""Tests for app/services/audio_postprocess.py – trim, normalize, limit.
+
+Covers:
+- Leading/trailing silence trimming across chunks
+- Loudness normalization towards the target level
+- Soft limiter behaviour
+- postprocess_pcm() wrapper
+- Working arrays reused across chunks, held-back silence kept when they grow
+"""
+
+import numpy as np
+import pytest
+
+from app.services.audio_postprocess import (
+    AudioPostProcessor,
+    PostProcessConfig,
+    db_to_amplitude,
+    postprocess_pcm,
+)
+from app.services.synthesis import AudioFormat
+
+FMT = AudioFormat(sample_rate=1000, channels=1, sample_width=2)
+
+
+def _pcm(*segments: tuple[int, int]) -> bytes:
+    """Build PCM from (amplitude, count) segments of a square-ish tone."""
+    parts = []
+    for amplitude, count in segments:
+        signs = np.where(np.arange(count) % 2 == 0, 1, -1)
+        parts.append((signs * amplitude).astype(np.int16))
+    return np.concatenate(parts).tobytes()
+
+
+def _samples(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, dtype=np.int16)
+
+
+# Normalization off (0 dB max gain) and limiter off, so only trimming acts
+TRIM_ONLY = PostProcessConfig(enabled=True, max_gain_db=0.0, limiter_threshold_db=0.0, silence_pad_ms=0)
+
+
+class TestSilenceTrimming:
+
+    def test_trims_leading_and_trailing_silence(self):
+        proc = AudioPostProcessor(FMT, TRIM_ONLY)
+        out = proc.process(_pcm((0, 100), (5000, 50), (0, 100))) + proc.flush()
+        assert len(_samples(out)) == 50
+
+    def test_keeps_pad_around_speech(self):
+        config = PostProcessConfig(enabled=True, max_gain_db=0.0, limiter_threshold_db=0.0, silence_pad_ms=10)
+        proc = AudioPostProcessor(FMT, config)
+        out = proc.process(_pcm((0, 100), (5000, 50), (0, 100))) + proc.flush()
+        assert len(_samples(out)) == 10 + 50 + 10
+
+    def test_internal_silence_between_chunks_is_kept(self):
+        proc = AudioPostProcessor(FMT, TRIM_ONLY)
+        out = proc.process(_pcm((5000, 20), (0, 30)))
+        assert len(_samples(out)) == 20
+        out += proc.process(_pcm((0, 40)))
+        out += proc.process(_pcm((5000, 20)))
+        out += proc.flush()
+        assert len(_samples(out)) == 20 + 30 + 40 + 20
+
+    def test_leading_silent_chunks_are_dropped(self):
+        proc = AudioPostProcessor(FMT, TRIM_ONLY)
+        assert proc.process(_pcm((0, 100))) == b""
+        out = proc.process(_pcm((5000, 10)))
+        assert len(_samples(out)) == 10
+
+    def test_long_pauses_are_bounded(self):
+        config = PostProcessConfig(
+            enabled=True, max_gain_db=0.0, limiter_threshold_db=0.0, silence_pad_ms=0, max_pause_ms=50
+        )
+        proc = AudioPostProcessor(FMT, config)
+        proc.process(_pcm((5000, 10)))
+        for _ in range(10):
+            proc.process(_pcm((0, 100)))
+        out = proc.process(_pcm((5000, 10)))
+        assert len(_samples(out)) == 50 + 10
+
+    def test_stereo_trim_stays_frame_aligned(self):
+        stereo = AudioFormat(sample_rate=1000, channels=2, sample_width=2)
+        proc = AudioPostProcessor(stereo, TRIM_ONLY)
+        out = proc.process(_pcm((0, 9), (5000, 1), (0, 10)))
+        assert len(_samples(out)) % 2 == 0
+
+    def test_held_silence_survives_growing_working_arrays(self):
+        proc = AudioPostProcessor(FMT, TRIM_ONLY)
+        proc.process(_pcm((5000, 10), (0, 10)))
+        # Larger chunk: the working arrays grow with 10 held samples in them
+        out = proc.process(_pcm((3000, 500)))
+        assert np.array_equal(_samples(out), _samples(_pcm((0, 10), (3000, 500))))
+
+    def test_working_arrays_reused_across_chunks(self):
+        proc = AudioPostProcessor(FMT, PostProcessConfig(enabled=True))
+        proc.process(_pcm((5000, 100)))
+        work, scratch = proc._work, proc._scratch
+        for _ in range(5):
+            proc.process(_pcm((5000, 100)))
+        assert proc._work is work
+        assert proc._scratch is scratch
+
+
+class TestLoudness:
+
+    def test_quiet_audio_is_boosted_towards_target(self):
+        config = PostProcessConfig(enabled=True, target_loudness_dbfs=-20.0, max_gain_db=40.0, limiter_threshold_db=0.0)
+        proc = AudioPostProcessor(FMT, config)
+        out = _samples(proc.process(_pcm((300, 1000))))
+        target = db_to_amplitude(-20.0) * 32768
+        rms = float(np.sqrt(np.mean(out.astype(np.float64) ** 2)))
+        assert rms == pytest.approx(target, rel=0.01)
+
+    def test_gain_is_capped(self):
+        config = PostProcessConfig(enabled=True, target_loudness_dbfs=-6.0, max_gain_db=6.0, limiter_threshold_db=0.0)
+        proc = AudioPostProcessor(FMT, config)
+        out = _samples(proc.process(_pcm((1000, 100))))
+        assert abs(int(out[0])) == pytest.approx(1000 * db_to_amplitude(6.0), abs=2)
+
+    def test_limiter_keeps_peaks_below_full_scale(self):
+        config = PostProcessConfig(enabled=True, target_loudness_dbfs=0.0, max_gain_db=20.0, limiter_threshold_db=-6.0)
+        proc = AudioPostProcessor(FMT, config)
+        out = _samples(proc.process(_pcm((20000, 100))))
+        assert np.abs(out.astype(np.int32)).max() < 32767
+        assert np.abs(out.astype(np.int32)).max() > db_to_amplitude(-6.0) * 32767
+
+    def test_requires_16_bit(self):
+        with pytest.raises(ValueError):
+            AudioPostProcessor(AudioFormat(22050, 1, 1), PostProcessConfig())
+
+
+class TestPostprocessPcm:
+
+    def test_first_chunk_always_yielded(self):
+        chunks = iter([(FMT, _pcm((0, 100))), (FMT, _pcm((5000, 10)))])
+        out = list(postprocess_pcm(chunks, TRIM_ONLY))
+        assert out[0] == (FMT, b"")
+        assert len(_samples(out[1][1])) == 10
+
+    def test_flush_output_is_yielded(self):
+        config = PostProcessConfig(enabled=True, max_gain_db=0.0, limiter_threshold_db=0.0, silence_pad_ms=10)
+        chunks = iter([(FMT, _pcm((5000, 10), (0, 100)))])
+        out = list(postprocess_pcm(chunks, config))
+        assert sum(len(pcm) for _, pcm in out) == (10 + 10) * 2
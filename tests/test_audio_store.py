@@ -0,0 +1,185 @@
+"""Tests for app/services/audio_store.py – content-addressed disk store.
+
+Covers:
+- put/get round trip and sharded layout, clips returned open
+- LRU eviction by total size, persisted across restarts in access times
+- A clip evicted while open stays readable; mtime untouched by hits
+- Atomic streamed writes (tee) with WAV header patching and abort
+- Strong content ETags: from put/tee, first render kept, rehashed after
+  restart
+- ETag helpers
+"""
+
+import hashlib
+import os
+import struct
+import wave
+
+import pytest
+
+from app.services.audio_store import AudioStore, etag_for_key, if_none_match
+from app.services.synthesis import STREAMING_DATA_SIZE, AudioFormat, wav_header
+
+KEY_A = "a" * 64
+KEY_B = "b" * 64
+KEY_C = "c" * 64
+
+
+class TestAudioStore:
+
+    def test_put_and_get(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=1000)
+        store.put(KEY_A, b"clip")
+        with store.get(KEY_A) as clip:
+            assert clip.path == tmp_path / "aa" / f"{KEY_A}.wav"
+            assert clip.read_bytes() == b"clip"
+            assert clip.etag == _content_etag(b"clip")
+
+    def test_miss_returns_none(self, tmp_path):
+        assert AudioStore(tmp_path, max_bytes=1000).get(KEY_A) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10)
+        store.put(KEY_A, b"aaaa")
+        store.put(KEY_B, b"bbbb")
+        store.get(KEY_A)  # A is now most recently used
+        store.put(KEY_C, b"cccc")
+        assert store.get(KEY_B) is None
+        assert store.get(KEY_A) is not None
+        assert store.get(KEY_C) is not None
+        assert store.total_bytes == 8
+
+    def test_oversized_clip_is_not_stored(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=3)
+        store.put(KEY_A, b"toolarge")
+        assert store.get(KEY_A) is None
+        assert len(store) == 0
+
+    def test_index_rebuilt_on_restart(self, tmp_path):
+        AudioStore(tmp_path, max_bytes=1000).put(KEY_A, b"clip")
+        store = AudioStore(tmp_path, max_bytes=1000)
+        assert store.get(KEY_A).read_bytes() == b"clip"
+        assert store.total_bytes == 4
+
+    def test_access_order_survives_restart(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10)
+        store.put(KEY_A, b"aaaa")
+        store.put(KEY_B, b"bbbb")
+        path_a = store.get(KEY_A).path
+        path_b = store.get(KEY_B).path
+        os.utime(path_a, (1000, 1000))
+        os.utime(path_b, (2000, 1000))
+        restarted = AudioStore(tmp_path, max_bytes=10)
+        restarted.put(KEY_C, b"cccc")
+        assert restarted.get(KEY_A) is None
+        assert restarted.get(KEY_B) is not None
+
+    def test_hit_keeps_modification_time(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=1000)
+        store.put(KEY_A, b"clip")
+        path = store.get(KEY_A).path
+        os.utime(path, (1000, 1000))
+        with store.get(KEY_A) as clip:
+            assert clip.stat.st_mtime == 1000
+        assert path.stat().st_mtime == 1000
+        assert path.stat().st_atime > 1000
+
+    def test_clip_evicted_while_open_stays_readable(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=6)
+        store.put(KEY_A, b"aaaa")
+        clip = store.get(KEY_A)
+        store.put(KEY_B, b"bbbb")  # evicts and unlinks A
+        assert not clip.path.exists()
+        assert clip.read_bytes() == b"aaaa"
+        clip.close()
+
+    def test_restart_removes_stale_temp_files(self, tmp_path):
+        (tmp_path / ".tmp-crashed").write_bytes(b"partial")
+        AudioStore(tmp_path, max_bytes=1000)
+        assert not (tmp_path / ".tmp-crashed").exists()
+
+    def test_tee_stores_streamed_wav_with_fixed_sizes(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10_000)
+        fmt = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+        chunks = [wav_header(fmt, STREAMING_DATA_SIZE), b"\x00\x00" * 10, b"\x01\x00" * 5]
+        assert list(store.tee(KEY_A, iter(chunks))) == chunks
+
+        clip = store.get(KEY_A)
+        data = clip.read_bytes()
+        assert struct.unpack_from("<I", data, 40)[0] == 30
+        with wave.open(str(clip.path), "rb") as wf:
+            assert wf.getnframes() == 15
+
+    def test_aborted_tee_leaves_nothing(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10_000)
+        stream = store.tee(KEY_A, iter([b"one", b"two"]))
+        next(stream)
+        stream.close()
+        assert store.get(KEY_A) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failed_source_leaves_nothing(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10_000)
+
+        def failing():
+            yield b"one"
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            list(store.tee(KEY_A, failing()))
+        assert store.get(KEY_A) is None
+
+
+def _content_etag(data: bytes) -> str:
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+
+class TestContentETag:
+
+    def test_put_returns_etag_of_bytes(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=1000)
+        assert store.put(KEY_A, b"clip") == _content_etag(b"clip")
+        assert store.etag(KEY_A) == _content_etag(b"clip")
+        assert store.etag(KEY_B) is None
+
+    def test_first_render_is_kept(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=1000)
+        etag = store.put(KEY_A, b"first")
+        assert store.put(KEY_A, b"second") is None
+        assert store.get(KEY_A).read_bytes() == b"first"
+        assert store.etag(KEY_A) == etag
+        assert list(tmp_path.glob(".tmp-*")) == []
+
+    def test_streamed_etag_covers_patched_header(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=10_000)
+        fmt = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+        list(store.tee(KEY_A, iter([wav_header(fmt, STREAMING_DATA_SIZE), b"\x00\x00" * 10])))
+        assert store.etag(KEY_A) == _content_etag(store.get(KEY_A).read_bytes())
+
+    def test_rehashed_after_restart(self, tmp_path):
+        AudioStore(tmp_path, max_bytes=1000).put(KEY_A, b"clip")
+        assert AudioStore(tmp_path, max_bytes=1000).etag(KEY_A) == _content_etag(b"clip")
+
+    def test_evicted_clip_has_no_etag(self, tmp_path):
+        store = AudioStore(tmp_path, max_bytes=6)
+        store.put(KEY_A, b"aaaa")
+        store.put(KEY_B, b"bbbb")
+        assert store.etag(KEY_A) is None
+
+
+class TestETag:
+
+    def test_key_etag_is_weak(self):
+        assert etag_for_key("abc") == 'W/"abc"'
+
+    def test_if_none_match(self):
+        etag = etag_for_key("abc")
+        assert if_none_match('"abc"', etag)
+        assert if_none_match('"x", W/"abc"', etag)
+        assert if_none_match('W/"abc"', '"abc"')
+        assert not if_none_match('"x"', etag)
+        assert not if_none_match(None, etag)
+
+    def test_if_none_match_star(self):
+        assert if_none_match("*", '"abc"')
+        assert if_none_match(" * ", etag_for_key("abc"))
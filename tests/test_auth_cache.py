@@ -0,0 +1,225 @@
+"""Tests for app/services/auth_cache.py – local auth validation cache.
+
+Covers:
+- Positive and negative caching with TTLs read live from settings
+- Errors other than 401/403 are not cached
+- Background refresh of hot entries near expiry
+- Cache keys (hashed app key, context headers) and LRU bound
+- Signature-preserving wrap() and hit-rate metrics
+"""
+
+import asyncio
+import inspect
+
+import pytest
+from fastapi import Header, HTTPException
+
+from app.services.auth_cache import AuthCache
+from app.services.metrics import get_metrics
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeValidator:
+    """Counts calls; returns a result or raises the configured error."""
+
+    def __init__(self):
+        self.calls = 0
+        self.error: Exception | None = None
+
+    async def __call__(self, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"app_id": kwargs["x_jarvis_app_id"], "call": self.calls}
+
+
+def _args(app_id="command-center", key="secret", household=None):
+    return {"x_jarvis_app_id": app_id, "x_jarvis_app_key": key, "x_context_household_id": household}
+
+
+@pytest.fixture(autouse=True)
+def _ttls(monkeypatch):
+    monkeypatch.setenv("NODE_AUTH_CACHE_TTL", "60")
+    monkeypatch.setenv("JARVIS_AUTH_CACHE_FAILURE_TTL", "10")
+    get_metrics().reset()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return AuthCache(clock=clock)
+
+
+class TestPositiveCache:
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_validator(self, cache):
+        validator = FakeValidator()
+        first = await cache.validate(validator, _args())
+        second = await cache.validate(validator, _args())
+        assert first == second
+        assert validator.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_expires_after_ttl(self, cache, clock):
+        validator = FakeValidator()
+        await cache.validate(validator, _args())
+        clock.now += 61
+        await cache.validate(validator, _args())
+        assert validator.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_read_live(self, cache, clock, monkeypatch):
+        validator = FakeValidator()
+        await cache.validate(validator, _args())
+        monkeypatch.setenv("NODE_AUTH_CACHE_TTL", "5")
+        clock.now += 6
+        await cache.validate(validator, _args())
+        assert validator.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_disables(self, cache, monkeypatch):
+        monkeypatch.setenv("NODE_AUTH_CACHE_TTL", "0")
+        validator = FakeValidator()
+        await cache.validate(validator, _args())
+        await cache.validate(validator, _args())
+        assert validator.calls == 2
+        assert len(cache) == 0
+
+
+class TestNegativeCache:
+
+    @pytest.mark.asyncio
+    async def test_rejection_cached_for_failure_ttl(self, cache, clock):
+        validator = FakeValidator()
+        validator.error = HTTPException(status_code=401, detail="Invalid app credentials")
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await cache.validate(validator, _args(key="wrong"))
+            assert exc_info.value.status_code == 401
+        assert validator.calls == 1
+
+        clock.now += 11
+        validator.error = None
+        assert (await cache.validate(validator, _args(key="wrong")))["call"] == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_not_cached(self, cache):
+        validator = FakeValidator()
+        validator.error = HTTPException(status_code=503, detail="Auth unavailable")
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await cache.validate(validator, _args())
+        validator.error = ConnectionError("down")
+        with pytest.raises(ConnectionError):
+            await cache.validate(validator, _args())
+        assert validator.calls == 3
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials_bypass_cache(self, cache):
+        validator = FakeValidator()
+        validator.error = HTTPException(status_code=401, detail="Missing app credentials")
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await cache.validate(validator, _args(key=None))
+        assert validator.calls == 2
+        assert len(cache) == 0
+
+
+class TestKeys:
+
+    def test_app_key_is_hashed(self):
+        key = AuthCache.cache_key(_args(key="secret"))
+        assert "secret" not in repr(key)
+
+    @pytest.mark.asyncio
+    async def test_context_is_part_of_key(self, cache):
+        validator = FakeValidator()
+        await cache.validate(validator, _args(household="a"))
+        await cache.validate(validator, _args(household="b"))
+        await cache.validate(validator, _args(key="other", household="a"))
+        assert validator.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self, clock):
+        cache = AuthCache(max_entries=2, clock=clock)
+        validator = FakeValidator()
+        for app_id in ("a", "b", "c"):
+            await cache.validate(validator, _args(app_id=app_id))
+        assert len(cache) == 2
+        await cache.validate(validator, _args(app_id="a"))
+        assert validator.calls == 4
+
+
+class TestBackgroundRefresh:
+
+    @pytest.mark.asyncio
+    async def test_hot_entry_refreshed_before_expiry(self, cache, clock):
+        validator = FakeValidator()
+        await cache.validate(validator, _args())
+        clock.now += 50  # past 80% of the 60s TTL
+        result = await cache.validate(validator, _args())
+        assert result["call"] == 1  # served from cache
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert validator.calls == 2
+        assert get_metrics().get_counter("auth_cache_refreshes_total") == 1
+
+        clock.now += 50  # past the original expiry, within the refreshed TTL
+        assert (await cache.validate(validator, _args()))["call"] == 2
+        assert validator.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_keeps_entry(self, cache, clock):
+        validator = FakeValidator()
+        await cache.validate(validator, _args())
+        clock.now += 50
+        validator.error = ConnectionError("down")
+        await cache.validate(validator, _args())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert (await cache.validate(validator, _args()))["call"] == 1
+        assert get_metrics().get_counter("auth_cache_refresh_errors_total") >= 1
+
+
+class TestWrapAndMetrics:
+
+    @pytest.mark.asyncio
+    async def test_wrap_preserves_signature(self, cache):
+        calls = []
+
+        async def dependency(
+            x_jarvis_app_id: str | None = Header(None),
+            x_jarvis_app_key: str | None = Header(None),
+        ):
+            calls.append(x_jarvis_app_id)
+            return x_jarvis_app_id
+
+        wrapped = cache.wrap(dependency)
+        assert inspect.signature(wrapped) == inspect.signature(dependency)
+        assert await wrapped(x_jarvis_app_id="a", x_jarvis_app_key="k") == "a"
+        assert await wrapped("a", "k") == "a"
+        assert calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_hit_ratio(self, cache):
+        validator = FakeValidator()
+        for _ in range(4):
+            await cache.validate(validator, _args())
+        metrics = get_metrics()
+        assert metrics.get_counter("auth_cache_misses_total") == 1
+        assert metrics.get_counter("auth_cache_hits_total", result="success") == 3
+        assert cache.hit_ratio() == pytest.approx(0.75)
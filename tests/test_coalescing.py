@@ -0,0 +1,245 @@
+"""Tests for app/services/coalescing.py – single-flight request coalescing.
+
+Covers:
+- Concurrent identical subscribers share one source
+- Different keys run independently
+- Flights are dropped once finished or abandoned
+- Errors propagate to every subscriber
+- Bounded replay buffer: chunks dropped past the replay window, late
+  joiners start their own flight, lagging subscribers keep their chunks,
+  streamed long plans hold a bounded number of chunks
+- Coalesced counters in the metrics registry
+- Turns: one claim to produce, waiters see ready chunks, claims released
+  when unused or on leave; identical requests on the scheduler take one
+  worker between them
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.coalescing import REPLAY_CHUNKS, SingleFlight
+from app.services.metrics import get_metrics
+from app.services.scheduler import SynthesisScheduler
+from app.services.speech import SpeechPipeline
+from tests.conftest import FakePiperVoice
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    get_metrics().reset()
+    yield
+    get_metrics().reset()
+
+
+def _gated_source(gate: threading.Event, items: list[str], calls: list[int]):
+    calls.append(1)
+    for item in items:
+        gate.wait(timeout=5)
+        yield item
+
+
+class TestSingleFlight:
+
+    def test_concurrent_subscribers_share_one_source(self):
+        flights = SingleFlight()
+        gate = threading.Event()
+        calls: list[int] = []
+
+        def factory():
+            return _gated_source(gate, ["a", "b", "c"], calls)
+
+        results: list[list[str]] = []
+        leader = flights.subscribe("k", factory)
+        follower = flights.subscribe("k", factory)
+
+        threads = [threading.Thread(target=lambda s=s: results.append(list(s))) for s in (leader, follower)]
+        for t in threads:
+            t.start()
+        gate.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert results == [["a", "b", "c"], ["a", "b", "c"]]
+        assert len(calls) == 1
+        assert get_metrics().get_counter("speak_coalesced_total") == 1
+        assert get_metrics().get_counter("speak_flights_started_total") == 1
+
+    def test_late_subscriber_replays_from_start(self):
+        flights = SingleFlight()
+        leader = flights.subscribe("k", lambda: iter(["a", "b"]))
+        assert next(leader) == "a"
+        follower = flights.subscribe("k", lambda: iter(["x"]))
+        assert list(follower) == ["a", "b"]
+        assert list(leader) == ["b"]
+
+    def test_different_keys_do_not_coalesce(self):
+        flights = SingleFlight()
+        a = flights.subscribe("a", lambda: iter([1]))
+        b = flights.subscribe("b", lambda: iter([2]))
+        assert list(a) == [1]
+        assert list(b) == [2]
+        assert get_metrics().get_counter("speak_coalesced_total") == 0
+
+    def test_finished_flight_is_removed(self):
+        flights = SingleFlight()
+        list(flights.subscribe("k", lambda: iter([1])))
+        assert flights.in_flight() == 0
+        calls = []
+        list(flights.subscribe("k", lambda: calls.append(1) or iter([1])))
+        assert calls == [1]
+
+    def test_abandoned_flight_closes_source(self):
+        flights = SingleFlight()
+        closed = []
+
+        def source():
+            try:
+                yield 1
+                yield 2
+            finally:
+                closed.append(True)
+
+        sub = flights.subscribe("k", source)
+        assert next(sub) == 1
+        sub.close()
+        assert closed == [True]
+        assert flights.in_flight() == 0
+
+    def test_error_propagates_to_all_subscribers(self):
+        flights = SingleFlight()
+
+        def failing():
+            yield 1
+            raise RuntimeError("boom")
+
+        leader = flights.subscribe("k", failing)
+        follower = flights.subscribe("k", failing)
+        assert next(leader) == 1
+        with pytest.raises(RuntimeError):
+            next(leader)
+        assert next(follower) == 1
+        with pytest.raises(RuntimeError):
+            next(follower)
+
+    def test_inflight_gauge(self):
+        flights = SingleFlight()
+        sub = flights.subscribe("k", lambda: iter([1, 2]))
+        next(sub)
+        assert get_metrics().snapshot()["gauges"]["speak_inflight_flights"] == 1
+
+
+class TestReplayBuffer:
+
+    def test_single_subscriber_holds_bounded_chunks(self):
+        flights = SingleFlight(replay_chunks=2)
+        sub = flights.subscribe("k", lambda: iter(range(10)))
+        flight = flights._flights["k"]
+        for expected in range(10):
+            assert next(sub) == expected
+            assert flight.retained() <= 2
+
+    def test_joiner_after_window_starts_own_flight(self):
+        flights = SingleFlight(replay_chunks=2)
+        leader = flights.subscribe("k", lambda: iter(["a", "b", "c", "d"]))
+        assert [next(leader) for _ in range(3)] == ["a", "b", "c"]
+        late = flights.subscribe("k", lambda: iter(["own"]))
+        assert list(late) == ["own"]
+        assert list(leader) == ["d"]
+        assert get_metrics().get_counter("speak_flights_started_total") == 2
+
+    def test_lagging_subscriber_keeps_unread_chunks(self):
+        flights = SingleFlight(replay_chunks=1)
+        leader = flights.subscribe("k", lambda: iter(range(5)))
+        follower = flights.subscribe("k", lambda: iter([]))
+        assert [next(leader) for _ in range(4)] == [0, 1, 2, 3]
+        assert list(follower) == [0, 1, 2, 3, 4]
+        assert flights._flights.get("k") is None or flights._flights["k"].retained() <= 1
+
+    def test_streamed_long_plan_retention_is_bounded(self, monkeypatch):
+        monkeypatch.setenv("TTS_CHUNK_MAX_CHARS", "40")
+        pipeline = SpeechPipeline(lambda: ("v", FakePiperVoice()))
+        text = " ".join(f"Sentence number {i} of the story." for i in range(40))
+        plan = pipeline.plan(text)
+        chunks = pipeline.open_pcm(plan)
+        flight = pipeline.coalescer._flights[plan.key]
+        produced = 0
+        for _ in chunks:
+            produced += 1
+            assert flight.retained() <= REPLAY_CHUNKS
+        assert produced > REPLAY_CHUNKS * 4
+
+
+class TestTurns:
+
+    @pytest.mark.asyncio
+    async def test_one_subscriber_claims_the_next_chunk(self):
+        flights = SingleFlight()
+        first = flights.subscribe("k", lambda: iter(["a", "b"]))
+        second = flights.subscribe("k", lambda: iter(["a", "b"]))
+
+        assert await first.wait_turn() is False
+        waiting = asyncio.ensure_future(second.wait_turn())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        # The claim holder's pull produces the chunk and wakes the waiter
+        assert await asyncio.to_thread(next, first) == "a"
+        assert await asyncio.wait_for(waiting, 2) is True
+        assert next(second) == "a"
+
+    @pytest.mark.asyncio
+    async def test_unused_claim_passes_on(self):
+        flights = SingleFlight()
+        first = flights.subscribe("k", lambda: iter(["a"]))
+        second = flights.subscribe("k", lambda: iter(["a"]))
+
+        assert await first.wait_turn() is False
+        waiting = asyncio.ensure_future(second.wait_turn())
+        await asyncio.sleep(0.01)
+        first.end_turn()
+        assert await asyncio.wait_for(waiting, 2) is False
+
+    @pytest.mark.asyncio
+    async def test_leaving_releases_claim(self):
+        flights = SingleFlight()
+        first = flights.subscribe("k", lambda: iter(["a"]))
+        second = flights.subscribe("k", lambda: iter(["a"]))
+
+        assert await first.wait_turn() is False
+        waiting = asyncio.ensure_future(second.wait_turn())
+        await asyncio.sleep(0.01)
+        first.close()
+        assert await asyncio.wait_for(waiting, 2) is False
+        assert list(second) == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_take_one_worker(self):
+        """N identical requests on a two-worker scheduler leave a worker free."""
+        scheduler = SynthesisScheduler(workers=2)
+        flights = SingleFlight()
+        gate = threading.Event()
+        calls: list[int] = []
+
+        def factory():
+            return _gated_source(gate, ["a", "b", "c"], calls)
+
+        async def request() -> list[str]:
+            subscription = flights.subscribe("k", factory)
+            return [item async for item in scheduler.iterate(subscription, turn=subscription)]
+
+        try:
+            requests = [asyncio.ensure_future(request()) for _ in range(4)]
+            await asyncio.sleep(0.05)
+            # One worker is held by the producer; joiners wait without one
+            assert await asyncio.wait_for(scheduler.run(lambda: "other"), 2) == "other"
+            assert scheduler.queue_depth() == 0
+            gate.set()
+            results = await asyncio.wait_for(asyncio.gather(*requests), 5)
+        finally:
+            gate.set()
+            scheduler.shutdown()
+
+        assert results == [["a", "b", "c"]] * 4
+        assert len(calls) == 1
@@ -0,0 +1,189 @@
+"""Tests for app/services/cost_model.py – synthesis cost model and backlog.
+
+Covers:
+- cost_units() phoneme proxy
+- CostModel: prior before samples, line fit, tracking a change, single
+  chunk size, per-voice models, predict_text() over chunks, error metric
+- SynthesisBacklog: progress, release on exhaustion / close / failure,
+  drain time per worker
+- overload_retry_after() from settings, background jobs only for new jobs
+- SpeechPipeline feeding the model and backlog
+"""
+
+import pytest
+
+from app.services.cost_model import (
+    CostModel,
+    SynthesisBacklog,
+    cost_units,
+    get_backlog,
+    get_cost_model,
+    overload_retry_after,
+    reset_cost_model,
+)
+from app.services.metrics import get_metrics
+from app.services.speech import SpeechPipeline
+from app.services.synthesis import SynthesisLimits
+from tests.conftest import FakePiperVoice
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    get_metrics().reset()
+    reset_cost_model()
+    yield
+    reset_cost_model()
+
+
+def _line(units: int) -> float:
+    return 0.01 + 0.002 * units
+
+
+class TestCostModel:
+
+    def test_cost_units_counts_letters_and_digits(self):
+        assert cost_units("Hi, it's 9 o'clock!") == 12
+
+    def test_prior_before_enough_samples(self):
+        model = CostModel(min_samples=3, prior_seconds_per_unit=0.001)
+        model.observe("v", 100, 5.0)
+        assert model.predict("v", 200) == pytest.approx(0.2)
+        assert not model.fitted("v")
+
+    def test_fits_intercept_and_slope(self):
+        model = CostModel()
+        for units in (10, 50, 120, 30, 200, 80, 15):
+            model.observe("v", units, _line(units))
+        assert model.predict("v", 100) == pytest.approx(_line(100))
+        assert model.predict("v", 0) == pytest.approx(0.01)
+
+    def test_tracks_a_slower_host(self):
+        model = CostModel(decay=0.9)
+        for units in (10, 50, 120, 30, 200) * 4:
+            model.observe("v", units, _line(units))
+        for units in (10, 50, 120, 30, 200) * 12:
+            model.observe("v", units, 2 * _line(units))
+        assert model.predict("v", 100) == pytest.approx(2 * _line(100), rel=0.05)
+
+    def test_single_chunk_size_uses_cost_per_unit(self):
+        model = CostModel()
+        for _ in range(6):
+            model.observe("v", 40, 0.2)
+        assert model.predict("v", 80) == pytest.approx(0.4)
+
+    def test_voices_are_separate(self):
+        model = CostModel(prior_seconds_per_unit=0.001)
+        for units in (10, 50, 120, 30, 200):
+            model.observe("slow", units, 10 * _line(units))
+        assert model.predict("slow", 100) > model.predict("fast", 100) * 10
+
+    def test_predict_text_sums_chunks(self):
+        model = CostModel(prior_seconds_per_unit=0.01)
+        limits = SynthesisLimits(chunk_max_chars=20)
+        text = "First sentence. Second sentence."
+        assert model.predict_text("v", text, limits) == pytest.approx(0.01 * cost_units(text))
+
+    def test_error_ratio_recorded_once_fitted(self):
+        model = CostModel(min_samples=2)
+        model.observe("v", 10, _line(10))
+        model.observe("v", 20, _line(20))
+        assert get_metrics().get_summary("cost_model_error_ratio", voice="v") is None
+        model.observe("v", 40, _line(40))
+        summary = get_metrics().get_summary("cost_model_error_ratio", voice="v")
+        assert summary["count"] == 1
+        assert summary["p50"] < 0.01
+        assert get_metrics().get_counter("cost_model_samples_total", voice="v") == 3
+
+
+class TestBacklog:
+
+    def test_progress_and_exhaustion(self):
+        backlog = SynthesisBacklog()
+        entry = backlog.start(2.0).attach(iter([1, 2]))
+        other = backlog.start(1.0).attach(iter([]))
+        assert backlog.total() == pytest.approx(3.0)
+        entry.progress(0.5)
+        assert backlog.total() == pytest.approx(2.5)
+        assert backlog.drain_seconds(workers=2) == pytest.approx(1.25)
+        assert list(entry) == [1, 2]
+        assert backlog.total() == pytest.approx(1.0)
+        assert list(other) == []
+        assert backlog.total() == 0
+
+    def test_progress_capped_at_prediction(self):
+        backlog = SynthesisBacklog()
+        entry = backlog.start(1.0).attach(iter([]))
+        entry.progress(5.0)
+        assert backlog.total() == 0
+        entry.release()
+        assert backlog.total() == 0
+
+    def test_close_releases_and_closes_source(self):
+        backlog = SynthesisBacklog()
+        closed = []
+
+        def source():
+            try:
+                yield 1
+                yield 2
+            finally:
+                closed.append(True)
+
+        entry = backlog.start(1.0).attach(source())
+        next(entry)
+        entry.close()
+        assert closed == [True]
+        assert backlog.total() == 0
+
+    def test_failure_releases(self):
+        backlog = SynthesisBacklog()
+
+        def failing():
+            raise RuntimeError("model crashed")
+            yield
+
+        entry = backlog.start(1.0).attach(failing())
+        with pytest.raises(RuntimeError):
+            next(entry)
+        assert backlog.total() == 0
+
+    def test_dropped_entry_released(self):
+        backlog = SynthesisBacklog()
+        backlog.start(1.0).attach(iter([1]))
+        assert backlog.total() == 0
+
+
+class TestOverloadRetryAfter:
+
+    def test_disabled_by_default(self):
+        get_backlog().start(100.0)
+        assert overload_retry_after(workers=1) is None
+
+    def test_background_jobs_only_count_for_new_jobs(self, monkeypatch):
+        monkeypatch.setenv("TTS_MAX_QUEUE_SECONDS", "2")
+        entry = get_backlog().start(10.0, background=True)
+        assert overload_retry_after(workers=1) is None
+        assert overload_retry_after(workers=1, background=True) == 10
+        entry.release()
+
+    def test_retry_after_is_drain_time(self, monkeypatch):
+        monkeypatch.setenv("TTS_MAX_QUEUE_SECONDS", "2")
+        entry = get_backlog().start(5.2)
+        assert overload_retry_after(workers=2) == 3
+        entry.progress(2.0)
+        assert overload_retry_after(workers=2) is None
+
+
+class TestPipelineIntegration:
+
+    def test_synthesis_feeds_model_and_backlog(self):
+        pipeline = SpeechPipeline(lambda: ("v", FakePiperVoice()))
+        plan = pipeline.plan("Good evening.")
+        assert plan.predicted_seconds > 0
+
+        chunks = pipeline.open_pcm(plan)
+        assert get_backlog().total() == pytest.approx(plan.predicted_seconds)
+        list(chunks)
+        assert get_backlog().total() == 0
+        assert get_metrics().get_counter("cost_model_samples_total", voice="v") == 1
+        assert get_cost_model()._fits["v"].samples == 1
@@ -0,0 +1,104 @@
+"""Tests for app/services/deadline.py – client-supplied deadlines.
+
+Covers:
+- parse_deadline(): budget and absolute headers, earliest wins, malformed or non-finite, disabled
+- DeadlineGuard: stops before the next item, closes the source, counts items
+- record_deadline_exceeded() metrics
+"""
+
+import time
+
+import pytest
+
+from app.services.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    DeadlineGuard,
+    parse_deadline,
+    record_deadline_exceeded,
+)
+from app.services.metrics import get_metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+class TestParseDeadline:
+
+    def test_no_headers(self):
+        assert parse_deadline({}) is None
+
+    def test_budget_in_ms(self):
+        deadline = parse_deadline({"x-request-timeout-ms": "1500"})
+        assert 1.4 < deadline.remaining() <= 1.5
+
+    def test_absolute_unix_time(self):
+        deadline = parse_deadline({"x-request-deadline": str(time.time() + 2)})
+        assert 1.9 < deadline.remaining() <= 2.0
+
+    def test_earliest_wins(self):
+        deadline = parse_deadline({"x-request-timeout-ms": "5000", "x-request-deadline": str(time.time() + 1)})
+        assert deadline.remaining() <= 1.0
+
+    def test_past_deadline_is_expired(self):
+        assert parse_deadline({"x-request-deadline": str(time.time() - 1)}).expired()
+
+    def test_malformed_ignored_and_counted(self):
+        assert parse_deadline({"x-request-timeout-ms": "soon"}) is None
+        assert get_metrics().get_counter("deadline_header_invalid_total") == 1
+
+    @pytest.mark.parametrize("value", ["nan", "inf", "-inf", "1e999"])
+    def test_non_finite_ignored_and_counted(self, value):
+        assert parse_deadline({"x-request-timeout-ms": value}) is None
+        assert parse_deadline({"x-request-deadline": value}) is None
+        assert get_metrics().get_counter("deadline_header_invalid_total") == 2
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("TTS_DEADLINES_ENABLED", "false")
+        assert parse_deadline({"x-request-timeout-ms": "10"}) is None
+
+
+class _Source:
+    def __init__(self, items):
+        self._items = iter(items)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def close(self):
+        self.closed = True
+
+
+class TestDeadlineGuard:
+
+    def test_passes_items_without_deadline(self):
+        guard = DeadlineGuard(iter([1, 2, 3]), None)
+        assert list(guard) == [1, 2, 3]
+        assert guard.produced == 3
+
+    def test_stops_before_next_item_and_closes_source(self):
+        source = _Source([1, 2, 3])
+        deadline = Deadline.after(60)
+        guard = DeadlineGuard(source, deadline)
+        assert next(guard) == 1
+        object.__setattr__(deadline, "expires_at", time.monotonic() - 1)
+        with pytest.raises(DeadlineExceeded):
+            next(guard)
+        assert guard.produced == 1
+        assert source.closed
+
+
+class TestRecord:
+
+    def test_counts_saved_work(self):
+        record_deadline_exceeded("speak", "running", saved_steps=3, saved_seconds=1.5)
+        metrics = get_metrics()
+        assert metrics.get_counter("deadline_exceeded_total", route="speak", stage="running") == 1
+        assert metrics.get_counter("deadline_saved_steps_total", route="speak") == 3
+        assert metrics.get_counter("deadline_saved_seconds_total", route="speak") == 1.5
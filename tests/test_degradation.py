@@ -0,0 +1,210 @@
+"""Tests for app/services/degradation.py – load-adaptive degradation.
+
+Covers:
+- LoadGovernor: enter on queue depth or RTF, exit only below both exit
+  thresholds after the hold time, RTF ignored when enter_rtf is 0
+- LoadGovernor.measure() feeding the RTF average
+- SpeechPipeline.degrade(): fallback plan, speaker requests kept, no
+  fallback configured
+- get_degradation_policy() / get_load_governor() from settings
+"""
+
+import pytest
+
+from app.services.degradation import (
+    DegradationPolicy,
+    LoadGovernor,
+    get_degradation_policy,
+    get_load_governor,
+    reset_load_governor,
+)
+from app.services.metrics import get_metrics
+from app.services.scheduler import reset_scheduler
+from app.services.speech import SpeechPipeline
+from app.services.synthesis import AudioFormat
+from tests.conftest import FakePiperVoice
+
+FMT = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+
+POLICY = DegradationPolicy(
+    voice="en_GB-alan-x_low",
+    enter_queue_depth=4,
+    exit_queue_depth=1,
+    enter_rtf=0.8,
+    exit_rtf=0.4,
+    min_hold_seconds=10,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    get_metrics().reset()
+    reset_load_governor()
+    yield
+    reset_load_governor()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Load:
+    def __init__(self):
+        self.depth = 0.0
+
+    def __call__(self) -> float:
+        return self.depth
+
+
+def _governor(policy: DegradationPolicy = POLICY):
+    clock, load = _Clock(), _Load()
+    return LoadGovernor(policy, load, clock=clock), clock, load
+
+
+class TestLoadGovernor:
+
+    def test_enters_on_queue_depth(self):
+        governor, _, load = _governor()
+        load.depth = 3.9
+        assert governor.update() is False
+        load.depth = 4
+        assert governor.update() is True
+        assert get_metrics().get_counter("degradation_transitions_total", state="degraded") == 1
+
+    def test_enters_on_rtf(self):
+        governor, _, _ = _governor()
+        governor.observe(0.9, 1.0)
+        assert governor.update() is True
+
+    def test_exit_waits_for_hold_time(self):
+        governor, clock, load = _governor()
+        load.depth = 5
+        governor.update()
+        load.depth = 0
+        clock.now = 9.9
+        assert governor.update() is True
+        clock.now = 10
+        assert governor.update() is False
+        assert get_metrics().get_counter("degradation_transitions_total", state="normal") == 1
+
+    def test_hysteresis_band_keeps_state(self):
+        governor, clock, load = _governor()
+        load.depth = 4
+        governor.update()
+        clock.now = 60
+        # Below the enter threshold but above the exit one: stays degraded
+        load.depth = 2
+        assert governor.update() is True
+        load.depth = 1
+        assert governor.update() is False
+        # ...and the same band does not re-enter
+        load.depth = 2
+        assert governor.update() is False
+
+    def test_exit_needs_low_rtf_too(self):
+        governor, clock, load = _governor()
+        governor.observe(1.0, 1.0)
+        governor.update()
+        clock.now = 60
+        governor.observe(0.6, 1.0)
+        assert governor.update() is True
+        for _ in range(10):
+            governor.observe(0.1, 1.0)
+        assert governor.rtf < 0.4
+        assert governor.update() is False
+
+    def test_rtf_ignored_when_disabled(self):
+        governor, _, _ = _governor(DegradationPolicy(voice="x", enter_rtf=0))
+        governor.observe(5.0, 1.0)
+        assert governor.update() is False
+
+    def test_measure_observes_chunks(self):
+        governor, _, _ = _governor()
+        chunks = [(FMT, b"\x00" * FMT.bytes_per_second)] * 3
+        assert list(governor.measure(iter(chunks))) == chunks
+        assert governor.rtf is not None and governor.rtf < 0.8
+
+    def test_measure_closes_source(self):
+        governor, _, _ = _governor()
+        closed = []
+
+        def source():
+            try:
+                yield FMT, b"\x00" * 100
+                yield FMT, b"\x00" * 100
+            finally:
+                closed.append(True)
+
+        measured = governor.measure(source())
+        next(measured)
+        measured.close()
+        assert closed == [True]
+
+
+class _MultiSpeakerVoice(FakePiperVoice):
+    class config:
+        num_speakers = 2
+        speaker_id_map = {"a": 0, "b": 1}
+        default_speaker_id = 0
+
+
+class TestPipelineDegrade:
+
+    def _pipeline(self, degraded: bool, voice=None):
+        pipeline = SpeechPipeline(lambda: ("en_GB-alan-low", voice or FakePiperVoice()))
+        governor, _, load = _governor()
+        load.depth = 10 if degraded else 0
+        pipeline.governor = governor
+        pipeline.fallback_voice = ("en_GB-alan-x_low", FakePiperVoice())
+        return pipeline
+
+    def test_degraded_plan_uses_fallback(self):
+        pipeline = self._pipeline(degraded=True)
+        plan = pipeline.plan("Hello there")
+        degraded = pipeline.degrade(plan)
+        assert degraded.degraded
+        assert degraded.voice_name == "en_GB-alan-x_low"
+        assert degraded.voice is pipeline.fallback_voice[1]
+        assert degraded.key != plan.key
+        assert get_metrics().get_counter("degraded_requests_total", voice="en_GB-alan-x_low") == 1
+
+    def test_normal_load_keeps_plan(self):
+        pipeline = self._pipeline(degraded=False)
+        plan = pipeline.plan("Hello there")
+        assert pipeline.degrade(plan) is plan
+
+    def test_speaker_request_keeps_voice(self):
+        pipeline = self._pipeline(degraded=True, voice=_MultiSpeakerVoice())
+        plan = pipeline.plan("Hello there", speaker="b")
+        assert pipeline.degrade(plan) is plan
+
+    def test_without_fallback(self):
+        pipeline = SpeechPipeline(lambda: ("v", FakePiperVoice()))
+        plan = pipeline.plan("Hello")
+        assert pipeline.degrade(plan) is plan
+
+
+class TestSettings:
+
+    def test_disabled_by_default(self):
+        assert not get_degradation_policy().enabled
+        assert get_load_governor() is None
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_DEGRADED_VOICE", "en_GB-alan-x_low")
+        monkeypatch.setenv("TTS_DEGRADATION_ENTER_QUEUE_DEPTH", "2.5")
+        monkeypatch.setenv("TTS_DEGRADATION_MIN_HOLD_SECONDS", "30")
+        policy = get_degradation_policy()
+        assert policy.voice == "en_GB-alan-x_low"
+        assert policy.enter_queue_depth == 2.5
+        assert policy.min_hold_seconds == 30
+        try:
+            governor = get_load_governor()
+            assert governor is get_load_governor()
+            assert governor.policy == policy
+        finally:
+            reset_scheduler()
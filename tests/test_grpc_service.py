@@ -0,0 +1,280 @@
+"""Tests for app/grpc_service/server.py – gRPC synthesis front end.
+
+Covers:
+- Unary Synthesize returns raw PCM and metadata
+- SynthesizeStream yields metadata on the first chunk only
+- Credentials are validated from call metadata, including through the
+  real verify_app_auth dependency (auth service mocked with pytest-httpx)
+- Invalid requests map to gRPC status codes
+- Overload is RESOURCE_EXHAUSTED with retry-after metadata
+- Synthesized clips are saved to the disk store and audio cache
+- A cancelled stream closes its PCM iterator
+"""
+
+import asyncio
+import threading
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from pytest_httpx import HTTPXMock
+
+grpc = pytest.importorskip("grpc")
+
+from app.grpc_service import tts_pb2, tts_pb2_grpc  # noqa: E402
+from app.deps import verify_app_auth  # noqa: E402
+from app.grpc_service.server import start_grpc_server  # noqa: E402
+from app.services.speech import SpeechPipeline  # noqa: E402
+
+from tests.conftest import FakeAudioChunk, FakePiperVoice, _make_auth_result  # noqa: E402
+
+
+class TwoChunkVoice(FakePiperVoice):
+    def synthesize(self, text: str):
+        yield FakeAudioChunk(num_frames=100)
+        yield FakeAudioChunk(num_frames=50)
+
+
+async def _fake_auth(**kwargs):
+    if kwargs["x_jarvis_app_key"] != "good-key":
+        raise HTTPException(status_code=401, detail="Invalid app credentials")
+    return _make_auth_result(app_id=kwargs["x_jarvis_app_id"])
+
+
+AUTH = (("x-jarvis-app-id", "command-center"), ("x-jarvis-app-key", "good-key"))
+
+
+@pytest.fixture
+def speech():
+    return SpeechPipeline(lambda: ("test-voice", TwoChunkVoice()))
+
+
+@pytest_asyncio.fixture
+async def stub(speech):
+    server = await start_grpc_server(speech, 0, authenticate=_fake_auth)
+    channel = grpc.aio.insecure_channel(f"localhost:{server.bound_port}")
+    yield tts_pb2_grpc.TextToSpeechStub(channel)
+    await channel.close()
+    await server.stop(grace=None)
+
+
+def _counting_voice(speech: SpeechPipeline) -> list[str]:
+    calls: list[str] = []
+
+    class CountingVoice(TwoChunkVoice):
+        def synthesize(self, text):
+            calls.append(text)
+            yield from super().synthesize(text)
+
+    voice = CountingVoice()
+    speech._voice_provider = lambda: ("test-voice", voice)
+    return calls
+
+
+class TestGrpcService:
+
+    @pytest.mark.asyncio
+    async def test_synthesize_returns_pcm(self, stub):
+        resp = await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"), metadata=AUTH)
+        assert resp.metadata.sample_rate == 22050
+        assert resp.metadata.channels == 1
+        assert resp.metadata.sample_width == 2
+        assert resp.metadata.voice == "test-voice"
+        assert resp.metadata.etag
+        assert len(resp.pcm) == 150 * 2
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_chunks(self, stub):
+        call = stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text="Hello"), metadata=AUTH)
+        chunks = [chunk async for chunk in call]
+        assert len(chunks) == 2
+        assert chunks[0].HasField("metadata")
+        assert not chunks[1].HasField("metadata")
+        assert sum(len(c.pcm) for c in chunks) == 150 * 2
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials_are_rejected(self, stub):
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"))
+        assert exc_info.value.code() == grpc.StatusCode.UNAUTHENTICATED
+
+    @pytest.mark.asyncio
+    async def test_bad_credentials_are_rejected(self, stub):
+        metadata = (("x-jarvis-app-id", "command-center"), ("x-jarvis-app-key", "bad"))
+        call = stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text="Hello"), metadata=metadata)
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            [chunk async for chunk in call]
+        assert exc_info.value.code() == grpc.StatusCode.UNAUTHENTICATED
+
+    @pytest.mark.asyncio
+    async def test_empty_text_is_invalid(self, stub):
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Synthesize(tts_pb2.SynthesizeRequest(text=""), metadata=AUTH)
+        assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    @pytest.mark.asyncio
+    async def test_text_too_long_is_invalid(self, stub, monkeypatch):
+        monkeypatch.setenv("TTS_MAX_INPUT_CHARS", "3")
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"), metadata=AUTH)
+        assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    @pytest.mark.asyncio
+    async def test_unknown_speaker_is_invalid(self, stub):
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello", speaker="nobody"), metadata=AUTH)
+        assert exc_info.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    @pytest.mark.asyncio
+    async def test_overload_is_resource_exhausted_with_retry_after(self, stub, monkeypatch):
+        from app.services.cost_model import get_backlog, reset_cost_model
+        from app.services.scheduler import get_scheduler
+
+        reset_cost_model()
+        monkeypatch.setenv("TTS_MAX_QUEUE_SECONDS", "1")
+        entry = get_backlog().start(10.0 * get_scheduler().workers)
+        try:
+            with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+                await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"), metadata=AUTH)
+        finally:
+            entry.release()
+            reset_cost_model()
+        assert exc_info.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+        assert ("retry-after", "10") in tuple(exc_info.value.trailing_metadata())
+
+    @pytest.mark.asyncio
+    async def test_synthesize_saves_clip_for_next_request(self, stub, speech, tmp_path):
+        from app.services.audio_cache import LocalAudioCache, TwoTierAudioCache
+        from app.services.audio_store import AudioStore
+
+        speech.audio_store = AudioStore(tmp_path, max_bytes=10_000_000)
+        speech.audio_cache = TwoTierAudioCache(LocalAudioCache(max_bytes=10_000_000), None)
+        calls = _counting_voice(speech)
+        first = await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Saved"), metadata=AUTH)
+        plan = speech.plan("Saved")
+        assert speech.audio_store.get(plan.key) is not None
+        assert speech.audio_cache.get_local(plan.key) is not None
+
+        again = await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Saved"), metadata=AUTH)
+        assert again.pcm == first.pcm
+        assert calls == ["Saved"]
+
+    @pytest.mark.asyncio
+    async def test_stream_saves_clip(self, stub, speech, tmp_path):
+        from app.services.audio_store import AudioStore
+
+        speech.audio_store = AudioStore(tmp_path, max_bytes=10_000_000)
+        calls = _counting_voice(speech)
+        call = stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text="Streamed"), metadata=AUTH)
+        streamed = b"".join([chunk.pcm async for chunk in call])
+        cached = speech.cached_pcm(speech.plan("Streamed"))
+        assert cached is not None
+        assert cached[1] == streamed
+
+        call = stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text="Streamed"), metadata=AUTH)
+        assert b"".join([chunk.pcm async for chunk in call]) == streamed
+        assert calls == ["Streamed"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_stream_closes_pcm_iterator(self, stub, speech):
+        first_sent = threading.Event()
+        release = threading.Event()
+        closed = threading.Event()
+
+        class BlockingVoice(TwoChunkVoice):
+            def synthesize(self, text):
+                yield FakeAudioChunk(num_frames=100)
+                first_sent.set()
+                release.wait(timeout=5)
+                yield FakeAudioChunk(num_frames=50)
+
+        class TrackedChunks:
+            def __init__(self, chunks):
+                self.chunks = chunks
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                return next(self.chunks)
+
+            def close(self):
+                closed.set()
+                self.chunks.close()
+
+        # Held here, so only an explicit close (not garbage collection) releases it
+        opened: list[TrackedChunks] = []
+
+        def tee_pcm(plan, chunks):
+            opened.append(TrackedChunks(chunks))
+            return opened[-1]
+
+        speech._voice_provider = lambda: ("test-voice", BlockingVoice())
+        speech.tee_pcm = tee_pcm
+        call = stub.SynthesizeStream(tts_pb2.SynthesizeRequest(text="Cancelled"), metadata=AUTH)
+        await call.read()
+        await asyncio.to_thread(first_sent.wait, 5)
+        call.cancel()
+        await asyncio.sleep(0.1)
+        release.set()
+        assert await asyncio.to_thread(closed.wait, 5)
+        assert len(opened) == 1
+
+
+class TestGrpcAppAuth:
+    """Calls authenticated by the real verify_app_auth, the default for start_grpc_server()."""
+
+    @pytest_asyncio.fixture(autouse=True)
+    async def setup_auth(self):
+        from jarvis_auth_client import init, shutdown
+
+        init(auth_base_url="http://localhost:7701")
+        yield
+        await shutdown()
+
+    @pytest_asyncio.fixture
+    async def real_auth_stub(self, speech):
+        results = []
+
+        async def recording_auth(**kwargs):
+            results.append(await verify_app_auth(**kwargs))
+            return results[-1]
+
+        server = await start_grpc_server(speech, 0, authenticate=recording_auth)
+        channel = grpc.aio.insecure_channel(f"localhost:{server.bound_port}")
+        yield tts_pb2_grpc.TextToSpeechStub(channel), results
+        await channel.close()
+        await server.stop(grace=None)
+
+    @pytest.mark.asyncio
+    async def test_metadata_reaches_verify_app_auth(self, real_auth_stub, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(
+            url="http://localhost:7701/internal/app-ping",
+            status_code=200,
+            json={"app_id": "command-center"},
+        )
+        stub, results = real_auth_stub
+        metadata = AUTH + (
+            ("x-context-household-id", "household-123"),
+            ("x-context-node-id", "kitchen-pi"),
+            ("x-context-user-id", "42"),
+            ("x-context-household-member-ids", "42,43"),
+        )
+        resp = await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"), metadata=metadata)
+        assert len(resp.pcm) == 150 * 2
+        (result,) = results
+        assert result.app.app_id == "command-center"
+        assert result.context.household_id == "household-123"
+        assert result.context.node_id == "kitchen-pi"
+        assert result.context.user_id == 42
+
+    @pytest.mark.asyncio
+    async def test_rejected_by_auth_service_is_unauthenticated(self, real_auth_stub, httpx_mock: HTTPXMock):
+        httpx_mock.add_response(
+            url="http://localhost:7701/internal/app-ping",
+            status_code=401,
+        )
+        stub, _ = real_auth_stub
+        with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+            await stub.Synthesize(tts_pb2.SynthesizeRequest(text="Hello"), metadata=AUTH)
+        assert exc_info.value.code() == grpc.StatusCode.UNAUTHENTICATED
@@ -0,0 +1,232 @@
+"""Tests for app/services/jobs.py – asynchronous long-form synthesis jobs.
+
+Covers:
+- Job completion, progress and WAV rendering in pieces
+- Background priority on the scheduler
+- Audio duration cap
+- TTL expiry and byte budget eviction
+- Owner scoping by app and household
+- Scheduler shut down mid-job fails the job
+- Steps charged to the job's tenant
+- Cost model samples and background backlog per job
+- get_job_limits() from settings
+"""
+
+import threading
+import time
+import wave
+from io import BytesIO
+
+import pytest
+
+from app.services.cost_model import get_backlog, reset_cost_model
+from app.services.jobs import JobManager, JobStatus, get_job_limits
+from app.services.metrics import get_metrics
+from app.services.scheduler import SynthesisScheduler, Tenant
+from app.services.synthesis import SynthesisLimits
+
+from tests.conftest import FakeAudioChunk, FakePiperVoice
+
+
+class CountingVoice(FakePiperVoice):
+    def __init__(self, num_frames: int = 100):
+        self.num_frames = num_frames
+        self.calls: list[str] = []
+
+    def synthesize(self, text: str):
+        self.calls.append(text)
+        yield FakeAudioChunk(num_frames=self.num_frames)
+
+
+LIMITS = SynthesisLimits(chunk_max_chars=20)
+OWNER = Tenant("app", "house")
+
+
+@pytest.fixture
+def scheduler():
+    sched = SynthesisScheduler(workers=1)
+    yield sched
+    sched.shutdown(wait=False)
+
+
+def _wait_finished(manager: JobManager, job_id: str, owner: Tenant = OWNER):
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = manager.get(job_id, owner)
+        if job is None or job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+
+
+class TestJobManager:
+
+    def test_job_completes_with_progress(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        voice = CountingVoice()
+        job = manager.create(OWNER, "First sentence. Second sentence. Third.", voice, LIMITS)
+        job = _wait_finished(manager, job.id)
+
+        assert job.status == JobStatus.COMPLETED
+        assert voice.calls == ["First sentence.", "Second sentence.", "Third."]
+        info = job.to_dict()
+        assert info["sentences_done"] == 3
+        assert info["sentences_total"] == 3
+        assert info["audio_seconds"] == pytest.approx(300 / 22050, abs=1e-3)
+
+    def test_iter_wav(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        job = manager.create(OWNER, "One. Two.", CountingVoice(), LIMITS)
+        job = _wait_finished(manager, job.id)
+        size, pieces = job.iter_wav()
+        wav = b"".join(pieces)
+        assert len(wav) == size
+        with wave.open(BytesIO(wav), "rb") as wf:
+            assert wf.getnframes() == 200
+
+    def test_iter_wav_in_pieces_and_fixed_at_call(self, scheduler, monkeypatch):
+        monkeypatch.setattr("app.services.jobs.WAV_PIECE_BYTES", 150)
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        job = manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        job = _wait_finished(manager, job.id)
+        size, pieces = job.iter_wav()
+        # Audio appended after the call (e.g. by a running step) is not part of it
+        job.pcm += b"\x01\x00" * 10
+        parts = list(pieces)
+        assert [len(p) for p in parts[1:]] == [150, 50]
+        assert sum(map(len, parts)) == size
+        with wave.open(BytesIO(b"".join(parts)), "rb") as wf:
+            assert wf.getnframes() == 100
+
+    def test_iter_wav_none_before_audio(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        job = manager.create(OWNER, "", CountingVoice(), LIMITS)
+        assert job.iter_wav() is None
+
+    def test_create_fails_when_scheduler_stopped(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        scheduler.shutdown(wait=True)
+        with pytest.raises(RuntimeError):
+            manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        assert manager._jobs == {}
+
+    def test_scheduler_shutdown_between_steps_fails_job(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=0, max_total_bytes=1_000_000)
+
+        class StoppingVoice(CountingVoice):
+            def synthesize(self, text):
+                scheduler.shutdown(wait=False)
+                yield from super().synthesize(text)
+
+        job = manager.create(OWNER, "One. Two.", StoppingVoice(), LIMITS)
+        deadline = time.time() + 5
+        while not job.finished and time.time() < deadline:
+            time.sleep(0.01)
+        assert job.status == JobStatus.FAILED
+        assert job.finished_at is not None
+        # Finished, so it expires and releases its audio
+        time.sleep(0.01)
+        assert manager.get(job.id, OWNER) is None
+        assert manager._total_bytes == 0
+
+    def test_audio_duration_cap(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        limits = SynthesisLimits(chunk_max_chars=20, max_audio_seconds=150 / 22050)
+        voice = CountingVoice()
+        job = manager.create(OWNER, "One. Two. Three.", voice, limits)
+        job = _wait_finished(manager, job.id)
+        assert job.status == JobStatus.COMPLETED
+        assert len(job.pcm) == 150 * 2
+        assert voice.calls == ["One.", "Two."]
+
+    def test_owner_scoping(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        job = manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        assert manager.get(job.id, Tenant("other-app", "house")) is None
+        # Same app, another household
+        assert manager.get(job.id, Tenant("app", "other-house")) is None
+        assert manager.get(job.id, OWNER) is job
+        assert manager.get("missing", OWNER) is None
+
+    def test_steps_submitted_for_tenant(self, scheduler, monkeypatch):
+        tenants = []
+        submit = scheduler.submit
+
+        def recording_submit(fn, *args, **kwargs):
+            tenants.append(kwargs.get("tenant"))
+            return submit(fn, *args, **kwargs)
+
+        monkeypatch.setattr(scheduler, "submit", recording_submit)
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        tenant = Tenant("app", "house")
+        job = manager.create(OWNER, "One. Two.", CountingVoice(), LIMITS, tenant=tenant)
+        _wait_finished(manager, job.id)
+        assert tenants and set(tenants) == {tenant}
+
+    def test_finished_jobs_expire(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=0, max_total_bytes=1_000_000)
+        job = manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        _wait_finished(manager, job.id)
+        time.sleep(0.01)
+        assert manager.get(job.id, OWNER) is None
+
+    def test_budget_evicts_oldest_finished_job(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=300)
+        first = manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        _wait_finished(manager, first.id)
+        second = manager.create(OWNER, "Two.", CountingVoice(), LIMITS)
+        second = _wait_finished(manager, second.id)
+        assert second.status == JobStatus.COMPLETED
+        assert manager.get(first.id, OWNER) is None
+
+    def test_budget_exceeded_fails_job(self, scheduler):
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=100)
+        job = manager.create(OWNER, "One.", CountingVoice(), LIMITS)
+        job = _wait_finished(manager, job.id)
+        assert job.status == JobStatus.FAILED
+        assert "budget" in job.error
+
+    def test_job_feeds_cost_model_and_background_backlog(self, scheduler):
+        get_metrics().reset()
+        reset_cost_model()
+        gate = threading.Event()
+
+        class GatedVoice(CountingVoice):
+            def synthesize(self, text):
+                gate.wait(timeout=5)
+                yield from super().synthesize(text)
+
+        manager = JobManager(scheduler, ttl_seconds=60, max_total_bytes=1_000_000)
+        try:
+            job = manager.create(OWNER, "One. Two.", GatedVoice(), LIMITS, voice_name="v")
+            assert get_backlog().total() > 0
+            # Interactive admission does not count jobs
+            assert get_backlog().total(background=False) == 0
+            gate.set()
+            _wait_finished(manager, job.id)
+            assert get_backlog().total() == 0
+            assert get_metrics().get_counter("cost_model_samples_total", voice="v") == 2
+        finally:
+            gate.set()
+            reset_cost_model()
+
+
+class TestJobLimits:
+
+    def test_defaults_exceed_speak_limits(self):
+        limits = get_job_limits()
+        assert limits.max_input_chars == 50000
+        assert limits.max_audio_seconds == 3600
+        assert not limits.fast_start
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_JOB_MAX_INPUT_CHARS", "120000")
+        monkeypatch.setenv("TTS_JOB_MAX_AUDIO_SECONDS", "0")
+        monkeypatch.setenv("TTS_CHUNK_MAX_CHARS", "200")
+        limits = get_job_limits()
+        assert limits.max_input_chars == 120000
+        assert limits.max_audio_seconds == 0
+        assert limits.chunk_max_chars == 200
+
@@ -0,0 +1,125 @@
+"""Tests for benchmarks/load_test.py – HTTP load harness.
+
+Covers:
+- parse_mix() weights and rejected mixes
+- Per-step report: percentiles, time to first byte, error counts, JSON output
+- A short closed-loop run against the in-process service with the fake LLM proxy
+"""
+
+import argparse
+import json
+import random
+import socket
+
+import httpx
+import pytest
+
+from benchmarks.fakes import BackgroundServer, FakeBehaviour, create_fake_llm_app
+from benchmarks.load_test import StepResult, _report, parse_mix, run_step
+
+from tests.conftest import _make_auth_result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestParseMix:
+
+    def test_weights(self):
+        assert parse_mix("speak_short=6, speak_long=2,wake=0.5") == {
+            "speak_short": 6.0,
+            "speak_long": 2.0,
+            "wake": 0.5,
+        }
+
+    def test_weight_defaults_to_one(self):
+        assert parse_mix("speak_short,wake") == {"speak_short": 1.0, "wake": 1.0}
+
+    def test_unknown_type_rejected(self):
+        with pytest.raises(argparse.ArgumentTypeError, match="Unknown request type"):
+            parse_mix("speak_short=1,shout=1")
+
+    def test_all_zero_rejected(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix("speak_short=0,wake=0")
+
+
+class TestReport:
+
+    def _result(self) -> StepResult:
+        result = StepResult()
+        # 1..100 ms, so nearest-rank percentiles are exact
+        result.latencies["speak_short"] = [i / 1000 for i in range(100, 0, -1)]
+        result.ttfb["speak_short"] = [i / 2000 for i in range(1, 101)]
+        result.latencies["wake"] = [0.2, 0.4]
+        result.errors["wake"] = 2
+        result.status_codes.update({"200": 102, "503": 2})
+        return result
+
+    def test_percentiles_and_throughput(self):
+        step = _report(4, self._result(), seconds=2.0)
+        assert step["concurrency"] == 4
+        overall = step["overall"]
+        assert overall["requests"] == 104
+        assert overall["errors"] == 2
+        assert overall["throughput_rps"] == pytest.approx(51.0)
+        short = step["by_type"]["speak_short"]
+        assert short["p50_ms"] == pytest.approx(50.0)
+        assert short["p95_ms"] == pytest.approx(95.0)
+        assert short["p99_ms"] == pytest.approx(99.0)
+        assert short["ttfb_p50_ms"] == pytest.approx(25.0)
+        assert short["ttfb_p95_ms"] == pytest.approx(47.5)
+
+    def test_errors_per_type(self):
+        wake = _report(1, self._result(), seconds=1.0)["by_type"]["wake"]
+        assert wake["requests"] == 4
+        assert wake["error_rate"] == pytest.approx(0.5)
+        # No time to first byte recorded for this type
+        assert "ttfb_p50_ms" not in wake
+
+    def test_report_is_json(self):
+        step = _report(2, self._result(), seconds=1.0)
+        decoded = json.loads(json.dumps(step))
+        assert decoded["status_codes"] == {"200": 102, "503": 2}
+        assert set(decoded["by_type"]) == {"speak_short", "wake"}
+
+
+class TestRunStep:
+
+    @pytest.fixture
+    def fake_llm(self, monkeypatch):
+        llm = create_fake_llm_app(FakeBehaviour(latency_ms=1.0), token_ms=0.0)
+        server = BackgroundServer(llm, _free_port()).start()
+        monkeypatch.setenv("JARVIS_LLM_PROXY_API_URL", server.url)
+        yield llm
+        server.stop()
+
+    @pytest.fixture
+    def service(self):
+        """jarvis-tts served by uvicorn on a thread of this process."""
+        from app.main import app, verify_app_auth
+
+        app.dependency_overrides[verify_app_auth] = lambda: _make_auth_result()
+        server = BackgroundServer(app, _free_port()).start()
+        yield server.url
+        server.stop()
+        app.dependency_overrides.clear()
+
+    @pytest.mark.asyncio
+    async def test_short_run_against_fakes(self, fake_llm, service):
+        mix = parse_mix("speak_short=2,speak_long=1,wake=1")
+        async with httpx.AsyncClient(base_url=service, timeout=10.0) as client:
+            result, seconds = await run_step(
+                client, concurrency=2, duration=0.5, warmup=0.0, mix=mix, unique=False, rng=random.Random(1)
+            )
+
+        step = _report(2, result, seconds)
+        assert step["overall"]["requests"] > 0
+        assert step["overall"]["errors"] == 0
+        assert set(step["status_codes"]) == {"200"}
+        assert set(step["by_type"]) == set(mix)
+        assert fake_llm.state.requests == len(result.latencies["wake"])
+        json.dumps(step)
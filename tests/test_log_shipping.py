@@ -0,0 +1,148 @@
+"""Tests for app/services/log_shipping.py – non-blocking log shipping.
+
+Covers:
+- Records are shipped from a background thread in batches
+- Args are merged into a copy of the record before queueing
+- Targets with emit_batch() receive whole batches
+- Overflow drops records and counts them
+- Target errors are counted and do not stop the shipper
+- close() ships queued records and closes the target
+"""
+
+import logging
+import threading
+
+import pytest
+
+from app.services.log_shipping import BatchingLogHandler
+from app.services.metrics import get_metrics
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self, block: threading.Event | None = None):
+        super().__init__(level=logging.DEBUG)
+        self.records: list[logging.LogRecord] = []
+        self.block = block
+        self.closed = False
+
+    def emit(self, record):
+        if self.block is not None:
+            self.block.wait(5)
+        self.records.append(record)
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+def _record(msg="hello %s", args=("world",), level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+class TestBatchingLogHandler:
+
+    def test_ships_records_in_background(self):
+        target = RecordingHandler()
+        handler = BatchingLogHandler(target, flush_interval=0.05)
+        for i in range(5):
+            handler.handle(_record(args=(i,)))
+        handler.close()
+        assert [r.getMessage() for r in target.records] == [f"hello {i}" for i in range(5)]
+        assert target.closed
+        assert get_metrics().get_counter("log_records_shipped_total") == 5
+
+    def test_emit_does_not_wait_for_target(self):
+        block = threading.Event()
+        target = RecordingHandler(block=block)
+        handler = BatchingLogHandler(target, max_queue=10, flush_interval=0.05)
+        handler.handle(_record())
+        handler.handle(_record())  # returns although the target is stuck
+        block.set()
+        handler.close()
+        assert len(target.records) == 2
+
+    def test_overflow_drops_and_counts(self):
+        block = threading.Event()
+        target = RecordingHandler(block=block)
+        handler = BatchingLogHandler(target, max_queue=2, batch_size=1, flush_interval=0.05)
+        for _ in range(10):
+            handler.handle(_record())
+        assert handler.dropped >= 7
+        assert get_metrics().get_counter("log_records_dropped_total") == handler.dropped
+        block.set()
+        handler.close()
+
+    def test_prepare_merges_args_and_exception(self):
+        handler = BatchingLogHandler(RecordingHandler())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            import sys
+
+            record = logging.LogRecord("t", logging.ERROR, __file__, 1, "x=%d", (3,), sys.exc_info())
+        prepared = handler.prepare(record)
+        assert prepared.msg == "x=3"
+        assert prepared.args is None
+        assert prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+        assert prepared is not record
+        assert (record.msg, record.args) == ("x=%d", (3,))
+        assert record.exc_info is not None
+        handler.close()
+
+    def test_batch_target_gets_whole_batches(self):
+        release = threading.Event()
+
+        class BatchTarget(RecordingHandler):
+            def __init__(self):
+                super().__init__()
+                self.batches: list[list[str]] = []
+
+            def emit_batch(self, records):
+                release.wait(5)  # the rest queue up behind the first batch
+                self.batches.append([r.getMessage() for r in records])
+
+        target = BatchTarget()
+        target.addFilter(lambda r: r.getMessage() != "hello skip")
+        handler = BatchingLogHandler(target, batch_size=3, flush_interval=0.05)
+        for i in (0, "skip", 1, 2, 3):
+            handler.handle(_record(args=(i,)))
+        release.set()
+        handler.close()
+        assert [m for b in target.batches for m in b] == ["hello 0", "hello 1", "hello 2", "hello 3"]
+        assert max(len(b) for b in target.batches) > 1
+        assert target.records == []
+
+    def test_level_follows_target(self):
+        target = RecordingHandler()
+        target.setLevel(logging.WARNING)
+        handler = BatchingLogHandler(target, flush_interval=0.05)
+        logger = logging.getLogger("tests.log_shipping")
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        try:
+            logger.info("filtered out")
+            logger.error("shipped")
+        finally:
+            logger.removeHandler(handler)
+        handler.close()
+        assert [r.levelno for r in target.records] == [logging.ERROR]
+
+    def test_target_errors_counted(self):
+        class Broken(logging.Handler):
+            def emit(self, record):
+                raise RuntimeError("down")
+
+            def handle(self, record):
+                return self.emit(record)
+
+        handler = BatchingLogHandler(Broken(), flush_interval=0.05)
+        handler.handle(_record())
+        handler.close()
+        assert get_metrics().get_counter("log_ship_errors_total") == 1
@@ -3,12 +3,16 @@
 Covers:
 - GET /ping
 - GET /health
-- POST /speak
+- GET /metrics, GET /admin/timings, GET /admin/memory
+- GET /voices
+- POST /speak (including load-adaptive degradation, 503 + Retry-After when overloaded)
+- POST /speak/jobs, GET /speak/jobs/{id}, GET /speak/jobs/{id}/audio (scoped to app and household)
 - POST /generate-wake-response
 - _setup_remote_logging()
-- startup event
+- startup event (voice load, phase report), voice watch task
 """
 
+import asyncio
 import json
 import struct
 import wave
@@ -19,9 +23,9 @@ import httpx
 import pytest
 
 # conftest.py installs mock modules before this import
-from app.main import app, _setup_remote_logging
+from app.main import app, _setup_remote_logging, verify_app_auth
 
-from tests.conftest import FakeAudioChunk, FakePiperVoice
+from tests.conftest import FakeAudioChunk, FakePiperVoice, _make_auth_result
 
 
 # ---------------------------------------------------------------------------
@@ -58,6 +62,81 @@ class TestHealthEndpoint:
         assert resp.json() == {"status": "healthy"}
 
 
+# ---------------------------------------------------------------------------
+# GET /metrics
+# ---------------------------------------------------------------------------
+
+class TestMetricsEndpoint:
+
+    def test_metrics_returns_snapshot(self, client):
+        client.post("/speak", json={"text": "Hello"})
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert "counters" in body
+        assert "gauges" in body
+        assert "speak_inflight_flights" in body["gauges"]
+
+
+class TestTimingEndpoint:
+
+    def test_speak_sends_server_timing(self, client):
+        resp = client.post("/speak", json={"text": "Hello"})
+        stages = [e.split(";")[0] for e in resp.headers["server-timing"].split(", ")]
+        recorded = {"queue", "phonemize", "inference", "encode"}
+        marked = [s for s in stages if s not in recorded]
+        assert marked[:5] == ["auth", "parse", "plan", "cache", "synth_first"]
+        assert "render" in marked
+        assert marked[-1] == "total"
+        # Recorded from the worker thread, separately from synth_first/render
+        assert {"queue", "encode"} <= set(stages)
+
+    def test_admin_timings_reports_percentiles(self, client):
+        from app.services.timing import get_timing_stats
+
+        get_timing_stats().reset()
+        client.post("/speak", json={"text": "Hello"})
+        resp = client.get("/admin/timings")
+        assert resp.status_code == 200
+        routes = resp.json()["routes"]
+        assert set(routes["/speak"]["synth_first"]) == {"count", "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+        assert routes["/speak"]["total"]["count"] == 1
+
+    def test_admin_memory_lists_voices(self, client):
+        import app.main as main_mod
+        from app.services.memory import get_voice_memory
+
+        get_voice_memory().track("test-voice", main_mod._active_voice(), 1024)
+        resp = client.get("/admin/memory")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["rss_bytes"] > 0
+        assert body["active_voice"] == main_mod.VOICE_NAME
+        entry = [v for v in body["voices"] if v["voice"] == "test-voice"][-1]
+        assert entry["resident_bytes"] == 1024
+        assert entry["sessions"] == 1
+
+# ---------------------------------------------------------------------------
+# GET /voices
+# ---------------------------------------------------------------------------
+
+class TestVoicesEndpoint:
+
+    def test_single_speaker_voice(self, client):
+        resp = client.get("/voices")
+        assert resp.status_code == 200
+        assert resp.json()["speakers"] == {}
+
+    def test_lists_speakers(self, client, monkeypatch):
+        import app.main as main_mod
+        from tests.test_synthesis import MultiSpeakerVoice
+
+        monkeypatch.setattr(main_mod, "voice", MultiSpeakerVoice())
+        assert client.get("/voices").json()["speakers"] == {"alan": 0, "jenny": 1, "ryan": 2}
+
+    def test_requires_auth(self, unauthenticated_client):
+        assert unauthenticated_client.get("/voices").status_code == 401
+
 # ---------------------------------------------------------------------------
 # POST /speak
 # ---------------------------------------------------------------------------
@@ -77,6 +156,36 @@ class TestSpeakEndpoint:
             assert wf.getsampwidth() == 2
             assert wf.getframerate() == 22050
 
+    def test_speak_buffer_returned_to_pool(self, client, monkeypatch):
+        from app.services import wav_buffer
+
+        pool = wav_buffer.BufferPool()
+        monkeypatch.setattr(wav_buffer, "_pool", pool)
+        for text in ("Pooled one", "Pooled two"):
+            resp = client.post("/speak", json={"text": text})
+            with wave.open(BytesIO(resp.content), "rb") as wf:
+                assert wf.getnframes() == 1024
+        assert pool.allocations == 1
+        assert pool.reuses == 1
+        assert pool.free_buffers() == 1
+
+    def test_speak_cache_lookup_runs_off_the_event_loop(self, client, monkeypatch):
+        import app.main as main_mod
+
+        loops = []
+        original = main_mod._speech.cached_wav
+
+        def cached_wav(plan):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return original(plan)
+
+        monkeypatch.setattr(main_mod._speech, "cached_wav", cached_wav)
+        assert client.post("/speak", json={"text": "Off the loop"}).status_code == 200
+        assert loops and loops == [None] * len(loops)
+
     def test_speak_empty_text_returns_error(self, client):
         resp = client.post("/speak", json={"text": ""})
         assert resp.status_code == 200
@@ -116,6 +225,477 @@ class TestSpeakEndpoint:
         with wave.open(buf, "rb") as wf:
             assert wf.getnframes() == 600  # 100 + 200 + 300
 
+    def test_speak_text_too_long_returns_413(self, client, monkeypatch):
+        monkeypatch.setenv("TTS_MAX_INPUT_CHARS", "10")
+        resp = client.post("/speak", json={"text": "This text is too long"})
+        assert resp.status_code == 413
+        assert "maximum length" in resp.json()["error"]
+
+    def test_speak_long_text_is_streamed_in_chunks(self, client, monkeypatch):
+        monkeypatch.setenv("TTS_LONG_TEXT_THRESHOLD_CHARS", "10")
+        monkeypatch.setenv("TTS_CHUNK_MAX_CHARS", "20")
+        calls = []
+
+        class RecordingVoice(FakePiperVoice):
+            def synthesize(self, text: str):
+                calls.append(text)
+                yield FakeAudioChunk(num_frames=100)
+
+        import app.main as main_mod
+        original_voice = main_mod.voice
+        main_mod.voice = RecordingVoice()
+        try:
+            resp = client.post("/speak", json={"text": "First sentence. Second sentence."})
+        finally:
+            main_mod.voice = original_voice
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "audio/wav"
+        assert calls == ["First sentence.", "Second sentence."]
+        assert len(resp.content) == 44 + 2 * 100 * 2
+
+    def test_speak_stream_flag_forces_streaming(self, client):
+        resp = client.post("/speak", json={"text": "Hi", "stream": True})
+        assert resp.status_code == 200
+        assert "content-length" not in resp.headers
+
+    def test_speak_fast_start_streams_leading_clause_first(self, client):
+        import app.main as main_mod
+        from app.services.metrics import get_metrics
+
+        calls = []
+
+        class RecordingVoice(FakePiperVoice):
+            def synthesize(self, text):
+                calls.append(text)
+                yield FakeAudioChunk()
+
+        get_metrics().reset()
+        original = main_mod.voice
+        main_mod.voice = RecordingVoice()
+        try:
+            resp = client.post("/speak", json={
+                "text": "Good evening, the lights are now off.",
+                "fast_start": True,
+            })
+        finally:
+            main_mod.voice = original
+        assert resp.status_code == 200
+        assert "content-length" not in resp.headers
+        assert calls == ["Good evening,", "the lights are now off."]
+        summary = get_metrics().get_summary(
+            "speak_time_to_first_audio_seconds", voice=main_mod.VOICE_NAME, mode="fast_start"
+        )
+        assert summary["count"] == 1
+
+    def test_speak_records_time_to_first_audio(self, client):
+        import app.main as main_mod
+        from app.services.metrics import get_metrics
+
+        get_metrics().reset()
+        client.post("/speak", json={"text": "Hello"})
+        summary = get_metrics().get_summary(
+            "speak_time_to_first_audio_seconds", voice=main_mod.VOICE_NAME, mode="buffered"
+        )
+        assert summary["count"] == 1
+
+    def test_speak_selects_speaker(self, client):
+        import app.main as main_mod
+        from tests.test_synthesis import MultiSpeakerVoice
+
+        voice = MultiSpeakerVoice()
+        original = main_mod.voice
+        main_mod.voice = voice
+        try:
+            default = client.post("/speak", json={"text": "Hello"})
+            jenny = client.post("/speak", json={"text": "Hello", "speaker": "jenny"})
+            unknown = client.post("/speak", json={"text": "Hello", "speaker": "nobody"})
+        finally:
+            main_mod.voice = original
+        assert voice.speakers == [None, 1]
+        assert default.headers["etag"] != jenny.headers["etag"]
+        assert unknown.status_code == 400
+
+    def test_speak_postprocess_trims_silence(self, client):
+        """The FakePiperVoice yields pure silence, which trimming removes."""
+        resp = client.post("/speak", json={"text": "Hi", "postprocess": True})
+        assert resp.status_code == 200
+        buf = BytesIO(resp.content)
+        with wave.open(buf, "rb") as wf:
+            assert wf.getnframes() == 0
+
+    def test_speak_serves_phrase_bank_hit(self, client, tmp_path):
+        from app.services.phrase_bank import PhraseBankStore, write_phrase_bank
+
+        import app.main as main_mod
+        bank_path = tmp_path / "phrases.bank"
+        write_phrase_bank(bank_path, [(main_mod.VOICE_NAME, "At your service.", b"RIFF-prerendered")])
+        original_bank = main_mod._speech.phrase_bank
+        main_mod._speech.phrase_bank = PhraseBankStore(bank_path)
+        try:
+            hit = client.post("/speak", json={"text": "At your service."})
+            miss = client.post("/speak", json={"text": "Something else"})
+        finally:
+            main_mod._speech.phrase_bank = original_bank
+
+        assert hit.status_code == 200
+        assert hit.content == b"RIFF-prerendered"
+        assert miss.content.startswith(b"RIFF")
+        assert miss.content != b"RIFF-prerendered"
+
+    def test_speak_returns_weak_etag_without_store(self, client):
+        first = client.post("/speak", json={"text": "Hello"})
+        second = client.post("/speak", json={"text": "Hello"})
+        other = client.post("/speak", json={"text": "Goodbye"})
+        assert first.headers["etag"].startswith('W/"')
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["etag"] != other.headers["etag"]
+
+    def test_speak_if_none_match_returns_304(self, client):
+        etag = client.post("/speak", json={"text": "Hello"}).headers["etag"]
+        resp = client.post("/speak", json={"text": "Hello"}, headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    def _degrade(self, monkeypatch, degraded: bool, fallback):
+        import app.main as main_mod
+        from app.services.degradation import DegradationPolicy, LoadGovernor
+
+        governor = LoadGovernor(DegradationPolicy(voice="en_GB-alan-x_low"), lambda: 10.0 if degraded else 0.0)
+        monkeypatch.setattr(main_mod._speech, "governor", governor)
+        monkeypatch.setattr(main_mod._speech, "fallback_voice", ("en_GB-alan-x_low", fallback))
+
+    def test_speak_under_load_uses_degraded_voice(self, client, monkeypatch):
+        calls = []
+
+        class LightVoice(FakePiperVoice):
+            def synthesize(self, text):
+                calls.append(text)
+                yield FakeAudioChunk()
+
+        self._degrade(monkeypatch, True, LightVoice())
+        resp = client.post("/speak", json={"text": "Under load"})
+        assert resp.status_code == 200
+        assert resp.headers["X-TTS-Degraded"] == "1"
+        assert calls == ["Under load"]
+
+    def test_speak_normal_load_not_degraded(self, client, monkeypatch):
+        self._degrade(monkeypatch, False, FakePiperVoice())
+        resp = client.post("/speak", json={"text": "Quiet day"})
+        assert resp.headers["X-TTS-Degraded"] == "0"
+
+    def test_speak_under_load_serves_cached_full_quality_clip(self, client, monkeypatch, tmp_path):
+        import app.main as main_mod
+        from app.services.audio_store import AudioStore
+
+        monkeypatch.setattr(main_mod._speech, "audio_store", AudioStore(tmp_path, max_bytes=10_000_000))
+        first = client.post("/speak", json={"text": "Cached clip"})
+        self._degrade(monkeypatch, True, FakePiperVoice())
+        again = client.post("/speak", json={"text": "Cached clip"})
+        assert again.headers["X-TTS-Degraded"] == "0"
+        assert again.headers["ETag"] == first.headers["ETag"]
+
+    def test_speak_rejected_with_retry_after_when_queue_is_full(self, client, monkeypatch):
+        from app.services.cost_model import get_backlog, reset_cost_model
+        from app.services.metrics import get_metrics
+        from app.services.scheduler import get_scheduler
+
+        get_metrics().reset()
+        reset_cost_model()
+        monkeypatch.setenv("TTS_MAX_QUEUE_SECONDS", "1")
+        entry = get_backlog().start(4.5 * get_scheduler().workers)
+        try:
+            resp = client.post("/speak", json={"text": "Too busy"})
+            entry.progress(4.0 * get_scheduler().workers)
+            admitted = client.post("/speak", json={"text": "Too busy"})
+        finally:
+            entry.release()
+            reset_cost_model()
+
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "5"
+        assert get_metrics().get_counter("synthesis_rejected_total", route="speak") == 1
+        assert admitted.status_code == 200
+
+    def test_speak_serves_stored_clip_with_range(self, client, tmp_path):
+        from app.services.audio_store import AudioStore
+
+        import app.main as main_mod
+        original_store = main_mod._speech.audio_store
+        main_mod._speech.audio_store = AudioStore(tmp_path, max_bytes=10_000_000)
+        try:
+            first = client.post("/speak", json={"text": "Stored clip"})
+            etag = first.headers["etag"]
+            ranged = client.post(
+                "/speak", json={"text": "Stored clip"}, headers={"Range": "bytes=0-43", "If-Range": etag}
+            )
+            other_render = client.post(
+                "/speak", json={"text": "Stored clip"}, headers={"Range": "bytes=0-43", "If-Range": '"other"'}
+            )
+            not_modified = client.post("/speak", json={"text": "Stored clip"}, headers={"If-None-Match": etag})
+            star = client.post("/speak", json={"text": "Stored clip"}, headers={"If-None-Match": "*"})
+            again = client.post("/speak", json={"text": "Stored clip"})
+        finally:
+            main_mod._speech.audio_store = original_store
+
+        # Strong ETag of the stored bytes, from the first (buffered) response on
+        assert not etag.startswith("W/")
+        assert ranged.status_code == 206
+        assert ranged.content == first.content[:44]
+        assert ranged.headers["etag"] == etag
+        assert other_render.status_code == 200
+        assert other_render.content == first.content
+        assert not_modified.status_code == 304
+        assert star.status_code == 304
+        # Serving a clip does not change its Last-Modified
+        assert again.headers["last-modified"] == other_render.headers["last-modified"]
+
+    def test_speak_stored_clip_evicted_mid_hit_is_still_served(self, client, monkeypatch, tmp_path):
+        from app.services.audio_store import AudioStore
+
+        import app.main as main_mod
+        store = AudioStore(tmp_path, max_bytes=10_000_000)
+        monkeypatch.setattr(main_mod._speech, "audio_store", store)
+        first = client.post("/speak", json={"text": "Evicted clip"})
+        get = store.get
+
+        def get_then_evict(key):
+            clip = get(key)
+            # A concurrent put evicts the clip after the lookup
+            store.max_bytes = 0
+            with store._lock:
+                store._evict()
+            return clip
+
+        monkeypatch.setattr(store, "get", get_then_evict)
+        resp = client.post("/speak", json={"text": "Evicted clip"})
+        assert resp.status_code == 200
+        assert resp.content == first.content
+        assert list(tmp_path.glob("*/*.wav")) == []
+
+    def test_speak_streamed_clip_is_stored(self, client, tmp_path):
+        from app.services.audio_store import AudioStore
+
+        import app.main as main_mod
+        store = AudioStore(tmp_path, max_bytes=10_000_000)
+        original_store = main_mod._speech.audio_store
+        main_mod._speech.audio_store = store
+        try:
+            streamed = client.post("/speak", json={"text": "Streamed clip", "stream": True})
+        finally:
+            main_mod._speech.audio_store = original_store
+
+        assert streamed.status_code == 200
+        assert len(store) == 1
+        stored = next(tmp_path.glob("*/*.wav"))
+        with wave.open(str(stored), "rb") as wf:
+            assert wf.getnframes() == 1024
+
+    def test_speak_served_from_shared_cache_of_another_replica(self, client, monkeypatch):
+        from app.services.audio_cache import LocalAudioCache, RedisCacheBackend, TwoTierAudioCache
+        from app.services.metrics import get_metrics
+        from benchmarks.fakes import FakeRedisServer
+
+        import app.main as main_mod
+        redis = FakeRedisServer().start()
+        shared = RedisCacheBackend(redis.url)
+        try:
+            # Replica A synthesizes and publishes; replica B only shares the server
+            monkeypatch.setattr(main_mod._speech, "audio_cache", TwoTierAudioCache(LocalAudioCache(10_000_000), shared))
+            first = client.post("/speak", json={"text": "Shared clip"})
+            monkeypatch.setattr(main_mod._speech, "audio_cache", TwoTierAudioCache(LocalAudioCache(10_000_000), shared))
+            get_metrics().reset()
+            second = client.post("/speak", json={"text": "Shared clip"})
+        finally:
+            shared.close()
+            redis.stop()
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert get_metrics().get_counter("audio_cache_hits_total", tier="shared") == 1
+
+    def test_speak_streamed_clip_is_cached(self, client, monkeypatch):
+        from app.services.audio_cache import LocalAudioCache, TwoTierAudioCache
+
+        import app.main as main_mod
+        local = LocalAudioCache(10_000_000)
+        monkeypatch.setattr(main_mod._speech, "audio_cache", TwoTierAudioCache(local, None))
+        streamed = client.post("/speak", json={"text": "Streamed cached clip", "stream": True})
+        cached = client.post("/speak", json={"text": "Streamed cached clip"})
+
+        assert len(local) == 1
+        # Same audio; the cached copy has the real sizes in its header
+        assert cached.content[44:] == streamed.content[44:]
+        with wave.open(BytesIO(cached.content), "rb") as wf:
+            assert wf.getnframes() == 1024
+
+    def test_speak_past_deadline_is_not_synthesized(self, client, monkeypatch):
+        from app.services.metrics import get_metrics
+
+        import app.main as main_mod
+        calls = []
+
+        class RecordingVoice(FakePiperVoice):
+            def synthesize(self, text):
+                calls.append(text)
+                yield FakeAudioChunk()
+
+        get_metrics().reset()
+        monkeypatch.setattr(main_mod, "voice", RecordingVoice())
+        resp = client.post("/speak", json={"text": "Too late"}, headers={"X-Request-Timeout-Ms": "0"})
+
+        assert resp.status_code == 504
+        assert calls == []
+        metrics = get_metrics()
+        assert metrics.get_counter("deadline_exceeded_total", route="speak", stage="queued") == 1
+        assert metrics.get_counter("deadline_saved_steps_total", route="speak") == 1
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_speak_stops_at_chunk_boundary_after_deadline(self, client, monkeypatch, stream):
+        import time as time_mod
+
+        from app.services.metrics import get_metrics
+
+        import app.main as main_mod
+        monkeypatch.setenv("TTS_CHUNK_MAX_CHARS", "20")
+        calls = []
+
+        class SlowVoice(FakePiperVoice):
+            def synthesize(self, text):
+                calls.append(text)
+                time_mod.sleep(0.2)
+                yield FakeAudioChunk(num_frames=100)
+
+        get_metrics().reset()
+        monkeypatch.setattr(main_mod, "voice", SlowVoice())
+        resp = client.post(
+            "/speak",
+            json={"text": "First sentence. Second sentence. Third one.", "stream": stream},
+            headers={"X-Request-Timeout-Ms": "100"},
+        )
+
+        assert calls == ["First sentence."]
+        if stream:
+            # Headers were already sent; the stream just ends early
+            assert resp.status_code == 200
+            assert len(resp.content) == 44 + 100 * 2
+        else:
+            assert resp.status_code == 504
+        metrics = get_metrics()
+        assert metrics.get_counter("deadline_exceeded_total", route="speak", stage="running") == 1
+        assert metrics.get_counter("deadline_saved_steps_total", route="speak") == 2
+
+    def test_speak_saved_steps_count_text_chunks(self, client, monkeypatch):
+        import time as time_mod
+
+        from app.services.metrics import get_metrics
+
+        import app.main as main_mod
+        monkeypatch.setenv("TTS_CHUNK_MAX_CHARS", "20")
+        calls = []
+
+        class TwoPieceVoice(FakePiperVoice):
+            # Two audio chunks for one text chunk, as Piper yields per sentence
+            def synthesize(self, text):
+                calls.append(text)
+                yield FakeAudioChunk(num_frames=100)
+                time_mod.sleep(0.2)
+                yield FakeAudioChunk(num_frames=100)
+
+        get_metrics().reset()
+        monkeypatch.setattr(main_mod, "voice", TwoPieceVoice())
+        resp = client.post(
+            "/speak",
+            json={"text": "First sentence. Second sentence. Third one."},
+            headers={"X-Request-Timeout-Ms": "100"},
+        )
+
+        assert resp.status_code == 504
+        assert calls == ["First sentence."]
+        # Two PCM chunks came out, but only the first of three text chunks started
+        assert get_metrics().get_counter("deadline_saved_steps_total", route="speak") == 2
+        assert get_metrics().get_counter("deadline_saved_seconds_total", route="speak") > 0
+
+    def test_speak_absolute_deadline_in_future_is_served(self, client):
+        import time as time_mod
+
+        resp = client.post("/speak", json={"text": "Hello"}, headers={"X-Request-Deadline": str(time_mod.time() + 30)})
+        assert resp.status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# /speak/jobs
+# ---------------------------------------------------------------------------
+
+class TestSpeakJobs:
+
+    @staticmethod
+    def _wait(client, job_id: str) -> dict:
+        import time
+        for _ in range(500):
+            info = client.get(f"/speak/jobs/{job_id}").json()
+            if info["status"] in ("completed", "failed"):
+                return info
+            time.sleep(0.01)
+        raise AssertionError("job did not finish")
+
+    def test_create_job_returns_id_immediately(self, client):
+        resp = client.post("/speak/jobs", json={"text": "Once upon a time. The end."})
+        assert resp.status_code == 202
+        body = resp.json()
+        assert body["job_id"]
+        assert body["sentences_total"] == 2
+
+    def test_job_progress_and_audio(self, client):
+        job_id = client.post("/speak/jobs", json={"text": "Once upon a time. The end."}).json()["job_id"]
+        info = self._wait(client, job_id)
+        assert info["status"] == "completed"
+        assert info["sentences_done"] == 2
+
+        audio = client.get(f"/speak/jobs/{job_id}/audio")
+        assert audio.status_code == 200
+        assert audio.headers["x-job-status"] == "completed"
+        with wave.open(BytesIO(audio.content), "rb") as wf:
+            assert wf.getnframes() == 2048
+        assert int(audio.headers["content-length"]) == len(audio.content)
+
+    def test_job_hidden_from_other_household_of_same_app(self, client):
+        job_id = client.post("/speak/jobs", json={"text": "Once upon a time."}).json()["job_id"]
+        self._wait(client, job_id)
+        app.dependency_overrides[verify_app_auth] = lambda: _make_auth_result(household_id="household-456")
+        assert client.get(f"/speak/jobs/{job_id}").status_code == 404
+        assert client.get(f"/speak/jobs/{job_id}/audio").status_code == 404
+
+    def test_create_job_while_shutting_down_returns_503(self, client, monkeypatch):
+        import app.main as main_mod
+        from app.services.jobs import JobManager
+        from app.services.scheduler import SynthesisScheduler
+
+        stopped = SynthesisScheduler(workers=1)
+        stopped.shutdown()
+        monkeypatch.setattr(main_mod, "_job_manager", JobManager(stopped, ttl_seconds=60, max_total_bytes=1000))
+        resp = client.post("/speak/jobs", json={"text": "Once upon a time."})
+        assert resp.status_code == 503
+
+    def test_job_uses_job_input_limit(self, client, monkeypatch):
+        monkeypatch.setenv("TTS_MAX_INPUT_CHARS", "10")
+        monkeypatch.setenv("TTS_JOB_MAX_INPUT_CHARS", "40")
+        accepted = client.post("/speak/jobs", json={"text": "Once upon a time. The end."})
+        rejected = client.post("/speak/jobs", json={"text": "Once upon a time. " * 3})
+        assert accepted.status_code == 202
+        assert rejected.status_code == 413
+
+    def test_job_empty_text_returns_400(self, client):
+        resp = client.post("/speak/jobs", json={"text": ""})
+        assert resp.status_code == 400
+
+    def test_unknown_job_returns_404(self, client):
+        assert client.get("/speak/jobs/nope").status_code == 404
+        assert client.get("/speak/jobs/nope/audio").status_code == 404
+
+    def test_jobs_require_auth(self, unauthenticated_client):
+        resp = unauthenticated_client.post("/speak/jobs", json={"text": "Hi"})
+        assert resp.status_code in (401, 422)
 
 # ---------------------------------------------------------------------------
 # POST /generate-wake-response
@@ -245,6 +825,60 @@ class TestGenerateWakeResponse:
 
         assert captured_url == "http://custom-host:9000/api/v2/lightweight/chat"
 
+    def test_wake_response_cut_at_first_sentence(self, client, env_vars, monkeypatch):
+        monkeypatch.setenv("TTS_WAKE_CUTOFF_ENABLED", "true")
+        lines = self._make_stream_lines(["At your service.", " Shall I", " fetch the paper?"])
+        mock_resp = AsyncMock()
+        mock_resp.raise_for_status = MagicMock()
+        mock_resp.aiter_lines = _async_line_iter(lines)
+
+        mock_client = AsyncMock()
+        mock_client.stream = _fake_stream_context(mock_resp)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+
+        with patch("app.main.httpx.AsyncClient", return_value=mock_client):
+            resp = client.post("/generate-wake-response")
+
+        assert resp.json() == {"text": "At your service."}
+
+    def test_wake_response_deadline_falls_back(self, client, env_vars, monkeypatch):
+        from app.services.metrics import get_metrics
+
+        monkeypatch.setenv("TTS_WAKE_CUTOFF_ENABLED", "true")
+        monkeypatch.setenv("TTS_WAKE_DEADLINE_MS", "20")
+        monkeypatch.setenv("TTS_WAKE_FALLBACK_TEXT", "At your service?")
+
+        async def _stalled():
+            await asyncio.sleep(5)
+            yield json.dumps({"response": "Too late."})
+
+        mock_resp = AsyncMock()
+        mock_resp.raise_for_status = MagicMock()
+        mock_resp.aiter_lines = _stalled
+
+        mock_client = AsyncMock()
+        mock_client.stream = _fake_stream_context(mock_resp)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+
+        with patch("app.main.httpx.AsyncClient", return_value=mock_client):
+            resp = client.post("/generate-wake-response")
+
+        assert resp.json() == {"text": "At your service?"}
+        assert get_metrics().get_counter("wake_llm_cutoff_total", reason="deadline") >= 1
+
+    def test_wake_response_past_deadline_skips_llm(self, client, env_vars):
+        from app.services.metrics import get_metrics
+
+        get_metrics().reset()
+        with patch("app.main.httpx.AsyncClient") as mock_client_cls:
+            resp = client.post("/generate-wake-response", headers={"X-Request-Timeout-Ms": "-5"})
+
+        assert resp.status_code == 504
+        mock_client_cls.assert_not_called()
+        assert get_metrics().get_counter("deadline_exceeded_total", route="wake", stage="queued") == 1
+
     def test_wake_response_requires_auth(self, unauthenticated_client):
         resp = unauthenticated_client.post("/generate-wake-response")
         assert resp.status_code in (401, 422)
@@ -268,6 +902,8 @@ class TestSetupRemoteLogging:
             # Should return early; no error
 
     def test_enabled_with_valid_config(self):
+        import app.main as main_mod
+
         mock_init = MagicMock()
         mock_handler_cls = MagicMock()
 
@@ -279,10 +915,32 @@ class TestSetupRemoteLogging:
                  "JARVIS_APP_KEY": "test-key",
              }):
             _setup_remote_logging()
+        main_mod._shutdown_remote_logging()
 
         mock_init.assert_called_once_with(app_id="jarvis-tts", app_key="test-key")
         mock_handler_cls.assert_called_once()
 
+    def test_remote_handler_is_queued_and_closed_on_shutdown(self):
+        import logging
+
+        import app.main as main_mod
+        from app.services.log_shipping import BatchingLogHandler
+
+        target = MagicMock(level=logging.DEBUG)
+        with patch("app.main._jarvis_log_available", True), \
+             patch("app.main.init_log_client"), \
+             patch("app.main.JarvisLogHandler", return_value=target), \
+             patch.dict("os.environ", {"JARVIS_APP_KEY": "test-key"}):
+            _setup_remote_logging()
+        handler = main_mod._jarvis_handler
+        assert isinstance(handler, BatchingLogHandler)
+        assert handler in logging.getLogger("uvicorn").handlers
+
+        main_mod._shutdown_remote_logging()
+        assert handler not in logging.getLogger("uvicorn").handlers
+        assert main_mod._jarvis_handler is None
+        target.close.assert_called_once()
+
 
 # ---------------------------------------------------------------------------
 # Startup event
@@ -290,15 +948,128 @@ class TestSetupRemoteLogging:
 
 class TestStartupEvent:
 
-    def test_startup_calls_setup_remote_logging(self):
+    def test_startup_calls_setup_remote_logging(self, monkeypatch):
+        import app.main as main_mod
+
+        # startup assigns these; keep the mocks from leaking into other tests
+        monkeypatch.setattr(main_mod._speech, "phrase_bank", None)
+        monkeypatch.setattr(main_mod._speech, "audio_store", None)
+        monkeypatch.setattr(main_mod._speech, "audio_cache", None)
+        monkeypatch.setattr(main_mod, "_voice_watch_task", None)
         with patch("app.main._setup_remote_logging") as mock_setup, \
-             patch("app.main.service_config") as mock_config:
+             patch("app.main.service_config") as mock_config, \
+             patch("app.main.PhraseBankStore"), \
+             patch("app.main.create_audio_store"):
             import asyncio
             from app.main import startup_event
             asyncio.run(startup_event())
             mock_setup.assert_called_once()
             mock_config.init.assert_called_once()
 
+    def test_startup_loads_voice_and_reports_phases(self, monkeypatch):
+        import app.main as main_mod
+        from app.services.metrics import get_metrics
+
+        get_metrics().reset()
+        monkeypatch.setattr(main_mod._speech, "phrase_bank", None)
+        monkeypatch.setattr(main_mod._speech, "audio_store", None)
+        monkeypatch.setattr(main_mod._speech, "audio_cache", None)
+        monkeypatch.setattr(main_mod, "_voice_watch_task", None)
+        monkeypatch.setattr(main_mod, "voice", None)
+        with patch("app.main.service_config"), patch("app.main.PhraseBankStore"):
+            asyncio.run(main_mod.startup_event())
+
+        assert isinstance(main_mod.voice, FakePiperVoice)
+        assert main_mod._speech.fallback_voice is None
+        for phase in ("config", "voice", "caches", "grpc"):
+            assert get_metrics().get_summary("startup_phase_seconds", phase=phase) is not None
+
+    def test_startup_builds_pinned_worker_sessions(self, monkeypatch):
+        import sys
+        from types import SimpleNamespace
+
+        import app.main as main_mod
+        from app.services.scheduler import reset_scheduler
+        from app.startup_report import StartupReport
+
+        class Session:
+            def run(self, outputs, inputs, run_options=None):
+                return []
+
+        class SessionVoice(FakePiperVoice):
+            def __init__(self):
+                self.session = Session()
+
+            def synthesize(self, text):
+                self.session.run(None, {})
+                yield from super().synthesize(text)
+
+        built = []
+        ort = sys.modules["onnxruntime"]
+        monkeypatch.setattr(ort, "SessionOptions", SimpleNamespace, raising=False)
+        monkeypatch.setattr(ort, "ExecutionMode", SimpleNamespace(ORT_SEQUENTIAL=0), raising=False)
+        monkeypatch.setattr(ort, "InferenceSession", lambda *a, **kw: built.append(kw) or Session(), raising=False)
+        monkeypatch.setattr(sys.modules["piper"], "PiperVoice", SessionVoice)
+        monkeypatch.setenv("TTS_WORKER_PINNING", "true")
+        monkeypatch.setenv("TTS_SYNTHESIS_WORKERS", "2")
+        monkeypatch.setattr(main_mod._speech, "phrase_bank", None)
+        monkeypatch.setattr(main_mod._speech, "audio_store", None)
+        monkeypatch.setattr(main_mod._speech, "audio_cache", None)
+        monkeypatch.setattr(main_mod, "_voice_watch_task", None)
+        monkeypatch.setattr(main_mod, "voice", None)
+        report = StartupReport(started=0.0)
+        monkeypatch.setattr(main_mod, "get_startup_report", lambda: report)
+        reset_scheduler()
+        try:
+            with patch("app.main.service_config"), patch("app.main.PhraseBankStore"):
+                asyncio.run(main_mod.startup_event())
+            # Both workers' sessions exist before any request
+            assert len(main_mod.voice.session) == 2
+            assert len(built) == 2
+        finally:
+            reset_scheduler()
+        assert any("3 ORT sessions (2 per-worker model copies)" in note for note in report.notes)
+
+    def test_startup_loads_degraded_voice(self, monkeypatch):
+        import app.main as main_mod
+        from app.services.degradation import reset_load_governor
+
+        monkeypatch.setenv("TTS_DEGRADED_VOICE", "en_GB-alan-x_low")
+        monkeypatch.setattr(main_mod._speech, "fallback_voice", None)
+        monkeypatch.setattr(main_mod._speech, "governor", None)
+        reset_load_governor()
+        try:
+            main_mod._load_fallback_voice()
+            name, fallback = main_mod._speech.fallback_voice
+            assert name == "en_GB-alan-x_low"
+            assert isinstance(fallback, FakePiperVoice)
+            assert main_mod._speech.governor.policy.voice == name
+        finally:
+            reset_load_governor()
+
+    @pytest.mark.asyncio
+    async def test_voice_watch_started_and_cancelled(self, monkeypatch):
+        import app.main as main_mod
+
+        monkeypatch.setattr(main_mod, "_voice_watch_task", None)
+        monkeypatch.setenv("TTS_VOICE_WATCH_INTERVAL_SECONDS", "60")
+        main_mod._start_voice_watch()
+        task = main_mod._voice_watch_task
+        assert task is not None and not task.done()
+
+        await main_mod.shutdown_event()
+        assert main_mod._voice_watch_task is None
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+    def test_voice_watch_disabled_with_zero_interval(self, monkeypatch):
+        import app.main as main_mod
+
+        monkeypatch.setattr(main_mod, "_voice_watch_task", None)
+        monkeypatch.setenv("TTS_VOICE_WATCH_INTERVAL_SECONDS", "0")
+        main_mod._start_voice_watch()
+        assert main_mod._voice_watch_task is None
+
 
 # ---------------------------------------------------------------------------
 # Helpers
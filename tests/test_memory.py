@@ -0,0 +1,134 @@
+"""Tests for app/services/memory.py – memory instrumentation.
+
+Covers:
+- RSS helpers
+- VoiceMemoryTracker: per-voice entries, extra sessions, release on GC
+- MemorySamplingMiddleware: sampling ratio, tracemalloc peak and RSS delta summaries
+"""
+
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+from app.services.memory import (
+    MemorySamplingMiddleware,
+    VoiceMemoryTracker,
+    mib,
+    peak_rss_bytes,
+    rss_bytes,
+)
+from app.services.metrics import get_metrics
+
+
+class Voice:
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+class TestRss:
+
+    def test_rss_is_positive(self):
+        assert rss_bytes() > 0
+        assert peak_rss_bytes() >= rss_bytes() // 2
+
+    def test_mib(self):
+        assert mib(3 * 1024 * 1024) == 3.0
+
+
+class TestVoiceMemoryTracker:
+
+    def test_track_and_snapshot(self, tmp_path):
+        model = tmp_path / "voice.onnx"
+        model.write_bytes(b"x" * 100)
+        tracker = VoiceMemoryTracker()
+        voice = Voice()
+        tracker.track("alan", voice, 5000, model)
+        [entry] = tracker.snapshot()
+        assert entry["voice"] == "alan"
+        assert entry["model_bytes"] == 100
+        assert entry["resident_bytes"] == 5000
+        assert entry["sessions"] == 1
+
+    def test_worker_sessions_add_to_newest_entry(self):
+        tracker = VoiceMemoryTracker()
+        old, new = Voice(), Voice()
+        tracker.track("alan", old, 100)
+        tracker.track("alan", new, 100)
+        tracker.add_session("alan", 50)
+        tracker.add_session("unknown", 50)
+        entries = tracker.snapshot()
+        assert [e["sessions"] for e in entries] == [1, 2]
+        assert entries[1]["resident_bytes"] == 150
+
+    def test_released_voice_is_dropped(self):
+        tracker = VoiceMemoryTracker()
+        voice = Voice()
+        tracker.track("alan", voice, 100)
+        del voice
+        gc.collect()
+        assert tracker.snapshot() == []
+
+    def test_negative_delta_clamped(self):
+        tracker = VoiceMemoryTracker()
+        voice = Voice()
+        tracker.track("alan", voice, -10)
+        assert tracker.snapshot()[0]["resident_bytes"] == 0
+
+
+async def _allocating_app(scope, receive, send):
+    data = bytearray(2_000_000)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": bytes(data[:1])})
+
+
+async def _run(middleware) -> list[dict]:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    await middleware({"type": "http", "path": "/speak", "method": "POST"}, receive, send)
+    return messages
+
+
+class TestMemorySamplingMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_sampled_request_records_peak(self):
+        middleware = MemorySamplingMiddleware(_allocating_app, sample_ratio=1.0)
+        messages = await _run(middleware)
+        assert messages[0]["status"] == 200
+        peak = get_metrics().get_summary("request_python_peak_bytes", route="unmatched")
+        assert peak["count"] == 1
+        assert peak["p50"] >= 2_000_000
+        assert get_metrics().get_summary("request_rss_delta_bytes", route="unmatched")["count"] == 1
+        assert not tracemalloc.is_tracing()
+
+    @pytest.mark.asyncio
+    async def test_unsampled_request_untouched(self):
+        middleware = MemorySamplingMiddleware(_allocating_app, sample_ratio=0.0)
+        await _run(middleware)
+        assert get_metrics().get_summary("request_python_peak_bytes", route="unmatched") is None
+
+    @pytest.mark.asyncio
+    async def test_ratio_applied(self):
+        middleware = MemorySamplingMiddleware(_allocating_app, sample_ratio=0.5, rng=random.Random(1))
+        for _ in range(40):
+            await _run(middleware)
+        count = get_metrics().get_summary("request_python_peak_bytes", route="unmatched")["count"]
+        assert 5 < count < 35
+
+    @pytest.mark.asyncio
+    async def test_ratio_read_from_settings(self, monkeypatch):
+        monkeypatch.setenv("TTS_MEMORY_SAMPLE_RATIO", "1")
+        await _run(MemorySamplingMiddleware(_allocating_app))
+        assert get_metrics().get_summary("request_rss_delta_bytes", route="unmatched")["count"] == 1
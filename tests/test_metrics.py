@@ -0,0 +1,53 @@
+"""Tests for app/services/metrics.py – in-process metrics registry."""
+
+import pytest
+
+from app.services.metrics import MetricsRegistry, get_metrics
+
+
+class TestMetricsRegistry:
+
+    def test_counters_accumulate(self):
+        metrics = MetricsRegistry()
+        metrics.increment("requests_total")
+        metrics.increment("requests_total", 2)
+        assert metrics.get_counter("requests_total") == 3
+
+    def test_labels_are_part_of_name(self):
+        metrics = MetricsRegistry()
+        metrics.increment("hits_total", voice="b", app="a")
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"] == {'hits_total{app="a",voice="b"}': 1}
+        assert metrics.get_counter("hits_total", app="a", voice="b") == 1
+
+    def test_gauges_evaluated_on_snapshot(self):
+        metrics = MetricsRegistry()
+        value = [1]
+        metrics.register_gauge("depth", lambda: value[0])
+        value[0] = 5
+        assert metrics.snapshot()["gauges"] == {"depth": 5}
+
+    def test_summary_percentiles(self):
+        metrics = MetricsRegistry()
+        for i in range(1, 101):
+            metrics.observe("latency_seconds", i / 100, voice="v")
+        summary = metrics.get_summary("latency_seconds", voice="v")
+        assert summary["count"] == 100
+        assert summary["sum"] == pytest.approx(50.5)
+        assert summary["p50"] == pytest.approx(0.5)
+        assert summary["p99"] == pytest.approx(0.99)
+        assert 'latency_seconds{voice="v"}' in metrics.snapshot()["summaries"]
+
+    def test_unobserved_summary_is_none(self):
+        assert MetricsRegistry().get_summary("nothing") is None
+
+    def test_reset_clears_counters(self):
+        metrics = MetricsRegistry()
+        metrics.increment("x")
+        metrics.observe("y", 1.0)
+        metrics.reset()
+        assert metrics.get_counter("x") == 0
+        assert metrics.get_summary("y") is None
+
+    def test_singleton(self):
+        assert get_metrics() is get_metrics()
@@ -0,0 +1,201 @@
+"""Tests for app/services/ort_session.py – ONNX Runtime session settings.
+
+Covers:
+- SessionMemoryOptions from settings
+- create_session(): arena / memory pattern / thread options and shrinkage RunOptions
+- ManagedSession applies default RunOptions
+- load_voice(): one session, built with the memory options when they are not the defaults
+- configure_voice_session(): per-worker sessions tracked
+"""
+
+import json
+import sys
+import types
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from app.services import worker_topology
+from app.services.memory import get_voice_memory, reset_voice_memory
+from app.services.ort_session import (
+    ManagedSession,
+    SessionMemoryOptions,
+    configure_voice_session,
+    create_session,
+    get_session_memory_options,
+    load_voice,
+)
+from app.services.worker_topology import PerWorkerSession, WorkerSlot
+
+
+class FakeSessionOptions:
+    pass
+
+
+class FakeRunOptions:
+
+    def __init__(self):
+        self.entries = {}
+
+    def add_run_config_entry(self, key, value):
+        self.entries[key] = value
+
+
+class FakeInferenceSession:
+
+    def __init__(self, path, sess_options=None, providers=None):
+        self.path = path
+        self.options = sess_options
+        self.providers = providers
+        self.calls = []
+
+    def run(self, output_names, input_feed, run_options=None):
+        self.calls.append(run_options)
+        return ["audio"]
+
+
+class FakeExecutionMode:
+    ORT_SEQUENTIAL = "sequential"
+
+
+@pytest.fixture
+def fake_ort(monkeypatch):
+    ort = sys.modules["onnxruntime"]
+    monkeypatch.setattr(ort, "SessionOptions", FakeSessionOptions, raising=False)
+    monkeypatch.setattr(ort, "RunOptions", FakeRunOptions, raising=False)
+    monkeypatch.setattr(ort, "InferenceSession", FakeInferenceSession, raising=False)
+    monkeypatch.setattr(ort, "ExecutionMode", FakeExecutionMode, raising=False)
+    return ort
+
+
+@pytest.fixture(autouse=True)
+def _reset_tracker():
+    reset_voice_memory()
+    yield
+    reset_voice_memory()
+
+
+class Voice:
+
+    def __init__(self):
+        self.session = FakeInferenceSession("piper-default")
+
+
+class TestOptions:
+
+    def test_defaults(self):
+        options = get_session_memory_options()
+        assert options == SessionMemoryOptions()
+        assert options.is_default
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_ORT_CPU_MEM_ARENA", "false")
+        monkeypatch.setenv("TTS_ORT_MEM_PATTERN", "false")
+        monkeypatch.setenv("TTS_ORT_ARENA_SHRINKAGE", "true")
+        options = get_session_memory_options()
+        assert options == SessionMemoryOptions(cpu_mem_arena=False, mem_pattern=False, arena_shrinkage=True)
+        assert not options.is_default
+
+
+class TestCreateSession:
+
+    def test_memory_options_applied(self, fake_ort):
+        managed = create_session("voice.onnx", SessionMemoryOptions(cpu_mem_arena=False, mem_pattern=False))
+        options = managed.session.options
+        assert options.enable_cpu_mem_arena is False
+        assert options.enable_mem_pattern is False
+        assert not hasattr(options, "intra_op_num_threads")
+        assert managed.session.providers == ["CPUExecutionProvider"]
+        assert managed.run_options is None
+
+    def test_threads(self, fake_ort):
+        managed = create_session("voice.onnx", SessionMemoryOptions(), threads=2)
+        assert managed.session.options.intra_op_num_threads == 2
+        assert managed.session.options.inter_op_num_threads == 1
+
+    def test_shrinkage_run_options(self, fake_ort):
+        managed = create_session("voice.onnx", SessionMemoryOptions(arena_shrinkage=True))
+        assert managed.run_options.entries == {"memory.enable_memory_arena_shrinkage": "cpu:0"}
+        managed.run(None, {})
+        assert managed.session.calls == [managed.run_options]
+
+    def test_shrinkage_needs_arena(self, fake_ort):
+        managed = create_session("voice.onnx", SessionMemoryOptions(cpu_mem_arena=False, arena_shrinkage=True))
+        assert managed.run_options is None
+
+    def test_explicit_run_options_win(self):
+        inner = FakeInferenceSession("voice.onnx")
+        managed = ManagedSession(inner, run_options="default")
+        managed.run(None, {}, run_options="explicit")
+        assert inner.calls == ["explicit"]
+        assert managed.path == "voice.onnx"
+
+
+@dataclass
+class FakeConfig:
+    values: dict
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values)
+
+
+@dataclass
+class PiperVoice:
+    """Mimics piper.PiperVoice: load() builds ORT's default session."""
+
+    session: Any
+    config: Any
+
+    @classmethod
+    def load(cls, model_path, config_path=None):
+        return cls(FakeInferenceSession("piper-default"), None)
+
+
+@pytest.fixture
+def fake_piper(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys.modules["piper"], "PiperVoice", PiperVoice)
+    monkeypatch.setitem(sys.modules, "piper.config", types.SimpleNamespace(PiperConfig=FakeConfig))
+    config_path = tmp_path / "voice.onnx.json"
+    config_path.write_text(json.dumps({"audio": {"sample_rate": 16000}}))
+    return config_path
+
+
+class TestLoadVoice:
+
+    def test_default_options_keep_piper_session(self, fake_ort, fake_piper):
+        voice = load_voice("alan", "voice.onnx", fake_piper, SessionMemoryOptions())
+        assert voice.session.path == "piper-default"
+
+    def test_non_default_options_build_one_session(self, fake_ort, fake_piper):
+        sessions = []
+
+        def create(model_path, memory, threads=0):
+            sessions.append(create_session(model_path, memory, threads))
+            return sessions[-1]
+
+        voice = load_voice("alan", "voice.onnx", fake_piper, SessionMemoryOptions(mem_pattern=False), create=create)
+        assert voice.session is sessions[0]
+        assert len(sessions) == 1
+        assert isinstance(voice.session, ManagedSession)
+        assert voice.session.session.options.enable_mem_pattern is False
+        assert voice.config.values == {"audio": {"sample_rate": 16000}}
+
+
+class TestConfigureVoiceSession:
+
+    def test_voice_without_session(self):
+        voice = object()
+        assert configure_voice_session(voice, "alan", "voice.onnx", SessionMemoryOptions(mem_pattern=False)) is voice
+
+    def test_per_worker_sessions_are_tracked(self, fake_ort, monkeypatch):
+        voice = Voice()
+        get_voice_memory().track("alan", voice, 100)
+        configure_voice_session(voice, "alan", "voice.onnx", SessionMemoryOptions(), per_worker=True)
+        assert isinstance(voice.session, PerWorkerSession)
+
+        # Act as a pinned worker without changing this thread's affinity
+        monkeypatch.setattr(worker_topology._local, "slot", WorkerSlot(index=0, cpus=(0,), threads=1), raising=False)
+        assert voice.session.run(None, {}) == ["audio"]
+        assert get_voice_memory().snapshot()[0]["sessions"] == 2
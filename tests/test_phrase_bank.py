@@ -0,0 +1,124 @@
+"""Tests for app/services/phrase_bank.py – packed, memory-mapped phrase bank.
+
+Covers:
+- write_phrase_bank() layout and deduplication
+- PhraseBank lookups (hits, misses, zero-copy slices)
+- Malformed files
+- PhraseBankStore atomic reload on file replacement
+- CLI phrase list parsing
+"""
+
+import os
+
+import pytest
+
+from app.services.phrase_bank import (
+    PhraseBank,
+    PhraseBankError,
+    PhraseBankStore,
+    _read_phrases,
+    write_phrase_bank,
+)
+
+
+@pytest.fixture
+def bank_path(tmp_path):
+    return tmp_path / "phrases.bank"
+
+
+class TestPhraseBank:
+
+    def test_round_trip(self, bank_path):
+        count = write_phrase_bank(bank_path, [
+            ("voice-a", "Hello", b"WAV-hello"),
+            ("voice-a", "Goodbye", b"WAV-goodbye"),
+            ("voice-b", "Hello", b"WAV-b-hello"),
+        ])
+        bank = PhraseBank(bank_path)
+        assert count == 3
+        assert len(bank) == 3
+        assert bytes(bank.lookup("voice-a", "Hello")) == b"WAV-hello"
+        assert bytes(bank.lookup("voice-a", "Goodbye")) == b"WAV-goodbye"
+        assert bytes(bank.lookup("voice-b", "Hello")) == b"WAV-b-hello"
+
+    def test_lookup_returns_memoryview(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"clip")])
+        clip = PhraseBank(bank_path).lookup("v", "Hi")
+        assert isinstance(clip, memoryview)
+
+    def test_miss_returns_none(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"clip")])
+        bank = PhraseBank(bank_path)
+        assert bank.lookup("v", "hi") is None
+        assert bank.lookup("other", "Hi") is None
+
+    def test_many_entries(self, bank_path):
+        clips = [("v", f"phrase {i}", f"clip-{i}".encode()) for i in range(500)]
+        write_phrase_bank(bank_path, clips)
+        bank = PhraseBank(bank_path)
+        for i in (0, 123, 499):
+            assert bytes(bank.lookup("v", f"phrase {i}")) == f"clip-{i}".encode()
+
+    def test_duplicates_are_skipped(self, bank_path):
+        count = write_phrase_bank(bank_path, [("v", "Hi", b"first"), ("v", "Hi", b"second")])
+        assert count == 1
+        assert bytes(PhraseBank(bank_path).lookup("v", "Hi")) == b"first"
+
+    def test_empty_bank(self, bank_path):
+        write_phrase_bank(bank_path, [])
+        assert PhraseBank(bank_path).lookup("v", "Hi") is None
+
+    def test_bad_magic_raises(self, bank_path):
+        bank_path.write_bytes(b"x" * 64)
+        with pytest.raises(PhraseBankError):
+            PhraseBank(bank_path)
+
+    def test_missing_file_raises(self, bank_path):
+        with pytest.raises(PhraseBankError):
+            PhraseBank(bank_path)
+
+    def test_no_temp_files_left_behind(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"clip")])
+        assert [p.name for p in bank_path.parent.iterdir()] == ["phrases.bank"]
+
+
+class TestPhraseBankStore:
+
+    def test_missing_file_serves_nothing(self, bank_path):
+        store = PhraseBankStore(bank_path)
+        assert store.get("v", "Hi") is None
+        assert len(store) == 0
+
+    def test_reloads_when_file_replaced(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"old")])
+        store = PhraseBankStore(bank_path, check_interval=0)
+        old_clip = store.get("v", "Hi")
+        assert bytes(old_clip) == b"old"
+
+        write_phrase_bank(bank_path, [("v", "Hi", b"new"), ("v", "Bye", b"bye")])
+        assert bytes(store.get("v", "Hi")) == b"new"
+        assert len(store) == 2
+        # Slices from the previous mapping stay readable
+        assert bytes(old_clip) == b"old"
+
+    def test_corrupt_replacement_keeps_previous_bank(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"old")])
+        store = PhraseBankStore(bank_path, check_interval=0)
+        corrupt = bank_path.with_suffix(".tmp")
+        corrupt.write_bytes(b"garbage" * 10)
+        os.replace(corrupt, bank_path)
+        assert bytes(store.get("v", "Hi")) == b"old"
+
+    def test_check_interval_limits_stat_calls(self, bank_path):
+        write_phrase_bank(bank_path, [("v", "Hi", b"old")])
+        store = PhraseBankStore(bank_path, check_interval=3600)
+        write_phrase_bank(bank_path, [("v", "Hi", b"new")])
+        assert bytes(store.get("v", "Hi")) == b"old"
+
+
+class TestReadPhrases:
+
+    def test_skips_blank_lines_and_comments(self, tmp_path):
+        path = tmp_path / "phrases.txt"
+        path.write_text("# greetings\nHello\n\n  At your service.  \n")
+        assert _read_phrases(path) == ["Hello", "At your service."]
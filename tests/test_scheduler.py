@@ -0,0 +1,354 @@
+"""Tests for app/services/scheduler.py – priority synthesis scheduler.
+
+Covers:
+- submit() results and exceptions
+- Priority ordering of queued steps
+- Async run() / iterate() helpers; iterate() closes its iterator when abandoned
+- on_each_worker(): one call per worker, ahead of queued steps
+- Shutdown
+- Tenant fairness: interleaving, weights, per-tenant concurrency cap
+- TenantPolicy / parse_weights() / Tenant.from_auth() / settings
+- Steps past their deadline are dropped before running
+- Shortest job first within a tenant queue, aging, FIFO when disabled
+- Queue wait and step context reach the submitting request's timer
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services.metrics import get_metrics
+from app.services.scheduler import (
+    Priority,
+    SynthesisScheduler,
+    Tenant,
+    TenantPolicy,
+    get_tenant_policy,
+    parse_weights,
+)
+from app.services.timing import RequestTimer, current_timer
+
+
+@pytest.fixture
+def scheduler():
+    sched = SynthesisScheduler(workers=1)
+    yield sched
+    sched.shutdown(wait=False)
+
+
+def _block(scheduler: SynthesisScheduler) -> threading.Event:
+    """Occupy the single worker until the returned event is set."""
+    gate = threading.Event()
+    started = threading.Event()
+
+    def _wait():
+        started.set()
+        gate.wait(timeout=5)
+
+    scheduler.submit(_wait)
+    started.wait(timeout=5)
+    return gate
+
+
+class TestSynthesisScheduler:
+
+    def test_submit_returns_result(self, scheduler):
+        assert scheduler.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+
+    def test_submit_propagates_exception(self, scheduler):
+        def boom():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError):
+            scheduler.submit(boom).result(timeout=5)
+
+    def test_interactive_runs_before_background(self, scheduler):
+        gate = _block(scheduler)
+        order: list[str] = []
+        futures = [
+            scheduler.submit(order.append, "bg1", priority=Priority.BACKGROUND),
+            scheduler.submit(order.append, "bg2", priority=Priority.BACKGROUND),
+            scheduler.submit(order.append, "fg", priority=Priority.INTERACTIVE),
+        ]
+        assert scheduler.queue_depth() == 3
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order == ["fg", "bg1", "bg2"]
+
+    def test_run_awaits_result(self, scheduler):
+        assert asyncio.run(scheduler.run(sum, [1, 2, 3])) == 6
+
+    def test_iterate_yields_all_items(self, scheduler):
+        async def collect():
+            return [item async for item in scheduler.iterate(iter([1, 2, 3]))]
+
+        assert asyncio.run(collect()) == [1, 2, 3]
+
+    def test_iterate_closes_iterator_when_closed_early(self, scheduler):
+        closed = []
+
+        def items():
+            try:
+                yield from [1, 2, 3]
+            finally:
+                closed.append(True)
+
+        async def first():
+            steps = scheduler.iterate(items())
+            item = await anext(steps)
+            await steps.aclose()
+            return item
+
+        assert asyncio.run(first()) == 1
+        assert closed == [True]
+
+    def test_iterate_cancelled_mid_step_closes_after_step(self, scheduler):
+        running = threading.Event()
+        release = threading.Event()
+        closed = threading.Event()
+
+        def items():
+            try:
+                yield 1
+                running.set()
+                release.wait(timeout=5)
+                yield 2
+            finally:
+                closed.set()
+
+        async def cancel_during_step():
+            async def consume():
+                async for _ in scheduler.iterate(items()):
+                    pass
+
+            task = asyncio.create_task(consume())
+            await asyncio.to_thread(running.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_during_step())
+        # Not closed under the running step; closed once it returns
+        assert not closed.is_set()
+        release.set()
+        assert closed.wait(timeout=5)
+
+    def test_on_each_worker_runs_once_on_every_worker(self):
+        scheduler = SynthesisScheduler(workers=3)
+        try:
+            futures = scheduler.on_each_worker(lambda: threading.current_thread().name)
+            names = [f.result(timeout=5) for f in futures]
+        finally:
+            scheduler.shutdown()
+        assert sorted(names) == ["tts-synth-0", "tts-synth-1", "tts-synth-2"]
+
+    def test_on_each_worker_runs_before_queued_steps(self, scheduler):
+        order = []
+        gate = _block(scheduler)
+        queued = scheduler.submit(order.append, "step")
+        (call,) = scheduler.on_each_worker(order.append, "call")
+        gate.set()
+        queued.result(timeout=5)
+        call.result(timeout=5)
+        assert order == ["call", "step"]
+
+    def test_shutdown_rejects_new_work(self, scheduler):
+        scheduler.shutdown()
+        with pytest.raises(RuntimeError):
+            scheduler.submit(lambda: None)
+
+    def test_step_past_deadline_is_dropped(self, scheduler):
+        get_metrics().reset()
+        gate = _block(scheduler)
+        calls = []
+        late = scheduler.submit(calls.append, "late", deadline=Deadline.after(0.01))
+        on_time = scheduler.submit(calls.append, "on time", deadline=Deadline.after(60))
+        time.sleep(0.02)
+        gate.set()
+        with pytest.raises(DeadlineExceeded):
+            late.result(timeout=5)
+        on_time.result(timeout=5)
+        assert calls == ["on time"]
+        assert get_metrics().get_counter("scheduler_deadline_dropped_total", priority="interactive") == 1
+
+    def test_invalid_worker_count(self):
+        with pytest.raises(ValueError):
+            SynthesisScheduler(workers=0)
+
+
+HEAVY = Tenant("reader", "house-a")
+LIGHT = Tenant("jarvis-node", "house-b")
+
+
+class TestTenantFairness:
+
+    def test_light_tenant_not_queued_behind_heavy_one(self, scheduler):
+        gate = _block(scheduler)
+        order: list[str] = []
+        futures = [scheduler.submit(order.append, f"heavy{i}", tenant=HEAVY) for i in range(4)]
+        futures.append(scheduler.submit(order.append, "light", tenant=LIGHT))
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order[:2] == ["heavy0", "light"]
+
+    def test_weights_share_worker_time(self, monkeypatch):
+        import app.services.scheduler as scheduler_mod
+
+        # Each step takes exactly 10 ms on a fake clock: real sleeps overshoot
+        # under load and skew the virtual times
+        now = [0.0]
+        monkeypatch.setattr(scheduler_mod, "time", SimpleNamespace(perf_counter=lambda: now[0]))
+        scheduler = SynthesisScheduler(workers=1, policy=TenantPolicy(app_weights={"reader": 2}))
+        try:
+            gate = _block(scheduler)
+            order: list[Tenant] = []
+
+            def step(tenant):
+                now[0] += 0.01
+                order.append(tenant)
+
+            futures = [scheduler.submit(step, HEAVY, tenant=HEAVY) for _ in range(8)]
+            futures += [scheduler.submit(step, LIGHT, tenant=LIGHT) for _ in range(8)]
+            gate.set()
+            for f in futures:
+                f.result(timeout=5)
+        finally:
+            scheduler.shutdown(wait=False)
+        # Roughly 2:1 while both have work; plain FIFO would give 6:0
+        assert 4 <= order[:6].count(HEAVY) <= 5
+
+    def test_priority_still_wins_over_fairness(self, scheduler):
+        gate = _block(scheduler)
+        order: list[str] = []
+        futures = [
+            scheduler.submit(order.append, "bg", priority=Priority.BACKGROUND, tenant=LIGHT),
+            scheduler.submit(order.append, "fg", tenant=HEAVY),
+        ]
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order == ["fg", "bg"]
+
+    def test_concurrency_cap_leaves_workers_for_others(self):
+        scheduler = SynthesisScheduler(workers=2, policy=TenantPolicy(max_concurrency=1))
+        gate = threading.Event()
+        try:
+            first = scheduler.submit(gate.wait, 5, tenant=HEAVY)
+            second = scheduler.submit(gate.wait, 5, tenant=HEAVY)
+            light = scheduler.submit(lambda: "done", tenant=LIGHT)
+            # HEAVY holds one worker; its second step must not take the other
+            assert light.result(timeout=5) == "done"
+            assert not second.done()
+            gate.set()
+            assert first.result(timeout=5) and second.result(timeout=5)
+        finally:
+            gate.set()
+            scheduler.shutdown(wait=False)
+
+    def test_idle_tenants_are_forgotten(self, scheduler):
+        scheduler.submit(lambda: None, tenant=HEAVY).result(timeout=5)
+        scheduler.submit(lambda: None, tenant=LIGHT).result(timeout=5)
+        deadline = time.monotonic() + 5
+        while scheduler._tenants and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler._tenants == {}
+
+    def test_queue_wait_recorded(self, scheduler):
+        get_metrics().reset()
+        scheduler.submit(lambda: None, priority=Priority.BACKGROUND).result(timeout=5)
+        assert get_metrics().get_summary("scheduler_queue_wait_seconds", priority="background")["count"] == 1
+
+    def test_queue_wait_recorded_as_request_stage(self, scheduler):
+        from app.services import timing
+
+        timer = RequestTimer()
+
+        def in_request():
+            timing._current.set(timer)
+            return scheduler.submit(current_timer).result(timeout=5)
+
+        assert contextvars.Context().run(in_request) is timer
+        assert "queue" in timer.stages
+
+
+class TestShortestJobFirst:
+
+    def test_cheapest_request_runs_first(self, scheduler):
+        gate = _block(scheduler)
+        order: list[str] = []
+        futures = [
+            scheduler.submit(order.append, "long", cost=3.0),
+            scheduler.submit(order.append, "short", cost=0.1),
+            scheduler.submit(order.append, "medium", cost=1.0),
+        ]
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order == ["short", "medium", "long"]
+
+    def test_fifo_when_disabled(self):
+        scheduler = SynthesisScheduler(workers=1, shortest_first=False)
+        try:
+            gate = _block(scheduler)
+            order: list[str] = []
+            futures = [
+                scheduler.submit(order.append, "long", cost=3.0),
+                scheduler.submit(order.append, "short", cost=0.1),
+            ]
+            gate.set()
+            for f in futures:
+                f.result(timeout=5)
+        finally:
+            scheduler.shutdown(wait=False)
+        assert order == ["long", "short"]
+
+    def test_waiting_ages_long_request(self, scheduler):
+        gate = _block(scheduler)
+        order: list[str] = []
+        futures = [scheduler.submit(order.append, "long", cost=0.2)]
+        time.sleep(0.3)
+        # Waited longer than its extra predicted work
+        futures.append(scheduler.submit(order.append, "short", cost=0.05))
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order == ["long", "short"]
+
+    def test_steps_without_cost_stay_fifo(self, scheduler):
+        gate = _block(scheduler)
+        order: list[int] = []
+        futures = [scheduler.submit(order.append, i) for i in range(5)]
+        gate.set()
+        for f in futures:
+            f.result(timeout=5)
+        assert order == list(range(5))
+
+
+class TestTenantPolicy:
+
+    def test_parse_weights(self):
+        assert parse_weights("a=2, b=0.5 ,,c=x,d=-1,=3,e") == {"a": 2.0, "b": 0.5}
+
+    def test_weight_multiplies_app_and_household(self):
+        policy = TenantPolicy(app_weights={"reader": 0.5}, household_weights={"house-a": 4})
+        assert policy.weight(HEAVY) == 2.0
+        assert policy.weight(LIGHT) == 1.0
+
+    def test_tenant_from_auth(self):
+        auth = SimpleNamespace(app=SimpleNamespace(app_id="app"), context=SimpleNamespace(household_id=None))
+        assert Tenant.from_auth(auth) == Tenant("app", "")
+
+    def test_from_settings(self, monkeypatch):
+        monkeypatch.setenv("TTS_TENANT_APP_WEIGHTS", "jarvis-node=4")
+        monkeypatch.setenv("TTS_TENANT_HOUSEHOLD_WEIGHTS", "house-b=0.5")
+        monkeypatch.setenv("TTS_TENANT_MAX_CONCURRENCY", "1")
+        policy = get_tenant_policy()
+        assert policy.weight(LIGHT) == 2.0
+        assert policy.max_concurrency == 1
@@ -0,0 +1,111 @@
+"""Tests for app/startup_report.py – startup-time report.
+
+Covers:
+- ImportProfiler: self vs cumulative time of nested imports, direct
+  imports listed as slowest, uninstall
+- StartupReport: phase timing, render(), finish() metrics and profiler removal
+"""
+
+import sys
+
+import pytest
+
+from app.services.metrics import get_metrics
+from app.startup_report import ImportProfiler, StartupReport
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """A throwaway package whose parent imports a slow child module."""
+    root = tmp_path / "startup_pkg"
+    root.mkdir()
+    (root / "__init__.py").write_text("import time\ntime.sleep(0.01)\nfrom startup_pkg import child\n")
+    (root / "child.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "startup_pkg"
+    for name in ("startup_pkg", "startup_pkg.child"):
+        sys.modules.pop(name, None)
+
+
+class TestImportProfiler:
+
+    def test_nested_import_charged_to_parent_cumulative(self, package):
+        profiler = ImportProfiler().install()
+        try:
+            __import__(package)
+        finally:
+            profiler.uninstall()
+
+        timings = {t.module: t for t in profiler.timings}
+        parent, child = timings["startup_pkg"], timings["startup_pkg.child"]
+        assert (parent.depth, child.depth) == (0, 1)
+        assert child.self_seconds >= 0.05
+        assert parent.cumulative_seconds >= child.cumulative_seconds + 0.01
+        assert parent.self_seconds < child.self_seconds
+
+    def test_slowest_lists_direct_imports(self, package):
+        profiler = ImportProfiler().install()
+        try:
+            __import__(package)
+        finally:
+            profiler.uninstall()
+        assert [t.module for t in profiler.slowest(5)] == ["startup_pkg"]
+
+    def test_uninstall_removes_hook(self):
+        profiler = ImportProfiler().install()
+        assert sys.meta_path[0] is profiler
+        profiler.uninstall()
+        assert profiler not in sys.meta_path
+
+
+class TestStartupReport:
+
+    def test_phases_timed(self):
+        clock = _Clock()
+        report = StartupReport(started=0.0, clock=clock)
+        clock.now = 0.5
+        report.imported()
+        with report.phase("voice"):
+            clock.now = 2.0
+        assert report.phases == [("import", 0.5), ("voice", 1.5)]
+        assert report.render() == "Startup 2.00 s: import 0.50 s, voice 1.50 s"
+
+    def test_notes_listed_under_phases(self):
+        report = StartupReport(started=0.0, clock=_Clock())
+        report.note("Voice alan: 3 ORT sessions")
+        assert report.render().splitlines() == ["Startup 0.00 s: ", "  Voice alan: 3 ORT sessions"]
+
+    def test_phase_recorded_when_it_raises(self):
+        report = StartupReport(started=0.0, clock=_Clock())
+        with pytest.raises(RuntimeError):
+            with report.phase("grpc"):
+                raise RuntimeError("port in use")
+        assert [name for name, _ in report.phases] == ["grpc"]
+
+    def test_finish_exports_metrics_and_stops_profiling(self, package):
+        profiler = ImportProfiler().install()
+        __import__(package)
+        clock = _Clock()
+        report = StartupReport(started=0.0, profiler=profiler, clock=clock)
+        with report.phase("voice"):
+            clock.now = 1.0
+
+        text = report.finish()
+        assert profiler not in sys.meta_path
+        assert "Slowest imports" in text
+        assert "startup_pkg" in text
+        assert get_metrics().get_summary("startup_phase_seconds", phase="voice")["count"] == 1
+        assert report.total() == 1.0
@@ -0,0 +1,241 @@
+"""Tests for app/services/synthesis.py – chunked synthesis pipeline.
+
+Covers:
+- synthesize_pcm() chunking, fast start and audio duration cap
+- Multi-speaker voices: resolve_speaker(), voice_speakers(), speaker_id
+- wav_header() / wav_header_into() layout
+- stream_wav() and render_wav() output
+- instrument_voice() phonemize/inference stage timing
+"""
+
+import contextvars
+import struct
+import wave
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.synthesis import (
+    STREAMING_DATA_SIZE,
+    AudioFormat,
+    SynthesisLimits,
+    UnknownSpeaker,
+    instrument_voice,
+    parse_wav_header,
+    render_wav,
+    resolve_speaker,
+    speaker_voice_key,
+    stream_wav,
+    synthesize_pcm,
+    voice_speakers,
+    wav_header,
+    wav_header_into,
+)
+
+from app.services import timing
+from app.services.timing import RequestTimer
+from tests.conftest import FakeAudioChunk, FakePiperVoice
+
+
+class RecordingVoice(FakePiperVoice):
+    """Fake voice that records the text of every synthesize() call."""
+
+    def __init__(self, num_frames: int = 1024):
+        self.calls: list[str] = []
+        self.num_frames = num_frames
+
+    def synthesize(self, text: str):
+        self.calls.append(text)
+        yield FakeAudioChunk(num_frames=self.num_frames)
+
+
+class MultiSpeakerVoice(FakePiperVoice):
+    """Fake multi-speaker voice recording the speaker of every call."""
+
+    def __init__(self, speaker_id_map=None, num_speakers=3, default_speaker_id=0):
+        self.config = SimpleNamespace(
+            num_speakers=num_speakers,
+            speaker_id_map=speaker_id_map if speaker_id_map is not None else {"alan": 0, "jenny": 1, "ryan": 2},
+            default_speaker_id=default_speaker_id,
+        )
+        self.speakers: list[int | None] = []
+
+    def synthesize(self, text: str, syn_config=None):
+        self.speakers.append(syn_config.speaker_id if syn_config is not None else None)
+        yield FakeAudioChunk()
+
+
+FMT = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+
+
+class TestSynthesizePcm:
+
+    def test_each_text_chunk_synthesized_separately(self):
+        voice = RecordingVoice()
+        limits = SynthesisLimits(chunk_max_chars=20)
+        out = list(synthesize_pcm(voice, "First sentence. Second sentence.", limits))
+        assert voice.calls == ["First sentence.", "Second sentence."]
+        assert len(out) == 2
+        assert out[0][0] == FMT
+
+    def test_is_lazy(self):
+        voice = RecordingVoice()
+        gen = synthesize_pcm(voice, "One. Two. Three.", SynthesisLimits(chunk_max_chars=5))
+        next(gen)
+        assert voice.calls == ["One."]
+
+    def test_audio_duration_cap_truncates(self):
+        voice = RecordingVoice(num_frames=22050)  # 1 second per chunk
+        limits = SynthesisLimits(chunk_max_chars=5, max_audio_seconds=1.5)
+        out = list(synthesize_pcm(voice, "One. Two. Three.", limits))
+        total = sum(len(pcm) for _, pcm in out)
+        assert total == int(1.5 * 22050) * 2
+        assert voice.calls == ["One.", "Two."]
+
+    def test_zero_cap_disables_limit(self):
+        voice = RecordingVoice(num_frames=22050)
+        limits = SynthesisLimits(chunk_max_chars=6, max_audio_seconds=0)
+        out = list(synthesize_pcm(voice, "One. Two. Three.", limits))
+        assert len(out) == 3
+
+    def test_fast_start_synthesizes_leading_clause_first(self):
+        voice = RecordingVoice()
+        limits = SynthesisLimits(fast_start=True, fast_start_max_words=4)
+        gen = synthesize_pcm(voice, "Good evening, the lights are now off. Sleep well.", limits)
+        next(gen)
+        assert voice.calls == ["Good evening,"]
+        list(gen)
+        assert voice.calls == ["Good evening,", "the lights are now off.", "Sleep well."]
+
+    def test_fast_start_short_text_single_call(self):
+        voice = RecordingVoice()
+        list(synthesize_pcm(voice, "Okay.", SynthesisLimits(fast_start=True)))
+        assert voice.calls == ["Okay."]
+
+
+class TestSpeakers:
+
+    def test_single_speaker_voice_has_no_speakers(self):
+        assert voice_speakers(FakePiperVoice()) == {}
+        assert resolve_speaker(FakePiperVoice(), None) is None
+        with pytest.raises(UnknownSpeaker):
+            resolve_speaker(FakePiperVoice(), "jenny")
+
+    def test_lists_speaker_map(self):
+        assert voice_speakers(MultiSpeakerVoice()) == {"alan": 0, "jenny": 1, "ryan": 2}
+
+    def test_lists_ids_without_map(self):
+        assert voice_speakers(MultiSpeakerVoice(speaker_id_map={}, num_speakers=2)) == {"0": 0, "1": 1}
+
+    def test_resolves_name_and_id(self):
+        voice = MultiSpeakerVoice()
+        assert resolve_speaker(voice, "jenny") == 1
+        assert resolve_speaker(voice, 2) == 2
+        assert resolve_speaker(voice, "2") == 2
+
+    def test_default_speaker_resolves_to_none(self):
+        voice = MultiSpeakerVoice(default_speaker_id=1)
+        assert resolve_speaker(voice, "jenny") is None
+        assert resolve_speaker(voice, "") is None
+
+    def test_unknown_speaker(self):
+        voice = MultiSpeakerVoice()
+        for speaker in ("nobody", 3, -1):
+            with pytest.raises(UnknownSpeaker):
+                resolve_speaker(voice, speaker)
+
+    def test_speaker_voice_key(self):
+        assert speaker_voice_key("v", None) == "v"
+        assert speaker_voice_key("v", 2) == "v#2"
+
+    def test_synthesize_passes_speaker_id(self):
+        voice = MultiSpeakerVoice()
+        list(synthesize_pcm(voice, "One. Two.", SynthesisLimits(chunk_max_chars=5), speaker_id=2))
+        assert voice.speakers == [2, 2]
+        list(synthesize_pcm(voice, "One.", SynthesisLimits()))
+        assert voice.speakers[-1] is None
+
+
+class TestWavHeader:
+
+    def test_header_is_44_bytes_and_readable(self):
+        pcm = b"\x00\x00" * 10
+        buf = BytesIO(wav_header(FMT, len(pcm)) + pcm)
+        assert len(wav_header(FMT, 0)) == 44
+        with wave.open(buf, "rb") as wf:
+            assert wf.getnchannels() == 1
+            assert wf.getsampwidth() == 2
+            assert wf.getframerate() == 22050
+            assert wf.getnframes() == 10
+
+    def test_stream_wav_uses_open_ended_size(self):
+        rest = iter([(FMT, b"\x01\x00"), (FMT, b"\x02\x00")])
+        out = b"".join(stream_wav((FMT, b"\x00\x00"), rest))
+        assert struct.unpack_from("<I", out, 40)[0] == STREAMING_DATA_SIZE
+        assert out[44:] == b"\x00\x00\x01\x00\x02\x00"
+
+    def test_parse_wav_header_round_trip(self):
+        assert parse_wav_header(wav_header(FMT, 100)) == (FMT, 44)
+
+    def test_parse_wav_header_rejects_other_data(self):
+        assert parse_wav_header(b"RIFF") is None
+        assert parse_wav_header(b"x" * 44) is None
+
+    def test_header_into_buffer_offset(self):
+        buf = bytearray(b"\xff" * 50)
+        wav_header_into(buf, FMT, 100, offset=3)
+        assert bytes(buf[3:47]) == wav_header(FMT, 100)
+        assert buf[:3] == b"\xff\xff\xff"
+
+    def test_render_wav_matches_wave_module(self):
+        rest = iter([(FMT, b"\x01\x00"), (FMT, b"\x02\x00\x03\x00")])
+        out = render_wav((FMT, b"\x00\x00"), rest)
+        with wave.open(BytesIO(out), "rb") as wf:
+            assert wf.getnframes() == 4
+            assert wf.readframes(4) == b"\x00\x00\x01\x00\x02\x00\x03\x00"
+
+
+class StagedVoice(FakePiperVoice):
+    """Fake voice that synthesizes through phonemize() and phoneme_ids_to_audio() like PiperVoice."""
+
+    def phonemize(self, text: str):
+        return [list(text)]
+
+    def phoneme_ids_to_audio(self, phoneme_ids, syn_config=None):
+        return b"\x00\x00" * len(phoneme_ids)
+
+    def synthesize(self, text: str, syn_config=None):
+        for phonemes in self.phonemize(text):
+            self.phoneme_ids_to_audio(phonemes, syn_config)
+            yield FakeAudioChunk()
+
+
+class TestInstrumentVoice:
+
+    def test_records_phonemize_and_inference(self):
+        voice = instrument_voice(StagedVoice())
+        timer = RequestTimer()
+
+        def in_request():
+            timing._current.set(timer)
+            return list(voice.synthesize("Hi"))
+
+        assert len(contextvars.Context().run(in_request)) == 1
+        assert set(timer.stages) == {"phonemize", "inference"}
+
+    def test_wraps_once_and_skips_missing_methods(self):
+        voice = instrument_voice(instrument_voice(StagedVoice()))
+        assert voice.phonemize.__wrapped__.__func__ is StagedVoice.phonemize
+        plain = instrument_voice(RecordingVoice())
+        assert list(plain.synthesize("Hi"))
+
+    def test_stream_wav_records_encode(self):
+        timer = RequestTimer()
+
+        def in_request():
+            timing._current.set(timer)
+            return b"".join(stream_wav((FMT, b"\x00\x00"), iter([])))
+
+        assert len(contextvars.Context().run(in_request)) == 46
+        assert "encode" in timer.stages
@@ -0,0 +1,103 @@
+"""Tests for app/services/text_chunker.py – long-text splitting.
+
+Covers:
+- Sentence-level splitting
+- Clause-level fallback for long sentences
+- Hard length cap for unbroken text
+- Whitespace normalization and invalid limits
+- split_first_clause() for fast start
+"""
+
+import pytest
+
+from app.services.text_chunker import split_first_clause, split_text
+
+
+class TestSplitText:
+
+    def test_short_text_is_single_chunk(self):
+        assert list(split_text("Hello world.", 100)) == ["Hello world."]
+
+    def test_splits_on_sentence_boundaries(self):
+        text = "First sentence. Second one! Third?"
+        assert list(split_text(text, 20)) == ["First sentence.", "Second one!", "Third?"]
+
+    def test_keeps_closing_quote_with_sentence(self):
+        text = 'He said "stop." Then he left.'
+        assert list(split_text(text, 15)) == ['He said "stop."', "Then he left."]
+
+    def test_does_not_split_decimal_numbers(self):
+        assert list(split_text("Pi is 3.14 today.", 100)) == ["Pi is 3.14 today."]
+
+    def test_long_sentence_falls_back_to_clauses(self):
+        text = "When the lights go out, the house is quiet, and everyone sleeps."
+        chunks = list(split_text(text, 30))
+        assert chunks == ["When the lights go out,", "the house is quiet,", "and everyone sleeps."]
+
+    def test_adjacent_clauses_are_packed(self):
+        chunks = list(split_text("a, b, c, d.", 100))
+        assert chunks == ["a, b, c, d."]
+        chunks = list(split_text("one, two, three, four, five six seven eight.", 12))
+        assert all(len(c) <= 12 for c in chunks)
+        assert chunks[0] == "one, two,"
+
+    def test_hard_cap_prefers_word_boundary(self):
+        chunks = list(split_text("alpha beta gamma delta epsilon", 11))
+        assert chunks == ["alpha beta", "gamma delta", "epsilon"]
+
+    def test_hard_cap_splits_unbroken_words(self):
+        chunks = list(split_text("x" * 25, 10))
+        assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_all_chunks_respect_limit(self):
+        text = ("This is a fairly long sentence, with clauses; and more words " * 20).strip()
+        for chunk in split_text(text, 40):
+            assert 0 < len(chunk) <= 40
+
+    def test_no_text_is_lost(self):
+        text = "One two. Three, four; five six seven eight nine ten eleven."
+        chunks = list(split_text(text, 12))
+        assert " ".join(chunks).split() == text.split()
+
+    def test_collapses_whitespace(self):
+        assert list(split_text("  Hello \n\n  world.  ", 100)) == ["Hello world."]
+
+    def test_empty_text_yields_nothing(self):
+        assert list(split_text("   ", 100)) == []
+
+    def test_invalid_limit_raises(self):
+        with pytest.raises(ValueError):
+            list(split_text("Hello", 0))
+
+
+class TestSplitFirstClause:
+
+    def test_splits_at_first_comma(self):
+        head, rest = split_first_clause("Good evening, the lights in the living room are now off.", 6)
+        assert head == "Good evening,"
+        assert rest == "the lights in the living room are now off."
+
+    def test_short_text_is_not_split(self):
+        assert split_first_clause("Lights off.", 6) == ("Lights off.", "")
+
+    def test_break_beyond_cap_uses_word_cap(self):
+        head, rest = split_first_clause("Turning on all of the lights in the kitchen now, as requested.", 5)
+        assert head == "Turning on all"
+        assert rest == "of the lights in the kitchen now, as requested."
+
+    def test_backs_off_from_weak_trailing_words(self):
+        head, _ = split_first_clause("Please remind me to call the plumber tomorrow morning", 6)
+        assert head == "Please remind me to call"
+
+    def test_sentence_end_counts_as_break(self):
+        head, rest = split_first_clause("Done. The timer is set for ten minutes.", 6)
+        assert (head, rest) == ("Done.", "The timer is set for ten minutes.")
+
+    def test_no_text_is_lost(self):
+        text = "Well then, here is a fairly long sentence without much punctuation at all"
+        head, rest = split_first_clause(text, 4)
+        assert f"{head} {rest}" == text
+
+    def test_invalid_limit_raises(self):
+        with pytest.raises(ValueError):
+            split_first_clause("text", 0)
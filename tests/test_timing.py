@@ -0,0 +1,166 @@
+"""Tests for app/services/timing.py – per-request stage timing.
+
+Covers:
+- RequestTimer marks and Server-Timing formatting
+- Stages recorded from worker threads (queue, phonemize, inference, encode)
+- TimingStats rolling window and percentiles
+- RequestTimingMiddleware header, streamed bodies and structured log
+"""
+
+import contextvars
+import json
+import logging
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.services import timing
+from app.services.timing import (
+    RequestTimer,
+    RequestTimingMiddleware,
+    TimingStats,
+    current_timer,
+    mark,
+    record_stage,
+)
+
+
+class TestRequestTimer:
+
+    def test_marks_accumulate_per_stage(self):
+        timer = RequestTimer()
+        timer.mark("a")
+        timer.mark("b")
+        timer.mark("a")
+        assert list(timer.stages) == ["a", "b"]
+        assert all(v >= 0 for v in timer.stages.values())
+
+    def test_server_timing_lists_stages_and_total(self):
+        timer = RequestTimer()
+        timer.mark("auth")
+        value = timer.server_timing()
+        names = [entry.split(";")[0] for entry in value.split(", ")]
+        assert names == ["auth", "total"]
+        assert "dur=" in value
+
+    def test_mark_outside_request_is_noop(self):
+        assert current_timer() is None
+        mark("anything")
+
+    def test_recorded_time_is_not_counted_twice(self):
+        timer = RequestTimer()
+        time.sleep(0.02)
+        timer.record("queue", 0.015)
+        timer.mark("synth_first")
+        assert timer.stages["queue"] == 0.015
+        assert 0 <= timer.stages["synth_first"] < 0.02
+
+    def test_mark_never_goes_negative(self):
+        timer = RequestTimer()
+        timer.record("inference", 10.0)
+        timer.mark("render")
+        assert timer.stages["render"] == 0.0
+
+    def test_record_stage_uses_the_context_timer(self):
+        timer = RequestTimer()
+
+        def in_request():
+            timing._current.set(timer)
+            record_stage("encode", 0.001)
+            record_stage("encode", 0.002)
+
+        contextvars.Context().run(in_request)
+        assert timer.stages["encode"] == pytest.approx(0.003)
+        record_stage("encode", 1.0)  # outside a request: no-op
+        assert timer.stages["encode"] == pytest.approx(0.003)
+
+
+class TestTimingStats:
+
+    def test_percentiles_per_route_and_stage(self):
+        stats = TimingStats(window=100)
+        for ms in range(1, 101):
+            stats.record("/speak", {"synth": ms / 1000})
+        result = stats.percentiles()["/speak"]["synth"]
+        assert result["count"] == 100
+        assert result["p50_ms"] == pytest.approx(50)
+        assert result["p95_ms"] == pytest.approx(95)
+        assert result["p99_ms"] == pytest.approx(99)
+        assert result["max_ms"] == pytest.approx(100)
+
+    def test_window_keeps_recent_samples(self):
+        stats = TimingStats(window=2)
+        for seconds in (10.0, 0.001, 0.002):
+            stats.record("/r", {"s": seconds})
+        result = stats.percentiles()["/r"]["s"]
+        assert result["count"] == 2
+        assert result["max_ms"] == pytest.approx(2)
+
+    def test_reset(self):
+        stats = TimingStats()
+        stats.record("/r", {"s": 1.0})
+        stats.reset()
+        assert stats.percentiles() == {}
+
+
+@pytest.fixture
+def timed_app():
+    stats = TimingStats()
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware, stats=stats)
+
+    @app.get("/items/{item_id}")
+    def item(item_id: str):
+        mark("lookup")
+        return {"id": item_id}
+
+    @app.get("/stream")
+    def stream():
+        mark("prepare")
+        return StreamingResponse(iter([b"a", b"b"]))
+
+    return app, stats
+
+
+class TestRequestTimingMiddleware:
+
+    def test_server_timing_header(self, timed_app):
+        app, _ = timed_app
+        resp = TestClient(app).get("/items/1")
+        assert resp.status_code == 200
+        assert resp.headers["server-timing"].startswith("lookup;dur=")
+        assert "total;dur=" in resp.headers["server-timing"]
+
+    def test_records_by_route_template(self, timed_app):
+        app, stats = timed_app
+        client = TestClient(app)
+        client.get("/items/1")
+        client.get("/items/2")
+        routes = stats.percentiles()
+        assert routes["/items/{item_id}"]["lookup"]["count"] == 2
+        assert routes["/items/{item_id}"]["total"]["count"] == 2
+
+    def test_streamed_body_recorded_as_send(self, timed_app):
+        app, stats = timed_app
+        resp = TestClient(app).get("/stream")
+        assert resp.content == b"ab"
+        assert "send" not in resp.headers["server-timing"]
+        assert stats.percentiles()["/stream"]["send"]["count"] == 1
+
+    def test_unmatched_route(self, timed_app):
+        app, stats = timed_app
+        TestClient(app).get("/nope")
+        assert "unmatched" in stats.percentiles()
+
+    def test_structured_debug_log(self, timed_app, caplog):
+        app, _ = timed_app
+        with caplog.at_level(logging.DEBUG, logger="app.services.timing"):
+            TestClient(app).get("/items/1")
+        record = next(r for r in caplog.records if r.getMessage().startswith("request timing "))
+        payload = json.loads(record.getMessage().removeprefix("request timing "))
+        assert payload["route"] == "/items/{item_id}"
+        assert payload["status"] == 200
+        assert set(payload["stages_ms"]) == {"lookup", "send", "total"}
@@ -0,0 +1,146 @@
+"""Tests for app/services/tracing.py – optional OpenTelemetry tracing.
+
+Covers:
+- No-op behaviour when tracing is disabled, SDK not imported
+- setup_tracing() sampling and exporters
+- Server spans with incoming W3C context, auth and LLM spans, TTFT
+- traceparent propagation to the LLM proxy
+"""
+
+import inspect
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+from app.services import tracing  # noqa: E402
+
+TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT = f"00-{TRACE_ID}-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setenv("TTS_TRACING_ENABLED", "true")
+    exporter = InMemorySpanExporter()
+    assert tracing.setup_tracing(exporter=exporter)
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+def _finished(exporter):
+    tracing._provider.force_flush()
+    return {s.name: s for s in exporter.get_finished_spans()}
+
+
+class TestDisabled:
+
+    def test_setup_disabled_by_default(self):
+        assert tracing.setup_tracing() is False
+        assert not tracing.tracing_enabled()
+
+    def test_span_is_noop(self):
+        with tracing.span("x") as s:
+            assert s is None
+        assert tracing.current_span() is None
+
+    def test_inject_is_noop(self):
+        assert tracing.inject_trace_headers({}) == {}
+
+    def test_sdk_not_imported_until_enabled(self):
+        code = "import sys, app.services.tracing; print('opentelemetry.sdk' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "False"
+
+    def test_first_token_timer_without_span(self):
+        timer = tracing.FirstTokenTimer(None)
+        timer.token()
+        assert timer.ttft is not None
+
+
+class TestSetup:
+
+    def test_zero_sample_ratio_drops_root_spans(self, monkeypatch):
+        monkeypatch.setenv("TTS_TRACING_ENABLED", "true")
+        monkeypatch.setenv("TTS_TRACING_SAMPLE_RATIO", "0")
+        exporter = InMemorySpanExporter()
+        tracing.setup_tracing(exporter=exporter)
+        try:
+            with tracing.span("root"):
+                pass
+            assert _finished(exporter) == {}
+        finally:
+            tracing.shutdown_tracing()
+
+    def test_file_exporter_writes_json_lines(self, monkeypatch, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setenv("TTS_TRACING_ENABLED", "true")
+        monkeypatch.setenv("TTS_TRACING_EXPORTER", "file")
+        monkeypatch.setenv("TTS_TRACING_FILE", str(path))
+        tracing.setup_tracing()
+        with tracing.span("written", answer=42):
+            pass
+        tracing.shutdown_tracing()
+        record = json.loads(path.read_text().splitlines()[0])
+        assert record["name"] == "written"
+        assert record["attributes"] == {"answer": 42}
+
+    def test_inject_adds_traceparent(self, exporter):
+        with tracing.span("outgoing"):
+            headers = tracing.inject_trace_headers({})
+        assert headers["traceparent"].startswith("00-")
+
+
+class TestInstrumentedApp:
+
+    def test_speak_spans_join_incoming_trace(self, client, exporter):
+        resp = client.post("/speak", json={"text": "Hello"}, headers={"traceparent": PARENT})
+        assert resp.status_code == 200
+        spans = _finished(exporter)
+        server = spans["POST /speak"]
+        assert format(server.context.trace_id, "032x") == TRACE_ID
+        assert server.attributes["http.route"] == "/speak"
+        assert server.attributes["http.response.status_code"] == 200
+        for name in ("tts.plan", "tts.cache_lookup", "tts.synthesis.first_chunk", "tts.synthesis.render"):
+            assert spans[name].parent.span_id == server.context.span_id
+
+    @pytest.mark.asyncio
+    async def test_auth_dependency_is_traced(self, exporter):
+        from app.deps import _traced
+
+        async def dependency(x_jarvis_app_id: str | None = None):
+            return x_jarvis_app_id
+
+        traced = _traced(dependency)
+        assert inspect.signature(traced) == inspect.signature(dependency)
+        assert await traced(x_jarvis_app_id="app") == "app"
+        assert "auth.validate" in _finished(exporter)
+
+    def test_wake_response_propagates_and_records_ttft(self, client, exporter):
+        seen = {}
+
+        def handler(request):
+            seen["traceparent"] = request.headers.get("traceparent")
+            lines = [json.dumps({"response": "At your"}), json.dumps({"response": " service"})]
+            return httpx.Response(200, content="\n".join(lines).encode())
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.AsyncClient
+        with patch("app.main.httpx.AsyncClient", lambda *a, **kw: real_client(transport=transport)), \
+                patch("app.main.service_config.get_llm_proxy_url", return_value="http://llm"):
+            resp = client.post("/generate-wake-response")
+        assert resp.json() == {"text": "At your service"}
+
+        spans = _finished(exporter)
+        llm = spans["llm.stream"]
+        assert "llm.ttft_ms" in llm.attributes
+        assert [e.name for e in llm.events] == ["first_token"]
+        assert seen["traceparent"].split("-")[2] == format(llm.context.span_id, "016x")
+        assert "llm_first_token" in resp.headers["server-timing"]
@@ -0,0 +1,213 @@
+"""Tests for app/services/voice_swap.py – zero-downtime voice switching.
+
+Covers:
+- New voice is loaded and warmed before it becomes current
+- In-flight references keep the old voice alive until released
+- Load failures keep the current voice and are not retried until the setting changes
+- check() follows tts.default_voice
+- warm_up_workers() builds a session on every pinned worker
+- A swap warms the new voice on the pinned workers before activating it
+"""
+
+import asyncio
+import gc
+
+import pytest
+
+from app.services.metrics import get_metrics
+from app.services.scheduler import SynthesisScheduler
+from app.services.voice_swap import VoiceHotSwap, warm_up_workers
+from app.services.worker_topology import PerWorkerSession, plan_workers
+from tests.conftest import FakeAudioChunk
+
+
+class NamedVoice:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.synth_calls = 0
+
+    def synthesize(self, text: str):
+        self.synth_calls += 1
+        yield FakeAudioChunk()
+
+
+class FakeSession:
+
+    def run(self, outputs, inputs):
+        return []
+
+
+class SessionVoice(NamedVoice):
+    """Voice whose synthesis runs its session, one per pinned worker."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.session = PerWorkerSession(lambda threads: FakeSession(), FakeSession())
+
+    def synthesize(self, text: str):
+        self.session.run(None, {})
+        yield from super().synthesize(text)
+
+
+class Holder:
+    """Stands in for the module globals in app.main."""
+
+    def __init__(self, name: str = "alan"):
+        self.name = name
+        self.voice = NamedVoice(name)
+        self.loads: list[str] = []
+        self.fail: set[str] = set()
+
+    def load(self, name: str) -> NamedVoice:
+        self.loads.append(name)
+        if name in self.fail:
+            raise FileNotFoundError(f"{name}.onnx")
+        return NamedVoice(name)
+
+    def get(self):
+        return self.name, self.voice
+
+    def set(self, name, voice):
+        self.name, self.voice = name, voice
+
+    def swapper(self) -> VoiceHotSwap:
+        return VoiceHotSwap(self.load, self.get, self.set)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+class TestSwap:
+
+    @pytest.mark.asyncio
+    async def test_switches_to_warmed_voice(self):
+        holder = Holder()
+        assert await holder.swapper().swap("jenny") is True
+        assert holder.name == "jenny"
+        assert holder.voice.name == "jenny"
+        assert holder.voice.synth_calls == 1  # warm-up ran before switch-over
+        assert get_metrics().get_counter("voice_swaps_total") == 1
+        assert get_metrics().get_summary("voice_swap_seconds")["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pinned_workers_warmed_before_switch(self):
+        scheduler = SynthesisScheduler(slots=plan_workers(2, cpus=[0, 1]))
+        holder = Holder()
+        holder.load = lambda name: SessionVoice(name)
+        sessions_at_switch = []
+
+        def set_current(name, voice):
+            sessions_at_switch.append(len(voice.session))
+            holder.set(name, voice)
+
+        swapper = VoiceHotSwap(holder.load, holder.get, set_current, get_scheduler=lambda: scheduler)
+        try:
+            assert await swapper.swap("jenny") is True
+        finally:
+            scheduler.shutdown()
+        assert sessions_at_switch == [2]
+        # Once on the loading thread (fallback session), once per worker
+        assert holder.voice.synth_calls == 3
+
+    @pytest.mark.asyncio
+    async def test_same_name_is_noop(self):
+        holder = Holder()
+        assert await holder.swapper().swap("alan") is False
+        assert holder.loads == []
+
+    @pytest.mark.asyncio
+    async def test_in_flight_request_keeps_old_voice(self):
+        holder = Holder()
+        swapper = holder.swapper()
+        _, in_flight = holder.get()
+
+        await swapper.swap("jenny")
+        gc.collect()
+        assert swapper.released == []
+        assert list(in_flight.synthesize("still works"))
+
+        del in_flight
+        gc.collect()
+        assert swapper.released == ["alan"]
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_current_voice(self):
+        holder = Holder()
+        holder.fail.add("broken")
+        old = holder.voice
+        assert await holder.swapper().swap("broken") is False
+        assert holder.voice is old
+        assert get_metrics().get_counter("voice_swap_failures_total") == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_swaps_are_serialized(self):
+        holder = Holder()
+        swapper = holder.swapper()
+        results = await asyncio.gather(swapper.swap("jenny"), swapper.swap("jenny"))
+        assert sorted(results) == [False, True]
+        assert holder.loads == ["jenny"]
+
+
+class TestCheck:
+
+    @pytest.mark.asyncio
+    async def test_follows_setting(self, monkeypatch):
+        monkeypatch.setenv("TTS_DEFAULT_VOICE", "jenny")
+        holder = Holder()
+        assert await holder.swapper().check() is True
+        assert holder.name == "jenny"
+
+    @pytest.mark.asyncio
+    async def test_failed_voice_not_retried(self, monkeypatch):
+        monkeypatch.setenv("TTS_DEFAULT_VOICE", "broken")
+        holder = Holder()
+        holder.fail.add("broken")
+        swapper = holder.swapper()
+        await swapper.check()
+        await swapper.check()
+        assert holder.loads == ["broken"]
+
+        monkeypatch.setenv("TTS_DEFAULT_VOICE", "jenny")
+        assert await swapper.check() is True
+        assert holder.name == "jenny"
+
+    @pytest.mark.asyncio
+    async def test_watch_runs_until_cancelled(self, monkeypatch):
+        monkeypatch.setenv("TTS_DEFAULT_VOICE", "jenny")
+        holder = Holder()
+        task = asyncio.create_task(holder.swapper().watch(0.01))
+        for _ in range(100):
+            if holder.name == "jenny":
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert holder.name == "jenny"
+
+
+class TestWarmUpWorkers:
+
+    @pytest.mark.asyncio
+    async def test_builds_session_on_every_pinned_worker(self):
+        scheduler = SynthesisScheduler(slots=plan_workers(2, cpus=[0, 1]))
+        voice = SessionVoice("alan")
+        try:
+            await warm_up_workers(scheduler, voice)
+        finally:
+            scheduler.shutdown()
+        assert len(voice.session) == 2
+        assert voice.synth_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_noop_without_pinning(self):
+        scheduler = SynthesisScheduler(workers=2)
+        voice = SessionVoice("alan")
+        try:
+            await warm_up_workers(scheduler, voice)
+        finally:
+            scheduler.shutdown()
+        assert voice.synth_calls == 0
@@ -0,0 +1,167 @@
+"""Tests for app/services/wake_response.py – bounded wake response reading.
+
+Covers:
+- WakeTextCollector: sentence, word cap and disabled cut-off
+- parse_stream_line() on valid, empty and malformed lines
+- collect_wake_text(): deadline keeps partial text, canned fallback, metrics,
+  caller budget shorter than the cut-off deadline
+- feed_lines() stops consuming the stream at the cut-off
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.metrics import get_metrics
+from app.services.wake_response import (
+    CutoffReason,
+    WakeCutoff,
+    WakeTextCollector,
+    collect_wake_text,
+    feed_lines,
+    get_wake_cutoff,
+    parse_stream_line,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+def _feed(collector: WakeTextCollector, fragments: list[str]) -> CutoffReason | None:
+    reason = None
+    for fragment in fragments:
+        reason = collector.feed(fragment)
+        if reason is not None:
+            break
+    return reason
+
+
+class TestCollector:
+
+    def test_stops_at_first_sentence(self):
+        collector = WakeTextCollector(WakeCutoff(enabled=True))
+        assert _feed(collector, ["At your", " service", "!", " How may"]) is CutoffReason.SENTENCE
+        assert collector.text == "At your service!"
+
+    def test_sentence_with_closing_quote(self):
+        collector = WakeTextCollector(WakeCutoff(enabled=True))
+        collector.feed('"Ready when you are." Shall')
+        assert collector.text == '"Ready when you are."'
+
+    def test_decimal_point_is_not_sentence_end(self):
+        collector = WakeTextCollector(WakeCutoff(enabled=True))
+        assert collector.feed("It is 2.5") is None
+
+    def test_word_cap_counts_complete_words(self):
+        collector = WakeTextCollector(WakeCutoff(enabled=True, max_words=3, stop_at_sentence=False))
+        assert collector.feed("one two thr") is None
+        assert collector.feed("ee ") is CutoffReason.WORD_CAP
+        collector.feed("four")
+        assert collector.text == "one two three"
+
+    def test_disabled_reads_everything(self):
+        collector = WakeTextCollector(WakeCutoff(enabled=False))
+        assert _feed(collector, ["Hi. ", "More text follows."]) is None
+        assert collector.text == "Hi. More text follows."
+
+
+class TestParseLine:
+
+    def test_valid_line(self):
+        assert parse_stream_line(json.dumps({"response": "Hi"})) == "Hi"
+
+    def test_empty_and_malformed(self):
+        assert parse_stream_line("  ") == ""
+        assert parse_stream_line("{bad") == ""
+        assert parse_stream_line("[1]") == ""
+        assert parse_stream_line(json.dumps({"done": True})) == ""
+
+
+async def _lines(fragments, delay=0.0, consumed=None):
+    for fragment in fragments:
+        if delay:
+            await asyncio.sleep(delay)
+        if consumed is not None:
+            consumed.append(fragment)
+        yield json.dumps({"response": fragment})
+
+
+class TestCollect:
+
+    @pytest.mark.asyncio
+    async def test_sentence_cutoff_stops_consuming(self):
+        consumed = []
+        tokens = []
+
+        async def read(collector):
+            await feed_lines(_lines(["Hello", " there.", " I", " am", " here"], consumed=consumed), collector,
+                             lambda: tokens.append(1))
+
+        text, reason = await collect_wake_text(read, WakeCutoff(enabled=True))
+        assert (text, reason) == ("Hello there.", CutoffReason.SENTENCE)
+        assert consumed == ["Hello", " there."]
+        assert len(tokens) == 2
+        assert get_metrics().get_counter("wake_llm_cutoff_total", reason="sentence") == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_returns_partial_text(self):
+        async def read(collector):
+            await feed_lines(_lines(["At", " your", " service"], delay=0.05), collector, lambda: None)
+
+        text, reason = await collect_wake_text(read, WakeCutoff(enabled=True, deadline_seconds=0.08))
+        assert reason is CutoffReason.DEADLINE
+        assert text == "At"
+
+    @pytest.mark.asyncio
+    async def test_deadline_without_text_falls_back(self):
+        async def read(collector):
+            await asyncio.sleep(1)
+
+        text, reason = await collect_wake_text(read, WakeCutoff(enabled=True, deadline_seconds=0.01, fallback_text="Sir?"))
+        assert (text, reason) == ("Sir?", CutoffReason.DEADLINE)
+        assert get_metrics().get_counter("wake_fallback_total", reason="deadline") == 1
+
+    @pytest.mark.asyncio
+    async def test_caller_budget_tightens_deadline(self):
+        async def read(collector):
+            await asyncio.sleep(1)
+
+        text, reason = await collect_wake_text(read, WakeCutoff(enabled=False), budget=0.01)
+        assert (text, reason) == ("Yes?", CutoffReason.DEADLINE)
+
+    @pytest.mark.asyncio
+    async def test_complete_stream(self):
+        async def read(collector):
+            await feed_lines(_lines(["Yes", " sir"]), collector, lambda: None)
+
+        assert await collect_wake_text(read, WakeCutoff()) == ("Yes sir", CutoffReason.COMPLETE)
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self):
+        async def read(collector):
+            raise RuntimeError("proxy down")
+
+        with pytest.raises(RuntimeError):
+            await collect_wake_text(read, WakeCutoff())
+
+
+class TestSettings:
+
+    def test_defaults(self):
+        # Off unless enabled: a slow LLM must not turn every reply into the fallback
+        assert get_wake_cutoff() == WakeCutoff()
+        assert not WakeCutoff().enabled
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TTS_WAKE_CUTOFF_ENABLED", "true")
+        monkeypatch.setenv("TTS_WAKE_DEADLINE_MS", "250")
+        monkeypatch.setenv("TTS_WAKE_MAX_WORDS", "5")
+        monkeypatch.setenv("TTS_WAKE_FALLBACK_TEXT", "Sir?")
+        cutoff = get_wake_cutoff()
+        assert cutoff.enabled
+        assert cutoff.deadline_seconds == 0.25
+        assert cutoff.max_words == 5
+        assert cutoff.fallback_text == "Sir?"
@@ -0,0 +1,140 @@
+"""Tests for app/services/wav_buffer.py – pooled WAV assembly.
+
+Covers:
+- assemble_wav() output matches the wave module
+- header written in place, PCM copied once
+- growth past the initial buffer
+- encode stage excludes time spent producing chunks
+- BufferPool reuse, bounds, and refusing buffers that are still viewed
+"""
+
+import contextvars
+import time
+import wave
+from io import BytesIO
+
+import pytest
+
+from app.services import timing
+from app.services.metrics import get_metrics
+from app.services.synthesis import AudioFormat
+from app.services.timing import RequestTimer
+from app.services.wav_buffer import MIN_BUFFER_BYTES, BufferPool, WavBuffer, assemble_wav
+
+FMT = AudioFormat(sample_rate=22050, channels=1, sample_width=2)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    get_metrics().reset()
+
+
+def _chunks(n: int, size: int):
+    return [(FMT, bytes([i % 256]) * size) for i in range(n)]
+
+
+class TestAssemble:
+
+    def test_output_is_valid_wav(self):
+        chunks = _chunks(3, 1000)
+        buffer, view = assemble_wav(chunks[0], iter(chunks[1:]))
+        with wave.open(BytesIO(bytes(view)), "rb") as wf:
+            assert wf.getframerate() == 22050
+            assert wf.getnframes() == 1500
+            assert wf.readframes(1500) == b"".join(pcm for _, pcm in chunks)
+        buffer.release()
+
+    def test_pcm_copied_once(self):
+        chunks = _chunks(4, 2000)
+        buffer, view = assemble_wav(chunks[0], iter(chunks[1:]))
+        assert len(view) == 44 + 8000
+        assert buffer.bytes_copied == 8000
+        assert buffer.allocations == 1
+        assert get_metrics().get_counter("wav_buffer_bytes_copied_total") == 8000
+        buffer.release()
+
+    def test_grows_past_initial_buffer(self):
+        size = MIN_BUFFER_BYTES // 2
+        chunks = _chunks(3, size)
+        buffer, view = assemble_wav(chunks[0], iter(chunks[1:]))
+        assert len(view) == 44 + 3 * size
+        assert buffer.allocations == 2
+        assert buffer.bytes_copied > 3 * size
+        assert bytes(view[-size:]) == chunks[2][1]
+        buffer.release()
+
+    def test_encode_stage_excludes_synthesis(self):
+        timer = RequestTimer()
+
+        def slow():
+            time.sleep(0.05)
+            yield FMT, b"\x00\x00"
+
+        def in_request():
+            timing._current.set(timer)
+            return assemble_wav((FMT, b"\x00\x00"), slow())
+
+        buffer, view = contextvars.Context().run(in_request)
+        assert len(view) == 48
+        assert 0 <= timer.stages["encode"] < 0.05
+        buffer.release()
+
+    def test_error_releases_buffer(self):
+        pool = BufferPool()
+
+        def failing():
+            yield FMT, b"\x00\x00"
+            raise RuntimeError("synthesis failed")
+
+        with pytest.raises(RuntimeError):
+            assemble_wav((FMT, b"\x00\x00"), failing(), pool)
+        assert pool.free_buffers() == 1
+
+
+class TestBufferPool:
+
+    def test_buffers_are_reused(self):
+        pool = BufferPool()
+        first, view = assemble_wav(*_split(_chunks(2, 100)), pool)
+        first.release()
+        second, view = assemble_wav(*_split(_chunks(2, 100)), pool)
+        second.release()
+        assert pool.allocations == 1
+        assert pool.reuses == 1
+        assert get_metrics().get_counter("wav_buffer_reuses_total") == 1
+
+    def test_smallest_fitting_buffer_chosen(self):
+        pool = BufferPool()
+        big, small = bytearray(MIN_BUFFER_BYTES * 4), bytearray(MIN_BUFFER_BYTES)
+        pool.release(big)
+        pool.release(small)
+        assert pool.acquire(100) is small
+        assert pool.acquire(100) is big
+
+    def test_pool_bounded_by_count(self):
+        pool = BufferPool(max_buffers=2)
+        for size in (10, 20, 30):
+            pool.release(bytearray(size))
+        assert pool.free_buffers() == 2
+        assert len(pool.acquire(1)) == 20
+
+    def test_pool_bounded_by_total_size(self):
+        pool = BufferPool(max_total_bytes=100)
+        pool.release(bytearray(80))
+        pool.release(bytearray(80))
+        assert pool.free_buffers() == 1
+
+    def test_viewed_buffer_not_pooled(self):
+        pool = BufferPool()
+        buffer = WavBuffer(pool)
+        buffer.append(b"\x00\x00")
+        view = buffer.finish(FMT)
+        leaked = view[10:]  # e.g. a transport's pending write
+        buffer.release()
+        assert pool.free_buffers() == 0
+        assert get_metrics().get_counter("wav_buffer_pinned_total") == 1
+        leaked.release()
+
+
+def _split(chunks):
+    return chunks[0], iter(chunks[1:])
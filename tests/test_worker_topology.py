@@ -0,0 +1,217 @@
+"""Tests for app/services/worker_topology.py – pinned synthesis workers.
+
+Covers:
+- cgroup v1/v2 CPU quota detection
+- usable CPUs trimmed to the quota
+- plan_workers(): disjoint CPU sets, auto worker/thread counts, oversubscription
+- pin_current_thread() and current_slot()
+- PerWorkerSession: one session per worker slot, fallback elsewhere
+- Scheduler workers pinned to their slots
+- get_scheduler() auto worker count, pinned or not
+"""
+
+import os
+import threading
+
+import pytest
+
+from app.services import scheduler as scheduler_mod
+from app.services.scheduler import SynthesisScheduler, get_scheduler, reset_scheduler
+from app.services.worker_topology import (
+    PerWorkerSession,
+    WorkerSlot,
+    cgroup_cpu_quota,
+    current_slot,
+    pin_current_thread,
+    plan_workers,
+    use_worker_sessions,
+    usable_cpus,
+)
+
+
+class FakeSession:
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def run(self, outputs, inputs):
+        return [self.name]
+
+    def get_inputs(self):
+        return ["input"]
+
+
+class TestCgroupQuota:
+
+    def test_v2_quota(self, tmp_path):
+        (tmp_path / "cpu.max").write_text("250000 100000\n")
+        assert cgroup_cpu_quota(tmp_path) == 2.5
+
+    def test_v2_unlimited(self, tmp_path):
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert cgroup_cpu_quota(tmp_path) is None
+
+    def test_v1_quota(self, tmp_path):
+        cpu = tmp_path / "cpu"
+        cpu.mkdir()
+        (cpu / "cpu.cfs_quota_us").write_text("200000\n")
+        (cpu / "cpu.cfs_period_us").write_text("100000\n")
+        assert cgroup_cpu_quota(tmp_path) == 2.0
+
+    def test_v1_unlimited(self, tmp_path):
+        cpu = tmp_path / "cpu"
+        cpu.mkdir()
+        (cpu / "cpu.cfs_quota_us").write_text("-1\n")
+        (cpu / "cpu.cfs_period_us").write_text("100000\n")
+        assert cgroup_cpu_quota(tmp_path) is None
+
+    def test_no_cgroup_files(self, tmp_path):
+        assert cgroup_cpu_quota(tmp_path) is None
+
+    def test_usable_cpus_rounds_quota_up(self):
+        assert usable_cpus([3, 0, 1, 2], quota=1.5) == [0, 1]
+        assert usable_cpus([0, 1, 2, 3], quota=None) == [0, 1, 2, 3]
+        assert usable_cpus([0, 1], quota=0.2) == [0]
+
+
+class TestPlanWorkers:
+
+    def test_disjoint_sets(self):
+        slots = plan_workers(2, cpus=[0, 1, 2, 3])
+        assert [s.cpus for s in slots] == [(0, 1), (2, 3)]
+        assert [s.threads for s in slots] == [2, 2]
+
+    def test_leftover_cpus_go_to_last_worker(self):
+        slots = plan_workers(2, cpus=[0, 1, 2, 3, 4])
+        assert [s.cpus for s in slots] == [(0, 1), (2, 3, 4)]
+        assert slots[1].threads == 3
+
+    def test_auto_worker_count(self):
+        slots = plan_workers(0, cpus=list(range(8)))
+        assert len(slots) == 4
+        assert all(len(s.cpus) == 2 for s in slots)
+        assert len(plan_workers(0, cpus=[0])) == 1
+
+    def test_explicit_threads(self):
+        slots = plan_workers(2, threads_per_worker=1, cpus=[0, 1, 2, 3])
+        assert [s.threads for s in slots] == [1, 1]
+
+    def test_more_workers_than_cpus(self):
+        slots = plan_workers(3, cpus=[0, 1])
+        assert [s.cpus for s in slots] == [(0,), (1,), (0,)]
+
+    def test_no_cpus(self):
+        with pytest.raises(ValueError):
+            plan_workers(1, cpus=[])
+
+
+class TestPinning:
+
+    def test_pin_sets_thread_slot(self):
+        slot = WorkerSlot(index=0, cpus=tuple(sorted(os.sched_getaffinity(0)))[:1], threads=1)
+        seen = {}
+
+        def target():
+            seen["pinned"] = pin_current_thread(slot)
+            seen["slot"] = current_slot()
+            seen["affinity"] = os.sched_getaffinity(0)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        assert seen["pinned"] is True
+        assert seen["slot"] == slot
+        assert seen["affinity"] == set(slot.cpus)
+        assert current_slot() is None
+
+    def test_refused_affinity_is_reported(self, monkeypatch):
+        def refuse(pid, cpus):
+            raise OSError("not permitted")
+
+        monkeypatch.setattr(os, "sched_setaffinity", refuse)
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(ok=pin_current_thread(WorkerSlot(0, (0,), 1))))
+        thread.start()
+        thread.join()
+        assert result["ok"] is False
+
+    def test_scheduler_workers_are_pinned(self):
+        cpus = sorted(os.sched_getaffinity(0))
+        slots = plan_workers(1, cpus=cpus)
+        scheduler = SynthesisScheduler(workers=5, slots=slots)
+        try:
+            assert scheduler.workers == 1
+            assert scheduler.pinned
+            assert scheduler.submit(current_slot).result(timeout=5) == slots[0]
+        finally:
+            scheduler.shutdown()
+
+    def test_unpinned_scheduler(self):
+        scheduler = SynthesisScheduler(workers=1)
+        try:
+            assert not scheduler.pinned
+            assert scheduler.submit(current_slot).result(timeout=5) is None
+        finally:
+            scheduler.shutdown()
+
+    @pytest.mark.parametrize("pinning", ["false", "true"])
+    def test_auto_worker_count(self, monkeypatch, pinning):
+        monkeypatch.setenv("TTS_WORKER_PINNING", pinning)
+        monkeypatch.setattr(scheduler_mod, "cgroup_cpu_quota", lambda: None)
+        monkeypatch.setattr(scheduler_mod, "usable_cpus", lambda quota=None: [0, 1, 2, 3, 4, 5])
+        monkeypatch.setattr(scheduler_mod, "pin_current_thread", lambda slot: None)
+        reset_scheduler()
+        try:
+            assert get_scheduler().workers == 3
+        finally:
+            reset_scheduler()
+
+
+class TestPerWorkerSession:
+
+    @pytest.fixture
+    def created(self):
+        return []
+
+    @pytest.fixture
+    def create(self, created):
+        def create(threads):
+            created.append(threads)
+            return FakeSession(f"worker-{len(created)}")
+
+        return create
+
+    def test_fallback_without_slot(self, created, create):
+        session = PerWorkerSession(create, FakeSession("shared"))
+        assert session.run(None, {}) == ["shared"]
+        assert created == []
+
+    def test_one_session_per_worker(self, created, create):
+        slots = plan_workers(2, cpus=[0, 1, 2, 3])
+        session = PerWorkerSession(create, FakeSession("shared"))
+        scheduler = SynthesisScheduler(slots=slots)
+        try:
+            names = {scheduler.submit(session.run, None, {}).result(timeout=5)[0] for _ in range(20)}
+        finally:
+            scheduler.shutdown()
+        assert names <= {"worker-1", "worker-2"}
+        assert created and all(threads == 2 for threads in created)
+        assert len(session) == len(created) <= 2
+
+    def test_attributes_are_delegated(self, create):
+        session = PerWorkerSession(create, FakeSession("shared"))
+        assert session.get_inputs() == ["input"]
+
+    def test_use_worker_sessions_wraps_once(self):
+        class Voice:
+            session = FakeSession("shared")
+
+        voice = use_worker_sessions(Voice(), FakeSession)
+        wrapped = voice.session
+        assert isinstance(wrapped, PerWorkerSession)
+        use_worker_sessions(voice, FakeSession)
+        assert voice.session is wrapped
+
+    def test_voice_without_session_untouched(self):
+        voice = object()
+        assert use_worker_sessions(voice, FakeSession) is voice